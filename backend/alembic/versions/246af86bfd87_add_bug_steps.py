@@ -0,0 +1,49 @@
+"""add_bug_steps
+
+Revision ID: 246af86bfd87
+Revises: 2bdbb71dee0b
+Create Date: 2026-10-16 21:42:37.904115
+
+Append-only step rows that supersede bug_results.steps. init_db's
+create_all may already have created the table, so it is only created if
+missing.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '246af86bfd87'
+down_revision: Union[str, Sequence[str], None] = '2bdbb71dee0b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if sa.inspect(op.get_bind()).has_table('bug_steps'):
+        return
+    op.create_table('bug_steps',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('job_id', sa.String(length=64), nullable=False),
+    sa.Column('bug_index', sa.Integer(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False, comment="Position within the bug's steps, from 0"),
+    sa.Column('step', sa.String(length=64), nullable=False, comment='Workflow node id'),
+    sa.Column('label', sa.String(length=255), nullable=True),
+    sa.Column('status', sa.String(length=32), nullable=False, comment='completed | failed'),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('duration_ms', sa.Float(), nullable=True),
+    sa.Column('attempt', sa.Integer(), nullable=True, comment='Fix/verify attempt number (1-based)'),
+    sa.Column('preview', sa.Text(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['batch_jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('job_id', 'bug_index', 'seq', name='uq_bug_steps_job_bug_seq')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('bug_steps')
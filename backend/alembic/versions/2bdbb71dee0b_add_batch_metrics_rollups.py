@@ -0,0 +1,101 @@
+"""add_batch_metrics_rollups
+
+Revision ID: 2bdbb71dee0b
+Revises: 2fac18a13063
+Create Date: 2026-10-16 21:40:12.518204
+
+Tables maintained by app/repositories/batch_metrics.py. init_db's
+create_all may already have created them, so each is only created if
+missing.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import sqlite
+
+# revision identifiers, used by Alembic.
+revision: str = '2bdbb71dee0b'
+down_revision: Union[str, Sequence[str], None] = '2fac18a13063'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _has_table('batch_job_metrics'):
+        op.create_table('batch_job_metrics',
+        sa.Column('job_id', sa.String(length=64), nullable=False),
+        sa.Column('day', sa.String(length=10), nullable=False, comment='Job created_at date (UTC), YYYY-MM-DD'),
+        sa.Column('status', sa.String(length=32), nullable=False),
+        sa.Column('included', sa.Boolean(), nullable=False, comment='Counted in batch_metrics_rollups (job status is terminal)'),
+        sa.Column('bugs_total', sa.Integer(), nullable=False),
+        sa.Column('bugs_completed', sa.Integer(), nullable=False),
+        sa.Column('bugs_failed', sa.Integer(), nullable=False),
+        sa.Column('bugs_skipped', sa.Integer(), nullable=False),
+        sa.Column('bug_duration_count', sa.Integer(), nullable=False),
+        sa.Column('bug_duration_total_ms', sa.Float(), nullable=False),
+        sa.Column('bug_duration_min_ms', sa.Float(), nullable=True),
+        sa.Column('bug_duration_max_ms', sa.Float(), nullable=True),
+        sa.Column('job_duration_ms', sa.Float(), nullable=True),
+        sa.Column('retries_total', sa.Integer(), nullable=False),
+        sa.Column('bugs_with_retries', sa.Integer(), nullable=False),
+        sa.Column('max_retries_single_bug', sa.Integer(), nullable=False),
+        sa.Column('step_metrics', sqlite.JSON(), nullable=True, comment='Per step label, in first-seen order: {label: {count, total_ms, failures}}'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['job_id'], ['batch_jobs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('job_id')
+        )
+        with op.batch_alter_table('batch_job_metrics', schema=None) as batch_op:
+            batch_op.create_index('ix_batch_job_metrics_day', ['day', 'included'], unique=False)
+
+    if not _has_table('batch_metrics_rollups'):
+        op.create_table('batch_metrics_rollups',
+        sa.Column('bucket', sa.String(length=16), nullable=False, comment='total | YYYY-MM-DD (job created_at, UTC)'),
+        sa.Column('jobs_total', sa.Integer(), nullable=False),
+        sa.Column('jobs_completed', sa.Integer(), nullable=False),
+        sa.Column('jobs_failed', sa.Integer(), nullable=False),
+        sa.Column('jobs_cancelled', sa.Integer(), nullable=False),
+        sa.Column('job_duration_count', sa.Integer(), nullable=False),
+        sa.Column('job_duration_total_ms', sa.Float(), nullable=False),
+        sa.Column('bugs_total', sa.Integer(), nullable=False),
+        sa.Column('bugs_completed', sa.Integer(), nullable=False),
+        sa.Column('bugs_failed', sa.Integer(), nullable=False),
+        sa.Column('bugs_skipped', sa.Integer(), nullable=False),
+        sa.Column('bug_duration_count', sa.Integer(), nullable=False),
+        sa.Column('bug_duration_total_ms', sa.Float(), nullable=False),
+        sa.Column('bug_duration_min_ms', sa.Float(), nullable=True),
+        sa.Column('bug_duration_max_ms', sa.Float(), nullable=True),
+        sa.Column('retries_total', sa.Integer(), nullable=False),
+        sa.Column('bugs_with_retries', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('bucket')
+        )
+
+    if not _has_table('batch_step_metrics'):
+        op.create_table('batch_step_metrics',
+        sa.Column('bucket', sa.String(length=16), nullable=False),
+        sa.Column('label', sa.String(length=255), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('failures', sa.Integer(), nullable=False),
+        sa.Column('total_ms', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('bucket', 'label')
+        )
+        with op.batch_alter_table('batch_step_metrics', schema=None) as batch_op:
+            batch_op.create_index('ix_batch_step_metrics_failures', ['bucket', 'failures'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('batch_step_metrics', schema=None) as batch_op:
+        batch_op.drop_index('ix_batch_step_metrics_failures')
+
+    op.drop_table('batch_step_metrics')
+    op.drop_table('batch_metrics_rollups')
+    with op.batch_alter_table('batch_job_metrics', schema=None) as batch_op:
+        batch_op.drop_index('ix_batch_job_metrics_day')
+
+    op.drop_table('batch_job_metrics')
@@ -6,8 +6,16 @@ workflows use to push SSE events to connected clients.
 Architecture:
   - In-process callers (design routes, spec_analyzer) use EventBus.push()
   - Cross-process callers (Temporal Worker) use HTTP POST to
-    /api/internal/events/{job_id} which delegates to EventBus.push()
+    /api/internal/events/{job_id} (or, batched, /api/internal/events:batch)
+    which delegates to EventBus.push()
   - Clients subscribe via EventBus.subscribe() which returns an async generator
+  - Each job keeps a bounded ring buffer of id-tagged events; any number of
+    subscribers read it from their own cursor and can resume via
+    Last-Event-ID (header or ?last_event_id=) after a reconnect
+
+Each event is encoded exactly once, at push time, into an immutable SSE
+frame (bytes) that is shared by the replay buffer and every subscriber.
+orjson is used when installed, with a stdlib json fallback.
 
 Event Envelope:
   {
@@ -23,33 +31,82 @@ Event Envelope:
 from __future__ import annotations
 
 import asyncio
+import itertools
 import json
 import time
+from collections import deque
 from datetime import datetime, timezone
-from typing import Any, AsyncGenerator, Dict, Optional
+from typing import Any, AsyncGenerator, Dict, List, Optional
 
 from fastapi import APIRouter
 from pydantic import BaseModel
 
 from workflow.logging_config import get_sse_logger
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
 logger = get_sse_logger()
 
 router = APIRouter()
 
-# Buffer limits: prevent unbounded memory growth from orphaned jobs
-BUFFER_MAX_EVENTS = 200
+# Per-job replay buffer: ring size and idle lifetime once no one is subscribed
+BUFFER_MAX_EVENTS = 1000
 BUFFER_MAX_AGE_SECS = 600  # 10 minutes
 
 # Stop signals: events that tell the SSE generator to close the connection
 STOP_EVENTS = frozenset({"job_done", "workflow_complete"})
 
 
+class _JobStream:
+    """Replayable event log for one job.
+
+    Holds the last N events in a ring buffer, each tagged with a
+    monotonically increasing id (starting at 1) and stored together with
+    its pre-encoded SSE frame, plus one wakeup Event per connected
+    subscriber.
+    """
+
+    __slots__ = ("events", "next_id", "delivered_id", "subscribers", "last_activity")
+
+    def __init__(self, max_events: int):
+        self.events: deque = deque(maxlen=max_events)  # (event_id, event, frame)
+        self.next_id = 1
+        # Highest id yielded to any subscriber — fresh subscribers start here,
+        # so events pushed before anyone connected are still delivered once.
+        self.delivered_id = 0
+        self.subscribers: set[asyncio.Event] = set()
+        self.last_activity = time.monotonic()
+
+    @property
+    def first_id(self) -> int:
+        """Id of the oldest event still in the ring (next_id when empty)."""
+        return self.events[0][0] if self.events else self.next_id
+
+    def can_resume(self, cursor: int) -> bool:
+        """Whether every event after cursor is still in the ring."""
+        return self.first_id - 1 <= cursor < self.next_id
+
+    def since(self, cursor: int) -> list:
+        """Events with id > cursor (ids are contiguous inside the ring)."""
+        start = max(0, cursor + 1 - self.first_id)
+        if start >= len(self.events):
+            return []
+        return list(itertools.islice(self.events, start, None))
+
+
 class EventBus:
     """Central event bus for SSE event management.
 
-    Manages active SSE connections (queues), pre-connection event buffering,
-    and provides push/subscribe interfaces for all workflow types.
+    Every pushed event is appended to its job's ring buffer and assigned an
+    id. Any number of subscribers can read a job concurrently, each from its
+    own cursor, so a second browser tab or an overlapping reconnect no
+    longer steals the stream. Reconnecting clients pass the last id they saw
+    (SSE Last-Event-ID) and resume without losing events.
     """
 
     def __init__(
@@ -57,143 +114,194 @@ class EventBus:
         buffer_max_events: int = BUFFER_MAX_EVENTS,
         buffer_max_age_secs: int = BUFFER_MAX_AGE_SECS,
     ):
-        self._streams: dict[str, asyncio.Queue] = {}
-        self._buffers: dict[str, dict] = {}
+        self._jobs: dict[str, _JobStream] = {}
         self._buffer_max_events = buffer_max_events
         self._buffer_max_age_secs = buffer_max_age_secs
-        self._lock = asyncio.Lock()
 
-    def push(self, job_id: str, event_type: str, data: dict) -> None:
-        """Push an event to a connected client or buffer it.
+    def push(self, job_id: str, event_type: str, data: dict) -> int:
+        """Append an event to the job's buffer and wake its subscribers.
 
         This is the single entry point for all SSE event publishing.
         Called directly by in-process code, or via the internal HTTP
         endpoint for cross-process callers (Temporal Worker).
 
-        Note: This method is synchronous. In asyncio single-threaded context,
-        dict reads/writes are atomic (no yield points), so the lock is not
-        needed here. The lock protects subscribe/cleanup which have await points.
+        Synchronous and lock-free: in a single-threaded event loop there is
+        no yield point between assigning the id and appending the event.
 
         Args:
             job_id: Job/run identifier
             event_type: Event type string (e.g. "bug_started", "spec_analyzed")
             data: Event payload dict (will be wrapped in envelope)
+
+        Returns:
+            The event id assigned to this event.
         """
         # Ensure timestamp in payload
         if "timestamp" not in data:
             data["timestamp"] = datetime.now(timezone.utc).isoformat()
 
+        stream = self._get_stream(job_id)
+        event_id = stream.next_id
+        stream.next_id += 1
         event = {"event": event_type, "data": data}
-        queue = self._streams.get(job_id)
-        if queue:
-            queue.put_nowait(event)
-            logger.info(f"Event sent: {event_type} for {job_id}")
+        stream.events.append((event_id, event, format_sse_frame(event_type, data, event_id)))
+        stream.last_activity = time.monotonic()
+
+        for wake in stream.subscribers:
+            wake.set()
+
+        if stream.subscribers:
+            logger.info(f"Event sent: {event_type} #{event_id} for {job_id}")
         else:
-            self._buffer_event(job_id, event, event_type)
+            logger.info(f"Event buffered: {event_type} #{event_id} for {job_id}")
+        return event_id
+
+    def can_resume(self, job_id: str, last_event_id: int) -> bool:
+        """Whether a client that saw last_event_id can resume without gaps."""
+        stream = self._jobs.get(job_id)
+        return stream is not None and stream.can_resume(last_event_id)
+
+    def replay(self, job_id: str, after_id: int = 0) -> list:
+        """Buffered (event_id, event) pairs with id > after_id."""
+        stream = self._jobs.get(job_id)
+        if stream is None:
+            return []
+        return [(event_id, event) for event_id, event, _ in stream.since(after_id)]
 
     async def subscribe(
         self,
         job_id: str,
         stop_events: Optional[frozenset] = None,
         keepalive_interval: float = 30.0,
-    ) -> AsyncGenerator[str, None]:
-        """Subscribe to events for a job, yielding SSE-formatted strings.
+        last_event_id: Optional[int] = None,
+    ) -> AsyncGenerator[bytes, None]:
+        """Subscribe to events for a job, yielding pre-encoded SSE frames.
 
-        Creates a queue for this job_id, flushes any buffered events,
-        then yields events as they arrive.
+        Without last_event_id, starts after the last event any subscriber
+        has received (so events buffered before the first connection are
+        flushed once). With last_event_id, replays everything after it; if
+        those events have already been evicted, a "resync" event is sent
+        first and the stream continues from the oldest buffered event.
 
         Args:
             job_id: Job/run identifier to subscribe to
             stop_events: Event types that signal end of stream.
                          Defaults to STOP_EVENTS.
             keepalive_interval: Seconds between keepalive comments.
+            last_event_id: Last event id the client received, if resuming.
 
         Yields:
-            SSE-formatted strings ("event: ...\ndata: ...\n\n")
+            SSE frames as bytes (id / event / data lines, blank-line terminated)
         """
         if stop_events is None:
             stop_events = STOP_EVENTS
 
-        logger.info(f"Client subscribed: {job_id}")
-        queue: asyncio.Queue = asyncio.Queue()
-
-        # Atomically register stream and flush buffered events
-        async with self._lock:
-            self._streams[job_id] = queue
-            buf = self._buffers.pop(job_id, None)
-
-        buffered = buf["events"] if buf else []
-        if buffered:
+        stream = self._get_stream(job_id)
+        if last_event_id is None:
+            cursor = stream.delivered_id
+        elif stream.can_resume(last_event_id):
+            cursor = last_event_id
+        else:
             logger.info(
-                f"Flushing {len(buffered)} buffered events for {job_id}"
+                f"Cannot resume {job_id} from #{last_event_id} "
+                f"(buffer holds #{stream.first_id}..#{stream.next_id - 1})"
+            )
+            yield format_sse_frame(
+                "resync", {"job_id": job_id, "last_event_id": last_event_id}
             )
-        for event in buffered:
-            yield _format_sse(event)
+            cursor = stream.first_id - 1
+
+        logger.info(f"Client subscribed: {job_id} (from #{cursor})")
+        wake = asyncio.Event()
+        stream.subscribers.add(wake)
 
         try:
-            # Stream live events
             while True:
-                try:
-                    event = await asyncio.wait_for(
-                        queue.get(), timeout=keepalive_interval
-                    )
-                    if event is None:  # Sentinel to stop
-                        break
-                    yield _format_sse(event)
-
-                    if event.get("event") in stop_events:
-                        break
-                except asyncio.TimeoutError:
-                    yield ": keepalive\n\n"
+                pending = stream.since(cursor)
+                if not pending:
+                    wake.clear()
+                    try:
+                        await asyncio.wait_for(wake.wait(), timeout=keepalive_interval)
+                    except asyncio.TimeoutError:
+                        yield _KEEPALIVE_FRAME
+                    continue
+
+                for event_id, event, frame in pending:
+                    cursor = event_id
+                    if event_id > stream.delivered_id:
+                        stream.delivered_id = event_id
+                    yield frame
+                    if event["event"] in stop_events:
+                        return
         finally:
-            async with self._lock:
-                self._streams.pop(job_id, None)
-                self._buffers.pop(job_id, None)
-
-    def _buffer_event(
-        self, job_id: str, event: dict, event_type: str
-    ) -> None:
-        """Buffer an event for a job that has no active subscriber yet."""
-        if job_id not in self._buffers:
-            self._cleanup_stale_buffers()
-            self._buffers[job_id] = {
-                "events": [],
-                "created_at": time.monotonic(),
-            }
-
-        buf = self._buffers[job_id]
-        if len(buf["events"]) < self._buffer_max_events:
-            buf["events"].append(event)
-            logger.info(
-                f"Event buffered ({len(buf['events'])}): "
-                f"{event_type} for {job_id}"
-            )
-        else:
-            logger.warning(
-                f"Buffer full ({self._buffer_max_events}), "
-                f"dropping: {event_type} for {job_id}"
-            )
-
-    def _cleanup_stale_buffers(self) -> None:
-        """Remove event buffers that are too old."""
+            stream.subscribers.discard(wake)
+            stream.last_activity = time.monotonic()
+            logger.info(f"Client unsubscribed: {job_id} (at #{cursor})")
+
+    def _get_stream(self, job_id: str) -> _JobStream:
+        stream = self._jobs.get(job_id)
+        if stream is None:
+            self._cleanup_stale_streams()
+            stream = _JobStream(self._buffer_max_events)
+            self._jobs[job_id] = stream
+        return stream
+
+    def _cleanup_stale_streams(self) -> None:
+        """Drop buffers with no subscribers that have been idle too long."""
         now = time.monotonic()
         stale = [
             rid
-            for rid, buf in self._buffers.items()
-            if now - buf["created_at"] > self._buffer_max_age_secs
+            for rid, stream in self._jobs.items()
+            if not stream.subscribers
+            and now - stream.last_activity > self._buffer_max_age_secs
         ]
         for rid in stale:
-            removed = self._buffers.pop(rid, None)
-            if removed:
-                logger.info(
-                    f"Cleaned up stale buffer for {rid} "
-                    f"({len(removed['events'])} events)"
-                )
+            removed = self._jobs.pop(rid)
+            logger.info(
+                f"Cleaned up stale buffer for {rid} "
+                f"({len(removed.events)} events)"
+            )
+
+
+_KEEPALIVE_FRAME = b": keepalive\n\n"
 
 
-def _format_sse(event: dict) -> str:
-    """Format an event dict as an SSE string."""
-    return f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+# json.dumps builds a new encoder for every call with non-default options
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _dumps(data: Any) -> bytes:
+    """Encode a payload as compact UTF-8 JSON (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return _JSON_ENCODER.encode(data).encode("utf-8")
+
+
+def format_sse_frame(
+    event_type: str, data: Any, event_id: Optional[int] = None
+) -> bytes:
+    """Encode one SSE frame; ids are included when given."""
+    if event_id is None:
+        return b"event: " + event_type.encode("utf-8") + b"\ndata: " + _dumps(data) + b"\n\n"
+    return b"".join((
+        b"id: ", str(event_id).encode("ascii"),
+        b"\nevent: ", event_type.encode("utf-8"),
+        b"\ndata: ", _dumps(data), b"\n\n",
+    ))
+
+
+def parse_last_event_id(*values: Optional[str]) -> Optional[int]:
+    """First valid integer among Last-Event-ID header / query values."""
+    for value in values:
+        if value is None:
+            continue
+        try:
+            event_id = int(value)
+        except (TypeError, ValueError):
+            continue
+        if event_id >= 0:
+            return event_id
+    return None
 
 
 # --- Singleton ---
@@ -220,10 +328,11 @@ def push_event(job_id: str, event_type: str, data: dict) -> None:
 async def subscribe_events(
     job_id: str,
     stop_events: Optional[frozenset] = None,
-) -> AsyncGenerator[str, None]:
+    last_event_id: Optional[int] = None,
+) -> AsyncGenerator[bytes, None]:
     """Subscribe to SSE events (convenience wrapper)."""
     async for event_str in get_event_bus().subscribe(
-        job_id, stop_events=stop_events
+        job_id, stop_events=stop_events, last_event_id=last_event_id,
     ):
         yield event_str
 
@@ -242,3 +351,27 @@ async def push_event_endpoint(run_id: str, payload: InternalEventRequest):
     logger.info(f"Received event via API: {payload.event_type} for {run_id}")
     get_event_bus().push(run_id, payload.event_type, payload.data)
     return {"status": "ok", "run_id": run_id}
+
+
+class InternalBatchEvent(BaseModel):
+    run_id: str
+    event_type: str
+    data: dict
+
+
+class InternalEventBatchRequest(BaseModel):
+    events: List[InternalBatchEvent]
+
+
+@router.post("/api/internal/events:batch")
+async def push_event_batch_endpoint(payload: InternalEventBatchRequest):
+    """Internal endpoint for batched cross-process SSE event push.
+
+    Events are pushed in list order, which the worker-side shipper
+    guarantees matches emission order per job.
+    """
+    bus = get_event_bus()
+    for event in payload.events:
+        bus.push(event.run_id, event.event_type, event.data)
+    logger.info(f"Received batch of {len(payload.events)} events via API")
+    return {"status": "ok", "count": len(payload.events)}
@@ -5,6 +5,8 @@ Tables:
 - workflow_runs: Execution records for each workflow run
 - execution_logs: Detailed logs for each run
 - node_executions: Per-node execution records within a run
+- batch_jobs / bug_results: Batch bug fix jobs, plus the
+  batch_job_metrics / batch_metrics_rollups / batch_step_metrics rollups
 """
 
 from __future__ import annotations
@@ -23,6 +25,7 @@ from sqlalchemy import (
     Integer,
     String,
     Text,
+    UniqueConstraint,
     func,
 )
 from sqlalchemy.dialects.sqlite import JSON
@@ -369,15 +372,21 @@ class BugResultModel(Base):
         DateTime(timezone=True), nullable=True,
     )
 
-    # Execution steps as JSON array
+    # Legacy execution steps as JSON array (new steps go to bug_steps)
     # Each step: {step, label, status, started_at, completed_at, duration_ms, output_preview, error, attempt}
     steps: Mapped[Optional[List[Dict[str, Any]]]] = mapped_column(
         JSON, nullable=True,
         comment="Execution steps: [{step, label, status, started_at, completed_at, duration_ms, output_preview, error}]",
     )
 
-    # Relationship
+    # Relationships
     job: Mapped["BatchJobModel"] = relationship(back_populates="bugs")
+    step_records: Mapped[List["BugStepModel"]] = relationship(
+        primaryjoin="and_(foreign(BugStepModel.job_id) == BugResultModel.job_id, "
+        "foreign(BugStepModel.bug_index) == BugResultModel.bug_index)",
+        order_by="BugStepModel.seq",
+        viewonly=True,
+    )
 
     __table_args__ = (
         Index("ix_bug_results_job_id", "job_id"),
@@ -385,6 +394,141 @@ class BugResultModel(Base):
     )
 
 
+class BugStepModel(Base):
+    """One execution step of a bug, appended as the step completes.
+
+    Supersedes the BugResultModel.steps JSON array, which is only read
+    for bugs that have no step rows (written before this table existed).
+    """
+
+    __tablename__ = "bug_steps"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    job_id: Mapped[str] = mapped_column(
+        String(64), ForeignKey("batch_jobs.id", ondelete="CASCADE"), nullable=False,
+    )
+    bug_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    seq: Mapped[int] = mapped_column(
+        Integer, nullable=False, comment="Position within the bug's steps, from 0",
+    )
+    step: Mapped[str] = mapped_column(String(64), nullable=False, comment="Workflow node id")
+    label: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    status: Mapped[str] = mapped_column(
+        String(32), nullable=False, default="completed", comment="completed | failed",
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True,
+    )
+    completed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True,
+    )
+    duration_ms: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    attempt: Mapped[Optional[int]] = mapped_column(
+        Integer, nullable=True, comment="Fix/verify attempt number (1-based)",
+    )
+    preview: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("job_id", "bug_index", "seq", name="uq_bug_steps_job_bug_seq"),
+    )
+
+
+# ─── Batch Metrics Rollups ───────────────────────────────────────────
+# Maintained by app/repositories/batch_metrics.py on every batch job write
+
+
+class BatchJobMetricsModel(Base):
+    """Per-job metrics rollup of a terminal job, recomputed from its bugs on every write."""
+
+    __tablename__ = "batch_job_metrics"
+
+    job_id: Mapped[str] = mapped_column(
+        String(64), ForeignKey("batch_jobs.id", ondelete="CASCADE"), primary_key=True,
+    )
+    day: Mapped[str] = mapped_column(
+        String(10), nullable=False, comment="Job created_at date (UTC), YYYY-MM-DD",
+    )
+    status: Mapped[str] = mapped_column(String(32), nullable=False)
+    included: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, default=False,
+        comment="Counted in batch_metrics_rollups (job status is terminal)",
+    )
+
+    bugs_total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    bugs_completed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    bugs_failed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    bugs_skipped: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    bug_duration_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    bug_duration_total_ms: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    bug_duration_min_ms: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    bug_duration_max_ms: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    job_duration_ms: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+    retries_total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    bugs_with_retries: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_retries_single_bug: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    step_metrics: Mapped[Optional[Dict[str, Any]]] = mapped_column(
+        JSON, nullable=True,
+        comment="Per step label, in first-seen order: {label: {count, total_ms, failures}}",
+    )
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=_utcnow, onupdate=_utcnow,
+    )
+
+    __table_args__ = (
+        Index("ix_batch_job_metrics_day", "day", "included"),
+    )
+
+
+class BatchMetricsRollupModel(Base):
+    """Terminal-job totals per day, plus one all-time row (bucket "total")."""
+
+    __tablename__ = "batch_metrics_rollups"
+
+    bucket: Mapped[str] = mapped_column(
+        String(16), primary_key=True, comment="total | YYYY-MM-DD (job created_at, UTC)",
+    )
+
+    jobs_total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    jobs_completed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    jobs_failed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    jobs_cancelled: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    job_duration_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    job_duration_total_ms: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+    bugs_total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    bugs_completed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    bugs_failed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    bugs_skipped: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    bug_duration_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    bug_duration_total_ms: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    bug_duration_min_ms: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    bug_duration_max_ms: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+    retries_total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    bugs_with_retries: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class BatchStepMetricsModel(Base):
+    """Step-level totals per rollup bucket and step label (terminal jobs only)."""
+
+    __tablename__ = "batch_step_metrics"
+
+    bucket: Mapped[str] = mapped_column(String(16), primary_key=True)
+    label: Mapped[str] = mapped_column(String(255), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failures: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_ms: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        Index("ix_batch_step_metrics_failures", "bucket", "failures"),
+    )
+
+
 # ─── Design-to-Code Job ─────────────────────────────────────────────
 
 
@@ -124,6 +124,12 @@ class ValidationResponse(BaseModel):
 class DynamicRunRequest(BaseModel):
     """Request to run a dynamic workflow."""
     initial_state: dict = Field(default_factory=dict, description="Initial input values")
+    event_schema_version: Optional[int] = Field(
+        None,
+        ge=1,
+        le=2,
+        description="node_output event schema: 1 = full state per node, 2 = deltas + snapshots (default: server setting)",
+    )
 
 
 class DynamicRunResponse(BaseModel):
@@ -1,29 +1,96 @@
 """Repository layer for batch bug fix job persistence.
 
-Provides async CRUD operations for BatchJobModel and BugResultModel.
+Provides async CRUD operations for BatchJobModel, BugResultModel and
+BugStepModel. Every write also refreshes the job's metrics rollup
+(batch_metrics.py).
 """
 
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 
-from sqlalchemy import select, func, update, or_
+from sqlalchemy import delete, select, func, update, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models.db import BatchJobModel, BugResultModel
+from app.models.db import BatchJobModel, BugResultModel, BugStepModel
+
+from .batch_metrics import BatchMetricsRepository
 
 
 def _utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def _parse_ts(value: Any) -> Optional[datetime]:
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return value if isinstance(value, datetime) else None
+
+
+def _format_ts(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    # SQLite hands back naive datetimes; they were stored as UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
+
+
+def _step_row(job_id: str, bug_index: int, seq: int, step: Dict[str, Any]) -> BugStepModel:
+    """Build a bug_steps row from a step record dict."""
+    return BugStepModel(
+        job_id=job_id,
+        bug_index=bug_index,
+        seq=seq,
+        step=str(step.get("step", "unknown")),
+        label=step.get("label"),
+        status=step.get("status", "completed"),
+        started_at=_parse_ts(step.get("started_at")),
+        completed_at=_parse_ts(step.get("completed_at")),
+        duration_ms=step.get("duration_ms"),
+        attempt=step.get("attempt"),
+        preview=step.get("output_preview"),
+        error=step.get("error"),
+    )
+
+
+def bug_step_history(bug: BugResultModel) -> Optional[List[Dict[str, Any]]]:
+    """A bug's steps as the API's step dicts.
+
+    Read from the bug's bug_steps rows (load BugResultModel.step_records),
+    falling back to the legacy steps JSON for bugs that have none.
+    """
+    if not bug.step_records:
+        return bug.steps
+    history = []
+    for row in bug.step_records:
+        step: Dict[str, Any] = {
+            "step": row.step,
+            "label": row.label,
+            "status": row.status,
+            "started_at": _format_ts(row.started_at),
+            "completed_at": _format_ts(row.completed_at),
+            "duration_ms": row.duration_ms,
+            "output_preview": row.preview,
+            "error": row.error,
+        }
+        if row.attempt is not None:
+            step["attempt"] = row.attempt
+        history.append(step)
+    return history
+
+
 class BatchJobRepository:
     """Data access layer for batch bug fix jobs."""
 
     def __init__(self, session: AsyncSession):
         self.session = session
+        self.metrics = BatchMetricsRepository(session)
 
     async def create(
         self,
@@ -71,16 +138,22 @@ class BatchJobRepository:
             self.session.add(bug)
 
         await self.session.flush()
+        await self.metrics.refresh_job(job_id)
 
         # Reload with bugs relationship
         return await self.get(job_id)
 
     async def get(self, job_id: str) -> Optional[BatchJobModel]:
-        """Get a batch job by ID with bugs loaded."""
+        """Get a batch job by ID with bugs and their step rows loaded."""
         result = await self.session.execute(
             select(BatchJobModel)
-            .options(selectinload(BatchJobModel.bugs))
+            .options(
+                selectinload(BatchJobModel.bugs)
+                .selectinload(BugResultModel.step_records)
+            )
             .where(BatchJobModel.id == job_id)
+            # step_records is view-only: reload it after appends in this session
+            .execution_options(populate_existing=True)
         )
         return result.scalar_one_or_none()
 
@@ -153,6 +226,7 @@ class BatchJobRepository:
         job.updated_at = _utcnow()
 
         await self.session.flush()
+        await self.metrics.refresh_job(job_id)
         return job
 
     async def update_bug_status(
@@ -203,6 +277,7 @@ class BatchJobRepository:
         )
 
         await self.session.flush()
+        await self.metrics.refresh_job(job_id)
         return bug
 
     async def get_bug(
@@ -220,21 +295,81 @@ class BatchJobRepository:
         return result.scalar_one_or_none()
 
     async def delete(self, job_id: str) -> bool:
-        """Delete a batch job and all its bugs."""
+        """Delete a batch job and all its bugs and steps."""
         job = await self.get(job_id)
         if not job:
             return False
+        await self.metrics.remove_job(job_id)
+        await self.session.execute(
+            delete(BugStepModel).where(BugStepModel.job_id == job_id)
+        )
         await self.session.delete(job)
         await self.session.flush()
         return True
 
+    async def append_bug_steps(
+        self,
+        job_id: str,
+        steps: Mapping[int, Sequence[Dict[str, Any]]],
+    ) -> int:
+        """Append completed steps to bugs' step rows.
+
+        Args:
+            job_id: Job identifier
+            steps: Step dicts [{step, label, status, started_at, ...}] to
+                append, in completion order, keyed by bug index
+
+        Returns:
+            Number of step rows inserted
+        """
+        steps = {bug_index: records for bug_index, records in steps.items() if records}
+        if not steps:
+            return 0
+
+        result = await self.session.execute(
+            select(BugStepModel.bug_index, func.max(BugStepModel.seq))
+            .where(
+                BugStepModel.job_id == job_id,
+                BugStepModel.bug_index.in_(list(steps)),
+            )
+            .group_by(BugStepModel.bug_index)
+        )
+        last_seq = dict(result.all())
+
+        inserted = 0
+        for bug_index, records in steps.items():
+            start = last_seq.get(bug_index, -1) + 1
+            for offset, step in enumerate(records):
+                self.session.add(_step_row(job_id, bug_index, start + offset, step))
+                inserted += 1
+
+        await self.session.execute(
+            update(BatchJobModel)
+            .where(BatchJobModel.id == job_id)
+            .values(updated_at=_utcnow())
+        )
+
+        await self.session.flush()
+        await self.metrics.refresh_job(job_id)
+        return inserted
+
+    async def clear_bug_steps(self, job_id: str, bug_index: int) -> None:
+        """Drop a bug's step rows (before re-running it)."""
+        await self.session.execute(
+            delete(BugStepModel).where(
+                BugStepModel.job_id == job_id,
+                BugStepModel.bug_index == bug_index,
+            )
+        )
+        await self.session.flush()
+
     async def update_bug_steps(
         self,
         job_id: str,
         bug_index: int,
         steps: List[Dict[str, Any]],
     ) -> Optional[BugResultModel]:
-        """Update the execution steps for a specific bug.
+        """Replace the execution steps for a specific bug.
 
         Args:
             job_id: Job identifier
@@ -254,7 +389,10 @@ class BatchJobRepository:
         if not bug:
             return None
 
-        bug.steps = steps
+        await self.clear_bug_steps(job_id, bug_index)
+        for seq, step in enumerate(steps):
+            self.session.add(_step_row(job_id, bug_index, seq, step))
+        bug.steps = None
 
         await self.session.execute(
             update(BatchJobModel)
@@ -263,243 +401,33 @@ class BatchJobRepository:
         )
 
         await self.session.flush()
+        await self.metrics.refresh_job(job_id)
         return bug
 
     async def get_job_metrics(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed metrics for a single job.
 
-        Computes per-bug timing, success rates, retry stats, and
-        step-level performance from existing BugResultModel fields.
+        Per-bug timing, success rate, retry stats and step-level
+        performance, read from the job's metrics rollup.
 
         Returns:
-            Dict with bug_metrics, step_metrics, retry_stats, summary
+            Dict with summary, timing, retry_stats, step_metrics
             or None if job not found.
         """
-        job = await self.get(job_id)
-        if not job:
-            return None
-
-        bugs = sorted(job.bugs, key=lambda b: b.bug_index)
-        total = len(bugs)
-        if total == 0:
-            return {
-                "job_id": job_id,
-                "status": job.status,
-                "summary": {"total": 0, "completed": 0, "failed": 0, "skipped": 0, "success_rate": 0.0},
-                "timing": {"avg_ms": 0, "min_ms": 0, "max_ms": 0, "total_ms": 0},
-                "retry_stats": {"total_retries": 0, "bugs_with_retries": 0, "max_retries_single_bug": 0},
-                "step_metrics": [],
-            }
-
-        # --- Bug-level timing ---
-        durations_ms: List[float] = []
-        completed_count = 0
-        failed_count = 0
-        skipped_count = 0
-        total_retries = 0
-        bugs_with_retries = 0
-        max_retries_single = 0
-
-        # Accumulate step-level data: step_label -> {count, total_ms, failures}
-        step_data: Dict[str, Dict[str, Any]] = {}
-
-        for bug in bugs:
-            if bug.status == "completed":
-                completed_count += 1
-            elif bug.status == "failed":
-                failed_count += 1
-            elif bug.status == "skipped":
-                skipped_count += 1
-
-            # Bug duration
-            if bug.started_at and bug.completed_at:
-                delta = (bug.completed_at - bug.started_at).total_seconds() * 1000
-                durations_ms.append(delta)
-
-            # Step-level metrics + retry counting
-            if bug.steps:
-                bug_max_attempt = 0
-                for step in bug.steps:
-                    label = step.get("label", step.get("step", "unknown"))
-                    dur = step.get("duration_ms")
-                    status = step.get("status", "")
-                    attempt = step.get("attempt")
-
-                    if attempt is not None and attempt > bug_max_attempt:
-                        bug_max_attempt = attempt
-
-                    if label not in step_data:
-                        step_data[label] = {"count": 0, "total_ms": 0.0, "failures": 0}
-                    step_data[label]["count"] += 1
-                    if dur is not None:
-                        step_data[label]["total_ms"] += dur
-                    if status == "failed":
-                        step_data[label]["failures"] += 1
-
-                retries = max(0, bug_max_attempt - 1)
-                total_retries += retries
-                if retries > 0:
-                    bugs_with_retries += 1
-                if retries > max_retries_single:
-                    max_retries_single = retries
-
-        # Compute summary timing
-        avg_ms = sum(durations_ms) / len(durations_ms) if durations_ms else 0
-        min_ms = min(durations_ms) if durations_ms else 0
-        max_ms = max(durations_ms) if durations_ms else 0
-        total_ms = sum(durations_ms)
-
-        finished = completed_count + failed_count + skipped_count
-        success_rate = (completed_count / finished * 100) if finished > 0 else 0.0
-
-        # Build step_metrics list sorted by occurrence order
-        step_metrics = []
-        for label, data in step_data.items():
-            avg_step = data["total_ms"] / data["count"] if data["count"] > 0 else 0
-            fail_rate = data["failures"] / data["count"] * 100 if data["count"] > 0 else 0
-            step_metrics.append({
-                "label": label,
-                "count": data["count"],
-                "avg_duration_ms": round(avg_step, 1),
-                "total_duration_ms": round(data["total_ms"], 1),
-                "failures": data["failures"],
-                "failure_rate": round(fail_rate, 1),
-            })
-
-        return {
-            "job_id": job_id,
-            "status": job.status,
-            "created_at": job.created_at.isoformat() if job.created_at else None,
-            "updated_at": job.updated_at.isoformat() if job.updated_at else None,
-            "summary": {
-                "total": total,
-                "completed": completed_count,
-                "failed": failed_count,
-                "skipped": skipped_count,
-                "success_rate": round(success_rate, 1),
-            },
-            "timing": {
-                "avg_ms": round(avg_ms, 1),
-                "min_ms": round(min_ms, 1),
-                "max_ms": round(max_ms, 1),
-                "total_ms": round(total_ms, 1),
-            },
-            "retry_stats": {
-                "total_retries": total_retries,
-                "bugs_with_retries": bugs_with_retries,
-                "max_retries_single_bug": max_retries_single,
-            },
-            "step_metrics": step_metrics,
-        }
+        return await self.metrics.get_job(job_id)
 
     async def get_global_metrics(self) -> Dict[str, Any]:
-        """Get aggregated metrics across all completed/failed jobs.
+        """Get aggregated metrics across all completed/failed/cancelled jobs.
 
         Returns:
             Dict with totals, success rates, average timing, and
-            most-failed steps ranking.
+            most-failed steps ranking (from the "total" rollup).
         """
-        # Get all jobs with terminal status
-        result = await self.session.execute(
-            select(BatchJobModel)
-            .options(selectinload(BatchJobModel.bugs))
-            .where(BatchJobModel.status.in_(["completed", "failed", "cancelled"]))
-            .order_by(BatchJobModel.created_at.desc())
-            .limit(1000)
-        )
-        jobs = list(result.scalars().all())
+        return await self.metrics.get_global()
 
-        total_jobs = len(jobs)
-        total_bugs = 0
-        completed_bugs = 0
-        failed_bugs = 0
-        skipped_bugs = 0
-        job_durations_ms: List[float] = []
-        bug_durations_ms: List[float] = []
-        step_failures: Dict[str, int] = {}
-        step_counts: Dict[str, int] = {}
-        total_retries = 0
-
-        for job in jobs:
-            # Job-level duration
-            if job.created_at and job.updated_at:
-                delta = (job.updated_at - job.created_at).total_seconds() * 1000
-                job_durations_ms.append(delta)
-
-            for bug in job.bugs:
-                total_bugs += 1
-                if bug.status == "completed":
-                    completed_bugs += 1
-                elif bug.status == "failed":
-                    failed_bugs += 1
-                elif bug.status == "skipped":
-                    skipped_bugs += 1
-
-                # Bug duration
-                if bug.started_at and bug.completed_at:
-                    delta = (bug.completed_at - bug.started_at).total_seconds() * 1000
-                    bug_durations_ms.append(delta)
-
-                # Step-level failure tracking
-                if bug.steps:
-                    bug_max_attempt = 0
-                    for step in bug.steps:
-                        label = step.get("label", step.get("step", "unknown"))
-                        status = step.get("status", "")
-                        attempt = step.get("attempt")
-                        if attempt is not None and attempt > bug_max_attempt:
-                            bug_max_attempt = attempt
-                        step_counts[label] = step_counts.get(label, 0) + 1
-                        if status == "failed":
-                            step_failures[label] = step_failures.get(label, 0) + 1
-                    total_retries += max(0, bug_max_attempt - 1)
-
-        finished_bugs = completed_bugs + failed_bugs + skipped_bugs
-        bug_success_rate = (completed_bugs / finished_bugs * 100) if finished_bugs > 0 else 0.0
-
-        jobs_succeeded = sum(1 for j in jobs if j.status == "completed")
-        job_success_rate = (jobs_succeeded / total_jobs * 100) if total_jobs > 0 else 0.0
-
-        # Most-failed steps ranking
-        most_failed_steps = sorted(
-            [
-                {
-                    "label": label,
-                    "failures": step_failures.get(label, 0),
-                    "total": count,
-                    "failure_rate": round(step_failures.get(label, 0) / count * 100, 1) if count > 0 else 0,
-                }
-                for label, count in step_counts.items()
-            ],
-            key=lambda x: x["failures"],
-            reverse=True,
-        )[:5]
-
-        return {
-            "jobs": {
-                "total": total_jobs,
-                "completed": jobs_succeeded,
-                "failed": total_jobs - jobs_succeeded,
-                "success_rate": round(job_success_rate, 1),
-            },
-            "bugs": {
-                "total": total_bugs,
-                "completed": completed_bugs,
-                "failed": failed_bugs,
-                "skipped": skipped_bugs,
-                "success_rate": round(bug_success_rate, 1),
-            },
-            "timing": {
-                "avg_job_ms": round(sum(job_durations_ms) / len(job_durations_ms), 1) if job_durations_ms else 0,
-                "avg_bug_ms": round(sum(bug_durations_ms) / len(bug_durations_ms), 1) if bug_durations_ms else 0,
-                "min_bug_ms": round(min(bug_durations_ms), 1) if bug_durations_ms else 0,
-                "max_bug_ms": round(max(bug_durations_ms), 1) if bug_durations_ms else 0,
-            },
-            "retries": {
-                "total": total_retries,
-            },
-            "most_failed_steps": most_failed_steps,
-        }
+    async def get_daily_metrics(self, days: int = 30) -> List[Dict[str, Any]]:
+        """Per-day metrics over terminal jobs, most recent day first."""
+        return await self.metrics.get_daily(days)
 
     async def get_stats(self, job_id: str) -> Dict[str, int]:
         """Get bug status counts for a job.
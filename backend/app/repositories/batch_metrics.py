@@ -0,0 +1,533 @@
+"""Incrementally maintained batch job metrics.
+
+get_global_metrics used to load up to 1000 terminal jobs with all their
+bugs and walk every bug's steps JSON in Python on each request. Metrics
+now live in three rollup tables that BatchJobRepository keeps current on
+every write (create, update_status, update_bug_status, update_bug_steps,
+delete):
+
+- batch_job_metrics      one row per terminal job, recomputed from its bugs
+- batch_metrics_rollups  one row per day (job created_at, UTC) + "total"
+- batch_step_metrics     (bucket, step label) counts, durations, failures
+
+Step figures come from the bug_steps rows (append_bug_steps also
+refreshes), or a bug's legacy steps JSON when it has no rows.
+
+A job counts towards the day/total buckets only while its status is
+terminal (completed / failed / cancelled), as before. Writes to a job
+still in flight (bug status changes, step appends, retry loops) only drop
+its row, if any, so they cost a primary-key lookup; get_job rolls such a
+job up on read. For a terminal job refresh_job recomputes the row and
+applies the difference between the previous and new rollup to its buckets
+as atomic ``col = col + delta`` updates, so the cost of a write depends on
+the size of one job and reading global metrics is a primary-key lookup
+plus a top-5 index scan, whatever the history size.
+
+Min/max bug durations cannot be subtracted: when an included job's
+extremes change they are recomputed with SQL MIN/MAX over that day's job
+rows, and the total's over the day rows.
+
+backfill() rebuilds all rollups from batch_jobs / bug_results
+(scripts/backfill_batch_metrics.py).
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import case, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.db import (
+    BatchJobMetricsModel,
+    BatchJobModel,
+    BatchMetricsRollupModel,
+    BatchStepMetricsModel,
+    BugResultModel,
+    BugStepModel,
+)
+
+TERMINAL_JOB_STATUSES = ("completed", "failed", "cancelled")
+
+TOTAL_BUCKET = "total"
+
+_LABEL_MAX_LEN = 255
+
+# batch_job_metrics columns summed into a bucket (besides the job counts)
+_SUMMED = (
+    "bugs_total", "bugs_completed", "bugs_failed", "bugs_skipped",
+    "bug_duration_count", "bug_duration_total_ms",
+    "retries_total", "bugs_with_retries",
+)
+
+_ROLLUP_FIELDS = _SUMMED + (
+    "day", "status", "included",
+    "bug_duration_min_ms", "bug_duration_max_ms", "job_duration_ms",
+    "max_retries_single_bug", "step_metrics",
+)
+
+
+class _BugRollupInput(NamedTuple):
+    status: str
+    started_at: Optional[datetime]
+    completed_at: Optional[datetime]
+    steps: Optional[List[Dict[str, Any]]]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _naive_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands back naive datetimes; values set in this process are aware
+    if dt is not None and dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _elapsed_ms(start: Optional[datetime], end: Optional[datetime]) -> Optional[float]:
+    start, end = _naive_utc(start), _naive_utc(end)
+    if start is None or end is None:
+        return None
+    return (end - start).total_seconds() * 1000
+
+
+def compute_job_rollup(
+    status: str,
+    created_at: Optional[datetime],
+    updated_at: Optional[datetime],
+    bugs: Iterable[Any],
+) -> Dict[str, Any]:
+    """Rollup of one job from its bugs (objects with status, started_at,
+    completed_at and steps attributes)."""
+    roll: Dict[str, Any] = {field: 0 for field in _SUMMED}
+    roll.update({
+        "day": (_naive_utc(created_at) or _naive_utc(_utcnow())).date().isoformat(),
+        "status": status,
+        "included": status in TERMINAL_JOB_STATUSES,
+        "bug_duration_min_ms": None,
+        "bug_duration_max_ms": None,
+        "job_duration_ms": _elapsed_ms(created_at, updated_at),
+        "max_retries_single_bug": 0,
+    })
+    steps: Dict[str, Dict[str, Any]] = {}
+
+    for bug in bugs:
+        roll["bugs_total"] += 1
+        if bug.status in ("completed", "failed", "skipped"):
+            roll[f"bugs_{bug.status}"] += 1
+
+        duration = _elapsed_ms(bug.started_at, bug.completed_at)
+        if duration is not None:
+            roll["bug_duration_count"] += 1
+            roll["bug_duration_total_ms"] += duration
+            if roll["bug_duration_min_ms"] is None or duration < roll["bug_duration_min_ms"]:
+                roll["bug_duration_min_ms"] = duration
+            if roll["bug_duration_max_ms"] is None or duration > roll["bug_duration_max_ms"]:
+                roll["bug_duration_max_ms"] = duration
+
+        max_attempt = 0
+        for step in bug.steps or []:
+            label = str(step.get("label", step.get("step", "unknown")))[:_LABEL_MAX_LEN]
+            attempt = step.get("attempt")
+            if attempt is not None and attempt > max_attempt:
+                max_attempt = attempt
+            entry = steps.setdefault(label, {"count": 0, "total_ms": 0.0, "failures": 0})
+            entry["count"] += 1
+            if step.get("duration_ms") is not None:
+                entry["total_ms"] += step["duration_ms"]
+            if step.get("status", "") == "failed":
+                entry["failures"] += 1
+
+        retries = max(0, max_attempt - 1)
+        roll["retries_total"] += retries
+        if retries > 0:
+            roll["bugs_with_retries"] += 1
+        roll["max_retries_single_bug"] = max(roll["max_retries_single_bug"], retries)
+
+    roll["step_metrics"] = steps
+    return roll
+
+
+def _bucket_contribution(roll: Dict[str, Any]) -> Dict[str, float]:
+    """What one included job adds to each summed bucket column."""
+    status = roll["status"]
+    contribution: Dict[str, float] = {field: roll[field] for field in _SUMMED}
+    contribution.update({
+        "jobs_total": 1,
+        "jobs_completed": int(status == "completed"),
+        "jobs_failed": int(status == "failed"),
+        "jobs_cancelled": int(status == "cancelled"),
+        "job_duration_count": int(roll["job_duration_ms"] is not None),
+        "job_duration_total_ms": roll["job_duration_ms"] or 0.0,
+    })
+    return contribution
+
+
+def _rate(part: float, whole: float) -> float:
+    return round(part / whole * 100, 1) if whole > 0 else 0.0
+
+
+def _avg(total: float, count: int) -> float:
+    return round(total / count, 1) if count else 0
+
+
+def _round(value: Optional[float]) -> float:
+    return round(value, 1) if value is not None else 0
+
+
+def _format_bucket(row: Optional[BatchMetricsRollupModel]) -> Dict[str, Any]:
+    """jobs / bugs / timing / retries sections of a metrics response."""
+    get = (lambda field: getattr(row, field) or 0) if row is not None else (lambda field: 0)
+    jobs_total = get("jobs_total")
+    finished_bugs = get("bugs_completed") + get("bugs_failed") + get("bugs_skipped")
+    return {
+        "jobs": {
+            "total": jobs_total,
+            "completed": get("jobs_completed"),
+            # cancelled jobs count as not succeeded, as they always have
+            "failed": jobs_total - get("jobs_completed"),
+            "success_rate": _rate(get("jobs_completed"), jobs_total),
+        },
+        "bugs": {
+            "total": get("bugs_total"),
+            "completed": get("bugs_completed"),
+            "failed": get("bugs_failed"),
+            "skipped": get("bugs_skipped"),
+            "success_rate": _rate(get("bugs_completed"), finished_bugs),
+        },
+        "timing": {
+            "avg_job_ms": _avg(get("job_duration_total_ms"), get("job_duration_count")),
+            "avg_bug_ms": _avg(get("bug_duration_total_ms"), get("bug_duration_count")),
+            "min_bug_ms": _round(row.bug_duration_min_ms if row is not None else None),
+            "max_bug_ms": _round(row.bug_duration_max_ms if row is not None else None),
+        },
+        "retries": {
+            "total": get("retries_total"),
+        },
+    }
+
+
+class BatchMetricsRepository:
+    """Maintains and reads the batch metrics rollup tables."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    # -- maintenance ----------------------------------------------------
+
+    async def refresh_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Bring one job's rollup up to date and apply the change to its buckets.
+
+        Call after any write to the job or its bugs (pending ORM changes are
+        autoflushed first). A job that is not terminal has no row: it is
+        taken out of the buckets if it was counted. Returns the new rollup
+        of a terminal job, or None.
+        """
+        job = await self._get_job_row(job_id)
+        if job is None:
+            return None
+        if job.status not in TERMINAL_JOB_STATUSES:
+            await self.remove_job(job_id)
+            return None
+        new = await self._compute(job_id, job)
+
+        row = await self.session.get(BatchJobMetricsModel, job_id)
+        if row is None:
+            # Two writers of the same job may both get here: insert once
+            await self.session.execute(self._insert_ignore(
+                BatchJobMetricsModel,
+                {"job_id": job_id, "day": new["day"], "status": new["status"]},
+            ))
+            row = (await self.session.execute(
+                select(BatchJobMetricsModel)
+                .where(BatchJobMetricsModel.job_id == job_id)
+                .execution_options(populate_existing=True)
+            )).scalar_one()
+        old = self._row_rollup(row)
+        for field in _ROLLUP_FIELDS:
+            setattr(row, field, new[field])
+        row.updated_at = _utcnow()
+        await self.session.flush()
+
+        await self._apply(old if old["included"] else None, new)
+        return new
+
+    async def remove_job(self, job_id: str) -> None:
+        """Take a job out of the rollups (call before deleting it)."""
+        row = await self.session.get(BatchJobMetricsModel, job_id)
+        if row is None:
+            return
+        old = self._row_rollup(row)
+        await self.session.delete(row)
+        await self.session.flush()
+        if old["included"]:
+            await self._apply(old, None)
+
+    async def backfill(self, batch_size: int = 200) -> int:
+        """Rebuild every rollup from batch_jobs / bug_results / bug_steps.
+
+        Runs in the caller's transaction, so readers keep seeing the old
+        rollups until it commits. The session is expunged after each batch
+        of jobs to bound memory. Returns the number of jobs processed.
+        """
+        for model in (BatchStepMetricsModel, BatchMetricsRollupModel, BatchJobMetricsModel):
+            await self.session.execute(delete(model))
+        processed = 0
+        last_id = ""
+        while True:
+            job_ids = (await self.session.execute(
+                select(BatchJobModel.id)
+                .where(BatchJobModel.id > last_id)
+                .order_by(BatchJobModel.id)
+                .limit(batch_size)
+            )).scalars().all()
+            if not job_ids:
+                return processed
+            for job_id in job_ids:
+                await self.refresh_job(job_id)
+            processed += len(job_ids)
+            last_id = job_ids[-1]
+            self.session.expunge_all()
+
+    async def _get_job_row(self, job_id: str) -> Any:
+        return (await self.session.execute(
+            select(BatchJobModel.status, BatchJobModel.created_at, BatchJobModel.updated_at)
+            .where(BatchJobModel.id == job_id)
+        )).one_or_none()
+
+    async def _compute(self, job_id: str, job: Any) -> Dict[str, Any]:
+        """Roll up a job from its bugs and their step rows."""
+        step_rows: Dict[int, List[Dict[str, Any]]] = {}
+        for row in (await self.session.execute(
+            select(
+                BugStepModel.bug_index, BugStepModel.step, BugStepModel.label,
+                BugStepModel.status, BugStepModel.duration_ms, BugStepModel.attempt,
+            )
+            .where(BugStepModel.job_id == job_id)
+            .order_by(BugStepModel.bug_index, BugStepModel.seq)
+        )).all():
+            step_rows.setdefault(row.bug_index, []).append({
+                "step": row.step,
+                "label": row.label if row.label is not None else row.step,
+                "status": row.status,
+                "duration_ms": row.duration_ms,
+                "attempt": row.attempt,
+            })
+        bugs = [
+            _BugRollupInput(
+                bug.status, bug.started_at, bug.completed_at,
+                step_rows.get(bug.bug_index, bug.steps),
+            )
+            for bug in (await self.session.execute(
+                select(
+                    BugResultModel.bug_index, BugResultModel.status,
+                    BugResultModel.started_at, BugResultModel.completed_at,
+                    BugResultModel.steps,
+                )
+                .where(BugResultModel.job_id == job_id)
+                .order_by(BugResultModel.bug_index)
+            )).all()
+        ]
+        return compute_job_rollup(job.status, job.created_at, job.updated_at, bugs)
+
+    @staticmethod
+    def _row_rollup(row: BatchJobMetricsModel) -> Dict[str, Any]:
+        return {field: getattr(row, field) for field in _ROLLUP_FIELDS}
+
+    async def _apply(
+        self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]],
+    ) -> None:
+        """Move the buckets from old's contribution to new's (None: none)."""
+        if old is None and new is None:
+            return
+        days = {r["day"] for r in (old, new) if r is not None}
+        # Day buckets first: the total's extremes are recomputed from them
+        for bucket in sorted(days) + [TOTAL_BUCKET]:
+            o = old if old is not None and bucket in (TOTAL_BUCKET, old["day"]) else None
+            n = new if new is not None and bucket in (TOTAL_BUCKET, new["day"]) else None
+            if o is None and n is None:
+                continue
+            o_sum = _bucket_contribution(o) if o is not None else {}
+            n_sum = _bucket_contribution(n) if n is not None else {}
+            await self._add(
+                BatchMetricsRollupModel, {"bucket": bucket},
+                {field: n_sum.get(field, 0) - o_sum.get(field, 0) for field in set(o_sum) | set(n_sum)},
+            )
+
+            o_steps = (o or {}).get("step_metrics") or {}
+            n_steps = (n or {}).get("step_metrics") or {}
+            for label in {**o_steps, **n_steps}:
+                before = o_steps.get(label, {})
+                after = n_steps.get(label, {})
+                await self._add(
+                    BatchStepMetricsModel, {"bucket": bucket, "label": label},
+                    {
+                        field: after.get(field, 0) - before.get(field, 0)
+                        for field in ("count", "failures", "total_ms")
+                    },
+                )
+
+            await self._update_extremes(bucket, o, n)
+
+    async def _add(self, model: Any, key: Dict[str, Any], deltas: Dict[str, float]) -> None:
+        """Atomic ``col = col + delta`` on the row at key, created if missing."""
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        await self.session.execute(self._insert_ignore(model, key))
+        await self.session.execute(
+            update(model)
+            .where(*(getattr(model, field) == value for field, value in key.items()))
+            .values({field: getattr(model, field) + delta for field, delta in deltas.items()})
+            .execution_options(synchronize_session=False)
+        )
+
+    def _insert_ignore(self, model: Any, values: Dict[str, Any]) -> Any:
+        if self.session.bind.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        return insert(model).values(**values).on_conflict_do_nothing()
+
+    async def _update_extremes(
+        self, bucket: str, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]],
+    ) -> None:
+        lo, hi = BatchMetricsRollupModel.bug_duration_min_ms, BatchMetricsRollupModel.bug_duration_max_ms
+        old_ext = (old["bug_duration_min_ms"], old["bug_duration_max_ms"]) if old is not None else (None, None)
+        new_ext = (new["bug_duration_min_ms"], new["bug_duration_max_ms"]) if new is not None else (None, None)
+        if old_ext == new_ext:
+            return
+
+        if old_ext == (None, None):
+            # Only adding durations: widen the bucket's range in place
+            new_min, new_max = new_ext
+            values = {
+                "bug_duration_min_ms": case((or_(lo.is_(None), lo > new_min), new_min), else_=lo),
+                "bug_duration_max_ms": case((or_(hi.is_(None), hi < new_max), new_max), else_=hi),
+            }
+        else:
+            # A previous extreme may be gone: recompute from the rows below
+            if bucket == TOTAL_BUCKET:
+                source = select(func.min(lo), func.max(hi)).where(
+                    BatchMetricsRollupModel.bucket != TOTAL_BUCKET,
+                )
+            else:
+                source = select(
+                    func.min(BatchJobMetricsModel.bug_duration_min_ms),
+                    func.max(BatchJobMetricsModel.bug_duration_max_ms),
+                ).where(
+                    BatchJobMetricsModel.day == bucket,
+                    BatchJobMetricsModel.included.is_(True),
+                )
+            new_min, new_max = (await self.session.execute(source)).one()
+            values = {"bug_duration_min_ms": new_min, "bug_duration_max_ms": new_max}
+
+        await self.session.execute(
+            update(BatchMetricsRollupModel)
+            .where(BatchMetricsRollupModel.bucket == bucket)
+            .values(values)
+            .execution_options(synchronize_session=False)
+        )
+
+    # -- reads ----------------------------------------------------------
+
+    async def get_global(self, top_steps: int = 5) -> Dict[str, Any]:
+        """All-time metrics over terminal jobs, plus the most-failed steps."""
+        total = await self._get_bucket(TOTAL_BUCKET)
+        steps = (await self.session.execute(
+            select(BatchStepMetricsModel)
+            .where(
+                BatchStepMetricsModel.bucket == TOTAL_BUCKET,
+                BatchStepMetricsModel.count > 0,
+            )
+            .order_by(BatchStepMetricsModel.failures.desc(), BatchStepMetricsModel.label)
+            .limit(top_steps)
+        )).scalars().all()
+        return {
+            **_format_bucket(total),
+            "most_failed_steps": [
+                {
+                    "label": step.label,
+                    "failures": step.failures,
+                    "total": step.count,
+                    "failure_rate": _rate(step.failures, step.count),
+                }
+                for step in steps
+            ],
+        }
+
+    async def get_daily(self, days: int = 30) -> List[Dict[str, Any]]:
+        """Per-day metrics (by job creation date, UTC), most recent first."""
+        rows = (await self.session.execute(
+            select(BatchMetricsRollupModel)
+            .where(
+                BatchMetricsRollupModel.bucket != TOTAL_BUCKET,
+                BatchMetricsRollupModel.jobs_total > 0,
+            )
+            .order_by(BatchMetricsRollupModel.bucket.desc())
+            .limit(days)
+        )).scalars().all()
+        return [{"day": row.bucket, **_format_bucket(row)} for row in rows]
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Metrics for one job, or None if the job does not exist.
+
+        Jobs still in flight are rolled up from their bugs on each read;
+        terminal jobs written before the rollups existed on first read.
+        """
+        job = await self._get_job_row(job_id)
+        if job is None:
+            return None
+        row = await self.session.get(BatchJobMetricsModel, job_id)
+        if row is not None and job.status in TERMINAL_JOB_STATUSES:
+            roll = self._row_rollup(row)
+        elif job.status in TERMINAL_JOB_STATUSES:
+            roll = await self.refresh_job(job_id)
+        else:
+            roll = await self._compute(job_id, job)
+
+        finished = roll["bugs_completed"] + roll["bugs_failed"] + roll["bugs_skipped"]
+        return {
+            "job_id": job_id,
+            "status": job.status,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+            "summary": {
+                "total": roll["bugs_total"],
+                "completed": roll["bugs_completed"],
+                "failed": roll["bugs_failed"],
+                "skipped": roll["bugs_skipped"],
+                "success_rate": _rate(roll["bugs_completed"], finished),
+            },
+            "timing": {
+                "avg_ms": _avg(roll["bug_duration_total_ms"], roll["bug_duration_count"]),
+                "min_ms": _round(roll["bug_duration_min_ms"]),
+                "max_ms": _round(roll["bug_duration_max_ms"]),
+                "total_ms": _round(roll["bug_duration_total_ms"]),
+            },
+            "retry_stats": {
+                "total_retries": roll["retries_total"],
+                "bugs_with_retries": roll["bugs_with_retries"],
+                "max_retries_single_bug": roll["max_retries_single_bug"],
+            },
+            "step_metrics": [
+                {
+                    "label": label,
+                    "count": data["count"],
+                    "avg_duration_ms": _avg(data["total_ms"], data["count"]),
+                    "total_duration_ms": round(data["total_ms"], 1),
+                    "failures": data["failures"],
+                    "failure_rate": _rate(data["failures"], data["count"]),
+                }
+                for label, data in (roll["step_metrics"] or {}).items()
+            ],
+        }
+
+    async def _get_bucket(self, bucket: str) -> Optional[BatchMetricsRollupModel]:
+        return (await self.session.execute(
+            select(BatchMetricsRollupModel)
+            .where(BatchMetricsRollupModel.bucket == bucket)
+            .execution_options(populate_existing=True)
+        )).scalar_one_or_none()
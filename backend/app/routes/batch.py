@@ -8,23 +8,28 @@ SSE events arrive via the shared /api/internal/events/{run_id} endpoint.
 
 from __future__ import annotations
 
-import json
 import logging
 import re
 import uuid
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query
 from fastapi.responses import JSONResponse, StreamingResponse
 
 # Database imports
 from app.database import get_session_ctx
-from app.repositories.batch_job import BatchJobRepository
+from app.repositories.batch_job import BatchJobRepository, bug_step_history
 from app.models.db import BatchJobModel
 
 # SSE infrastructure (unified EventBus)
-from app.event_bus import push_event as push_node_event, subscribe_events
+from app.event_bus import (
+    format_sse_frame,
+    get_event_bus,
+    parse_last_event_id,
+    push_event as push_node_event,
+    subscribe_events,
+)
 
 # Temporal client (lazy import to avoid startup dependency)
 from app.temporal_adapter import get_client
@@ -73,7 +78,12 @@ _DRY_RUN_STEPS = [
 
 
 def _db_job_to_dict(db_job: BatchJobModel) -> Dict[str, Any]:
-    """Convert database job model to dict format for API responses."""
+    """Convert database job model to dict format for API responses.
+
+    Expects bugs with step_records loaded (BatchJobRepository.get).
+    """
+    bugs = sorted(db_job.bugs, key=lambda b: b.bug_index)
+    steps = [bug_step_history(bug) for bug in bugs]
     return {
         "job_id": db_job.id,
         "status": db_job.status,
@@ -86,10 +96,10 @@ def _db_job_to_dict(db_job: BatchJobModel) -> Dict[str, Any]:
                 "error": bug.error,
                 "started_at": bug.started_at.isoformat() if bug.started_at else None,
                 "completed_at": bug.completed_at.isoformat() if bug.completed_at else None,
-                "steps": bug.steps,
-                "retry_count": _count_retries(bug.steps),
+                "steps": bug_steps,
+                "retry_count": _count_retries(bug_steps),
             }
-            for bug in sorted(db_job.bugs, key=lambda b: b.bug_index)
+            for bug, bug_steps in zip(bugs, steps, strict=True)
         ],
         "created_at": db_job.created_at.isoformat() if db_job.created_at else "",
         "updated_at": db_job.updated_at.isoformat() if db_job.updated_at else "",
@@ -323,13 +333,21 @@ async def list_batch_bug_fix_jobs(
 # --- SSE Progress Streaming ---
 
 
-async def _batch_sse_generator(job_id: str):
+async def _batch_sse_generator(job_id: str, last_event_id: Optional[int] = None):
     """SSE generator for batch job progress.
 
     Sends initial job state from DB, then streams real-time events
     from the shared SSE infrastructure (events arrive from Temporal
     Worker via HTTP POST to /api/internal/events/{job_id}).
+
+    When the client resumes with a last_event_id that is still buffered,
+    the snapshot is skipped and only the missed events are replayed.
     """
+    if last_event_id is not None and get_event_bus().can_resume(job_id, last_event_id):
+        async for frame in subscribe_events(job_id, last_event_id=last_event_id):
+            yield frame
+        return
+
     # Send initial job state from database
     try:
         async with get_session_ctx() as session:
@@ -337,23 +355,31 @@ async def _batch_sse_generator(job_id: str):
             db_job = await repo.get(job_id)
         if db_job:
             initial_state = _db_job_to_dict(db_job)
-            yield f"event: job_state\ndata: {json.dumps(initial_state, default=str)}\n\n"
+            yield format_sse_frame("job_state", initial_state)
     except Exception as e:
         logger.error(f"Job {job_id}: Failed to send initial SSE state: {e}")
 
     # Stream events from EventBus (events arrive from Temporal Worker
     # via HTTP POST to /api/internal/events/{job_id}).
     # subscribe_events stops automatically on job_done / workflow_complete.
-    async for event_str in subscribe_events(job_id):
-        yield event_str
+    async for frame in subscribe_events(job_id):
+        yield frame
 
 
 @router.get("/bug-fix/{job_id}/stream")
-async def stream_batch_job_progress(job_id: str):
+async def stream_batch_job_progress(
+    job_id: str,
+    last_event_id: Optional[str] = Query(None),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
     """Stream real-time progress updates for a batch bug fix job via SSE.
 
+    Every event carries an SSE id. Reconnecting clients send the last id
+    they received (Last-Event-ID header or ?last_event_id=) to resume
+    without a full state reload.
+
     Events:
-    - job_state: Initial job state when connected
+    - job_state: Initial job state when connected (skipped on resume)
     - bug_started: When a bug fix starts (data: {bug_index, url})
     - bug_step_started: When a step begins (data: {bug_index, step, label, attempt?})
     - bug_step_completed: When a step completes (data: {bug_index, step, label, status, ...})
@@ -375,7 +401,9 @@ async def stream_batch_job_progress(job_id: str):
         raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
 
     return StreamingResponse(
-        _batch_sse_generator(job_id),
+        _batch_sse_generator(
+            job_id, parse_last_event_id(last_event_id_header, last_event_id)
+        ),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -502,7 +530,7 @@ async def retry_single_bug(job_id: str, bug_index: int):
             bug.started_at = None
             bug.completed_at = None
             bug.steps = None
-            await session.flush()
+            await repo.clear_bug_steps(job_id, bug_index)
         await repo.update_status(job_id, "running")
 
     # 5. Recover config and cwd from stored job config
@@ -641,10 +669,27 @@ async def get_global_metrics():
     """Get aggregated metrics across all completed batch jobs.
 
     Returns total job/bug counts, overall success rate,
-    average timing, and most-failed steps ranking.
+    average timing, and most-failed steps ranking. Read from the
+    incrementally maintained rollups, so cost does not grow with history.
     """
     async with get_session_ctx() as session:
         repo = BatchJobRepository(session)
         metrics = await repo.get_global_metrics()
 
     return metrics
+
+
+@router.get("/metrics/daily")
+async def get_daily_metrics(
+    days: int = Query(30, ge=1, le=366, description="Number of most recent days with jobs"),
+):
+    """Get per-day metrics (by job creation date, UTC), most recent first.
+
+    Each day has the same jobs/bugs/timing/retries sections as
+    /metrics/global.
+    """
+    async with get_session_ctx() as session:
+        repo = BatchJobRepository(session)
+        daily = await repo.get_daily_metrics(days)
+
+    return {"days": daily}
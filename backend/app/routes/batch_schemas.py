@@ -13,6 +13,10 @@ class BatchBugFixConfig(BaseModel):
     validation_level: Literal["minimal", "standard", "thorough"] = "standard"
     failure_policy: Literal["stop", "skip", "retry"] = "skip"
     max_retries: int = Field(default=3, ge=1, le=10)
+    max_parallel_bugs: int = Field(
+        default=1, ge=1, le=8,
+        description="Bugs fixed concurrently, each in its own git worktree (1 = sequential)",
+    )
 
 
 class BatchBugFixRequest(BaseModel):
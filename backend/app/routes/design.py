@@ -9,7 +9,7 @@ SSE progress streaming via EventBus.
 
 from __future__ import annotations
 
-import json
+import gzip
 import logging
 import os
 import re
@@ -18,15 +18,21 @@ from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 from urllib.parse import unquote
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_session, get_session_ctx
 from app.models.db import DesignJobModel
 from app.repositories.design_job import DesignJobRepository
-from app.event_bus import push_event as push_node_event, subscribe_events
+from app.event_bus import (
+    format_sse_frame,
+    get_event_bus,
+    parse_last_event_id,
+    push_event as push_node_event,
+    subscribe_events,
+)
 
 logger = logging.getLogger("workflow.routes.design")
 
@@ -440,39 +446,99 @@ async def get_design_job_status(
     return _job_to_status(job)
 
 
+async def _get_spec_path(job_id: str, session: AsyncSession) -> str:
+    """design_spec.json path for a job; 404 if the job or file is missing."""
+    repo = DesignJobRepository(session)
+    job = await repo.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+
+    spec_path = job.design_file
+    if not spec_path or not os.path.isfile(spec_path):
+        raise HTTPException(status_code=404, detail="design_spec.json not found on disk")
+    return spec_path
+
+
 @router.get("/{job_id}/spec")
 async def get_design_job_spec(
     job_id: str,
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
     session: AsyncSession = Depends(get_session),
 ):
     """Return the design_spec.json content for a completed (or in-progress) job.
 
     Used by the frontend to recover designSpec state after page navigation.
+    Serves the file bytes as written (no re-parse) with an ETag; a matching
+    If-None-Match gets 304. Gzipped specs are sent with Content-Encoding:
+    gzip, or decompressed for clients that don't accept it.
     """
-    repo = DesignJobRepository(session)
-    job = await repo.get(job_id)
-    if not job:
-        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    from workflow.spec.spec_file import is_gzip_spec, spec_etag
 
-    spec_path = job.design_file
-    if not spec_path or not os.path.isfile(spec_path):
-        raise HTTPException(status_code=404, detail="design_spec.json not found on disk")
+    spec_path = await _get_spec_path(job_id, session)
+    etag = spec_etag(spec_path)
+    if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
 
-    with open(spec_path, "r", encoding="utf-8") as f:
-        spec_data = json.load(f)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if is_gzip_spec(spec_path):
+        if "gzip" not in (accept_encoding or ""):
+            def _decompressed():
+                with gzip.open(spec_path, "rb") as f:
+                    while chunk := f.read(64 * 1024):
+                        yield chunk
 
-    return spec_data
+            return StreamingResponse(_decompressed(), media_type="application/json", headers=headers)
+        headers["Content-Encoding"] = "gzip"
+    return FileResponse(spec_path, media_type="application/json", headers=headers)
+
+
+@router.get("/{job_id}/spec/header")
+async def get_design_job_spec_header(
+    job_id: str,
+    session: AsyncSession = Depends(get_session),
+):
+    """Return design_spec.json without its components.
+
+    Adds component_index ([{id, name}] in document order) so clients can
+    fetch components one at a time from /spec/components/{component_id}.
+    """
+    from workflow.spec.spec_file import read_spec_header
+
+    return read_spec_header(await _get_spec_path(job_id, session))
+
+
+@router.get("/{job_id}/spec/components/{component_id}")
+async def get_design_job_spec_component(
+    job_id: str,
+    component_id: str,
+    session: AsyncSession = Depends(get_session),
+):
+    """Return one top-level component of design_spec.json by its id."""
+    from workflow.spec.spec_file import read_spec_component
+
+    component = read_spec_component(await _get_spec_path(job_id, session), component_id)
+    if component is None:
+        raise HTTPException(
+            status_code=404, detail=f"Component '{component_id}' not found in spec",
+        )
+    return component
 
 
 @router.get("/{job_id}/stream")
 async def stream_design_job_progress(
     job_id: str,
+    last_event_id: Optional[str] = Query(None),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
     session: AsyncSession = Depends(get_session),
 ):
     """Stream real-time progress updates for a design-to-code job via SSE.
 
+    Reconnecting clients resume from the Last-Event-ID header (or
+    ?last_event_id=) instead of reloading the full job state.
+
     Events:
-    - job_state: Initial job state when connected
+    - job_state: Initial job state when connected (skipped on resume)
     - workflow_start: Pipeline started
     - node_started / node_completed: Per-node progress
     - component_started / component_completed / component_failed: Per-component
@@ -494,7 +560,11 @@ async def stream_design_job_progress(
     initial_state = _job_to_dict(job)
 
     return StreamingResponse(
-        _design_sse_generator(job_id, initial_state),
+        _design_sse_generator(
+            job_id,
+            initial_state,
+            parse_last_event_id(last_event_id_header, last_event_id),
+        ),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -595,7 +665,7 @@ async def get_design_job_files(
         for dirpath, _, filenames in os.walk(output_dir, followlinks=False):
             for filename in sorted(filenames):
                 ext = os.path.splitext(filename)[1].lower()
-                if ext not in _CODE_EXTENSIONS:
+                if ext not in _CODE_EXTENSIONS or filename == "design_spec.index.json":
                     continue
                 abs_path = os.path.join(dirpath, filename)
                 rel_path = os.path.relpath(abs_path, output_dir)
@@ -688,7 +758,11 @@ async def get_screenshot(
 # --- SSE Generator ---
 
 
-async def _design_sse_generator(job_id: str, initial_state: Dict[str, Any]):
+async def _design_sse_generator(
+    job_id: str,
+    initial_state: Dict[str, Any],
+    last_event_id: Optional[int] = None,
+):
     """SSE generator for design job progress.
 
     Sends initial job state, then streams real-time events.
@@ -696,12 +770,16 @@ async def _design_sse_generator(job_id: str, initial_state: Dict[str, Any]):
     Args:
         job_id: Job identifier for SSE event subscription
         initial_state: Snapshot of job state for the first SSE event
+        last_event_id: Last event id seen by a reconnecting client; when
+            still buffered, the snapshot is skipped and missed events replayed
     """
-    yield f"event: job_state\ndata: {json.dumps(initial_state, default=str)}\n\n"
+    if last_event_id is None or not get_event_bus().can_resume(job_id, last_event_id):
+        yield format_sse_frame("job_state", initial_state)
+        last_event_id = None
 
     # Stream from EventBus (stops automatically on job_done / workflow_complete)
-    async for event_str in subscribe_events(job_id):
-        yield event_str
+    async for frame in subscribe_events(job_id, last_event_id=last_event_id):
+        yield frame
 
 
 # --- Figma URL Parsing ---
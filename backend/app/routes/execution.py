@@ -4,14 +4,14 @@ from __future__ import annotations
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_session
 from ..repositories.workflow import WorkflowRepository
 from ..models.schemas import DynamicRunRequest, DynamicRunResponse
-from ..event_bus import subscribe_events
+from ..event_bus import parse_last_event_id, subscribe_events
 from ..temporal_adapter import start_dynamic_workflow
 from .workflows import _build_workflow_definition, validate_workflow_graph
 
@@ -56,11 +56,13 @@ async def run_dynamic_workflow(
     }
 
     initial_state = payload.initial_state if payload else {}
+    event_schema_version = payload.event_schema_version if payload else None
 
     try:
         run_id = await start_dynamic_workflow(
             workflow_definition=wf_dict,
             initial_state=initial_state,
+            event_schema_version=event_schema_version,
         )
     except Exception as exc:
         raise HTTPException(
@@ -82,16 +84,25 @@ async def run_dynamic_workflow(
 async def stream_workflow_run(
     workflow_id: str,
     run_id: str,
+    last_event_id: Optional[str] = Query(None),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
     session: AsyncSession = Depends(get_session),
 ):
-    """SSE endpoint for real-time workflow execution status."""
+    """SSE endpoint for real-time workflow execution status.
+
+    Resumes after the Last-Event-ID header (or ?last_event_id=) on
+    reconnect; a "resync" event is sent if those events were evicted.
+    """
     repo = WorkflowRepository(session)
     workflow = await repo.get(workflow_id)
     if not workflow:
         raise HTTPException(status_code=404, detail="工作流不存在")
 
     return StreamingResponse(
-        subscribe_events(run_id),
+        subscribe_events(
+            run_id,
+            last_event_id=parse_last_event_id(last_event_id_header, last_event_id),
+        ),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
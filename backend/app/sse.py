@@ -25,9 +25,7 @@ __all__ = [
 def __getattr__(name: str):
     """Expose EventBus internals for test backward compat."""
     if name == "_active_streams":
-        return get_event_bus()._streams
-    if name == "_event_buffers":
-        return get_event_bus()._buffers
+        return get_event_bus()._jobs
     raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
@@ -38,5 +36,5 @@ def push_node_event(run_id: str, event_type: str, data: dict) -> None:
 
 async def sse_event_generator(run_id: str):
     """Generate SSE events — delegates to EventBus.subscribe()."""
-    async for event_str in subscribe_events(run_id):
-        yield event_str
+    async for frame in subscribe_events(run_id):
+        yield frame
@@ -66,12 +66,15 @@ async def get_client() -> Client:
 async def start_dynamic_workflow(
     workflow_definition: dict,
     initial_state: dict,
+    event_schema_version: Optional[int] = None,
 ) -> str:
     """Start a DynamicWorkflow via Temporal and return run ID.
 
     Args:
         workflow_definition: Serialized WorkflowDefinition dict
         initial_state: Initial input values for the workflow
+        event_schema_version: node_output event schema for this run
+            (None = worker default)
 
     Returns:
         Temporal workflow run ID
@@ -83,6 +86,8 @@ async def start_dynamic_workflow(
         "workflow_definition": workflow_definition,
         "initial_state": initial_state,
     }
+    if event_schema_version is not None:
+        params["event_schema_version"] = event_schema_version
     run = await client.start_workflow(
         DynamicWorkflow.__name__,
         params,
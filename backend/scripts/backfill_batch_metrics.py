@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Rebuild the batch metrics rollup tables from existing jobs and bugs.
+
+Run once after upgrading (jobs written before the rollups existed are
+otherwise only counted in /metrics/global once they are written again),
+or any time the rollups are suspected to be off. Creates missing tables,
+then recomputes batch_job_metrics / batch_metrics_rollups /
+batch_step_metrics in one transaction against DATABASE_URL.
+
+Usage:
+    python scripts/backfill_batch_metrics.py [--batch-size 200]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.database import close_db, get_session_ctx, init_db
+from app.repositories.batch_metrics import BatchMetricsRepository
+
+
+async def _backfill(batch_size: int) -> None:
+    await init_db()
+    start = time.monotonic()
+    try:
+        async with get_session_ctx() as session:
+            processed = await BatchMetricsRepository(session).backfill(batch_size=batch_size)
+    finally:
+        await close_db()
+    print(f"Backfilled metrics for {processed} jobs in {time.monotonic() - start:.1f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(_backfill(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Benchmark: pairwise vs grid-indexed neighbor and stack detection.
+
+Builds a synthetic design-system page: sections stacked vertically, each
+holding a wrapped grid of cards, and each card holding a few leaf nodes.
+The flattened boxes then go through two computations:
+
+- neighbors: DesignAnalyzerNode._compute_spatial_neighbors
+  (the pairwise loop before, SpatialIndex.query after)
+- stack:     detect_container_layout over the same boxes as siblings
+  (the pairwise overlap scan before, SpatialIndex.overlapping_pairs after)
+
+The pairwise version is quadratic. It only runs up to --pairwise-max nodes;
+larger sizes report it as skipped.
+
+Usage:
+    python scripts/bench_spatial_index.py [--sizes 1000 10000 50000] [--pairwise-max 5000]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from workflow.nodes.design import DesignAnalyzerNode
+from workflow.nodes.figma_utils import _bounds_overlap_ratio, detect_container_layout
+
+
+def _synthetic_page(n_nodes: int, seed: int = 0) -> list:
+    """Flat list of boxes for a 1440px-wide page with ~n_nodes nodes."""
+    rng = random.Random(seed)
+    boxes = []
+    y = 0.0
+    while len(boxes) < n_nodes:
+        section_top = y
+        x = 24.0
+        row_h = 0.0
+        for _ in range(rng.randint(8, 40)):
+            w, h = rng.choice([(320, 180), (200, 240), (440, 120)])
+            if x + w > 1416:
+                x = 24.0
+                y += row_h + 24
+                row_h = 0.0
+            boxes.append({"x": x, "y": y, "width": w, "height": h})
+            for k in range(rng.randint(2, 6)):  # leaves inside the card
+                boxes.append({"x": x + 12, "y": y + 12 + k * 28, "width": w - 24, "height": 20})
+            x += w + 24
+            row_h = max(row_h, h)
+        y += row_h + 64
+        boxes.append({"x": 0, "y": section_top, "width": 1440, "height": y - section_top})
+    return boxes[:n_nodes]
+
+
+def _pairwise_neighbors(node: DesignAnalyzerNode, components: list) -> None:
+    for i, comp_a in enumerate(components):
+        neighbors = []
+        for j, comp_b in enumerate(components):
+            if i != j and node._are_spatially_adjacent(comp_a["bounds"], comp_b["bounds"]):
+                neighbors.append(comp_b["name"])
+        comp_a["neighbors"] = neighbors
+
+
+def _pairwise_stack(children_bounds: list) -> bool:
+    # Non-overlapping siblings only, so the scan runs to completion.
+    for i in range(len(children_bounds)):
+        for j in range(i + 1, len(children_bounds)):
+            if _bounds_overlap_ratio(children_bounds[i], children_bounds[j]) > 0.3:
+                return True
+    return False
+
+
+def _components(boxes: list) -> list:
+    return [{"name": f"N{i}", "bounds": b} for i, b in enumerate(boxes)]
+
+
+def _timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--pairwise-max", type=int, default=5000)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    node = DesignAnalyzerNode(node_id="bench", node_type="design_analyzer", config={})
+
+    print("=== spatial index benchmark ===\n")
+    print(f"{'nodes':>7}  {'neighbors pairwise':>19}  {'indexed':>9}  {'stack pairwise':>15}  {'indexed':>9}")
+    for n in args.sizes:
+        boxes = _synthetic_page(n)
+        # Siblings for stack detection: leaves only (no card/section overlap)
+        siblings = [b for b in boxes if b["height"] == 20]
+
+        indexed_n = _timed(node._compute_spatial_neighbors, _components(boxes))
+        indexed_s = _timed(detect_container_layout, {}, siblings)
+        if n <= args.pairwise_max:
+            pairwise_n = f"{_timed(_pairwise_neighbors, node, _components(boxes)):.3f}s"
+            pairwise_s = f"{_timed(_pairwise_stack, siblings):.3f}s"
+        else:
+            pairwise_n = pairwise_s = "skipped"
+        print(f"{n:>7}  {pairwise_n:>19}  {indexed_n:>8.3f}s  {pairwise_s:>15}  {indexed_s:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Benchmark: merge_analyzer_output with a deep copy vs in place.
+
+Builds a synthetic FrameDecomposer component with ~500 nodes (nested
+containers with styled text/image leaves) and an analyzer output with
+300 children_updates (a few pointing at pruned or hallucinated IDs), then
+times repeated merges in both modes:
+
+- copy:     merge_analyzer_output(component, output)
+- in place: merge_analyzer_output(component, output, in_place=True)
+            (each run gets a fresh component, prepared outside the timer)
+
+Usage:
+    python scripts/bench_spec_merge.py [--nodes 500] [--updates 300] [--runs 200]
+"""
+
+import argparse
+import copy
+import logging
+import os
+import random
+import sys
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from workflow.spec.spec_merger import merge_analyzer_output
+
+
+def _component(n_nodes: int, seed: int = 0) -> tuple:
+    """(component, all descendant ids) with about n_nodes nodes."""
+    rng = random.Random(seed)
+    ids = []
+
+    def node(depth: int) -> dict:
+        nid = f"{depth}:{len(ids)}"
+        ids.append(nid)
+        spec = {
+            "id": nid,
+            "name": rng.choice(["Frame", "Text", "Rectangle", "Icon"]),
+            "bounds": {"x": 0, "y": 0, "width": 100, "height": 40},
+            "layout": {"type": "flex", "direction": "row", "gap": 8},
+            "style": {"background": {"type": "solid", "color": "#FFFFFF"}, "corner_radius": 8},
+            "typography": {"content": "示例文字", "font_size": 14, "font_weight": 400},
+            "content": {"image": {"src": "", "alt": None}},
+        }
+        if depth < 5 and len(ids) < n_nodes:
+            spec["children"] = [node(depth + 1) for _ in range(rng.randint(2, 6)) if len(ids) < n_nodes]
+        else:
+            spec["_pruned_child_ids"] = [f"{nid}/vector"]
+        return spec
+
+    root = node(0)
+    return root, ids[1:]
+
+
+def _analyzer_output(ids: list, n_updates: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    targets = rng.sample(ids, min(n_updates - 10, len(ids)))
+    targets += [f"{ids[0]}/vector"] * 5 + [f"ghost-{i}" for i in range(5)]
+    return {
+        "role": "section",
+        "description": "商品卡片",
+        "suggested_name": "ProductCard",
+        "children_updates": [
+            {
+                "id": nid,
+                "role": "text",
+                "description": "标题",
+                "suggested_name": f"Label{i % 20}",
+                "content_updates": {"image_alt": "商品图"},
+            }
+            for i, nid in enumerate(targets)
+        ],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=500)
+    parser.add_argument("--updates", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    # Unmatched/pruned warnings would dominate the timing
+    logging.disable(logging.WARNING)
+
+    component, ids = _component(args.nodes)
+    output = _analyzer_output(ids, args.updates)
+
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        merge_analyzer_output(component, output)
+    copy_ms = (time.perf_counter() - start) * 1000 / args.runs
+
+    fresh = [copy.deepcopy(component) for _ in range(args.runs)]
+    start = time.perf_counter()
+    for spec in fresh:
+        merge_analyzer_output(spec, output, in_place=True)
+    in_place_ms = (time.perf_counter() - start) * 1000 / args.runs
+
+    print(f"=== spec merge benchmark ({len(ids) + 1} nodes, "
+          f"{len(output['children_updates'])} children_updates) ===\n")
+    print(f"copy:     {copy_ms:.2f} ms/merge")
+    print(f"in place: {in_place_ms:.2f} ms/merge")
+    print(f"speedup:  {copy_ms / in_place_ms:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
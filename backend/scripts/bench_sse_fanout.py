@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: SSE fan-out throughput of the EventBus.
+
+Compares the legacy path (stdlib json.dumps + str formatting per event,
+per subscriber) with the current serialize-once path (one bytes frame
+per event shared by all subscribers), for 1, 10 and 100 subscribers.
+
+Usage:
+    python scripts/bench_sse_fanout.py [--events 2000]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import event_bus
+from app.event_bus import EventBus
+
+_log = logging.getLogger("bench")
+
+SUBSCRIBER_COUNTS = (1, 10, 100)
+
+
+def _payload(i: int) -> dict:
+    """A node_completed-sized event (~1 KB)."""
+    return {
+        "node_id": f"node_{i % 8}",
+        "status": "completed",
+        "output": "组件分析结果 " * 40,
+        "bug_index": i % 5,
+        "metrics": {"duration_ms": 1234, "tokens": [1, 2, 3, 4, 5]},
+    }
+
+
+def _legacy_frame(event: dict) -> str:
+    """The pre-change formatter: re-encoded for every subscriber."""
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+async def _run_legacy(n_events: int, n_subs: int) -> float:
+    """The pre-change EventBus: one queue per subscriber, timestamped and
+    logged at push, awaited with a keepalive timeout per event."""
+    queues = [asyncio.Queue() for _ in range(n_subs)]
+
+    async def consume(queue: asyncio.Queue) -> None:
+        for _ in range(n_events):
+            event = await asyncio.wait_for(queue.get(), timeout=30.0)
+            _legacy_frame(event)
+
+    start = time.perf_counter()
+    consumers = [asyncio.create_task(consume(q)) for q in queues]
+    for i in range(n_events):
+        data = _payload(i)
+        data["timestamp"] = datetime.now(timezone.utc).isoformat()
+        event = {"event": "node_completed", "data": data}
+        for queue in queues:
+            queue.put_nowait(event)
+        _log.info(f"Event sent: node_completed for bench")
+        if i % 50 == 0:
+            await asyncio.sleep(0)
+    await asyncio.gather(*consumers)
+    return time.perf_counter() - start
+
+
+async def _run_current(n_events: int, n_subs: int) -> float:
+    bus = EventBus(buffer_max_events=n_events)
+
+    async def consume(gen) -> None:
+        received = 0
+        async for _ in gen:
+            received += 1
+            if received >= n_events:
+                return
+
+    start = time.perf_counter()
+    consumers = [
+        asyncio.create_task(consume(bus.subscribe("bench", last_event_id=0)))
+        for _ in range(n_subs)
+    ]
+    for i in range(n_events):
+        bus.push("bench", "node_completed", _payload(i))
+        if i % 50 == 0:
+            await asyncio.sleep(0)
+    await asyncio.gather(*consumers)
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument(
+        "--stdlib-json", action="store_true", help="Use the stdlib json fallback encoder",
+    )
+    args = parser.parse_args()
+    if args.stdlib_json:
+        event_bus.ORJSON_AVAILABLE = False
+
+    # Keep the per-event INFO logs out of the measurement
+    logging.disable(logging.INFO)
+
+    encoder = "orjson" if event_bus.ORJSON_AVAILABLE else "stdlib json"
+    print(f"=== SSE fan-out benchmark ({args.events} events, encoder: {encoder}) ===\n")
+    print(f"{'subscribers':>11} | {'before ev/s':>12} | {'after ev/s':>12} | speedup")
+    print("-" * 54)
+    for n_subs in SUBSCRIBER_COUNTS:
+        legacy = await _run_legacy(args.events, n_subs)
+        current = await _run_current(args.events, n_subs)
+        before = args.events / legacy
+        after = args.events / current
+        print(f"{n_subs:>11} | {before:>12,.0f} | {after:>12,.0f} | {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -37,9 +37,32 @@ from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, Asyn
 from app.database import Base, get_session_ctx
 from app.repositories.batch_job import BatchJobRepository
 from app.models.db import BatchJobModel, BugResultModel
+from app.event_bus import get_event_bus
 from app.sse import push_node_event, _active_streams
 from workflow.temporal.batch_activities import NODE_TO_STEP
 
+
+class _BufferReader:
+    """Queue-like reader over the EventBus replay buffer of one job."""
+
+    def __init__(self, job_id: str):
+        self._job_id = job_id
+        self._cursor = 0
+
+    def _pending(self) -> list:
+        return get_event_bus().replay(self._job_id, self._cursor)
+
+    def empty(self) -> bool:
+        return not self._pending()
+
+    def get_nowait(self) -> dict:
+        pending = self._pending()
+        if not pending:
+            raise asyncio.QueueEmpty
+        self._cursor, event = pending[0]
+        return event
+
+
 # --- Test DB isolation: use in-memory SQLite to avoid nuking production data ---
 _test_engine = create_async_engine("sqlite+aiosqlite:///:memory:")
 _test_session_factory = async_sessionmaker(_test_engine, class_=AsyncSession, expire_on_commit=False)
@@ -361,8 +384,8 @@ async def run_tests():
         print("\nTest T67.6: bug_step_started event format ... ", end="")
 
         sse_job_id = "job_sse_test_01"
-        sse_queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
-        _active_streams[sse_job_id] = sse_queue
+        _active_streams.pop(sse_job_id, None)
+        sse_queue = _BufferReader(sse_job_id)
 
         try:
             event_data = {
@@ -0,0 +1,196 @@
+"""Tests for the SSE EventBus (app/event_bus.py).
+
+Covers:
+- Event ids and SSE framing (encoded once, shared across subscribers)
+- Pre-connection buffering (first subscriber receives buffered events)
+- Concurrent subscribers on the same job
+- Resume via last_event_id, and resync when the ring has evicted events
+- Stale buffer cleanup
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app import event_bus
+
+from app.event_bus import EventBus, _dumps, format_sse_frame, parse_last_event_id
+
+
+async def _collect(gen, count: int, timeout: float = 1.0) -> list:
+    """Read `count` frames from an SSE generator, decoded to str."""
+    frames = []
+
+    async def _read():
+        async for frame in gen:
+            frames.append(frame.decode("utf-8"))
+            if len(frames) >= count:
+                return
+
+    await asyncio.wait_for(_read(), timeout=timeout)
+    return frames
+
+
+def _event_types(frames: list) -> list:
+    return [
+        line.split(": ", 1)[1]
+        for frame in frames
+        for line in frame.splitlines()
+        if line.startswith("event: ")
+    ]
+
+
+def _event_ids(frames: list) -> list:
+    return [
+        int(line.split(": ", 1)[1])
+        for frame in frames
+        for line in frame.splitlines()
+        if line.startswith("id: ")
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Push / framing
+# ---------------------------------------------------------------------------
+
+
+class TestPush:
+
+    def test_ids_are_monotonic_per_job(self):
+        bus = EventBus()
+        assert [bus.push("job_a", "x", {}) for _ in range(3)] == [1, 2, 3]
+        assert bus.push("job_b", "x", {}) == 1
+
+    async def test_frames_carry_ids(self):
+        bus = EventBus()
+        bus.push("job_a", "bug_started", {"bug_index": 0})
+        frames = await _collect(bus.subscribe("job_a"), 1)
+        assert frames[0].startswith("id: 1\nevent: bug_started\ndata: ")
+
+    async def test_frame_encoded_once_and_shared(self):
+        bus = EventBus()
+        bus.push("job_a", "evt", {"n": 1})
+        gens = [bus.subscribe("job_a", last_event_id=0) for _ in range(2)]
+        frames = [await gen.__anext__() for gen in gens]
+        assert frames[0] is frames[1]
+        assert frames[0] is bus._jobs["job_a"].events[0][2]
+
+    def test_frame_encoding(self):
+        frame = format_sse_frame("evt", {"name": "按钮", "n": 1}, event_id=7)
+        head, data = frame.decode("utf-8").rstrip("\n").split("\ndata: ")
+        assert head == "id: 7\nevent: evt"
+        assert json.loads(data) == {"name": "按钮", "n": 1}
+        assert format_sse_frame("evt", {}).startswith(b"event: evt\n")
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_dumps_handles_non_json_values(self, use_orjson):
+        if use_orjson and not event_bus.ORJSON_AVAILABLE:
+            pytest.skip("orjson not installed")
+        with patch.object(event_bus, "ORJSON_AVAILABLE", use_orjson):
+            assert json.loads(_dumps({1: {"a"}, "s": "按钮"})) == {"1": "{'a'}", "s": "按钮"}
+
+    def test_parse_last_event_id(self):
+        assert parse_last_event_id(None, "7") == 7
+        assert parse_last_event_id("3", "7") == 3
+        assert parse_last_event_id("abc", None) is None
+        assert parse_last_event_id("-1") is None
+
+
+# ---------------------------------------------------------------------------
+# Subscribers
+# ---------------------------------------------------------------------------
+
+
+class TestSubscribe:
+
+    async def test_first_subscriber_gets_buffered_events(self):
+        bus = EventBus()
+        for i in range(3):
+            bus.push("job_a", f"evt_{i}", {})
+        frames = await _collect(bus.subscribe("job_a"), 3)
+        assert _event_types(frames) == ["evt_0", "evt_1", "evt_2"]
+
+    async def test_later_subscriber_starts_from_now(self):
+        bus = EventBus()
+        bus.push("job_a", "old", {})
+        await _collect(bus.subscribe("job_a"), 1)
+
+        gen = bus.subscribe("job_a")
+        reader = asyncio.create_task(_collect(gen, 1))
+        await asyncio.sleep(0.05)
+        bus.push("job_a", "new", {})
+        assert _event_types(await reader) == ["new"]
+
+    async def test_concurrent_subscribers_each_receive_all(self):
+        bus = EventBus()
+        readers = [asyncio.create_task(_collect(bus.subscribe("job_a"), 3)) for _ in range(2)]
+        await asyncio.sleep(0.05)  # let both subscribe before publishing
+        for i in range(3):
+            bus.push("job_a", f"evt_{i}", {})
+
+        results = await asyncio.gather(*readers)
+        for frames in results:
+            assert _event_ids(frames) == [1, 2, 3]
+
+    async def test_stop_event_ends_stream(self):
+        bus = EventBus()
+        bus.push("job_a", "bug_started", {})
+        bus.push("job_a", "job_done", {})
+        bus.push("job_a", "after", {})
+
+        frames = []
+        async for frame in bus.subscribe("job_a"):
+            frames.append(frame.decode("utf-8"))
+        assert _event_types(frames) == ["bug_started", "job_done"]
+
+    async def test_subscriber_removed_on_close(self):
+        bus = EventBus()
+        bus.push("job_a", "evt", {})
+        gen = bus.subscribe("job_a")
+        await _collect(gen, 1)
+        await gen.aclose()
+        assert not bus._jobs["job_a"].subscribers
+
+
+# ---------------------------------------------------------------------------
+# Resume
+# ---------------------------------------------------------------------------
+
+
+class TestResume:
+
+    async def test_resume_replays_missed_events(self):
+        bus = EventBus()
+        for i in range(5):
+            bus.push("job_a", f"evt_{i}", {})
+        await _collect(bus.subscribe("job_a"), 5)
+
+        assert bus.can_resume("job_a", 2)
+        frames = await _collect(bus.subscribe("job_a", last_event_id=2), 3)
+        assert _event_ids(frames) == [3, 4, 5]
+
+    async def test_resync_when_events_evicted(self):
+        bus = EventBus(buffer_max_events=3)
+        for i in range(6):
+            bus.push("job_a", f"evt_{i}", {})
+
+        assert not bus.can_resume("job_a", 1)
+        frames = await _collect(bus.subscribe("job_a", last_event_id=1), 4)
+        assert _event_types(frames)[0] == "resync"
+        assert _event_ids(frames) == [4, 5, 6]
+
+    async def test_unknown_job_cannot_resume(self):
+        bus = EventBus()
+        assert not bus.can_resume("missing", 3)
+
+    def test_stale_buffers_cleaned_up(self):
+        bus = EventBus(buffer_max_age_secs=0)
+        bus.push("job_a", "evt", {})
+        bus._jobs["job_a"].last_activity -= 1
+        bus.push("job_b", "evt", {})
+        assert "job_a" not in bus._jobs
+        assert "job_b" in bus._jobs
@@ -10,10 +10,19 @@ from datetime import datetime, timedelta, timezone
 
 import pytest
 import pytest_asyncio
+from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.db import BatchJobModel, BugResultModel
-from app.repositories.batch_job import BatchJobRepository
+from app.models.db import (
+    BatchJobMetricsModel,
+    BatchJobModel,
+    BatchMetricsRollupModel,
+    BatchStepMetricsModel,
+    BugResultModel,
+    BugStepModel,
+)
+from app.repositories.batch_job import BatchJobRepository, bug_step_history
+from app.repositories.batch_metrics import BatchMetricsRepository
 
 # Ensure temporalio mock is available
 from tests.workflow.conftest import *  # noqa: F401, F403
@@ -321,8 +330,71 @@ class TestUpdateBugSteps:
         ]
         bug = await repo.update_bug_steps("test_job_001", 0, steps)
         assert bug is not None
-        assert len(bug.steps) == 2
-        assert bug.steps[0]["label"] == "获取 Bug 信息"
+
+        job = await repo.get("test_job_001")
+        history = bug_step_history(job.bugs[0])
+        assert len(history) == 2
+        assert history[0]["label"] == "获取 Bug 信息"
+        assert bug_step_history(job.bugs[1]) is None
+
+    @pytest.mark.asyncio
+    async def test_append_steps_keeps_api_shape(self, test_session: AsyncSession):
+        await _create_job(test_session)
+        repo = BatchJobRepository(test_session)
+        started = datetime(2026, 3, 1, 8, 0, tzinfo=timezone.utc)
+        fix = {
+            "step": "fix_bug_peer", "label": "修复 Bug", "status": "completed",
+            "started_at": started.isoformat(),
+            "completed_at": (started + timedelta(seconds=2)).isoformat(),
+            "duration_ms": 2000.0, "output_preview": "done", "error": None,
+            "attempt": 1,
+        }
+        verify = {
+            "step": "verify_fix", "label": "验证修复结果", "status": "failed",
+            "started_at": None, "completed_at": None, "duration_ms": None,
+            "output_preview": None, "error": "still broken",
+        }
+
+        assert await repo.append_bug_steps("test_job_001", {0: [fix]}) == 1
+        assert await repo.append_bug_steps("test_job_001", {0: [verify], 1: []}) == 1
+
+        rows = (await test_session.execute(
+            select(BugStepModel.seq).where(BugStepModel.bug_index == 0)
+        )).scalars().all()
+        assert sorted(rows) == [0, 1]
+
+        job = await repo.get("test_job_001")
+        assert bug_step_history(job.bugs[0]) == [fix, verify]
+
+        await repo.clear_bug_steps("test_job_001", 0)
+        job = await repo.get("test_job_001")
+        assert bug_step_history(job.bugs[0]) is None
+
+    @pytest.mark.asyncio
+    async def test_legacy_steps_json_fallback(self, test_session: AsyncSession):
+        await _create_job(test_session)
+        repo = BatchJobRepository(test_session)
+        bug = await repo.get_bug("test_job_001", 0)
+        bug.steps = [{"step": "fix", "label": "修复 Bug", "status": "completed", "attempt": 2}]
+        await test_session.flush()
+
+        job = await repo.get("test_job_001")
+        assert bug_step_history(job.bugs[0]) == bug.steps
+        await repo.metrics.refresh_job("test_job_001")
+        metrics = await repo.get_job_metrics("test_job_001")
+        assert metrics["retry_stats"]["total_retries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_delete_removes_steps(self, test_session: AsyncSession):
+        await _create_job(test_session)
+        repo = BatchJobRepository(test_session)
+        await repo.append_bug_steps("test_job_001", {0: [{"step": "fix", "label": "修复 Bug"}]})
+
+        assert await repo.delete("test_job_001") is True
+        count = (await test_session.execute(
+            select(func.count()).select_from(BugStepModel)
+        )).scalar()
+        assert count == 0
 
 
 # ---------------------------------------------------------------------------
@@ -374,6 +446,122 @@ class TestMetrics:
         metrics = await repo.get_global_metrics()
         assert metrics["jobs"]["total"] == 0
 
+    @pytest.mark.asyncio
+    async def test_global_metrics_from_rollups(self, test_session: AsyncSession):
+        repo = BatchJobRepository(test_session)
+        now = datetime.now(timezone.utc)
+        await _create_job(test_session, job_id="job_a")
+        await _create_job(test_session, job_id="job_running")
+
+        await repo.update_bug_status(
+            "job_a", 0, "completed",
+            started_at=now - timedelta(seconds=10), completed_at=now,
+        )
+        await repo.update_bug_status(
+            "job_a", 1, "failed",
+            started_at=now - timedelta(seconds=30), completed_at=now,
+        )
+        await repo.update_bug_steps("job_a", 1, [
+            {"label": "verify", "status": "failed", "duration_ms": 100, "attempt": 1},
+            {"label": "verify", "status": "failed", "duration_ms": 300, "attempt": 3},
+            {"label": "fix", "status": "completed", "duration_ms": 50},
+        ])
+        await repo.update_bug_status("job_running", 0, "completed")
+        await repo.update_status("job_a", "failed")
+
+        metrics = await repo.get_global_metrics()
+        # Non-terminal jobs are not counted
+        assert metrics["jobs"] == {"total": 1, "completed": 0, "failed": 1, "success_rate": 0.0}
+        assert metrics["bugs"]["completed"] == 1 and metrics["bugs"]["failed"] == 1
+        assert metrics["timing"]["min_bug_ms"] == pytest.approx(10000, abs=1)
+        assert metrics["timing"]["max_bug_ms"] == pytest.approx(30000, abs=1)
+        assert metrics["retries"]["total"] == 2
+        assert metrics["most_failed_steps"][0] == {
+            "label": "verify", "failures": 2, "total": 2, "failure_rate": 100.0,
+        }
+
+        job_metrics = await repo.get_job_metrics("job_a")
+        assert job_metrics["retry_stats"]["max_retries_single_bug"] == 2
+        assert [s["label"] for s in job_metrics["step_metrics"]] == ["verify", "fix"]
+        assert job_metrics["step_metrics"][0]["avg_duration_ms"] == 200.0
+
+    @pytest.mark.asyncio
+    async def test_rollups_follow_status_changes_and_delete(self, test_session: AsyncSession):
+        repo = BatchJobRepository(test_session)
+        now = datetime.now(timezone.utc)
+        for job_id, seconds in (("job_fast", 5), ("job_slow", 50)):
+            await _create_job(test_session, job_id=job_id, urls=JIRA_URLS[:1])
+            await repo.update_bug_status(
+                job_id, 0, "completed",
+                started_at=now - timedelta(seconds=seconds), completed_at=now,
+            )
+            await repo.update_status(job_id, "completed")
+
+        metrics = await repo.get_global_metrics()
+        assert metrics["jobs"]["total"] == 2
+        assert metrics["timing"]["max_bug_ms"] == pytest.approx(50000, abs=1)
+
+        # Retried: back to running leaves the rollups until terminal again
+        await repo.update_status("job_slow", "running")
+        metrics = await repo.get_global_metrics()
+        assert metrics["jobs"]["total"] == 1
+        assert metrics["timing"]["max_bug_ms"] == pytest.approx(5000, abs=1)
+
+        await repo.update_status("job_slow", "completed")
+        await repo.delete("job_fast")
+        metrics = await repo.get_global_metrics()
+        assert metrics["jobs"]["total"] == 1
+        assert metrics["bugs"]["total"] == 1
+        assert metrics["timing"]["min_bug_ms"] == pytest.approx(50000, abs=1)
+
+        daily = await repo.get_daily_metrics()
+        assert len(daily) == 1
+        assert daily[0]["jobs"]["total"] == 1
+
+    @pytest.mark.asyncio
+    async def test_running_job_is_rolled_up_on_read_only(self, test_session: AsyncSession):
+        repo = BatchJobRepository(test_session)
+        now = datetime.now(timezone.utc)
+        await _create_job(test_session)
+        await repo.update_status("test_job_001", "running")
+        await repo.update_bug_status(
+            "test_job_001", 0, "completed",
+            started_at=now - timedelta(seconds=10), completed_at=now,
+        )
+        await repo.append_bug_steps("test_job_001", {1: [{"step": "fix", "label": "修复 Bug"}]})
+
+        # Writes to a job in flight leave no per-job row behind
+        assert await test_session.get(BatchJobMetricsModel, "test_job_001") is None
+        metrics = await repo.get_job_metrics("test_job_001")
+        assert metrics["summary"]["completed"] == 1
+        assert [s["label"] for s in metrics["step_metrics"]] == ["修复 Bug"]
+
+        await repo.update_status("test_job_001", "completed")
+        row = await test_session.get(BatchJobMetricsModel, "test_job_001")
+        assert row is not None and row.included is True
+        assert (await repo.get_global_metrics())["bugs"]["completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_backfill_matches_incremental(self, test_session: AsyncSession):
+        repo = BatchJobRepository(test_session)
+        now = datetime.now(timezone.utc)
+        await _create_job(test_session, job_id="job_b", urls=JIRA_URLS)
+        await repo.update_bug_status(
+            "job_b", 0, "completed", started_at=now - timedelta(seconds=3), completed_at=now,
+        )
+        await repo.update_bug_steps("job_b", 0, [{"label": "fix", "status": "failed", "attempt": 2}])
+        await repo.update_bug_status("job_b", 2, "skipped")
+        await repo.update_status("job_b", "completed")
+        incremental = await repo.get_global_metrics()
+
+        # Jobs written before the rollups existed
+        for model in (BatchStepMetricsModel, BatchMetricsRollupModel, BatchJobMetricsModel):
+            await test_session.execute(delete(model))
+        assert (await repo.get_global_metrics())["jobs"]["total"] == 0
+
+        assert await BatchMetricsRepository(test_session).backfill(batch_size=1) == 1
+        assert await repo.get_global_metrics() == incremental
+
     @pytest.mark.asyncio
     async def test_get_stats(self, test_session: AsyncSession):
         await _create_job(test_session)
@@ -10,10 +10,14 @@ Covers:
 - POST /api/v2/batch/bug-fix/batch-delete
 - GET /api/v2/batch/metrics/job/{job_id}
 - GET /api/v2/batch/metrics/global
+- GET /api/v2/batch/metrics/daily
+- POST /api/internal/events:batch
 """
 
 from __future__ import annotations
 
+from unittest.mock import patch
+
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient
@@ -431,6 +435,12 @@ class TestMetrics:
         assert "bugs" in data
         assert "timing" in data
 
+    @pytest.mark.asyncio
+    async def test_daily_metrics(self, client: AsyncClient):
+        resp = await client.get("/api/v2/batch/metrics/daily?days=7")
+        assert resp.status_code == 200
+        assert resp.json() == {"days": []}
+
 
 # ---------------------------------------------------------------------------
 # SSE Endpoint — Basic validation
@@ -454,3 +464,31 @@ class TestSSEStream:
         # and the endpoint path is correct (the non-existent test covers 404).
         resp = await client.get(f"/api/v2/batch/bug-fix/{created['job_id']}")
         assert resp.status_code == 200
+
+
+# ---------------------------------------------------------------------------
+# Internal batched event endpoint (Worker → API)
+# ---------------------------------------------------------------------------
+
+
+class TestInternalEventBatch:
+
+    async def test_batch_endpoint_pushes_in_order(self, client: AsyncClient):
+        from app.event_bus import get_event_bus
+
+        bus = get_event_bus()
+        events = [
+            {"run_id": "job_batch_ep", "event_type": f"evt_{i}", "data": {"i": i}}
+            for i in range(3)
+        ]
+        with patch.object(bus, "push") as mock_push:
+            resp = await client.post("/api/internal/events:batch", json={"events": events})
+
+        assert resp.status_code == 200
+        assert resp.json()["count"] == 3
+        assert [c[0][1] for c in mock_push.call_args_list] == ["evt_0", "evt_1", "evt_2"]
+        assert all(c[0][0] == "job_batch_ep" for c in mock_push.call_args_list)
+
+    async def test_batch_endpoint_rejects_malformed(self, client: AsyncClient):
+        resp = await client.post("/api/internal/events:batch", json={"events": [{"run_id": "x"}]})
+        assert resp.status_code == 422
@@ -7,6 +7,7 @@ Covers:
 - GET /api/v2/design (list jobs)
 - POST /api/v2/design/{job_id}/cancel (cancel job)
 - GET /api/v2/design/{job_id}/files (generated files)
+- GET /api/v2/design/{job_id}/spec[/header|/components/{id}] (spec document)
 - GET /api/v2/design/{job_id}/screenshots/{filename} (screenshots)
 - GET /api/v2/design/{job_id}/stream (SSE — basic 404 check)
 """
@@ -239,6 +240,70 @@ class TestGetDesignFiles:
         assert data["files"] == []
 
 
+# ---------------------------------------------------------------------------
+# GET /api/v2/design/{job_id}/spec — Spec Document
+# ---------------------------------------------------------------------------
+
+
+class TestGetDesignSpec:
+    """Tests for the full, header and per-component spec endpoints."""
+
+    @staticmethod
+    async def _job_with_spec(client: AsyncClient, output_dir: str) -> str:
+        from workflow.spec.spec_file import write_spec_document
+
+        created = await _create_design_job(client, output_dir=output_dir)
+        write_spec_document(os.path.join(created["output_dir"], "design_spec.json"), {
+            "version": "1.0",
+            "page": {"name": "Home"},
+            "components": [
+                {"id": "1:2", "name": "Header", "children": []},
+                {"id": "1:3", "name": "Footer", "children": []},
+            ],
+            "validation": {"quality_warning_count": 0},
+        })
+        return created["job_id"]
+
+    @pytest.mark.asyncio
+    async def test_full_spec_with_etag(self, client: AsyncClient, tmp_path):
+        job_id = await self._job_with_spec(client, str(tmp_path))
+        resp = await client.get(f"/api/v2/design/{job_id}/spec")
+        assert resp.status_code == 200
+        assert [c["name"] for c in resp.json()["components"]] == ["Header", "Footer"]
+
+        etag = resp.headers["etag"]
+        resp = await client.get(f"/api/v2/design/{job_id}/spec", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+
+    @pytest.mark.asyncio
+    async def test_spec_header(self, client: AsyncClient, tmp_path):
+        job_id = await self._job_with_spec(client, str(tmp_path))
+        resp = await client.get(f"/api/v2/design/{job_id}/spec/header")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert "components" not in data
+        assert data["validation"] == {"quality_warning_count": 0}
+        assert data["component_index"] == [
+            {"id": "1:2", "name": "Header"}, {"id": "1:3", "name": "Footer"},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_spec_component(self, client: AsyncClient, tmp_path):
+        job_id = await self._job_with_spec(client, str(tmp_path))
+        resp = await client.get(f"/api/v2/design/{job_id}/spec/components/1:3")
+        assert resp.status_code == 200
+        assert resp.json()["name"] == "Footer"
+
+        resp = await client.get(f"/api/v2/design/{job_id}/spec/components/9:9")
+        assert resp.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_spec_missing_file(self, client: AsyncClient, tmp_path):
+        created = await _create_design_job(client, output_dir=str(tmp_path))
+        resp = await client.get(f"/api/v2/design/{created['job_id']}/spec/header")
+        assert resp.status_code == 404
+
+
 # ---------------------------------------------------------------------------
 # GET /api/v2/design/{job_id}/screenshots/{filename} — Screenshots
 # ---------------------------------------------------------------------------
@@ -51,3 +51,24 @@ if "temporalio" not in sys.modules:
         sys.modules["temporalio.workflow"] = _workflow
         sys.modules["temporalio.client"] = _temporalio.client
         sys.modules["temporalio.worker"] = _temporalio.worker
+
+
+# ---------------------------------------------------------------------------
+# Fresh worker DB write-behind queue per test
+# ---------------------------------------------------------------------------
+# DB helpers in workflow.temporal queue their writes on a process-wide
+# DBWriteQueue. Give each test its own queue, with no timer flushes and no
+# retry backoff, so writes land only when the code (or the test) flushes
+# and nothing queued in one test is written under another test's mocks.
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _fresh_db_write_queue(monkeypatch):
+    from workflow.temporal import db_writer
+
+    queue = db_writer.DBWriteQueue(flush_interval=3600, retry_delay=0)
+    monkeypatch.setattr(db_writer, "_queue", queue)
+    yield queue
+    queue.stop()
@@ -0,0 +1,74 @@
+"""Unit tests for the cross-job SpecAnalyzer result store (workflow/spec/analysis_store.py).
+
+Tests cover:
+- Fingerprint ignores semantic fields, tracks structure and screenshot content
+- Roundtrip and LRU pruning by entry count
+"""
+
+from __future__ import annotations
+
+import os
+import time
+
+from workflow.spec.analysis_store import SpecAnalysisStore, component_fingerprint
+
+
+def _component(**overrides):
+    comp = {
+        "id": "1:2",
+        "name": "Button",
+        "bounds": {"x": 0, "y": 0, "width": 120, "height": 44},
+        "screenshot_path": "screenshots/1_2.png",
+        "role": None,
+        "description": None,
+        "children": [{"id": "1:3", "type": "TEXT", "content": "提交", "role": None}],
+    }
+    comp.update(overrides)
+    return comp
+
+
+class TestComponentFingerprint:
+
+    def test_semantic_fields_ignored(self, tmp_path):
+        base = component_fingerprint(_component(), str(tmp_path))
+        analyzed = _component(role="button", description="提交按钮")
+        analyzed["children"] = [{**analyzed["children"][0], "role": "text"}]
+        assert component_fingerprint(analyzed, str(tmp_path)) == base
+
+    def test_structure_and_model_change_fingerprint(self, tmp_path):
+        base = component_fingerprint(_component(), str(tmp_path))
+        moved = _component(bounds={"x": 0, "y": 8, "width": 120, "height": 44})
+        relabeled = _component(children=[{"id": "1:3", "type": "TEXT", "content": "确认"}])
+        assert component_fingerprint(moved, str(tmp_path)) != base
+        assert component_fingerprint(relabeled, str(tmp_path)) != base
+        assert component_fingerprint(_component(), str(tmp_path), model="other") != base
+
+    def test_screenshot_content_changes_fingerprint(self, tmp_path):
+        shot = tmp_path / "screenshots" / "1_2.png"
+        shot.parent.mkdir()
+        shot.write_bytes(b"v1")
+        first = component_fingerprint(_component(), str(tmp_path))
+        shot.write_bytes(b"v2")
+        assert component_fingerprint(_component(), str(tmp_path)) != first
+
+
+class TestSpecAnalysisStore:
+
+    def test_roundtrip(self, tmp_path):
+        store = SpecAnalysisStore(str(tmp_path))
+        assert store.get("abc") is None
+        store.put("abc", {"id": "1:2", "role": "button"})
+        assert store.get("abc") == {"id": "1:2", "role": "button"}
+        assert not [n for n in os.listdir(tmp_path) if n.endswith(".tmp")]
+
+    def test_prune_keeps_recently_used(self, tmp_path):
+        store = SpecAnalysisStore(str(tmp_path), max_entries=2)
+        for i, key in enumerate(("a", "b", "c")):
+            store.put(key, {"id": key})
+            os.utime(tmp_path / f"{key}.json", (1000 + i, 1000 + i))
+        time.sleep(0.01)
+        store.get("a")  # touch: a becomes most recent
+
+        assert store.prune() == 1
+        assert store.get("b") is None
+        assert store.get("a") is not None and store.get("c") is not None
@@ -23,6 +23,8 @@ from unittest.mock import AsyncMock, MagicMock, patch, call
 
 import pytest
 
+from workflow.temporal.db_writer import flush_db_writes, get_db_write_stats
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -548,6 +550,7 @@ class TestPeriodicHeartbeat:
             pass
 
         mock_activity.heartbeat.assert_called()
+        assert "avg_flush_ms" in mock_activity.heartbeat.call_args[0][1]
 
     @patch("workflow.temporal.sse_events.activity")
     async def test_heartbeat_stops_on_activity_error(self, mock_activity):
@@ -583,7 +586,10 @@ class TestUpdateJobStatus:
 
         result = await _update_job_status("job_1", "running")
 
+        # Non-terminal: queued until the next flush
         assert result is True
+        mock_repo.update_status.assert_not_awaited()
+        assert await flush_db_writes() is True
         mock_repo.update_status.assert_awaited_once_with(
             "job_1", "running", error=None
         )
@@ -601,6 +607,7 @@ class TestUpdateJobStatus:
 
         result = await _update_job_status("job_1", "failed", error="boom")
 
+        # Terminal: written before returning
         assert result is True
         mock_repo.update_status.assert_awaited_once_with(
             "job_1", "failed", error="boom"
@@ -616,7 +623,7 @@ class TestUpdateJobStatus:
         )
         mock_ctx.return_value.__aexit__ = AsyncMock(return_value=False)
 
-        result = await _update_job_status("job_1", "running")
+        result = await _update_job_status("job_1", "cancelled")
 
         assert result is False
         # Should push db_sync_warning SSE event
@@ -653,14 +660,14 @@ class TestPersistBugSteps:
         result = await _persist_bug_steps("job_1", 0, steps)
 
         assert result is True
-        mock_repo.update_bug_steps.assert_awaited_once_with(
+        assert await flush_db_writes() is True
+        mock_repo.append_bug_steps.assert_awaited_once_with(
             job_id="job_1",
-            bug_index=0,
-            steps=steps,
+            steps={0: steps},
         )
 
     @patch("app.database.get_session_ctx")
-    async def test_db_error_returns_false(self, mock_ctx):
+    async def test_db_error_keeps_update_queued(self, mock_ctx):
         from workflow.temporal.batch_activities import _persist_bug_steps
 
         mock_ctx.return_value.__aenter__ = AsyncMock(
@@ -668,8 +675,9 @@ class TestPersistBugSteps:
         )
         mock_ctx.return_value.__aexit__ = AsyncMock(return_value=False)
 
-        result = await _persist_bug_steps("job_1", 0, [{"step": "fix"}])
-        assert result is False
+        assert await _persist_bug_steps("job_1", 0, [{"step": "fix"}]) is True
+        assert await flush_db_writes() is False
+        assert get_db_write_stats()["pending"] == 1
 
 
 # ---------------------------------------------------------------------------
@@ -698,6 +706,7 @@ class TestUpdateBugStatusDb:
         )
 
         assert result is True
+        assert await flush_db_writes() is True
         mock_repo.update_bug_status.assert_awaited_once_with(
             job_id="job_1",
             bug_index=2,
@@ -708,7 +717,7 @@ class TestUpdateBugStatusDb:
         )
 
     @patch("app.database.get_session_ctx")
-    async def test_db_error_returns_false(self, mock_ctx):
+    async def test_db_error_keeps_update_queued(self, mock_ctx):
         from workflow.temporal.batch_activities import _update_bug_status_db
 
         mock_ctx.return_value.__aenter__ = AsyncMock(
@@ -716,8 +725,9 @@ class TestUpdateBugStatusDb:
         )
         mock_ctx.return_value.__aexit__ = AsyncMock(return_value=False)
 
-        result = await _update_bug_status_db("job_1", 0, "completed")
-        assert result is False
+        assert await _update_bug_status_db("job_1", 0, "completed") is True
+        assert await flush_db_writes() is False
+        assert get_db_write_stats()["pending"] == 1
 
 
 # ---------------------------------------------------------------------------
@@ -785,13 +795,16 @@ class TestSyncIncrementalResultsWithOffset:
         assert len(bug_started_calls) == 1
         assert bug_started_calls[0][0][2]["bug_index"] == 3  # next_index(1) + offset(2)
 
+    @patch("workflow.temporal.state_sync.flush_db_writes", new_callable=AsyncMock)
     @patch("workflow.temporal.state_sync._update_bug_status_db", new_callable=AsyncMock)
     @patch("workflow.temporal.sse_events._push_event", new_callable=AsyncMock)
-    async def test_offset_db_failure_pushes_warning_with_correct_index(self, mock_push, mock_db):
+    async def test_offset_db_failure_pushes_warning_with_correct_index(
+        self, mock_push, mock_db, mock_flush,
+    ):
         """DB failure with offset should push warning with correct bug_index."""
         from workflow.temporal.batch_activities import _sync_incremental_results
 
-        mock_db.return_value = False  # DB failure
+        mock_flush.return_value = False  # DB failure
         jira_urls = ["https://jira.example.com/browse/TEST-3"]
         results = [{"status": "completed"}]
 
@@ -1063,31 +1076,34 @@ class TestSyncFinalResultsDbRetry:
 class TestSyncIncrementalDbWarning:
     """Test that _sync_incremental_results pushes SSE warning on DB failure."""
 
+    @patch("workflow.temporal.state_sync.flush_db_writes", new_callable=AsyncMock)
     @patch("workflow.temporal.state_sync._update_bug_status_db", new_callable=AsyncMock)
     @patch("workflow.temporal.sse_events._push_event", new_callable=AsyncMock)
-    async def test_db_failure_pushes_warning(self, mock_push, mock_db):
-        """When DB update fails, a db_sync_warning SSE event is pushed."""
+    async def test_db_failure_pushes_warning(self, mock_push, mock_db, mock_flush):
+        """When the phase-boundary write fails, a db_sync_warning SSE event is pushed."""
         from workflow.temporal.batch_activities import _sync_incremental_results
 
-        mock_db.return_value = False  # DB failure
+        mock_flush.return_value = False  # DB failure
         jira_urls = ["https://jira.example.com/browse/TEST-1"]
         results = [{"status": "completed"}]
 
         await _sync_incremental_results("job_1", jira_urls, results, 0)
 
+        mock_flush.assert_awaited_once_with(job_id="job_1")
         warning_calls = [
             c for c in mock_push.call_args_list if c[0][1] == "db_sync_warning"
         ]
         assert len(warning_calls) == 1
         assert warning_calls[0][0][2]["bug_index"] == 0
 
+    @patch("workflow.temporal.state_sync.flush_db_writes", new_callable=AsyncMock)
     @patch("workflow.temporal.state_sync._update_bug_status_db", new_callable=AsyncMock)
     @patch("workflow.temporal.sse_events._push_event", new_callable=AsyncMock)
-    async def test_db_success_no_warning(self, mock_push, mock_db):
-        """When DB update succeeds, no warning event is pushed."""
+    async def test_db_success_no_warning(self, mock_push, mock_db, mock_flush):
+        """When the write succeeds, no warning event is pushed."""
         from workflow.temporal.batch_activities import _sync_incremental_results
 
-        mock_db.return_value = True
+        mock_flush.return_value = True
         jira_urls = ["https://jira.example.com/browse/TEST-1"]
         results = [{"status": "completed"}]
 
@@ -1098,14 +1114,14 @@ class TestSyncIncrementalDbWarning:
         ]
         assert len(warning_calls) == 0
 
+    @patch("workflow.temporal.state_sync.flush_db_writes", new_callable=AsyncMock)
     @patch("workflow.temporal.state_sync._update_bug_status_db", new_callable=AsyncMock)
     @patch("workflow.temporal.sse_events._push_event", new_callable=AsyncMock)
-    async def test_multiple_bugs_partial_failure(self, mock_push, mock_db):
-        """2 bugs: first DB update fails, second succeeds → 1 warning."""
+    async def test_multiple_bugs_failure_warns_each(self, mock_push, mock_db, mock_flush):
+        """2 bugs synced in one call, write fails → 1 warning per bug."""
         from workflow.temporal.batch_activities import _sync_incremental_results
 
-        # First call fails, subsequent calls succeed
-        mock_db.side_effect = [False, True, True]
+        mock_flush.return_value = False
         jira_urls = [
             "https://jira.example.com/browse/TEST-1",
             "https://jira.example.com/browse/TEST-2",
@@ -1117,11 +1133,28 @@ class TestSyncIncrementalDbWarning:
 
         await _sync_incremental_results("job_1", jira_urls, results, 0)
 
+        warning_calls = [
+            c for c in mock_push.call_args_list if c[0][1] == "db_sync_warning"
+        ]
+        assert [c[0][2]["bug_index"] for c in warning_calls] == [0, 1]
+
+    @patch("workflow.temporal.state_sync.flush_db_writes", new_callable=AsyncMock)
+    @patch("workflow.temporal.state_sync._update_bug_status_db", new_callable=AsyncMock)
+    @patch("workflow.temporal.sse_events._push_event", new_callable=AsyncMock)
+    async def test_failure_without_new_results_warns_once(self, mock_push, mock_db, mock_flush):
+        """Nothing new to sync (only the next bug started) → one job-level warning."""
+        from workflow.temporal.batch_activities import _sync_incremental_results
+
+        mock_flush.return_value = False
+        jira_urls = ["https://jira.example.com/browse/TEST-1"]
+
+        await _sync_incremental_results("job_1", jira_urls, [], 0)
+
         warning_calls = [
             c for c in mock_push.call_args_list if c[0][1] == "db_sync_warning"
         ]
         assert len(warning_calls) == 1
-        assert warning_calls[0][0][2]["bug_index"] == 0
+        assert "bug_index" not in warning_calls[0][0][2]
 
 
 # ---------------------------------------------------------------------------
@@ -2166,3 +2199,173 @@ class TestPrescanIntegration:
         # Verify indices 0, 1, 2
         skip_indices = sorted(c[0][1] for c in skip_calls)
         assert skip_indices == [0, 1, 2]
+
+
+# ---------------------------------------------------------------------------
+# Parallel worktree mode (max_parallel_bugs > 1)
+# ---------------------------------------------------------------------------
+
+
+class TestExecuteWorkflowParallel:
+    """Test concurrent bug fixing across git worktrees."""
+
+    @staticmethod
+    def _patches(execute_side_effect, cherry_pick_result=(True, "1 commit(s)")):
+        mod = "workflow.temporal.batch_activities"
+        return [
+            patch(f"{mod}._git_worktree_root", new_callable=AsyncMock, return_value="/repo/.git/batch-worktrees/job_p"),
+            patch(f"{mod}._git_worktree_add", new_callable=AsyncMock, return_value=True),
+            patch(f"{mod}._git_worktree_remove", new_callable=AsyncMock, return_value=True),
+            patch(f"{mod}._git_head", new_callable=AsyncMock, return_value="base_sha"),
+            patch(f"{mod}._git_checkout_bug_branch", new_callable=AsyncMock, return_value=True),
+            patch(f"{mod}._git_cherry_pick_branch", new_callable=AsyncMock, return_value=cherry_pick_result),
+            patch(f"{mod}._git_delete_branch", new_callable=AsyncMock, return_value=True),
+            patch(f"{mod}._git_run", new_callable=AsyncMock, return_value=(0, "")),
+            patch(f"{mod}._execute_workflow", new_callable=AsyncMock, side_effect=execute_side_effect),
+            patch(f"{mod}._update_bug_status_db", new_callable=AsyncMock, return_value=True),
+            patch(f"{mod}._sync_incremental_results", new_callable=AsyncMock),
+            patch(f"{mod}._push_event", new_callable=AsyncMock),
+        ]
+
+    async def _run(self, patches, urls, config, max_parallel=2, index_map=None):
+        from contextlib import ExitStack
+        from workflow.temporal.batch_activities import _execute_workflow_parallel
+
+        with ExitStack() as stack:
+            mocks = [stack.enter_context(p) for p in patches]
+            state = await _execute_workflow_parallel(
+                "job_p", urls, "/repo", config, 0, index_map, max_parallel,
+            )
+        return state, {p.attribute: m for p, m in zip(patches, mocks, strict=True)}
+
+    async def test_runs_bugs_concurrently_in_worktrees(self):
+        urls = [f"https://jira.example.com/browse/TEST-{i}" for i in range(4)]
+        in_flight = 0
+        peak = 0
+
+        async def fake_execute(job_id, bug_urls, cwd, config, offset, index_map):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            assert cwd.startswith("/repo/.git/batch-worktrees/job_p/slot-")
+            return {"results": [{"url": bug_urls[0], "status": "completed"}]}
+
+        state, mocks = await self._run(self._patches(fake_execute), urls, {}, max_parallel=2)
+
+        assert peak == 2
+        assert [r["url"] for r in state["results"]] == urls
+        assert mocks["_git_worktree_add"].await_count == 2
+        assert mocks["_git_worktree_remove"].await_count == 2
+        assert mocks["_git_cherry_pick_branch"].await_count == 4
+
+    async def test_single_bug_run_uses_db_index_map(self):
+        urls = ["https://jira.example.com/browse/TEST-0", "https://jira.example.com/browse/TEST-2"]
+        seen = []
+
+        async def fake_execute(job_id, bug_urls, cwd, config, offset, index_map):
+            seen.append((bug_urls, offset, index_map))
+            return {"results": [{"url": bug_urls[0], "status": "completed"}]}
+
+        await self._run(self._patches(fake_execute), urls, {}, index_map=[0, 2])
+
+        assert sorted(seen) == [
+            ([urls[0]], 0, [0]),
+            ([urls[1]], 0, [2]),
+        ]
+
+    async def test_merge_conflict_marks_bug_failed(self):
+        urls = ["https://jira.example.com/browse/TEST-0"]
+
+        async def fake_execute(job_id, bug_urls, cwd, config, offset, index_map):
+            return {"results": [{"url": bug_urls[0], "status": "completed"}]}
+
+        state, mocks = await self._run(
+            self._patches(fake_execute, cherry_pick_result=(False, "CONFLICT")),
+            urls, {}, max_parallel=2,
+        )
+
+        assert state["results"][0]["status"] == "failed"
+        assert "batch/job_p/TEST-0" in state["results"][0]["error"]
+        # Conflicting branch is kept for manual resolution
+        mocks["_git_delete_branch"].assert_not_awaited()
+        failed_calls = [
+            c for c in mocks["_push_event"].call_args_list if c[0][1] == "bug_failed"
+        ]
+        assert len(failed_calls) == 1
+
+    async def test_failed_bug_is_not_merged(self):
+        urls = ["https://jira.example.com/browse/TEST-0"]
+
+        async def fake_execute(job_id, bug_urls, cwd, config, offset, index_map):
+            return {"results": [{"url": bug_urls[0], "status": "failed"}]}
+
+        state, mocks = await self._run(self._patches(fake_execute), urls, {})
+
+        assert state["results"][0]["status"] == "failed"
+        mocks["_git_cherry_pick_branch"].assert_not_awaited()
+        mocks["_git_delete_branch"].assert_awaited_once()
+
+    async def test_stop_policy_stops_scheduling(self):
+        urls = [f"https://jira.example.com/browse/TEST-{i}" for i in range(5)]
+
+        async def fake_execute(job_id, bug_urls, cwd, config, offset, index_map):
+            status = "failed" if bug_urls[0].endswith("TEST-0") else "completed"
+            await asyncio.sleep(0.01 if status == "failed" else 0.02)
+            return {"results": [{"url": bug_urls[0], "status": status}]}
+
+        state, mocks = await self._run(
+            self._patches(fake_execute), urls, {"failure_policy": "stop"},
+        )
+
+        # Slot 0 fails TEST-0; slot 1 finishes TEST-1; nothing else starts
+        assert len(state["results"]) == 2
+        assert mocks["_execute_workflow"].await_count == 2
+
+    async def test_no_worktree_created_raises(self):
+        urls = ["https://jira.example.com/browse/TEST-0"]
+        patches = self._patches(AsyncMock())
+        patches[1] = patch(
+            "workflow.temporal.batch_activities._git_worktree_add",
+            new_callable=AsyncMock, return_value=False,
+        )
+
+        with pytest.raises(RuntimeError):
+            await self._run(patches, urls, {})
+
+    @patch("workflow.temporal.batch_activities._push_event", new_callable=AsyncMock)
+    @patch("workflow.temporal.batch_activities._update_bug_status_db", new_callable=AsyncMock)
+    @patch("workflow.temporal.batch_activities._update_job_status", new_callable=AsyncMock)
+    @patch("workflow.temporal.batch_activities._preflight_check", new_callable=AsyncMock)
+    @patch("workflow.temporal.batch_activities._prescan_closed_bugs", new_callable=AsyncMock)
+    @patch("workflow.temporal.batch_activities._git_is_repo", new_callable=AsyncMock)
+    @patch("workflow.temporal.batch_activities._execute_workflow_parallel", new_callable=AsyncMock)
+    @patch("workflow.temporal.batch_activities._sync_final_results", new_callable=AsyncMock)
+    @patch("workflow.temporal.batch_activities.activity")
+    async def test_activity_dispatches_parallel_mode(
+        self, mock_activity, mock_final_sync, mock_parallel, mock_is_repo,
+        mock_prescan, mock_preflight, mock_update_job, mock_update_bug, mock_push,
+    ):
+        from workflow.temporal.batch_activities import execute_batch_bugfix_activity
+
+        mock_preflight.return_value = (True, [])
+        mock_prescan.return_value = set()
+        mock_is_repo.return_value = True
+        mock_activity.info.return_value.attempt = 1
+        mock_parallel.return_value = {"results": []}
+
+        params = {
+            "job_id": "job_par",
+            "jira_urls": [f"https://jira.example.com/browse/TEST-{i}" for i in range(3)],
+            "cwd": "/repo",
+            "config": {"max_parallel_bugs": 8},
+        }
+        result = await execute_batch_bugfix_activity(params)
+
+        assert result["success"] is True
+        # Clamped to the number of bugs
+        assert mock_parallel.call_args[0][6] == 3
+        # Slots mark their own bugs in_progress
+        started = [c for c in mock_push.call_args_list if c[0][1] == "bug_started"]
+        assert started == []
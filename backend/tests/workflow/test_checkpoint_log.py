@@ -0,0 +1,94 @@
+"""Tests for the per-job spec checkpoint log (workflow/spec/checkpoint_log.py)."""
+
+import json
+import os
+import threading
+
+from workflow.spec.checkpoint_log import CheckpointLog
+
+
+class TestCheckpointLog:
+
+    def test_round_trip_last_record_wins(self, tmp_path):
+        with CheckpointLog(str(tmp_path)) as log:
+            log.append("1:1", {"id": "1:1", "role": "other"})
+            log.append("1:2", {"id": "1:2", "role": "text", "description": "标题"})
+            log.append("1:1", {"id": "1:1", "role": "navigation"})
+
+        loaded = CheckpointLog(str(tmp_path)).load()
+        assert loaded == {
+            "1:1": {"id": "1:1", "role": "navigation"},
+            "1:2": {"id": "1:2", "role": "text", "description": "标题"},
+        }
+
+    def test_missing_log_is_empty(self, tmp_path):
+        assert CheckpointLog(str(tmp_path / "nope")).load() == {}
+
+    def test_records_visible_before_close(self, tmp_path):
+        """Appends are flushed immediately, so a crash keeps finished components."""
+        log = CheckpointLog(str(tmp_path), fsync_every=100, fsync_interval=3600)
+        log.append("1:1", {"id": "1:1", "role": "navigation"})
+        assert CheckpointLog(str(tmp_path)).load() == {"1:1": {"id": "1:1", "role": "navigation"}}
+        log.close()
+
+    def test_batched_fsync_runs_off_the_calling_thread(self, tmp_path, monkeypatch):
+        threads = []
+        monkeypatch.setattr(os, "fsync", lambda fd: threads.append(threading.current_thread()))
+        log = CheckpointLog(str(tmp_path), fsync_every=1, fsync_interval=3600)
+        log.append("1:1", {"id": "1:1", "role": "navigation"})
+        log.close()
+        assert threads and threading.current_thread() not in threads
+
+    def test_torn_tail_is_dropped_and_repaired(self, tmp_path):
+        log = CheckpointLog(str(tmp_path))
+        with log:
+            log.append("1:1", {"id": "1:1", "role": "navigation"})
+            log.append("1:2", {"id": "1:2", "role": "section"})
+        with open(log.path, "rb") as f:
+            raw = f.read()
+        with open(log.path, "wb") as f:
+            f.write(raw[:-10])  # crash mid-write of the second record
+
+        assert list(CheckpointLog(str(tmp_path)).load()) == ["1:1"]
+        with CheckpointLog(str(tmp_path)) as log:
+            log.append("1:3", {"id": "1:3", "role": "footer"})
+        assert list(CheckpointLog(str(tmp_path)).load()) == ["1:1", "1:3"]
+
+    def test_corrupt_record_fails_crc(self, tmp_path):
+        log = CheckpointLog(str(tmp_path))
+        with log:
+            log.append("1:1", {"id": "1:1", "role": "navigation"})
+            log.append("1:2", {"id": "1:2", "role": "section"})
+        with open(log.path, "rb") as f:
+            raw = f.read()
+        with open(log.path, "wb") as f:
+            f.write(raw.replace(b"section", b"sectioX"))
+
+        assert list(CheckpointLog(str(tmp_path)).load()) == ["1:1"]
+
+    def test_compacts_superseded_records(self, tmp_path):
+        log = CheckpointLog(str(tmp_path))
+        with log:
+            for i in range(20):
+                log.append("1:1", {"id": "1:1", "version": i})
+        size_before = os.path.getsize(log.path)
+
+        assert CheckpointLog(str(tmp_path)).load() == {"1:1": {"id": "1:1", "version": 19}}
+        assert os.path.getsize(log.path) < size_before / 10
+
+    def test_imports_legacy_checkpoint_dir(self, tmp_path):
+        legacy = tmp_path / ".spec_checkpoints"
+        legacy.mkdir()
+        (legacy / "1_1.json").write_text(json.dumps({"id": "1:1", "role": "navigation"}))
+        (legacy / "bad.json").write_text("{invalid json")
+        (legacy / "readme.txt").write_text("not json")
+
+        loaded = CheckpointLog(str(tmp_path)).load()
+        assert loaded == {"1:1": {"id": "1:1", "role": "navigation"}}
+        assert not legacy.exists()
+        assert CheckpointLog(str(tmp_path)).load() == loaded
+
+    def test_append_failure_is_logged_not_raised(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        CheckpointLog(str(blocker)).append("1:1", {"id": "1:1"})  # output_dir is a file
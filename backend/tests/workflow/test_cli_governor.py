@@ -0,0 +1,233 @@
+"""Unit tests for the process-wide Claude CLI governor (workflow/claude_cli_wrapper.py).
+
+Tests cover:
+- Global concurrency cap
+- Priority classes across pipelines
+- Round-robin fairness between jobs of the same class
+- Cancellation while queued
+- AIMD adaptive concurrency (increase on success, cut on rate limit)
+- queue_wait_ms reported by invoke_oneshot / invoke_stream
+- stream_claude_agent releasing its slot when closed early
+
+No real CLI is spawned (asyncio.create_subprocess_exec is mocked).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from workflow import claude_cli_wrapper
+from workflow.agents.claude import stream_claude_agent
+from workflow.claude_cli_wrapper import CLIGovernor, ClaudeEvent, invoke_oneshot, invoke_stream
+
+
+async def _hold(governor: CLIGovernor, pipeline: str, job_id: str, order: list, gate: asyncio.Event):
+    async with governor.slot(pipeline, job_id):
+        order.append((pipeline, job_id))
+        await gate.wait()
+
+
+# ---------------------------------------------------------------------------
+# Scheduling
+# ---------------------------------------------------------------------------
+
+
+class TestCLIGovernor:
+
+    @pytest.mark.asyncio
+    async def test_cap_is_enforced(self):
+        governor = CLIGovernor(max_concurrency=2, initial_concurrency=2)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with governor.slot("batch", "job"):
+                peak = max(peak, governor.active)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*[call() for _ in range(6)])
+        assert peak == 2
+        assert governor.stats()["total_acquired"] == 6
+        assert governor.active == 0 and governor.queued() == 0
+
+    @pytest.mark.asyncio
+    async def test_priority_then_round_robin(self):
+        governor = CLIGovernor(max_concurrency=1)
+        order: list = []
+        gate = asyncio.Event()
+        first = asyncio.create_task(_hold(governor, "batch", "warmup", order, gate))
+        await asyncio.sleep(0)
+
+        # Queue: job A x3 and job B x1 (batch), then one spec call
+        tasks = [
+            asyncio.create_task(_hold(governor, "batch", job, order, gate))
+            for job in ("A", "A", "A", "B")
+        ]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(_hold(governor, "spec", "S", order, gate)))
+        await asyncio.sleep(0)
+        assert governor.queued() == 5
+
+        gate.set()
+        await asyncio.gather(first, *tasks)
+        assert order == [
+            ("batch", "warmup"),
+            ("spec", "S"),      # higher priority class jumps the batch queue
+            ("batch", "A"),
+            ("batch", "B"),     # B is not stuck behind all of A's calls
+            ("batch", "A"),
+            ("batch", "A"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        governor = CLIGovernor(max_concurrency=1)
+        order: list = []
+        gate = asyncio.Event()
+        holder = asyncio.create_task(_hold(governor, "batch", "A", order, gate))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(governor.acquire("batch", "B"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert governor.queued() == 0
+
+        gate.set()
+        await holder
+        assert governor.active == 0
+        assert await governor.acquire("batch", "C") == 0
+
+
+# ---------------------------------------------------------------------------
+# Queue-wait reporting
+# ---------------------------------------------------------------------------
+
+
+def _fake_proc(stdout: bytes = b"", lines: list[bytes] | None = None) -> MagicMock:
+    proc = MagicMock()
+    proc.returncode = 0
+    proc.communicate = AsyncMock(return_value=(stdout, b""))
+    proc.wait = AsyncMock(return_value=0)
+    proc.stdout.readline = AsyncMock(side_effect=(lines or []) + [b""])
+    return proc
+
+
+class TestQueueWaitReporting:
+
+    @pytest.mark.asyncio
+    async def test_oneshot_returns_queue_wait(self):
+        envelope = json.dumps({"result": "ok", "usage": {"input_tokens": 1, "output_tokens": 2}})
+        governor = CLIGovernor(max_concurrency=1)
+        with patch.object(claude_cli_wrapper, "_governor", governor), \
+             patch("asyncio.create_subprocess_exec", AsyncMock(return_value=_fake_proc(envelope.encode()))):
+            await governor.acquire("batch", "other")
+            call = asyncio.create_task(invoke_oneshot(prompt="hi", pipeline="spec", job_id="run-1", cache=False))
+            await asyncio.sleep(0.02)
+            governor.release()
+            result = await call
+
+        assert result["text"] == "ok"
+        assert result["queue_wait_ms"] >= 10
+        assert governor.active == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_result_event_carries_queue_wait(self):
+        lines = [json.dumps({"type": "result", "result": "done", "usage": {}}).encode() + b"\n"]
+        events: list[ClaudeEvent] = []
+        governor = CLIGovernor(max_concurrency=1)
+        with patch.object(claude_cli_wrapper, "_governor", governor), \
+             patch("asyncio.create_subprocess_exec", AsyncMock(return_value=_fake_proc(lines=lines))):
+            text = await invoke_stream("hi", on_event=events.append, pipeline="batch", job_id="job-1")
+
+        assert text == "done"
+        assert events[-1].type == ClaudeEvent.RESULT
+        assert events[-1].to_dict()["queue_wait_ms"] == 0
+        assert governor.stats()["total_acquired"] == 1
+
+
+class TestStreamClaudeAgent:
+
+    @pytest.mark.asyncio
+    async def test_early_close_kills_cli_and_releases_slot(self):
+        proc = _fake_proc(lines=[b"one\n", b"two\n"])
+        proc.returncode = None
+        proc.kill = MagicMock(side_effect=lambda: setattr(proc, "returncode", -9))
+        governor = CLIGovernor(max_concurrency=1)
+        with patch.object(claude_cli_wrapper, "_governor", governor), \
+             patch("asyncio.create_subprocess_exec", AsyncMock(return_value=proc)):
+            async with contextlib.aclosing(stream_claude_agent("hi")) as lines:
+                async for line in lines:
+                    assert line == "one"
+                    break
+
+        proc.kill.assert_called_once()
+        proc.wait.assert_awaited()
+        assert governor.active == 0
+
+
+# ---------------------------------------------------------------------------
+# Adaptive concurrency
+# ---------------------------------------------------------------------------
+
+
+class TestAdaptiveConcurrency:
+
+    def test_additive_increase_capped_at_max(self):
+        governor = CLIGovernor(max_concurrency=4, initial_concurrency=1)
+        governor.record_success()
+        assert governor.limit == 2
+        for _ in range(3):
+            governor.record_success()
+        assert governor.limit == 3
+        for _ in range(20):
+            governor.record_success()
+        assert governor.limit == 4
+
+    def test_multiplicative_decrease_with_cooldown(self):
+        governor = CLIGovernor(
+            max_concurrency=8, min_concurrency=1, initial_concurrency=8,
+            throttle_cooldown=60.0,
+        )
+        governor.record_rate_limit()
+        governor.record_rate_limit()  # same burst: ignored
+        assert governor.limit == 4
+        assert governor.throttle_events == 1
+
+        governor.throttle_cooldown = 0.0
+        for _ in range(5):
+            governor.record_rate_limit()
+        assert governor.limit == 1  # floor
+        assert governor.stats()["throttle_events"] == 6
+
+    @pytest.mark.asyncio
+    async def test_increase_wakes_waiters(self):
+        governor = CLIGovernor(max_concurrency=4, initial_concurrency=1)
+        await governor.acquire("spec", "job")
+        waiter = asyncio.create_task(governor.acquire("spec", "job"))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        governor.record_success()
+        await asyncio.wait_for(waiter, 1)
+        assert governor.active == 2
+
+    @pytest.mark.asyncio
+    async def test_oneshot_rate_limit_cuts_concurrency(self):
+        proc = _fake_proc()
+        proc.returncode = 1
+        proc.communicate = AsyncMock(return_value=(b"", b"429 Too Many Requests"))
+        governor = CLIGovernor(max_concurrency=4, initial_concurrency=4)
+        with patch.object(claude_cli_wrapper, "_governor", governor), \
+             patch("asyncio.create_subprocess_exec", AsyncMock(return_value=proc)):
+            with pytest.raises(RuntimeError):
+                await invoke_oneshot(prompt="hi", max_retries=0, cache=False)
+
+        assert governor.limit == 2
+        assert governor.throttle_events == 1
+        assert governor.active == 0
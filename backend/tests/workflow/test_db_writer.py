@@ -0,0 +1,265 @@
+"""Unit tests for the worker-side DB write-behind queue (workflow/temporal/db_writer.py).
+
+Tests cover:
+- Coalescing updates per (job, bug) row and appending steps
+- Size- and time-triggered background flushes
+- Retry, then requeue under newer updates when the DB is failing
+- Per-job isolation: a job that keeps failing neither blocks other jobs
+  nor retries forever
+- Explicit flushes waiting for a background flush in flight
+- Terminal job statuses written before the helper returns
+
+Writes are recorded by patching _write_batch; TestWriteBatch applies a
+batch to the in-memory SQLite session.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from workflow.temporal.db_writer import DBWriteQueue
+
+
+class _Recorder:
+    """Stand-in for _write_batch that records each batch."""
+
+    def __init__(self, failures: int = 0, delay: float = 0.0):
+        self.batches: list[dict] = []
+        self.failures = failures
+        self.delay = delay
+
+    async def __call__(self, batch: dict) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database is locked")
+        self.batches.append({key: value for key, value in batch.items()})
+
+
+@pytest.fixture
+def recorder():
+    rec = _Recorder()
+    with patch("workflow.temporal.db_writer._write_batch", rec):
+        yield rec
+
+
+class TestDBWriteQueueCoalescing:
+    async def test_updates_merge_per_row(self, recorder):
+        queue = DBWriteQueue(flush_interval=10.0)
+        queue.update_bug("job_1", 0, "in_progress", started_at="t0")
+        queue.update_bug("job_1", 0, "completed", completed_at="t1")
+        queue.update_bug("job_1", 1, "in_progress")
+        queue.update_batch_job("job_1", "running")
+        queue.append_steps("job_1", 0, [{"step": "fix"}])
+        queue.append_steps("job_1", 0, [{"step": "verify"}])
+
+        assert queue.stats["pending"] == 4
+        assert recorder.batches == []
+        assert await queue.flush() is True
+
+        assert len(recorder.batches) == 1
+        batch = recorder.batches[0]
+        assert batch[("bug", "job_1", 0)] == {
+            "status": "completed", "error": None,
+            "started_at": "t0", "completed_at": "t1",
+        }
+        assert batch[("bug", "job_1", 1)]["status"] == "in_progress"
+        assert batch[("steps", "job_1", 0)] == [{"step": "fix"}, {"step": "verify"}]
+
+        stats = queue.stats
+        assert stats["queued"] == 6 and stats["coalesced"] == 2
+        assert stats["flushed"] == 4 and stats["flushes"] == 1
+        assert stats["pending"] == 0
+        queue.stop()
+
+    async def test_design_fields_set_as_given(self, recorder):
+        queue = DBWriteQueue(flush_interval=10.0)
+        queue.update_design_job("job_d", status="running")
+        queue.update_design_job("job_d", components_total=5, error=None)
+
+        await queue.flush()
+        assert recorder.batches[0][("design_job", "job_d", -1)] == {
+            "status": "running", "components_total": 5, "error": None,
+        }
+        queue.stop()
+
+
+class TestDBWriteQueueTriggers:
+    async def test_size_triggered_flush(self, recorder):
+        queue = DBWriteQueue(flush_interval=10.0, max_pending=2)
+        queue.update_bug("job_1", 0, "in_progress")
+        await asyncio.sleep(0.02)
+        assert recorder.batches == []
+
+        queue.update_bug("job_1", 1, "in_progress")
+        await asyncio.sleep(0.02)
+        assert len(recorder.batches) == 1
+        queue.stop()
+
+    async def test_time_triggered_flush(self, recorder):
+        queue = DBWriteQueue(flush_interval=0.01)
+        queue.update_batch_job("job_1", "running")
+        await asyncio.sleep(0.05)
+        assert len(recorder.batches) == 1
+        assert queue.stats["pending"] == 0
+        queue.stop()
+
+    async def test_flush_waits_for_inflight_batch(self):
+        rec = _Recorder(delay=0.05)
+        with patch("workflow.temporal.db_writer._write_batch", rec):
+            queue = DBWriteQueue(flush_interval=0.001)
+            queue.update_batch_job("job_1", "running")
+            await asyncio.sleep(0.01)  # background flush now in flight
+            assert queue.stats["pending"] == 0 and rec.batches == []
+
+            assert await queue.flush() is True
+            assert len(rec.batches) == 1
+            queue.stop()
+
+
+class TestDBWriteQueueFailures:
+    async def test_retries_then_succeeds(self):
+        rec = _Recorder(failures=2)
+        with patch("workflow.temporal.db_writer._write_batch", rec):
+            queue = DBWriteQueue(flush_interval=10.0, max_retries=2, retry_delay=0)
+            queue.update_batch_job("job_1", "running")
+            assert await queue.flush() is True
+
+        assert len(rec.batches) == 1
+        assert queue.stats["failed_flushes"] == 2
+        queue.stop()
+
+    async def test_failed_batch_requeued_under_newer_updates(self):
+        rec = _Recorder(failures=1)
+        with patch("workflow.temporal.db_writer._write_batch", rec):
+            queue = DBWriteQueue(flush_interval=10.0, max_retries=0)
+            queue.update_bug("job_1", 0, "in_progress", started_at="t0")
+            queue.append_steps("job_1", 0, [{"step": "fix"}])
+            assert await queue.flush() is False
+            assert queue.stats["pending"] == 2
+
+            queue.update_bug("job_1", 0, "completed")
+            queue.append_steps("job_1", 0, [{"step": "verify"}])
+            assert await queue.flush() is True
+
+        batch = rec.batches[0]
+        assert batch[("bug", "job_1", 0)]["status"] == "completed"
+        assert batch[("bug", "job_1", 0)]["started_at"] == "t0"
+        assert batch[("steps", "job_1", 0)] == [{"step": "fix"}, {"step": "verify"}]
+        queue.stop()
+
+
+class _PoisonedJob(_Recorder):
+    """Fails every write of one job (e.g. steps of a deleted batch job)."""
+
+    def __init__(self, job_id: str):
+        super().__init__()
+        self.job_id = job_id
+
+    async def __call__(self, batch: dict) -> None:
+        if any(key[1] == self.job_id for key in batch):
+            raise RuntimeError("FOREIGN KEY constraint failed")
+        await super().__call__(batch)
+
+
+class TestDBWriteQueueIsolation:
+    async def test_failing_job_does_not_block_others(self):
+        rec = _PoisonedJob("job_gone")
+        with patch("workflow.temporal.db_writer._write_batch", rec):
+            queue = DBWriteQueue(flush_interval=10.0, max_retries=1, retry_delay=0)
+            queue.append_steps("job_gone", 0, [{"step": "fix"}])
+            queue.update_design_job("job_d", status="running")
+            assert await queue.flush() is False
+
+            queue.update_design_job("job_d", status="completed")
+            assert await queue.flush(job_id="job_d") is True
+
+        assert [list(batch) for batch in rec.batches] == [
+            [("design_job", "job_d", -1)], [("design_job", "job_d", -1)],
+        ]
+        assert rec.batches[1][("design_job", "job_d", -1)] == {"status": "completed"}
+        assert queue.stats["pending"] == 1  # job_gone's steps, retried next flush
+        queue.stop()
+
+    async def test_permanently_failing_job_dropped(self):
+        rec = _PoisonedJob("job_gone")
+        with patch("workflow.temporal.db_writer._write_batch", rec):
+            queue = DBWriteQueue(flush_interval=10.0, max_retries=0, max_failed_flushes=2)
+            queue.append_steps("job_gone", 0, [{"step": "fix"}])
+            queue.update_batch_job("job_ok", "running")
+            assert await queue.flush() is False
+            assert queue.stats["pending"] == 1
+
+            queue.update_batch_job("job_ok", "completed")
+            assert await queue.flush() is False
+
+            stats = queue.stats
+            assert stats["pending"] == 0 and stats["dropped"] == 1
+            assert await queue.flush() is True
+        assert len(rec.batches) == 2
+        queue.stop()
+
+    async def test_nothing_dropped_while_database_is_down(self):
+        rec = _Recorder(failures=100)
+        with patch("workflow.temporal.db_writer._write_batch", rec):
+            queue = DBWriteQueue(flush_interval=10.0, max_retries=0, max_failed_flushes=1)
+            queue.update_batch_job("job_1", "running")
+            queue.update_design_job("job_d", status="running")
+            for _ in range(3):
+                assert await queue.flush() is False
+
+        assert queue.stats["pending"] == 2 and queue.stats["dropped"] == 0
+        queue.stop()
+
+
+class TestTerminalStatusFlush:
+    async def test_terminal_job_status_written_before_return(self, recorder):
+        from workflow.temporal.state_sync import _update_bug_status_db, _update_job_status
+
+        await _update_bug_status_db("job_1", 0, "completed")
+        await _update_job_status("job_1", "running")
+        assert recorder.batches == []
+
+        with patch("workflow.temporal.sse_events._push_event", new_callable=AsyncMock) as mock_push:
+            assert await _update_job_status("job_1", "failed", error="boom") is True
+        mock_push.assert_not_awaited()
+
+        assert len(recorder.batches) == 1
+        batch = recorder.batches[0]
+        assert batch[("bug", "job_1", 0)]["status"] == "completed"
+        assert batch[("batch_job", "job_1", -1)] == {"status": "failed", "error": "boom"}
+
+
+class TestWriteBatch:
+    async def test_applies_batch_through_repositories(self, test_session):
+        from contextlib import asynccontextmanager
+
+        from app.repositories.batch_job import BatchJobRepository, bug_step_history
+
+        repo = BatchJobRepository(test_session)
+        await repo.create(
+            job_id="job_wb", target_group_id="g",
+            jira_urls=["https://jira.example.com/browse/TEST-1"],
+        )
+
+        @asynccontextmanager
+        async def _session_ctx():
+            yield test_session
+
+        queue = DBWriteQueue(flush_interval=10.0)
+        queue.update_bug("job_wb", 0, "in_progress")
+        queue.append_steps("job_wb", 0, [{"step": "fix_bug_peer", "label": "修复 Bug"}])
+        queue.update_bug("job_wb", 0, "completed")
+        queue.update_batch_job("job_wb", "completed")
+        with patch("app.database.get_session_ctx", _session_ctx):
+            assert await queue.flush() is True
+        queue.stop()
+
+        job = await repo.get("job_wb")
+        assert job.status == "completed"
+        assert job.bugs[0].status == "completed"
+        assert [s["label"] for s in bug_step_history(job.bugs[0])] == ["修复 Bug"]
@@ -212,6 +212,31 @@ class TestSpatialNeighbors:
         assert "C" not in result[0]["neighbors"]
         assert "A" in result[1]["neighbors"]
 
+    def test_matches_pairwise_adjacency(self):
+        import random
+
+        rng = random.Random(7)
+        node = _make_node(DesignAnalyzerNode)
+        components = [
+            {
+                "name": f"C{i}",
+                "bounds": {
+                    "x": rng.uniform(0, 1500), "y": rng.uniform(0, 1500),
+                    "width": rng.uniform(10, 150), "height": rng.uniform(10, 150),
+                },
+            }
+            for i in range(200)
+        ]
+        components.append({"name": "NoBounds", "bounds": {}})
+        result = node._compute_spatial_neighbors(components)
+        for a in result:
+            expected = [
+                b["name"] for b in result
+                if b is not a and node._are_spatially_adjacent(a["bounds"], b["bounds"])
+            ]
+            assert a["neighbors"] == expected
+        assert result[-1]["neighbors"] == []
+
     def test_are_spatially_adjacent(self):
         node = _make_node(DesignAnalyzerNode)
         a = {"x": 0, "y": 0, "width": 100, "height": 50}
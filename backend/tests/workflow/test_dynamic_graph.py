@@ -6,6 +6,7 @@ Tests cover:
 - Dangling node detection
 - Topological sorting
 - Graph building from Fixture v1.0 scenarios
+- Pre-compiled condition expressions
 """
 
 import pytest
@@ -24,6 +25,7 @@ from workflow.engine.graph_builder import (
     topological_sort,
     validate_workflow,
 )
+from workflow.engine.safe_eval import SafeEvalError, compile_expression, safe_eval
 
 # Import node types to ensure registration
 from workflow.nodes.base import (
@@ -31,6 +33,7 @@ from workflow.nodes.base import (
     DataSourceNode,
     HttpRequestNode,
 )
+from workflow.nodes.state import UpdateStateNode
 
 
 class TestNodeConfig:
@@ -673,5 +676,103 @@ class TestLoopDetection:
         assert error is None
 
 
+class TestCompiledExpressions:
+    """Test compile-once condition expressions."""
+
+    def test_compile_is_cached(self):
+        compiled = compile_expression("retry_count < config['max_retries']")
+        assert compile_expression("retry_count < config['max_retries']") is compiled
+        assert compiled({"retry_count": 1, "config": {"max_retries": 3}}) is True
+        assert compiled({"retry_count": 3, "config": {"max_retries": 3}}) is False
+
+    @pytest.mark.parametrize(
+        "expr,expected",
+        [
+            ("1 < x <= 3", True),
+            ("x > 0 and not done", True),
+            ("result.status == 'ok' or false", True),
+            ("items[1] * 2 + 1", 5),
+            ("x in [1, 2] if done == False else None", True),
+            ("{'a': x}['a'] - 1", 1),
+        ],
+    )
+    def test_semantics(self, expr, expected):
+        context = {"x": 2, "done": False, "result": {"status": "ok"}, "items": [1, 2]}
+        assert safe_eval(expr, context) == expected
+
+    @pytest.mark.parametrize(
+        "expr", ["", "x +", "missing > 1", "items[5]", "result.nope", "len(items)"]
+    )
+    def test_errors(self, expr):
+        with pytest.raises(SafeEvalError):
+            safe_eval(expr, {"items": [], "result": {}})
+
+    @pytest.mark.asyncio
+    async def test_router_uses_compiled_conditions(self):
+        """Failing conditions are skipped at route time; good ones still route."""
+        if not LANGGRAPH_AVAILABLE:
+            pytest.skip("langgraph not installed")
+        workflow = WorkflowDefinition(
+            name="routing",
+            nodes=[
+                NodeConfig(id="src", type="data_source", config={"name": "S"}),
+                NodeConfig(id="a", type="data_source", config={"name": "A"}),
+                NodeConfig(id="b", type="data_source", config={"name": "B"}),
+            ],
+            edges=[
+                EdgeDefinition(id="e1", source="src", target="a", condition="missing_var > 1"),
+                EdgeDefinition(id="e2", source="src", target="b", condition="flag == 1 and result != None"),
+            ],
+        )
+        graph = build_graph_from_config(workflow)
+        visited = []
+        async for event in graph.astream({"flag": 1}):
+            visited.extend(event)
+        assert visited == ["src", "b"]
+
+    def test_router_does_not_reraise_uncompilable_condition(self, monkeypatch):
+        """A condition that failed to compile is logged and skipped, never raised."""
+        from workflow.engine import graph_builder
+
+        condition = SafeEvalError("bad condition")
+
+        def fake_compile(expr):
+            if expr == "x +":
+                raise condition
+            return compile_expression(expr)
+
+        monkeypatch.setattr(graph_builder, "compile_expression", fake_compile)
+
+        class _Graph:
+            def add_conditional_edges(self, source, router, path_map):
+                self.router = router
+
+        edges = [
+            EdgeDefinition(id="e1", source="src", target="a", condition="x +"),
+            EdgeDefinition(id="e2", source="src", target="b", condition="x > 1"),
+        ]
+        workflow = WorkflowDefinition(
+            name="bad-edge",
+            nodes=[NodeConfig(id=n, type="data_source", config={"name": n}) for n in ("src", "a", "b")],
+            edges=edges,
+        )
+        graph = _Graph()
+        graph_builder._add_conditional_edges(graph, "src", edges, [], {}, workflow)
+        condition.__traceback__ = None
+
+        for _ in range(1000):
+            assert graph.router({"x": 2}) == "b"
+        assert condition.__traceback__ is None
+
+    def test_update_state_expressions(self):
+        node = UpdateStateNode("u", "update_state", {"updates": []})
+        context = {"current_index": 4, "config": {"max_retries": 2}}
+        assert node._evaluate_expression("current_index + 1", context) == 5
+        assert node._evaluate_expression("config.max_retries - 1", context) == 1
+        assert node._evaluate_expression("unknown_field + 1", context) == 1
+        with pytest.raises(ValueError):
+            node._evaluate_expression("current_index +", context)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
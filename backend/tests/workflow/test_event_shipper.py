@@ -0,0 +1,216 @@
+"""Unit tests for the worker-side SSE EventShipper (workflow/sse.py).
+
+Tests cover:
+- Size- and time-triggered batch flushes to /api/internal/events:batch
+- Urgent (stream-closing) events flushing immediately
+- Ordering across batches
+- Retry + drop accounting when the API server is failing
+- Queue-full drops
+- Fallback to per-event POST when the batch endpoint is missing
+- Payloads snapshotted at enqueue time
+
+HTTP is served by httpx.MockTransport (no real server).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from workflow.sse import EventShipper
+
+
+def _mock_client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class _Recorder:
+    """MockTransport handler that records request paths and bodies."""
+
+    def __init__(self, status: int = 200, batch_status: int | None = None):
+        self.requests: list[tuple[str, dict]] = []
+        self.status = status
+        self.batch_status = batch_status
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.requests.append((request.url.path, body))
+        if request.url.path.endswith(":batch") and self.batch_status is not None:
+            return httpx.Response(self.batch_status)
+        return httpx.Response(self.status, json={"status": "ok"})
+
+    @property
+    def shipped(self) -> list[str]:
+        events = []
+        for path, body in self.requests:
+            if path.endswith(":batch"):
+                events.extend(e["event_type"] for e in body["events"])
+            else:
+                events.append(body["event_type"])
+        return events
+
+
+@pytest.fixture
+def recorder():
+    rec = _Recorder()
+    client = _mock_client(rec)
+
+    async def _get():
+        return client
+
+    with patch("workflow.sse._get_http_client", _get):
+        yield rec
+
+
+class TestEventShipperBatching:
+
+    async def test_enqueue_returns_immediately_and_flush_ships(self, recorder):
+        shipper = EventShipper(max_batch=50, flush_interval=10.0)
+
+        for i in range(3):
+            assert shipper.enqueue("job_1", f"evt_{i}", {"i": i}) is True
+        assert recorder.requests == []  # nothing sent synchronously
+
+        assert await shipper.flush(timeout=1.0) is True
+        assert len(recorder.requests) == 1
+        path, body = recorder.requests[0]
+        assert path == "/api/internal/events:batch"
+        assert [e["event_type"] for e in body["events"]] == ["evt_0", "evt_1", "evt_2"]
+        assert body["events"][0]["run_id"] == "job_1"
+
+    async def test_time_triggered_flush(self, recorder):
+        shipper = EventShipper(max_batch=50, flush_interval=0.01)
+        shipper.enqueue("job_1", "bug_started", {})
+
+        await asyncio.sleep(0.1)
+        assert recorder.shipped == ["bug_started"]
+
+    async def test_size_triggered_batches_preserve_order(self, recorder):
+        shipper = EventShipper(max_batch=4, flush_interval=10.0)
+        for i in range(10):
+            shipper.enqueue("job_1" if i % 2 else "job_2", f"evt_{i}", {})
+
+        await shipper.flush(timeout=1.0)
+        assert recorder.shipped == [f"evt_{i}" for i in range(10)]
+        assert all(len(body["events"]) <= 4 for _, body in recorder.requests)
+        stats = shipper.stats
+        assert stats["queued"] == 10
+        assert stats["flushed"] == 10
+        assert stats["pending"] == 0
+
+    async def test_urgent_event_flushes_without_timer(self, recorder):
+        shipper = EventShipper(max_batch=50, flush_interval=10.0)
+        shipper.enqueue("job_1", "bug_completed", {})
+        shipper.enqueue("job_1", "job_done", {"status": "completed"})
+
+        await asyncio.sleep(0.05)
+        assert recorder.shipped == ["bug_completed", "job_done"]
+
+
+class TestEventShipperFailures:
+
+    async def test_failed_batch_is_retried_then_dropped(self):
+        rec = _Recorder(status=503)
+        client = _mock_client(rec)
+
+        async def _get():
+            return client
+
+        shipper = EventShipper(max_batch=10, flush_interval=10.0, max_retries=1)
+        with patch("workflow.sse._get_http_client", _get):
+            shipper.enqueue("job_1", "a", {})
+            shipper.enqueue("job_1", "b", {})
+            assert await shipper.flush(timeout=2.0) is True
+
+        assert len(rec.requests) == 2  # initial + 1 retry
+        assert shipper.stats["dropped"] == 2
+        assert shipper.stats["failed_batches"] == 2
+        assert shipper.stats["flushed"] == 0
+
+    async def test_queue_full_drops_new_events(self, recorder):
+        shipper = EventShipper(max_batch=50, flush_interval=10.0, max_queue=2)
+        assert shipper.enqueue("job_1", "a", {}) is True
+        assert shipper.enqueue("job_1", "b", {}) is True
+        assert shipper.enqueue("job_1", "c", {}) is False
+
+        await shipper.flush(timeout=1.0)
+        assert recorder.shipped == ["a", "b"]
+        assert shipper.stats["dropped"] == 1
+
+    async def test_falls_back_to_per_event_post_on_404(self):
+        rec = _Recorder(batch_status=404)
+        client = _mock_client(rec)
+
+        async def _get():
+            return client
+
+        shipper = EventShipper(max_batch=10, flush_interval=10.0)
+        with patch("workflow.sse._get_http_client", _get):
+            shipper.enqueue("job_1", "a", {"x": 1})
+            shipper.enqueue("job_2", "b", {})
+            await shipper.flush(timeout=1.0)
+
+        paths = [p for p, _ in rec.requests]
+        assert paths == [
+            "/api/internal/events:batch",
+            "/api/internal/events/job_1",
+            "/api/internal/events/job_2",
+        ]
+        assert shipper.stats["flushed"] == 2
+
+
+class TestPushSseEvent:
+
+    async def test_push_enqueues_on_shipper(self):
+        from workflow import sse
+
+        shipper = EventShipper(flush_interval=10.0)
+        with patch.object(sse, "get_event_shipper", return_value=shipper):
+            await sse.push_sse_event("job_1", "bug_started", {"bug_index": 0})
+
+        assert shipper.stats["queued"] == 1
+        assert shipper.stats["pending"] == 1
+
+    async def test_payload_is_snapshotted_at_push(self, recorder):
+        from workflow import sse
+
+        shipper = EventShipper(flush_interval=10.0)
+        components = [{"id": "c1", "role": "unknown"}]
+        data = {"components": components, "total": 1}
+        with patch.object(sse, "get_event_shipper", return_value=shipper):
+            await sse.push_sse_event("job_1", "frame_decomposed", data)
+
+        components[0]["role"] = "button"
+        components[0]["screenshot_path"] = "/tmp/c1.png"
+        data["total"] = 2
+        await shipper.flush(timeout=1.0)
+
+        _, body = recorder.requests[0]
+        assert body["events"][0]["data"] == {
+            "components": [{"id": "c1", "role": "unknown"}],
+            "total": 1,
+        }
+
+    async def test_unserializable_payload_is_dropped(self, recorder):
+        shipper = EventShipper(flush_interval=10.0)
+        cyclic: dict = {}
+        cyclic["self"] = cyclic
+        assert shipper.enqueue("job_1", "bad", cyclic) is False
+        assert shipper.enqueue("job_1", "good", {"when": object.__name__}) is True
+
+        await shipper.flush(timeout=1.0)
+        assert recorder.shipped == ["good"]
+        assert shipper.stats["dropped"] == 1
+
+    async def test_push_without_run_id_is_skipped(self):
+        from workflow import sse
+
+        shipper = EventShipper(flush_interval=10.0)
+        with patch.object(sse, "get_event_shipper", return_value=shipper):
+            await sse.push_sse_event("", "bug_started", {})
+
+        assert shipper.stats["queued"] == 0
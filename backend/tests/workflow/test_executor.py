@@ -5,8 +5,12 @@ Tests cover:
 - MaxIterationsExceeded enforcement
 - SSE event emissions (loop_iteration, loop_terminated)
 - Graceful loop termination with partial results
+- node_output delta encoding (schema v2) and legacy full output (v1)
+- Compiled graph cache (hashing, hits/misses, LRU eviction)
 """
 
+import json
+
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from collections import defaultdict
@@ -16,15 +20,34 @@ from workflow.engine.executor import (
     execute_dynamic_workflow,
 )
 from workflow.engine.graph_builder import (
+    CompiledGraphCache,
+    CompiledWorkflow,
     EdgeDefinition,
     NodeConfig,
     WorkflowDefinition,
+    detect_loops,
+    workflow_definition_hash,
 )
+from workflow.engine.state_delta import NodeOutputEncoder, merge_node_output
 
 # Import node types to ensure registration
 import workflow.nodes.base  # noqa: F401
 
 
+def _patch_compiled(mock_graph):
+    """Patch the executor's graph cache to return mock_graph with real loop metadata."""
+    def fake_get(workflow):
+        loops = detect_loops(workflow)
+        n = len(workflow.nodes)
+        return CompiledWorkflow(
+            graph=mock_graph,
+            loops=loops,
+            loop_node_ids=frozenset(nid for loop in loops for nid in loop.cycle_path[:-1]),
+            recursion_limit=workflow.max_iterations * n + n,
+        )
+    return patch("workflow.engine.executor.get_compiled_workflow", side_effect=fake_get)
+
+
 class TestMaxIterationsExceeded:
     """Test MaxIterationsExceeded exception."""
 
@@ -89,7 +112,7 @@ class TestExecutorLoopControl:
 
         mock_graph.astream = fake_stream
 
-        with patch("workflow.engine.executor.build_graph_from_config", return_value=mock_graph), \
+        with _patch_compiled(mock_graph), \
              patch("workflow.engine.executor.push_sse_event", new_callable=AsyncMock), \
              patch("workflow.engine.executor.notify_node_status", new_callable=AsyncMock):
 
@@ -116,7 +139,7 @@ class TestExecutorLoopControl:
 
         mock_graph.astream = fake_stream
 
-        with patch("workflow.engine.executor.build_graph_from_config", return_value=mock_graph), \
+        with _patch_compiled(mock_graph), \
              patch("workflow.engine.executor.push_sse_event", new_callable=AsyncMock) as mock_sse, \
              patch("workflow.engine.executor.notify_node_status", new_callable=AsyncMock):
 
@@ -149,7 +172,7 @@ class TestExecutorLoopControl:
 
         mock_graph.astream = fake_stream
 
-        with patch("workflow.engine.executor.build_graph_from_config", return_value=mock_graph), \
+        with _patch_compiled(mock_graph), \
              patch("workflow.engine.executor.push_sse_event", new_callable=AsyncMock) as mock_sse, \
              patch("workflow.engine.executor.notify_node_status", new_callable=AsyncMock):
 
@@ -179,7 +202,7 @@ class TestExecutorLoopControl:
 
         mock_graph.astream = fake_stream
 
-        with patch("workflow.engine.executor.build_graph_from_config", return_value=mock_graph), \
+        with _patch_compiled(mock_graph), \
              patch("workflow.engine.executor.push_sse_event", new_callable=AsyncMock) as mock_sse, \
              patch("workflow.engine.executor.notify_node_status", new_callable=AsyncMock):
 
@@ -208,7 +231,7 @@ class TestExecutorLoopControl:
 
         mock_graph.astream = fake_stream
 
-        with patch("workflow.engine.executor.build_graph_from_config", return_value=mock_graph), \
+        with _patch_compiled(mock_graph), \
              patch("workflow.engine.executor.push_sse_event", new_callable=AsyncMock) as mock_sse, \
              patch("workflow.engine.executor.notify_node_status", new_callable=AsyncMock):
 
@@ -223,5 +246,150 @@ class TestExecutorLoopControl:
         assert complete_data["node_execution_counts"] == {"node-1": 1, "node-2": 1}
 
 
+class TestNodeOutputDelta:
+    """Test delta-encoded node_output events."""
+
+    def test_merge_reports_only_changed_keys(self):
+        state = {"run_id": "r", "results": [1, 2, 3], "a": {"x": 1}}
+        ops = merge_node_output(
+            state, "b", {"run_id": "r", "results": [1, 2, 3], "a": {"x": 2}, "b": "ok"}
+        )
+        assert ops == [
+            {"op": "replace", "path": "/a", "value": {"x": 2}},
+            {"op": "add", "path": "/b", "value": "ok"},
+        ]
+        assert state["a"] == {"x": 2} and state["b"] == "ok"
+
+    def test_merge_non_dict_output_and_pointer_escaping(self):
+        state = {}
+        assert merge_node_output(state, "n/1~", "text") == [
+            {"op": "add", "path": "/n~11~0", "value": "text"},
+        ]
+        assert state == {"n/1~": "text"}
+        assert merge_node_output(state, "n", "x", track_changes=False) is None
+
+    def test_encoder_snapshot_interval(self):
+        encoder = NodeOutputEncoder(schema_version=2, snapshot_every=3)
+        kinds = [encoder.encode({}, [], {"k": 1})[1]["kind"] for _ in range(5)]
+        assert kinds == ["snapshot", "delta", "delta", "snapshot", "delta"]
+
+    def test_encoder_v1_returns_full_output(self):
+        encoder = NodeOutputEncoder(schema_version=1)
+        output, extra = encoder.encode({"a": 1}, None, {"a": 1})
+        assert json.loads(output) == {"a": 1}
+        assert extra == {}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("version", [None, 1, 2])
+    async def test_executor_emits_schema(self, version):
+        wf = WorkflowDefinition(
+            name="delta_test",
+            nodes=[
+                NodeConfig(id="n1", type="data_source", config={"name": "A"}),
+                NodeConfig(id="n2", type="data_source", config={"name": "B"}),
+            ],
+            edges=[EdgeDefinition(id="e1", source="n1", target="n2")],
+        )
+        big = ["row"] * 100
+        mock_graph = AsyncMock()
+
+        async def fake_stream(state, config=None):
+            yield {"n1": {**state, "results": big, "n1": {"ok": True}}}
+            yield {"n2": {**state, "results": big, "n1": {"ok": True}, "n2": {"ok": 2}}}
+
+        mock_graph.astream = fake_stream
+
+        with _patch_compiled(mock_graph), \
+             patch("workflow.engine.executor.push_sse_event", new_callable=AsyncMock), \
+             patch("workflow.engine.executor.notify_node_status", new_callable=AsyncMock) as mock_notify:
+
+            await execute_dynamic_workflow(
+                wf, {}, run_id="test-delta", event_schema_version=version
+            )
+
+        completed = [c for c in mock_notify.call_args_list if c[0][2] == "completed"]
+        assert len(completed) == 2
+        second_output, second_extra = completed[1][0][3], completed[1][1]["extra"]
+        if version != 2:  # full state unless the run opts in
+            assert second_extra == {}
+            assert json.loads(second_output)["results"] == big
+        else:
+            assert completed[0][1]["extra"]["kind"] == "snapshot"
+            assert second_extra == {"schema_version": 2, "kind": "delta", "seq": 2}
+            assert json.loads(second_output) == [
+                {"op": "add", "path": "/n2", "value": {"ok": 2}},
+            ]
+
+
+class TestCompiledGraphCache:
+    """Test the LRU cache of compiled graphs."""
+
+    @staticmethod
+    def _wf(name="cache_test", max_iterations=10, config=None):
+        return WorkflowDefinition(
+            name=name,
+            nodes=[
+                NodeConfig(id="a", type="data_source", config=config or {"name": "A"}),
+                NodeConfig(id="b", type="data_source", config={"name": "B"}),
+            ],
+            edges=[EdgeDefinition(id="e1", source="a", target="b")],
+            max_iterations=max_iterations,
+        )
+
+    def test_hash_is_canonical(self):
+        assert workflow_definition_hash(self._wf(config={"x": 1, "y": 2})) == \
+            workflow_definition_hash(self._wf(config={"y": 2, "x": 1}))
+        assert workflow_definition_hash(self._wf()) != \
+            workflow_definition_hash(self._wf(max_iterations=5))
+
+    def test_hit_and_miss_counters(self):
+        cache = CompiledGraphCache(max_entries=4)
+        first = cache.get(self._wf())
+        second = cache.get(self._wf())
+        assert first is second
+        assert cache.stats() == {"hits": 1, "misses": 1, "size": 1, "max_entries": 4}
+        assert first.loops == [] and first.run_config == {}
+
+    def test_lru_eviction(self):
+        cache = CompiledGraphCache(max_entries=2)
+        cache.get(self._wf("w1"))
+        cache.get(self._wf("w2"))
+        cache.get(self._wf("w1"))  # w1 most recent
+        cache.get(self._wf("w3"))  # evicts w2
+        cache.get(self._wf("w1"))
+        assert cache.hits == 2
+        cache.get(self._wf("w2"))
+        assert cache.misses == 4
+
+    def test_invalid_workflow_not_cached(self):
+        cache = CompiledGraphCache()
+        bad = WorkflowDefinition(
+            name="bad", nodes=[NodeConfig(id="a", type="no_such_type")], edges=[],
+        )
+        with pytest.raises(ValueError):
+            cache.get(bad)
+        assert cache.stats()["size"] == 0
+
+    def test_loop_metadata(self):
+        wf = WorkflowDefinition(
+            name="loop",
+            nodes=[
+                NodeConfig(id="p", type="data_processor", config={"name": "P", "input_field": "x"}),
+                NodeConfig(id="c", type="condition", config={"name": "C", "condition": "done == True"}),
+                NodeConfig(id="o", type="output", config={"name": "O", "format": "json"}),
+            ],
+            edges=[
+                EdgeDefinition(id="e1", source="p", target="c"),
+                EdgeDefinition(id="e2", source="c", target="p", condition="done != True"),
+                EdgeDefinition(id="e3", source="c", target="o", condition="done == True"),
+            ],
+            entry_point="p",
+            max_iterations=3,
+        )
+        compiled = CompiledGraphCache().get(wf)
+        assert compiled.loop_node_ids == frozenset({"p", "c"})
+        assert compiled.run_config == {"recursion_limit": 12}
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,159 @@
+"""Unit tests for the versioned Figma response cache (workflow/integrations/figma_cache.py).
+
+Tests cover:
+- Key sensitivity (file, endpoint, params, version)
+- Compressed storage, TTL expiry and size-based LRU eviction
+- FigmaClient re-runs of the same page only hit the network for the version probe
+- A new file version misses; error payloads are never stored
+"""
+
+from __future__ import annotations
+
+import os
+import time
+
+import httpx
+import pytest
+
+from workflow.integrations.figma_cache import FigmaResponseCache, response_key
+from workflow.integrations.figma_client import FIGMA_API_BASE, FigmaClient
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return FigmaResponseCache(str(tmp_path / "figma.sqlite3"), max_bytes=100_000, ttl_seconds=60)
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+
+class TestFigmaResponseCache:
+
+    def test_key_inputs(self):
+        base = response_key("fk", "/v1/files/fk/nodes", {"ids": "1:2"}, "v1")
+        assert base == response_key("fk", "/v1/files/fk/nodes", {"ids": "1:2"}, "v1")
+        assert base != response_key("fk", "/v1/files/fk/nodes", {"ids": "1:2"}, "v2")
+        assert base != response_key("fk", "/v1/files/fk/nodes", {"ids": "1:3"}, "v1")
+        assert base != response_key("fk2", "/v1/files/fk/nodes", {"ids": "1:2"}, "v1")
+
+    def test_json_roundtrip_is_compressed(self, cache):
+        tree = {"nodes": {"1:2": {"document": {"name": "页面", "children": [{"type": "TEXT"}] * 500}}}}
+        cache.put_json("k", tree)
+        assert cache.get_json("k") == tree
+        assert cache.stats()["bytes"] < 2_000
+
+    def test_incompressible_bytes_stored_raw(self, cache):
+        blob = os.urandom(4096)
+        cache.put("img", blob)
+        assert cache.get("img") == blob
+        assert cache.stats()["bytes"] == 4096
+
+    def test_ttl_and_lru_eviction(self, cache):
+        cache.max_bytes = 2_500
+        cache.put("a", os.urandom(1000))
+        time.sleep(0.001)
+        cache.put("b", os.urandom(1000))
+        time.sleep(0.001)
+        assert cache.get("a") is not None
+        time.sleep(0.001)
+        cache.put("c", os.urandom(1000))
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+
+        cache.ttl_seconds = 0.01
+        time.sleep(0.02)
+        assert cache.get("a") is None
+
+
+# ---------------------------------------------------------------------------
+# FigmaClient integration
+# ---------------------------------------------------------------------------
+
+
+class _FakeFigma:
+    """Records API paths and serves a tiny page with two frames."""
+
+    def __init__(self, version: str = "111"):
+        self.version = version
+        self.api_calls: list[str] = []
+        self.downloads = 0
+
+    def api(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.api_calls.append(path)
+        if path == "/v1/files/fk":
+            return httpx.Response(200, json={"version": self.version})
+        if path == "/v1/files/fk/nodes":
+            return httpx.Response(200, json={"name": "文件", "nodes": {"1:1": {"document": {"id": "1:1"}}}})
+        if path == "/v1/files/fk/variables/local":
+            return httpx.Response(200, json={"meta": {"variables": {}, "variableCollections": {}}})
+        if path == "/v1/images/fk":
+            ids = request.url.params["ids"].split(",")
+            return httpx.Response(200, json={"images": {i: f"https://cdn.example.com/{i}.png" for i in ids}})
+        return httpx.Response(404)
+
+    def cdn(self, request: httpx.Request) -> httpx.Response:
+        self.downloads += 1
+        return httpx.Response(200, content=b"PNG" + request.url.path.encode())
+
+    def client(self, cache: FigmaResponseCache) -> FigmaClient:
+        client = FigmaClient(token="t", cache=cache)
+        client._client = httpx.AsyncClient(base_url=FIGMA_API_BASE, transport=httpx.MockTransport(self.api))
+        client._download_client = httpx.AsyncClient(transport=httpx.MockTransport(self.cdn))
+        return client
+
+
+async def _fetch_page(client: FigmaClient, output_dir: str) -> dict:
+    nodes = await client.get_file_nodes("fk", ["1:1"])
+    tokens = await client.get_design_tokens("fk")
+    shots = await client.download_screenshots("fk", ["1:1", "1:2"], output_dir)
+    await client.close()
+    return {"nodes": nodes, "tokens": tokens, "shots": shots}
+
+
+class TestClientCaching:
+
+    @pytest.mark.asyncio
+    async def test_rerun_only_probes_version(self, cache, tmp_path):
+        figma = _FakeFigma()
+        first = await _fetch_page(figma.client(cache), str(tmp_path / "run1"))
+        assert figma.api_calls.count("/v1/files/fk") == 1  # probed once per client
+        assert figma.downloads == 2
+
+        figma.api_calls.clear()
+        second = await _fetch_page(figma.client(cache), str(tmp_path / "run2"))
+
+        assert figma.api_calls == ["/v1/files/fk"]
+        assert figma.downloads == 2
+        assert second == first
+        assert (tmp_path / "run2" / "screenshots" / "1_2.png").read_bytes() == b"PNG/1:2.png"
+
+    @pytest.mark.asyncio
+    async def test_new_version_misses(self, cache, tmp_path):
+        figma = _FakeFigma()
+        await _fetch_page(figma.client(cache), str(tmp_path / "run1"))
+
+        figma.version = "222"
+        figma.api_calls.clear()
+        await _fetch_page(figma.client(cache), str(tmp_path / "run2"))
+
+        assert "/v1/files/fk/nodes" in figma.api_calls
+        assert "/v1/images/fk" in figma.api_calls
+        assert figma.downloads == 4
+
+    @pytest.mark.asyncio
+    async def test_render_error_not_cached(self, cache):
+        figma = _FakeFigma()
+        client = figma.client(cache)
+        client._client = httpx.AsyncClient(
+            base_url=FIGMA_API_BASE,
+            transport=httpx.MockTransport(
+                lambda req: httpx.Response(200, json={"version": "1", "err": "Invalid node IDs"})
+            ),
+        )
+        data = await client._get_cached("fk", "/v1/images/fk", {"ids": "bad"})
+        await client.close()
+        assert data["err"] == "Invalid node IDs"
+        assert cache.stats()["entries"] == 0
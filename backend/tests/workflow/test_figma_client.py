@@ -5,6 +5,7 @@ import os
 import tempfile
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 
 from workflow.integrations.figma_client import FigmaClient, FigmaClientError
@@ -24,7 +25,7 @@ from workflow.integrations.figma_classifiers import (
 @pytest.fixture
 def client():
     """Create a FigmaClient with a test token."""
-    return FigmaClient(token="test-figma-token-123")
+    return FigmaClient(token="test-figma-token-123", use_cache=False)
 
 
 @pytest.fixture
@@ -209,12 +210,12 @@ def sample_variables_response():
 class TestFigmaClientInit:
 
     def test_creates_with_explicit_token(self):
-        client = FigmaClient(token="my-token")
+        client = FigmaClient(token="my-token", use_cache=False)
         assert client._token == "my-token"
 
     def test_reads_token_from_env(self, monkeypatch):
         monkeypatch.setenv("FIGMA_TOKEN", "env-token-abc")
-        client = FigmaClient()
+        client = FigmaClient(use_cache=False)
         assert client._token == "env-token-abc"
 
     def test_raises_without_token(self, monkeypatch):
@@ -551,6 +552,70 @@ class TestGenerateDesignExport:
 # ---------------------------------------------------------------------------
 
 
+class TestDownloadImages:
+    """Concurrent screenshot downloads over the pooled download client."""
+
+    @staticmethod
+    def _use_transport(client, handler):
+        client._download_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    @pytest.mark.asyncio
+    async def test_downloads_all_and_reports_progress(self, client, tmp_path):
+        self._use_transport(client, lambda req: httpx.Response(200, content=req.url.path.encode()))
+        progress = []
+
+        async def on_progress(event):
+            progress.append(event)
+
+        urls = {f"1:{i}": f"https://cdn.example.com/img{i}.png" for i in range(5)}
+        urls["1:9"] = None
+        result = await client.download_images(urls, str(tmp_path), "screenshots", on_progress=on_progress)
+
+        assert result == {f"1:{i}": f"screenshots/1_{i}.png" for i in range(5)}
+        assert (tmp_path / "screenshots" / "1_3.png").read_bytes() == b"/img3.png"
+        assert sorted(e["completed"] for e in progress) == [1, 2, 3, 4, 5]
+        assert all(e["total"] == 5 and e["bytes"] == 9 for e in progress)
+
+    @pytest.mark.asyncio
+    async def test_retries_server_error(self, client, tmp_path):
+        calls = []
+
+        def handler(req):
+            calls.append(req.url)
+            return httpx.Response(503 if len(calls) == 1 else 200, content=b"PNG")
+
+        self._use_transport(client, handler)
+        with patch("workflow.integrations.figma_client.FIGMA_DOWNLOAD_RETRY_DELAY", 0):
+            result = await client.download_images(
+                {"1:1": "https://cdn.example.com/a.png"}, str(tmp_path), "screenshots",
+            )
+        assert result == {"1:1": "screenshots/1_1.png"}
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_client_error_skipped_without_partial_file(self, client, tmp_path):
+        calls = []
+
+        def handler(req):
+            calls.append(req.url)
+            return httpx.Response(404)
+
+        self._use_transport(client, handler)
+        result = await client.download_images(
+            {"1:1": "https://cdn.example.com/a.png"}, str(tmp_path), "screenshots",
+        )
+        assert result == {}
+        assert len(calls) == 1
+        assert os.listdir(tmp_path / "screenshots") == []
+
+    @pytest.mark.asyncio
+    async def test_close_releases_download_client(self, client):
+        download_client = await client._get_download_client()
+        assert await client._get_download_client() is download_client
+        await client.close()
+        assert download_client.is_closed
+
+
 class TestExtractInteractionContext:
     """Tests for _extract_interaction_context() and related helpers."""
 
@@ -728,22 +793,15 @@ class TestExtractInteractionContextsBatch:
             }
 
             # Mock the download
-            mock_resp = MagicMock()
-            mock_resp.status_code = 200
-            mock_resp.content = b"PNG_DATA"
-
-            with patch("httpx.AsyncClient") as mock_http_cls:
-                mock_http_inst = AsyncMock()
-                mock_http_inst.get.return_value = mock_resp
-                mock_http_inst.__aenter__ = AsyncMock(return_value=mock_http_inst)
-                mock_http_inst.__aexit__ = AsyncMock(return_value=None)
-                mock_http_cls.return_value = mock_http_inst
-
-                import tempfile
-                with tempfile.TemporaryDirectory() as tmpdir:
-                    results = await client.extract_interaction_contexts(
-                        "fk", nodes, output_dir=tmpdir
-                    )
+            client._download_client = httpx.AsyncClient(
+                transport=httpx.MockTransport(lambda req: httpx.Response(200, content=b"PNG_DATA"))
+            )
+            with tempfile.TemporaryDirectory() as tmpdir:
+                results = await client.extract_interaction_contexts(
+                    "fk", nodes, output_dir=tmpdir
+                )
+                with open(os.path.join(tmpdir, "interaction_screenshots", "20_2.png"), "rb") as f:
+                    assert f.read() == b"PNG_DATA"
 
             assert len(results) == 2
             # First frame: text only, no screenshot
@@ -5,6 +5,7 @@ Covers:
 - _normalize_bounds
 - figma_node_to_component_spec (core conversion, style extraction, content detection)
 - _detect_device_type
+- TokenIndex (nearest-color token resolution during spec building)
 """
 
 from __future__ import annotations
@@ -19,6 +20,7 @@ from workflow.nodes.figma_spec_builder import (
     _should_recurse,
     figma_node_to_component_spec,
 )
+from workflow.nodes.figma_utils import TokenIndex
 
 
 # ─── Fixtures ─────────────────────────────────────────────────────────
@@ -345,3 +347,56 @@ class TestDetectDeviceType:
 
     def test_ambiguous_defaults_to_mobile(self):
         assert _detect_device_type(500) == "mobile"
+
+
+# ─── TokenIndex ──────────────────────────────────────────────────────
+
+
+_TOKENS = {"colors": {"brand-primary": "#FF6B35", "text-primary": "#333333", "brand-alt": "#FF6B37"}}
+
+
+class TestTokenIndex:
+    def test_exact_and_rounding_tolerance(self):
+        index = TokenIndex.from_design_tokens(_TOKENS)
+        assert index.lookup("#ff6b35") == "brand-primary"
+        assert index.lookup("#FF6B35CC") == "brand-primary"  # alpha ignored
+        assert index.lookup("#343332") == "text-primary"  # +/-1 per channel
+        assert index.lookup("#363636") is None
+
+    def test_nearest_token_wins(self):
+        index = TokenIndex.from_design_tokens(_TOKENS)
+        assert index.lookup("#FF6B36") == "brand-primary"  # tie: first listed
+        index = TokenIndex.from_design_tokens(_TOKENS, tolerance=3)
+        assert index.lookup("#FF6B38") == "brand-alt"
+
+    def test_perceptual_metric(self):
+        index = TokenIndex.from_design_tokens(_TOKENS, tolerance=6, metric="perceptual")
+        assert index.lookup("#343434") == "text-primary"
+        assert index.lookup("#383838") is None
+        with pytest.raises(ValueError):
+            TokenIndex({}, metric="lab")
+
+    def test_zero_tolerance_exact_only(self):
+        index = TokenIndex.from_design_tokens(_TOKENS, tolerance=0)
+        assert index.lookup("#FF6B35") == "brand-primary"
+        assert index.lookup("#FF6B34") is None
+
+    def test_spec_builder_resolves_colors_per_node(self):
+        red = {"r": 1.0, "g": 0x6B / 255, "b": 0x35 / 255, "a": 1.0}
+        text = _make_frame(
+            name="Label", node_type="TEXT", id="1:2", characters="#FF6B35",
+            fills=[{"type": "SOLID", "color": red}],
+            style={"fontFamily": "PingFang SC", "fontSize": 14},
+        )
+        node = _make_frame(
+            name="Card", id="1:1", children=[text],
+            fills=[{"type": "SOLID", "color": {"r": 0.2, "g": 0.2, "b": 0.2, "a": 1.0}}],
+            effects=[{"type": "DROP_SHADOW", "color": red, "offset": {"x": 0, "y": 2}, "radius": 4}],
+        )
+        spec = figma_node_to_component_spec(node, token_index=TokenIndex.from_design_tokens(_TOKENS))
+
+        assert spec["style"]["background"]["color"] == {"value": "#333333", "token": "text-primary"}
+        assert spec["style"]["shadow"][0]["color"]["token"] == "brand-primary"
+        label = spec["children"][0]
+        assert label["typography"]["color"] == {"value": "#FF6B35", "token": "brand-primary"}
+        assert label["typography"]["content"] == "#FF6B35"  # text is not a color position
@@ -8,12 +8,14 @@ Tests cover:
 - _git_commit_bug_fix: Per-bug commit after successful fix
 - _git_revert_changes: Revert on failed bug fix
 
-All git operations use mocks (no real git repo).
+Git operations use mocks, except the stale-worktree test, which needs a
+real repository.
 """
 
 from __future__ import annotations
 
 import asyncio
+import os
 from unittest.mock import AsyncMock, patch
 
 import pytest
@@ -328,3 +330,109 @@ class TestGitRevertChanges:
 
         result = await _git_revert_changes("/tmp", "job_1", "XSZS-100")
         assert result is False
+
+
+# ---------------------------------------------------------------------------
+# 7. Worktree helpers (parallel batch mode)
+# ---------------------------------------------------------------------------
+
+
+class TestGitWorktreeHelpers:
+    """Test worktree creation, branch checkout and cherry-pick merge-back."""
+
+    @patch("workflow.temporal.git_operations._git_run", new_callable=AsyncMock)
+    async def test_worktree_root_inside_git_dir(self, mock_run):
+        from workflow.temporal.batch_activities import _git_worktree_root
+
+        mock_run.return_value = (0, "/repo/.git")
+
+        root = await _git_worktree_root("/repo", "job_1")
+        assert root == "/repo/.git/batch-worktrees/job_1"
+
+    @patch("workflow.temporal.git_operations._git_run", new_callable=AsyncMock)
+    async def test_worktree_root_not_repo(self, mock_run):
+        from workflow.temporal.batch_activities import _git_worktree_root
+
+        mock_run.return_value = (128, "fatal: not a git repo")
+        assert await _git_worktree_root("/tmp", "job_1") is None
+
+    @patch("workflow.temporal.git_operations._git_run", new_callable=AsyncMock)
+    async def test_worktree_add_detached_at_head(self, mock_run):
+        from workflow.temporal.batch_activities import _git_worktree_add
+
+        mock_run.return_value = (0, "")
+        assert await _git_worktree_add("/repo", "/repo/.git/wt/slot-0", "job_1") is True
+        assert mock_run.await_count == 2
+        mock_run.assert_any_await("/repo", "worktree", "prune")
+        mock_run.assert_awaited_with(
+            "/repo", "worktree", "add", "--detach", "/repo/.git/wt/slot-0", "HEAD",
+        )
+
+    async def test_worktree_add_replaces_stale_slot(self, tmp_path):
+        """A retried activity re-creates a slot the previous attempt left behind."""
+        from workflow.temporal.batch_activities import _git_run, _git_worktree_add
+
+        repo = str(tmp_path / "repo")
+        os.makedirs(repo)
+        await _git_run(repo, "init", "-q")
+        with open(os.path.join(repo, "a.txt"), "w") as f:
+            f.write("a")
+        await _git_run(repo, "add", "a.txt")
+        await _git_run(
+            repo, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "init",
+        )
+        worktree = os.path.join(repo, ".git", "batch-worktrees", "job_1", "slot-0")
+
+        assert await _git_worktree_add(repo, worktree, "job_1") is True
+        with open(os.path.join(worktree, "leftover.txt"), "w") as f:
+            f.write("from the crashed attempt")
+
+        assert await _git_worktree_add(repo, worktree, "job_1") is True
+        assert not os.path.exists(os.path.join(worktree, "leftover.txt"))
+        _, listing = await _git_run(repo, "worktree", "list", "--porcelain")
+        assert listing.count(worktree) == 1
+
+    @patch("workflow.temporal.git_operations._git_run", new_callable=AsyncMock)
+    async def test_checkout_bug_branch_resets_slot(self, mock_run):
+        from workflow.temporal.batch_activities import _git_checkout_bug_branch
+
+        mock_run.return_value = (0, "")
+        ok = await _git_checkout_bug_branch("/wt", "batch/job_1/XSZS-1", "abc123", "job_1")
+
+        assert ok is True
+        args = [c[0][1:] for c in mock_run.call_args_list]
+        assert args[0] == ("reset", "--hard")
+        assert args[1] == ("clean", "-fd")
+        assert args[2] == ("checkout", "-B", "batch/job_1/XSZS-1", "abc123")
+
+    @patch("workflow.temporal.git_operations._git_run", new_callable=AsyncMock)
+    async def test_cherry_pick_applies_commits_in_order(self, mock_run):
+        from workflow.temporal.batch_activities import _git_cherry_pick_branch
+
+        mock_run.side_effect = [(0, "c1\nc2"), (0, "")]
+        ok, detail = await _git_cherry_pick_branch("/repo", "base", "batch/job_1/X-1", "job_1")
+
+        assert ok is True
+        assert detail == "2 commit(s)"
+        assert mock_run.call_args_list[1][0] == ("/repo", "cherry-pick", "c1", "c2")
+
+    @patch("workflow.temporal.git_operations._git_run", new_callable=AsyncMock)
+    async def test_cherry_pick_no_commits(self, mock_run):
+        from workflow.temporal.batch_activities import _git_cherry_pick_branch
+
+        mock_run.return_value = (0, "")
+        ok, _ = await _git_cherry_pick_branch("/repo", "base", "batch/job_1/X-1", "job_1")
+
+        assert ok is True
+        assert mock_run.call_count == 1
+
+    @patch("workflow.temporal.git_operations._git_run", new_callable=AsyncMock)
+    async def test_cherry_pick_conflict_aborts(self, mock_run):
+        from workflow.temporal.batch_activities import _git_cherry_pick_branch
+
+        mock_run.side_effect = [(0, "c1"), (1, "CONFLICT (content)"), (0, "")]
+        ok, detail = await _git_cherry_pick_branch("/repo", "base", "batch/job_1/X-1", "job_1")
+
+        assert ok is False
+        assert "CONFLICT" in detail
+        assert mock_run.call_args_list[2][0] == ("/repo", "cherry-pick", "--abort")
@@ -0,0 +1,155 @@
+"""Unit tests for the oneshot LLM response cache (workflow/llm_cache.py).
+
+Tests cover:
+- Key sensitivity (prompt, model, tools, screenshot content — not path)
+- TTL expiry and size-based LRU eviction (shared BlobCache store)
+- invoke_oneshot hits skip the CLI and are flagged cached; cache=False bypasses
+- SpecAnalyzer token accounting keeps cached usage separate
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from workflow import claude_cli_wrapper
+from workflow.claude_cli_wrapper import invoke_oneshot
+from workflow.llm_cache import LLMResponseCache, cache_key, file_content_hash
+from workflow.nodes.spec_analyzer import _add_token_usage
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMResponseCache(str(tmp_path / "responses.sqlite3"), max_bytes=10_000, ttl_seconds=60)
+
+
+# ---------------------------------------------------------------------------
+# Keys
+# ---------------------------------------------------------------------------
+
+
+class TestCacheKey:
+
+    def test_inputs_change_key(self):
+        base = cache_key("p", model="m", allowed_tools=["Read"])
+        assert base == cache_key("p", model="m", allowed_tools=["Read"])
+        assert base != cache_key("p2", model="m", allowed_tools=["Read"])
+        assert base != cache_key("p", model="m2", allowed_tools=["Read"])
+        assert base != cache_key("p", model="m", allowed_tools=None)
+        assert base != cache_key("p", model="m", allowed_tools=["Read"], screenshot_hash="x")
+
+    def test_screenshot_content_not_path(self, tmp_path):
+        a = tmp_path / "a.png"
+        b = tmp_path / "job2" / "b.png"
+        b.parent.mkdir()
+        a.write_bytes(b"same pixels")
+        b.write_bytes(b"same pixels")
+        assert file_content_hash(str(a)) == file_content_hash(str(b))
+        b.write_bytes(b"changed pixels")
+        assert file_content_hash(str(a)) != file_content_hash(str(b))
+        assert file_content_hash(str(tmp_path / "missing.png")) == ""
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+
+class TestLLMResponseCache:
+
+    def test_roundtrip(self, cache):
+        assert cache.get("k") is None
+        cache.put("k", "响应文本", {"input_tokens": 10, "output_tokens": 5})
+        assert cache.get("k") == {
+            "text": "响应文本",
+            "token_usage": {"input_tokens": 10, "output_tokens": 5},
+        }
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    def test_ttl_expiry(self, cache):
+        cache.put("k", "old", None)
+        cache.ttl_seconds = 0.01
+        time.sleep(0.02)
+        assert cache.get("k") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_lru_eviction_by_size(self, cache):
+        cache.max_bytes = 350  # two ~136-byte entries fit, three do not
+        cache.put("a", "x" * 100, None)
+        time.sleep(0.001)
+        cache.put("b", "x" * 100, None)
+        time.sleep(0.001)
+        assert cache.get("a") is not None  # a is now more recent than b
+        time.sleep(0.001)
+        cache.put("c", "x" * 100, None)
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+        assert cache.stats()["bytes"] <= 350
+
+    def test_old_table_layout_is_reset(self, tmp_path):
+        path = tmp_path / "old.sqlite3"
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE responses (key TEXT PRIMARY KEY, text TEXT NOT NULL)")
+        conn.execute("INSERT INTO responses VALUES ('k', 'old')")
+        conn.commit()
+        conn.close()
+
+        cache = LLMResponseCache(str(path), max_bytes=10_000, ttl_seconds=60)
+        assert cache.get("k") is None
+        cache.put("k", "new", None)
+        assert cache.get("k") == {"text": "new", "token_usage": None}
+
+
+# ---------------------------------------------------------------------------
+# invoke_oneshot integration
+# ---------------------------------------------------------------------------
+
+
+def _proc(text: str) -> MagicMock:
+    envelope = json.dumps({"result": text, "usage": {"input_tokens": 7, "output_tokens": 3}})
+    proc = MagicMock()
+    proc.returncode = 0
+    proc.communicate = AsyncMock(return_value=(envelope.encode(), b""))
+    return proc
+
+
+class TestOneshotCaching:
+
+    @pytest.mark.asyncio
+    async def test_hit_skips_cli(self, cache):
+        spawn = AsyncMock(return_value=_proc("first"))
+        with patch.object(claude_cli_wrapper, "get_llm_cache", return_value=cache), \
+             patch("asyncio.create_subprocess_exec", spawn):
+            miss = await invoke_oneshot(prompt="same", model="m")
+            hit = await invoke_oneshot(prompt="same", model="m")
+            other = await invoke_oneshot(prompt="same", model="other")
+
+        assert spawn.await_count == 2
+        assert miss["cached"] is False and other["cached"] is False
+        assert hit["cached"] is True
+        assert hit["text"] == "first"
+        assert hit["token_usage"] == {"input_tokens": 7, "output_tokens": 3}
+
+    @pytest.mark.asyncio
+    async def test_cache_false_bypasses(self, cache):
+        spawn = AsyncMock(return_value=_proc("fresh"))
+        with patch.object(claude_cli_wrapper, "get_llm_cache", return_value=cache), \
+             patch("asyncio.create_subprocess_exec", spawn):
+            await invoke_oneshot(prompt="p")
+            result = await invoke_oneshot(prompt="p", cache=False)
+
+        assert spawn.await_count == 2
+        assert result["cached"] is False
+
+    def test_cached_usage_kept_separate(self):
+        spent = {"input_tokens": 0, "output_tokens": 0}
+        cached = {"input_tokens": 0, "output_tokens": 0}
+        usage = {"input_tokens": 7, "output_tokens": 3}
+        _add_token_usage({"token_usage": usage, "cached": False}, spent, cached)
+        _add_token_usage({"token_usage": usage, "cached": True}, spent, cached)
+        _add_token_usage({"token_usage": None}, spent, cached)
+        assert spent == usage and cached == usage
@@ -0,0 +1,237 @@
+"""Unit tests for screenshot preprocessing (workflow/spec/screenshot_prep.py).
+
+Tests cover:
+- Image token estimate, size classes, tile planning and crop boxes
+- Job-level summary (bytes saved, token deltas)
+- Skipped when disabled or Pillow is missing
+- invoke_oneshot tiles prompt and cache key
+- With Pillow: downsizing, tiling, cropping from the page render, caching
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from workflow import claude_cli_wrapper
+from workflow.claude_cli_wrapper import invoke_oneshot
+from workflow.llm_cache import LLMResponseCache
+from workflow.spec import screenshot_prep
+from workflow.spec.screenshot_prep import (
+    crop_box,
+    estimate_image_tokens,
+    plan_layout,
+    prepare_analysis_images,
+    prune_cache,
+    size_class_max_dim,
+    summarize,
+)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    path = tmp_path / "cache"
+    monkeypatch.setattr(screenshot_prep, "SPEC_SCREENSHOT_CACHE_DIR", str(path))
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Pure planning helpers
+# ---------------------------------------------------------------------------
+
+
+class TestPlanning:
+
+    def test_token_estimate_matches_api_scaling(self):
+        assert estimate_image_tokens(0, 100) == 0
+        assert estimate_image_tokens(750, 1) == 1
+        assert estimate_image_tokens(1000, 1000) == 1334
+        # Oversized images are scaled down by the API, so tokens plateau
+        assert estimate_image_tokens(4000, 4000) == estimate_image_tokens(2000, 2000)
+
+    def test_size_classes(self):
+        assert size_class_max_dim({"width": 40, "height": 40}) == screenshot_prep.SPEC_SCREENSHOT_MAX_DIM_SMALL
+        assert size_class_max_dim({"width": 393, "height": 120}) == screenshot_prep.SPEC_SCREENSHOT_MAX_DIM_MEDIUM
+        assert size_class_max_dim({"width": 393, "height": 2400}) == screenshot_prep.SPEC_SCREENSHOT_MAX_DIM_LARGE
+        assert size_class_max_dim(None) == screenshot_prep.SPEC_SCREENSHOT_MAX_DIM_LARGE
+
+    def test_regular_image_fits_long_edge(self):
+        scale, rows = plan_layout(800, 400, max_dim=512, tile_aspect=3.0, max_tiles=4)
+        assert scale == pytest.approx(0.64)
+        assert rows == [(0, 256)]
+        # Never upscaled
+        assert plan_layout(100, 50, max_dim=512) == (1.0, [(0, 50)])
+
+    def test_tall_frame_is_tiled_with_overlap(self):
+        scale, rows = plan_layout(786, 4800, max_dim=1000, tile_aspect=3.0, max_tiles=8)
+        assert scale == 1.0
+        assert len(rows) == 5
+        assert rows[0] == (0, 1000)
+        assert rows[-1][1] == 4800
+        for (_, prev_bottom), (top, _) in zip(rows[:-1], rows[1:], strict=True):
+            assert top < prev_bottom  # overlap
+        assert all(bottom - top <= 1000 for top, bottom in rows)
+
+    def test_tall_frame_capped_at_max_tiles(self):
+        scale, rows = plan_layout(786, 20000, max_dim=1000, tile_aspect=3.0, max_tiles=4)
+        assert scale < 1.0
+        assert len(rows) == 4
+        assert rows[-1][1] == round(20000 * scale)
+
+    def test_crop_box_scales_design_px(self):
+        # Page render at 2x of a 393px wide page
+        assert crop_box({"x": 10, "y": 100, "width": 50, "height": 20}, 393, (786, 3000)) == (
+            20, 200, 120, 240,
+        )
+        assert crop_box({"x": 0, "y": 2990, "width": 393, "height": 100}, 393, (786, 3000)) is None
+        assert crop_box({"x": 0, "y": 0, "width": 10, "height": 10}, 0, (786, 3000)) is None
+
+    def test_summarize(self):
+        prepared = {
+            "1:1": {"paths": ["a"], "cropped": False, "tiles": 1, "source_bytes": 1000,
+                    "derived_bytes": 200, "tokens_before": 900, "tokens_after": 300},
+            "1:2": {"paths": ["b", "c"], "cropped": False, "tiles": 2, "source_bytes": 5000,
+                    "derived_bytes": 1500, "tokens_before": 1600, "tokens_after": 2400},
+            "1:3": {"paths": ["d"], "cropped": True, "tiles": 1, "source_bytes": 0,
+                    "derived_bytes": 100, "tokens_before": 0, "tokens_after": 50},
+        }
+        stats = summarize(prepared)
+        assert stats["preprocessed"] == 3
+        assert stats["cropped"] == 1
+        assert stats["tiled"] == 1
+        assert stats["bytes_saved"] == 6000 - 1700
+        assert stats["image_tokens_before"] == 2500
+        assert stats["image_tokens_after"] == 2750
+        assert stats["components"]["1:1"]["token_delta"] == -600
+        assert stats["components"]["1:2"]["tiles"] == 2
+
+
+# ---------------------------------------------------------------------------
+# Skipped paths
+# ---------------------------------------------------------------------------
+
+
+class TestSkipped:
+
+    def test_disabled(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(screenshot_prep, "SPEC_SCREENSHOT_PREP_ENABLED", False)
+        (tmp_path / "a.png").write_bytes(b"x")
+        assert prepare_analysis_images({"screenshot_path": "a.png"}, str(tmp_path)) is None
+
+    def test_without_pillow(self, tmp_path):
+        (tmp_path / "a.png").write_bytes(b"x")
+        with patch.object(screenshot_prep, "_load_pillow", return_value=None):
+            assert prepare_analysis_images({"screenshot_path": "a.png"}, str(tmp_path)) is None
+
+    def test_prune_cache_drops_oldest_sources(self, cache_dir):
+        cache_dir.mkdir()
+        for i, key in enumerate(["aa", "bb", "cc"]):
+            (cache_dir / f"{key}_0.jpg").write_bytes(b"x")
+            (cache_dir / f"{key}_1.jpg").write_bytes(b"x")
+            meta = cache_dir / f"{key}.json"
+            meta.write_text("{}")
+            os.utime(meta, (1000 + i, 1000 + i))
+        assert prune_cache(max_entries=1) == 2
+        assert sorted(os.listdir(cache_dir)) == ["cc.json", "cc_0.jpg", "cc_1.jpg"]
+
+
+# ---------------------------------------------------------------------------
+# Multi-image prompt
+# ---------------------------------------------------------------------------
+
+
+def _proc(text: str) -> MagicMock:
+    envelope = json.dumps({"result": text, "usage": {"input_tokens": 7, "output_tokens": 3}})
+    proc = MagicMock()
+    proc.returncode = 0
+    proc.communicate = AsyncMock(return_value=(envelope.encode(), b""))
+    return proc
+
+
+class TestTilesPrompt:
+
+    @pytest.mark.asyncio
+    async def test_tiles_listed_in_order_and_cached_by_content(self, tmp_path):
+        for name in ("t0.jpg", "t1.jpg", "single.jpg"):
+            (tmp_path / name).write_bytes(name.encode())
+        cache = LLMResponseCache(str(tmp_path / "r.sqlite3"), max_bytes=10_000, ttl_seconds=60)
+        spawn = AsyncMock(return_value=_proc("ok"))
+        with patch.object(claude_cli_wrapper, "get_llm_cache", return_value=cache), \
+             patch("asyncio.create_subprocess_exec", spawn):
+            await invoke_oneshot(prompt="p", cwd=str(tmp_path), screenshot_tiles=["t0.jpg", "t1.jpg"])
+            hit = await invoke_oneshot(prompt="p", cwd=str(tmp_path), screenshot_tiles=["t0.jpg", "t1.jpg"])
+            # A single image is not the same request as its tiles
+            await invoke_oneshot(prompt="p", cwd=str(tmp_path), screenshot_path="single.jpg")
+
+        assert hit["cached"] is True
+        assert spawn.await_count == 2
+        args = spawn.await_args_list[0].args
+        prompt = next(a for a in args if isinstance(a, str) and a.startswith("p\n"))
+        first = prompt.index(str(tmp_path / "t0.jpg"))
+        assert first < prompt.index(str(tmp_path / "t1.jpg"))
+        assert "top to bottom" in prompt
+
+
+# ---------------------------------------------------------------------------
+# With Pillow
+# ---------------------------------------------------------------------------
+
+
+class TestPrepareImages:
+
+    @pytest.fixture(autouse=True)
+    def _pil(self):
+        return pytest.importorskip("PIL.Image")
+
+    def _save(self, path, size, color=(200, 30, 30, 255)):
+        from PIL import Image
+        path.parent.mkdir(parents=True, exist_ok=True)
+        Image.new("RGBA", size, color).save(path)
+
+    def test_small_component_downsized_to_jpeg(self, tmp_path, cache_dir):
+        self._save(tmp_path / "screenshots" / "1_2.png", (1200, 800))
+        comp = {"id": "1:2", "screenshot_path": "screenshots/1_2.png",
+                "bounds": {"x": 0, "y": 0, "width": 150, "height": 100}}
+        result = prepare_analysis_images(comp, str(tmp_path))
+
+        from PIL import Image
+        assert result["paths"] == [os.path.join("screenshots", "analysis", "1_2_0.jpg")]
+        with Image.open(tmp_path / result["paths"][0]) as img:
+            assert img.format == "JPEG"
+            assert max(img.size) == screenshot_prep.SPEC_SCREENSHOT_MAX_DIM_SMALL
+        assert result["tokens_after"] < result["tokens_before"]
+        assert result["derived_bytes"] < result["source_bytes"]
+        # The original render is untouched
+        assert comp["screenshot_path"] == "screenshots/1_2.png"
+
+    def test_tall_frame_tiled(self, tmp_path, cache_dir):
+        self._save(tmp_path / "tall.png", (786, 6000))
+        comp = {"id": "1:3", "screenshot_path": "tall.png",
+                "bounds": {"x": 0, "y": 0, "width": 393, "height": 3000}}
+        result = prepare_analysis_images(comp, str(tmp_path))
+        assert result["tiles"] > 1
+        assert len(result["paths"]) == result["tiles"]
+        assert all(os.path.isfile(tmp_path / p) for p in result["paths"])
+
+    def test_missing_render_cropped_from_page(self, tmp_path, cache_dir):
+        self._save(tmp_path / "page.png", (786, 1704))
+        comp = {"id": "1:4", "screenshot_path": "",
+                "bounds": {"x": 0, "y": 100, "width": 393, "height": 60}}
+        result = prepare_analysis_images(comp, str(tmp_path), "page.png", 393)
+
+        from PIL import Image
+        assert result["cropped"] is True
+        assert result["tokens_before"] == 0 and result["source_bytes"] == 0
+        with Image.open(tmp_path / result["paths"][0]) as img:
+            assert img.size == (786, 120)
+
+    def test_second_call_served_from_cache(self, tmp_path, cache_dir):
+        self._save(tmp_path / "a.png", (1000, 1000))
+        comp = {"id": "1:5", "screenshot_path": "a.png", "bounds": {"width": 300, "height": 300}}
+        first = prepare_analysis_images(comp, str(tmp_path))
+        with patch.object(screenshot_prep, "_derive", side_effect=AssertionError("re-derived")):
+            second = prepare_analysis_images(comp, str(tmp_path))
+        assert second == first
@@ -0,0 +1,99 @@
+"""Unit tests for the grid spatial index (workflow/nodes/spatial_index.py).
+
+Tests cover:
+- Range, k-nearest and overlap queries agree with brute force on random layouts
+- Oversized and empty boxes
+- detect_container_layout / neighbor computation still match pairwise results
+"""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from workflow.nodes.figma_utils import _bounds_overlap_ratio, detect_container_layout
+from workflow.nodes.spatial_index import SpatialIndex, _extent, _gap
+
+
+def _random_bounds(n, seed, extent=2000, max_size=200):
+    rng = random.Random(seed)
+    return [
+        {
+            "x": rng.uniform(0, extent),
+            "y": rng.uniform(0, extent),
+            "width": rng.uniform(0, max_size),
+            "height": rng.uniform(0, max_size),
+        }
+        for _ in range(n)
+    ]
+
+
+def _touches(a, b, margin=0.0):
+    ax1, ay1, ax2, ay2 = _extent(a)
+    bx1, by1, bx2, by2 = _extent(b)
+    return bx1 <= ax2 + margin and ax1 - margin <= bx2 and by1 <= ay2 + margin and ay1 - margin <= by2
+
+
+class TestSpatialIndex:
+
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_query_matches_brute_force(self, seed):
+        boxes = _random_bounds(400, seed) + _random_bounds(30, seed + 300, max_size=1500)
+        index = SpatialIndex(boxes)
+        for q in _random_bounds(30, seed + 100):
+            expected = [i for i, b in enumerate(boxes) if _touches(q, b, margin=50)]
+            assert index.query(q, margin=50) == expected
+
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_nearest_matches_brute_force(self, seed):
+        boxes = _random_bounds(400, seed)
+        index = SpatialIndex(boxes)
+        for q in _random_bounds(20, seed + 200, max_size=20):
+            qe = _extent(q)
+            expected = sorted(range(len(boxes)), key=lambda i: (_gap(*qe, *_extent(boxes[i])), i))[:5]
+            assert index.nearest(q, k=5) == expected
+
+    def test_nearest_excludes_self(self):
+        boxes = [
+            {"x": 0, "y": 0, "width": 10, "height": 10},
+            {"x": 500, "y": 0, "width": 10, "height": 10},
+            {"x": 30, "y": 0, "width": 10, "height": 10},
+        ]
+        assert SpatialIndex(boxes).nearest(boxes[0], k=1, exclude=0) == [2]
+
+    @pytest.mark.parametrize("seed", [1, 2])
+    def test_overlapping_pairs_match_brute_force(self, seed):
+        boxes = _random_bounds(300, seed)
+        # oversized sections and backdrops, enough to need the coarse level
+        boxes += _random_bounds(30, seed + 300, extent=1000, max_size=1500)
+        expected = {
+            (i, j)
+            for i in range(len(boxes))
+            for j in range(i + 1, len(boxes))
+            if _bounds_overlap_ratio(boxes[i], boxes[j]) > 0
+        }
+        assert set(SpatialIndex(boxes).overlapping_pairs()) == expected
+
+    def test_empty_entries_not_indexed(self):
+        index = SpatialIndex([{}, None, {"x": 0, "y": 0, "width": 10, "height": 10}])
+        assert len(index) == 1
+        assert index.query({"x": 0, "y": 0, "width": 100, "height": 100}) == [2]
+        assert SpatialIndex([]).query({"x": 0, "y": 0, "width": 1, "height": 1}) == []
+
+
+class TestContainerLayoutStack:
+
+    def test_overlap_detected_among_many_children(self):
+        children = [{"x": i * 120, "y": 0, "width": 100, "height": 40} for i in range(200)]
+        assert detect_container_layout({}, children) == {"type": "absolute"}
+
+        children.append({"x": 120 * 150 + 10, "y": 5, "width": 80, "height": 30})
+        assert detect_container_layout({}, children) == {"type": "stack"}
+
+    def test_small_overlap_is_not_stack(self):
+        children = [
+            {"x": 0, "y": 0, "width": 100, "height": 100},
+            {"x": 90, "y": 0, "width": 100, "height": 100},  # 10% overlap
+        ]
+        assert detect_container_layout({}, children) == {"type": "absolute"}
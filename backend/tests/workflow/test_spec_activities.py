@@ -1,18 +1,15 @@
 """Tests for workflow.temporal.spec_activities — Design-to-Spec pipeline activity.
 
 Covers:
-- Checkpoint helpers (_checkpoint_dir, _save_checkpoint, _load_checkpoints)
-- DB helpers (_update_job_status, _update_component_counts)
+- DB helpers (_update_job_status, _update_component_counts) on the write-behind queue
 - Heartbeat (_periodic_heartbeat)
 - Main activity (execute_spec_pipeline_activity) — happy path, 0-components, Figma error,
-  cancellation, checkpoint resume, SpecAnalyzer failures
+  cancellation, checkpoint resume, cross-job reuse, SpecAnalyzer failures
 """
 
 from __future__ import annotations
 
 import asyncio
-import json
-import os
 import tempfile
 from datetime import datetime, timezone
 from typing import Any, Dict
@@ -20,110 +17,19 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from workflow.spec.analysis_store import SpecAnalysisStore
+from workflow.spec.checkpoint_log import CheckpointLog
+from workflow.temporal.db_writer import flush_db_writes, get_db_write_stats
 from workflow.temporal.spec_activities import (
-    _checkpoint_dir,
-    _load_checkpoints,
     _periodic_heartbeat,
-    _save_checkpoint,
+    _run_sequential_phases,
+    _run_streaming_phases,
     _update_component_counts,
     _update_job_status,
     execute_spec_pipeline_activity,
 )
 
 
-# ─── Checkpoint helpers ───────────────────────────────────────────────
-
-
-class TestCheckpointDir:
-    def test_returns_checkpoint_subdir(self):
-        result = _checkpoint_dir("/some/output")
-        assert result == "/some/output/.spec_checkpoints"
-
-    def test_works_with_trailing_slash(self):
-        result = _checkpoint_dir("/some/output/")
-        assert result.endswith(".spec_checkpoints")
-
-
-class TestSaveCheckpoint:
-    def test_saves_json_file(self, tmp_path):
-        data = {"id": "comp-1", "role": "button", "description": "A button"}
-        _save_checkpoint(str(tmp_path), "comp-1", data)
-
-        cp_dir = os.path.join(str(tmp_path), ".spec_checkpoints")
-        assert os.path.isdir(cp_dir)
-
-        path = os.path.join(cp_dir, "comp-1.json")
-        assert os.path.isfile(path)
-
-        with open(path) as f:
-            loaded = json.load(f)
-        assert loaded["id"] == "comp-1"
-        assert loaded["role"] == "button"
-
-    def test_sanitizes_id_with_special_chars(self, tmp_path):
-        data = {"id": "1:23/abc", "role": "text"}
-        _save_checkpoint(str(tmp_path), "1:23/abc", data)
-
-        cp_dir = os.path.join(str(tmp_path), ".spec_checkpoints")
-        path = os.path.join(cp_dir, "1_23_abc.json")
-        assert os.path.isfile(path)
-
-    def test_handles_write_failure_gracefully(self, tmp_path):
-        """Save should not raise on json.dump failure — just log a warning."""
-        # Create checkpoint dir so makedirs succeeds, but mock open to fail
-        cp_dir = os.path.join(str(tmp_path), ".spec_checkpoints")
-        os.makedirs(cp_dir, exist_ok=True)
-        with patch("builtins.open", side_effect=PermissionError("denied")):
-            _save_checkpoint(str(tmp_path), "comp-1", {"id": "comp-1"})
-        # No exception raised
-
-
-class TestLoadCheckpoints:
-    def test_returns_empty_dict_for_missing_dir(self, tmp_path):
-        result = _load_checkpoints(str(tmp_path))
-        assert result == {}
-
-    def test_loads_saved_checkpoints(self, tmp_path):
-        data1 = {"id": "comp-1", "role": "button"}
-        data2 = {"id": "comp-2", "role": "text"}
-        _save_checkpoint(str(tmp_path), "comp-1", data1)
-        _save_checkpoint(str(tmp_path), "comp-2", data2)
-
-        result = _load_checkpoints(str(tmp_path))
-        assert len(result) == 2
-        assert result["comp-1"]["role"] == "button"
-        assert result["comp-2"]["role"] == "text"
-
-    def test_skips_non_json_files(self, tmp_path):
-        cp_dir = os.path.join(str(tmp_path), ".spec_checkpoints")
-        os.makedirs(cp_dir)
-        with open(os.path.join(cp_dir, "readme.txt"), "w") as f:
-            f.write("not json")
-        _save_checkpoint(str(tmp_path), "comp-1", {"id": "comp-1", "role": "nav"})
-
-        result = _load_checkpoints(str(tmp_path))
-        assert len(result) == 1
-        assert "comp-1" in result
-
-    def test_skips_entries_without_id(self, tmp_path):
-        cp_dir = os.path.join(str(tmp_path), ".spec_checkpoints")
-        os.makedirs(cp_dir)
-        with open(os.path.join(cp_dir, "bad.json"), "w") as f:
-            json.dump({"role": "button"}, f)  # no 'id' key
-
-        result = _load_checkpoints(str(tmp_path))
-        assert len(result) == 0
-
-    def test_handles_corrupt_json_gracefully(self, tmp_path):
-        cp_dir = os.path.join(str(tmp_path), ".spec_checkpoints")
-        os.makedirs(cp_dir)
-        with open(os.path.join(cp_dir, "bad.json"), "w") as f:
-            f.write("{invalid json")
-
-        result = _load_checkpoints(str(tmp_path))
-        assert result == {}
-
-
 # ─── DB helpers ───────────────────────────────────────────────────────
 
 
@@ -140,7 +46,10 @@ class TestUpdateJobStatus:
 
         result = await _update_job_status("job-1", "running")
 
+        # Non-terminal: queued until the next flush
         assert result is True
+        mock_repo_instance.update.assert_not_called()
+        assert await flush_db_writes() is True
         mock_repo_instance.update.assert_called_once()
         call_kwargs = mock_repo_instance.update.call_args
         assert call_kwargs[0][0] == "job-1"
@@ -169,7 +78,7 @@ class TestUpdateJobStatus:
     @pytest.mark.asyncio
     @patch("app.database.get_session_ctx", side_effect=Exception("DB down"))
     async def test_returns_false_on_db_error(self, _):
-        result = await _update_job_status("job-1", "running")
+        result = await _update_job_status("job-1", "failed")
         assert result is False
 
 
@@ -182,20 +91,23 @@ class TestUpdateComponentCounts:
         mock_session_ctx.return_value.__aenter__ = AsyncMock(return_value=mock_session)
         mock_session_ctx.return_value.__aexit__ = AsyncMock(return_value=False)
         mock_repo_instance = MockRepo.return_value
-        mock_repo_instance.update_component_counts = AsyncMock()
+        mock_repo_instance.update = AsyncMock()
 
         result = await _update_component_counts("job-1", total=5, completed=3, failed=1)
+        await _update_component_counts("job-1", completed=4)
 
         assert result is True
-        mock_repo_instance.update_component_counts.assert_called_once_with(
-            "job-1", total=5, completed=3, failed=1,
+        assert await flush_db_writes() is True
+        mock_repo_instance.update.assert_called_once_with(
+            "job-1", components_total=5, components_completed=4, components_failed=1,
         )
 
     @pytest.mark.asyncio
     @patch("app.database.get_session_ctx", side_effect=Exception("DB down"))
-    async def test_returns_false_on_db_error(self, _):
-        result = await _update_component_counts("job-1", total=5)
-        assert result is False
+    async def test_db_error_keeps_update_queued(self, _):
+        assert await _update_component_counts("job-1", total=5) is True
+        assert await flush_db_writes() is False
+        assert get_db_write_stats()["pending"] == 1
 
 
 # ─── Heartbeat ────────────────────────────────────────────────────────
@@ -207,10 +119,12 @@ class TestPeriodicHeartbeat:
     async def test_sends_heartbeats(self, mock_activity):
         """Heartbeat should call activity.heartbeat periodically."""
         call_count = 0
+        details = []
 
-        def track_heartbeat(msg):
+        def track_heartbeat(msg, *extra):
             nonlocal call_count
             call_count += 1
+            details.append(extra)
             if call_count >= 2:
                 raise Exception("Stop")  # break the loop
 
@@ -225,6 +139,7 @@ class TestPeriodicHeartbeat:
             pass
 
         assert call_count >= 1
+        assert "pending" in details[0][0]  # DB write-behind stats
 
     @pytest.mark.asyncio
     @patch("workflow.temporal.spec_activities.activity")
@@ -338,6 +253,13 @@ class TestExecuteSpecPipelineActivity:
     _ANALYZER = "workflow.nodes.spec_nodes.SpecAnalyzerNode"
     _ASSEMBLER = "workflow.nodes.spec_nodes.SpecAssemblerNode"
 
+    @pytest.fixture(autouse=True)
+    def analysis_store(self, tmp_path_factory):
+        """Isolated cross-job analysis store per test."""
+        store = SpecAnalysisStore(str(tmp_path_factory.mktemp("analysis_store")))
+        with patch("workflow.spec.analysis_store.get_spec_analysis_store", return_value=store):
+            yield store
+
     @pytest.mark.asyncio
     @patch("workflow.temporal.spec_activities.activity")
     @patch("workflow.temporal.spec_activities._push_event", new_callable=AsyncMock)
@@ -458,7 +380,8 @@ class TestExecuteSpecPipelineActivity:
             "id": "1:1", "name": "Header", "role": "navigation",
             "description": "Top nav", "_token_usage": {"input_tokens": 100, "output_tokens": 50},
         }
-        _save_checkpoint(str(tmp_path), "1:1", checkpoint_data)
+        with CheckpointLog(str(tmp_path)) as log:
+            log.append("1:1", checkpoint_data)
 
         figma_client = _mock_figma_client()
         decomposer_result = _mock_decomposer_result()
@@ -497,6 +420,94 @@ class TestExecuteSpecPipelineActivity:
         ]
         assert len(resume_calls) == 1
 
+    @pytest.mark.asyncio
+    @patch("workflow.temporal.spec_activities.activity")
+    @patch("workflow.temporal.spec_activities._push_event", new_callable=AsyncMock)
+    @patch("workflow.temporal.spec_activities._update_job_status", new_callable=AsyncMock)
+    @patch("workflow.temporal.spec_activities._update_component_counts", new_callable=AsyncMock)
+    async def test_crash_mid_analysis_keeps_finished_components(
+        self, mock_counts, mock_status, mock_push, mock_activity, tmp_path,
+    ):
+        """Components checkpointed via on_analyzed survive a crash before the gather ends."""
+        mock_activity.heartbeat = MagicMock()
+
+        async def crash_after_first(inputs):
+            inputs["on_analyzed"]({"id": "1:1", "name": "Header", "role": "navigation"})
+            raise RuntimeError("worker lost")
+
+        with (
+            patch(self._FIGMA_CLIENT, return_value=_mock_figma_client()),
+            patch(self._DECOMPOSER) as MockDecomp,
+            patch(self._ANALYZER) as MockAnalyzer,
+        ):
+            MockDecomp.return_value.execute = AsyncMock(return_value=_mock_decomposer_result())
+            MockAnalyzer.return_value.execute = AsyncMock(side_effect=crash_after_first)
+            result = await execute_spec_pipeline_activity(_make_params(tmp_path))
+
+        assert result["success"] is False
+
+        checkpoints = CheckpointLog(str(tmp_path)).load()
+        assert list(checkpoints) == ["1:1"]
+        assert checkpoints["1:1"]["role"] == "navigation"
+
+    @pytest.mark.asyncio
+    @patch("workflow.temporal.spec_activities.activity")
+    @patch("workflow.temporal.spec_activities._push_event", new_callable=AsyncMock)
+    @patch("workflow.temporal.spec_activities._update_job_status", new_callable=AsyncMock)
+    @patch("workflow.temporal.spec_activities._update_component_counts", new_callable=AsyncMock)
+    async def test_new_job_reuses_unchanged_components(
+        self, mock_counts, mock_status, mock_push, mock_activity, tmp_path,
+    ):
+        """A second job on the same page only re-analyzes the component that changed."""
+        mock_activity.heartbeat = MagicMock()
+        mock_status.return_value = True
+        mock_counts.return_value = True
+        assembler_result = _mock_assembler_result(spec_path=str(tmp_path / "spec.json"))
+
+        async def run(job_dir, decomposed, analyzed):
+            with (
+                patch(self._FIGMA_CLIENT, return_value=_mock_figma_client()),
+                patch(self._DECOMPOSER) as MockDecomp,
+                patch(self._ANALYZER) as MockAnalyzer,
+                patch(self._ASSEMBLER) as MockAssembler,
+            ):
+                MockDecomp.return_value.execute = AsyncMock(
+                    return_value=_mock_decomposer_result(decomposed),
+                )
+                MockAnalyzer.return_value.execute = AsyncMock(
+                    return_value=_mock_analyzer_result(components=analyzed),
+                )
+                MockAssembler.return_value.execute = AsyncMock(return_value=assembler_result)
+                result = await execute_spec_pipeline_activity(
+                    _make_params(job_dir, job_id=job_dir.name),
+                )
+            return result, MockAnalyzer.return_value.execute, MockAssembler.return_value.execute
+
+        header = {"id": "1:1", "name": "Header", "role": "other", "bounds": {"x": 0, "y": 0, "width": 393, "height": 80}}
+        body = {"id": "1:2", "name": "Body", "role": "other", "bounds": {"x": 0, "y": 80, "width": 393, "height": 700}}
+        await run(
+            tmp_path / "job1", [header, body],
+            [{**header, "role": "navigation"}, {**body, "role": "section"}],
+        )
+
+        # Designer nudges the body frame; header is untouched
+        moved_body = {**body, "bounds": {**body["bounds"], "y": 96}}
+        mock_push.reset_mock()
+        result, analyzer_execute, assembler_execute = await run(
+            tmp_path / "job2", [header, moved_body], [{**moved_body, "role": "section"}],
+        )
+
+        assert result["components_completed"] == 2
+        sent = analyzer_execute.call_args[0][0]["components"]
+        assert [c["id"] for c in sent] == ["1:2"]
+        resume = [c[0][2] for c in mock_push.call_args_list if c[0][1] == "checkpoint_resume"]
+        assert resume == [{
+            "pre_completed": 1, "checkpointed": 0, "reused": 1,
+            "reanalyzed": 1, "pending": 1, "total": 2,
+        }]
+        assembled = assembler_execute.call_args[0][0]["components"]
+        assert {c["id"]: c["role"] for c in assembled} == {"1:1": "navigation", "1:2": "section"}
+
     @pytest.mark.asyncio
     @patch("workflow.temporal.spec_activities.activity")
     @patch("workflow.temporal.spec_activities._push_event", new_callable=AsyncMock)
@@ -682,3 +693,192 @@ class TestExecuteSpecPipelineActivity:
         # Direct heartbeat calls should have been made (phase markers)
         assert any("init" in str(c) for c in heartbeat_calls)
         assert any("complete" in str(c) for c in heartbeat_calls)
+
+
+# ─── Streaming pipeline mode ──────────────────────────────────────────
+
+
+class _FakeAnalysisRun:
+    """Stands in for SpecAnalysisRun: records the order components arrive in."""
+
+    def __init__(self):
+        self.analyzed: list = []
+        self.started = asyncio.Event()
+        self.stats = {"total": 2, "succeeded": 0, "failed": 0}
+
+    async def analyze(self, idx, component):
+        self.analyzed.append((component["id"], component.get("screenshot_path")))
+        self.started.set()
+        self.stats["succeeded"] += 1
+        return {**component, "role": "section"}
+
+    def result(self, components):
+        return {
+            "components": components,
+            "analysis_stats": self.stats,
+            "token_usage": {"input_tokens": 10, "output_tokens": 5},
+            "cached_token_usage": {"input_tokens": 0, "output_tokens": 0},
+        }
+
+
+class TestStreamingPipeline:
+    """pipeline_mode="streaming": frames are analyzed as their screenshots land."""
+
+    _FIGMA_CLIENT = TestExecuteSpecPipelineActivity._FIGMA_CLIENT
+    _DECOMPOSER = TestExecuteSpecPipelineActivity._DECOMPOSER
+    _ANALYZER = TestExecuteSpecPipelineActivity._ANALYZER
+    _ASSEMBLER = TestExecuteSpecPipelineActivity._ASSEMBLER
+
+    @pytest.fixture(autouse=True)
+    def analysis_store(self, tmp_path_factory):
+        store = SpecAnalysisStore(str(tmp_path_factory.mktemp("analysis_store")))
+        with patch("workflow.spec.analysis_store.get_spec_analysis_store", return_value=store):
+            yield store
+
+    async def _run(self, tmp_path, download, run):
+        figma_client = _mock_figma_client()
+        figma_client.download_screenshots = download
+        assembler_result = _mock_assembler_result(spec_path=str(tmp_path / "spec.json"))
+        with (
+            patch(self._FIGMA_CLIENT, return_value=figma_client),
+            patch(self._DECOMPOSER) as MockDecomp,
+            patch(self._ANALYZER) as MockAnalyzer,
+            patch(self._ASSEMBLER) as MockAssembler,
+        ):
+            MockDecomp.return_value.execute = AsyncMock(return_value=_mock_decomposer_result())
+            MockAnalyzer.return_value.start_run = MagicMock(return_value=run)
+            MockAssembler.return_value.execute = AsyncMock(return_value=assembler_result)
+            result = await execute_spec_pipeline_activity(
+                _make_params(tmp_path, pipeline_mode="streaming"),
+            )
+        return result, MockAssembler.return_value.execute
+
+    @pytest.mark.asyncio
+    @patch("workflow.temporal.spec_activities.activity")
+    @patch("workflow.temporal.spec_activities._push_event", new_callable=AsyncMock)
+    @patch("workflow.temporal.spec_activities._update_job_status", new_callable=AsyncMock)
+    @patch("workflow.temporal.spec_activities._update_component_counts", new_callable=AsyncMock)
+    async def test_analysis_starts_before_downloads_finish(
+        self, mock_counts, mock_status, mock_push, mock_activity, tmp_path,
+    ):
+        mock_activity.heartbeat = MagicMock()
+        run = _FakeAnalysisRun()
+
+        async def download(file_key, node_ids, output_dir, on_progress=None):
+            await on_progress({"node_id": "1:1", "path": "screenshots/1_1.png"})
+            # 1:2 only lands once 1:1 is already being analyzed
+            await asyncio.wait_for(run.started.wait(), 5)
+            await on_progress({"node_id": "1:2", "path": "screenshots/1_2.png"})
+            return {"1:1": "screenshots/1_1.png", "1:2": "screenshots/1_2.png"}
+
+        result, assembler_execute = await self._run(tmp_path, download, run)
+
+        assert result["success"] is True
+        assert result["components_completed"] == 2
+        assert run.analyzed == [("1:1", "screenshots/1_1.png"), ("1:2", "screenshots/1_2.png")]
+        assembled = assembler_execute.call_args[0][0]["components"]
+        assert [c["id"] for c in assembled] == ["1:1", "1:2"]
+
+        complete = [c[0][2] for c in mock_push.call_args_list if c[0][1] == "spec_complete"]
+        assert complete[0]["pipeline_mode"] == "streaming"
+        timings = complete[0]["stage_timings"]
+        for key in ("fetch_nodes_ms", "fetch_tokens_ms", "screenshots_ms", "decompose_ms",
+                    "first_analyzed_ms", "analyze_ms", "assemble_ms", "total_ms"):
+            assert key in timings
+
+    @pytest.mark.asyncio
+    @patch("workflow.temporal.spec_activities.activity")
+    @patch("workflow.temporal.spec_activities._push_event", new_callable=AsyncMock)
+    @patch("workflow.temporal.spec_activities._update_job_status", new_callable=AsyncMock)
+    @patch("workflow.temporal.spec_activities._update_component_counts", new_callable=AsyncMock)
+    async def test_failed_screenshot_and_checkpoint(
+        self, mock_counts, mock_status, mock_push, mock_activity, tmp_path,
+    ):
+        mock_activity.heartbeat = MagicMock()
+        with CheckpointLog(str(tmp_path)) as log:
+            log.append("1:1", {"id": "1:1", "name": "Header", "role": "navigation"})
+        run = _FakeAnalysisRun()
+
+        async def download(file_key, node_ids, output_dir, on_progress=None):
+            await on_progress({"node_id": "1:1", "path": "screenshots/1_1.png"})
+            return {"1:1": "screenshots/1_1.png"}  # 1:2 failed to render
+
+        result, _ = await self._run(tmp_path, download, run)
+
+        assert result["success"] is True
+        assert result["components_completed"] == 2
+        assert run.analyzed == [("1:2", None)]
+        resume = [c[0][2] for c in mock_push.call_args_list if c[0][1] == "checkpoint_resume"]
+        assert resume[0]["checkpointed"] == 1 and resume[0]["reanalyzed"] == 1
+        warnings = [c[0][2] for c in mock_push.call_args_list if c[0][1] == "warning"]
+        assert warnings[0]["failed_node_ids"] == ["0:1", "1:2"]
+
+    @pytest.mark.asyncio
+    @patch("workflow.temporal.spec_activities.activity")
+    @patch("workflow.temporal.spec_activities._push_event", new_callable=AsyncMock)
+    @patch("workflow.temporal.spec_activities._update_job_status", new_callable=AsyncMock)
+    @patch("workflow.temporal.spec_activities._update_component_counts", new_callable=AsyncMock)
+    async def test_screenshots_restored_from_cache(
+        self, mock_counts, mock_status, mock_push, mock_activity, tmp_path,
+    ):
+        mock_activity.heartbeat = MagicMock()
+        run = _FakeAnalysisRun()
+
+        async def download(file_key, node_ids, output_dir, on_progress=None):
+            # Cache restores do not report progress
+            return {
+                "0:1": "screenshots/0_1.png",
+                "1:1": "screenshots/1_1.png",
+                "1:2": "screenshots/1_2.png",
+            }
+
+        result, _ = await self._run(tmp_path, download, run)
+
+        assert result["success"] is True
+        assert result["components_completed"] == 2
+        assert sorted(run.analyzed) == [
+            ("1:1", "screenshots/1_1.png"), ("1:2", "screenshots/1_2.png"),
+        ]
+        assert run.page_screenshot == "screenshots/0_1.png"
+
+    @pytest.mark.asyncio
+    @patch("workflow.temporal.spec_activities.activity")
+    @patch("workflow.temporal.spec_activities._push_event", new_callable=AsyncMock)
+    @patch("workflow.temporal.spec_activities._update_component_counts", new_callable=AsyncMock)
+    async def test_modes_return_the_same_phases(
+        self, mock_counts, mock_push, mock_activity, tmp_path,
+    ):
+        """Both modes build the phases dict and fetch warnings the same way."""
+        mock_activity.heartbeat = MagicMock()
+        screenshots = {"0:1": "screenshots/0_1.png", "1:1": "screenshots/1_1.png"}
+        results = {}
+        for mode, run_phases in (
+            ("sequential", _run_sequential_phases), ("streaming", _run_streaming_phases),
+        ):
+            mock_push.reset_mock()
+            figma_client = _mock_figma_client(screenshots=screenshots)
+            output_dir = tmp_path / mode
+            output_dir.mkdir()
+            with (
+                patch(self._DECOMPOSER) as MockDecomp,
+                patch(self._ANALYZER) as MockAnalyzer,
+            ):
+                MockDecomp.return_value.execute = AsyncMock(return_value=_mock_decomposer_result())
+                MockAnalyzer.return_value.execute = AsyncMock(return_value=_mock_analyzer_result())
+                MockAnalyzer.return_value.start_run = MagicMock(return_value=_FakeAnalysisRun())
+                results[mode] = await run_phases(
+                    figma_client, "job_1", "abc123", "0:1", str(output_dir), "",
+                )
+            warnings = [c[0][2] for c in mock_push.call_args_list if c[0][1] == "warning"]
+            assert warnings == [{
+                "source": "figma_screenshots",
+                "message": "1 个组件截图下载失败",
+                "failed_node_ids": ["1:2"],
+            }]
+
+        sequential, streaming = results["sequential"], results["streaming"]
+        assert sequential.keys() == streaming.keys()
+        for phases in (sequential, streaming):
+            assert phases["page_screenshot_path"] == "screenshots/0_1.png"
+            assert phases["figma_last_modified"] == "2026-01-01T00:00:00Z"
+            assert phases["components_total"] == 2
@@ -165,10 +165,14 @@ class TestSpecAnalyzerNodeExecute:
         }
 
         node = _make_node()
-        result = await node.execute(_make_inputs())
+        inputs = _make_inputs()
+        result = await node.execute(inputs)
 
         assert result["analysis_stats"]["succeeded"] == 1
         assert result["analysis_stats"]["failed"] == 0
+        # The decomposer's component is merged into a copy, not in place
+        assert inputs["components"][0]["role"] == "other"
+        assert "_merge_report" not in inputs["components"][0]
         assert result["token_usage"]["input_tokens"] == 800
         assert result["token_usage"]["output_tokens"] == 300
         assert len(result["components"]) == 1
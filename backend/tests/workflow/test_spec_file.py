@@ -0,0 +1,85 @@
+"""Tests for the streaming design_spec.json writer and partial readers (spec_file.py)."""
+
+import gzip
+import json
+import os
+
+import pytest
+
+from workflow.spec.spec_file import (
+    load_spec_index,
+    read_spec_component,
+    read_spec_header,
+    spec_index_path,
+    write_spec_document,
+)
+
+
+def _document(n=5):
+    return {
+        "version": "1.0",
+        "source": {"file_key": "abc"},
+        "page": {"name": "首页", "device": {"width": 393, "height": 852}},
+        "components": [
+            {"id": f"1:{i}", "name": f"Comp{i}", "children": [{"id": f"2:{i}", "name": "文本"}]}
+            for i in range(n)
+        ],
+        "validation": {"quality_warning_count": 0},
+        "token_usage": {"input_tokens": 10},
+    }
+
+
+class TestWriteSpecDocument:
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_round_trip(self, tmp_path, compress):
+        spec_path = str(tmp_path / ("design_spec.json.gz" if compress else "design_spec.json"))
+        doc = _document()
+        write_spec_document(spec_path, doc, compress=compress)
+
+        opener = gzip.open if compress else open
+        with opener(spec_path, "rb") as f:
+            loaded = json.loads(f.read())
+        assert loaded == doc
+        assert list(loaded) == list(doc)  # key order preserved
+        assert os.path.exists(str(tmp_path / "design_spec.index.json"))
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_read_header_and_component(self, tmp_path, compress):
+        spec_path = str(tmp_path / "design_spec.json")
+        doc = _document()
+        write_spec_document(spec_path, doc, compress=compress)
+
+        header = read_spec_header(spec_path)
+        assert header["validation"] == doc["validation"]
+        assert header["token_usage"] == doc["token_usage"]
+        assert "components" not in header
+        assert [c["id"] for c in header["component_index"]] == [c["id"] for c in doc["components"]]
+
+        for comp in doc["components"]:
+            assert read_spec_component(spec_path, comp["id"]) == comp
+        assert read_spec_component(spec_path, "missing") is None
+
+    def test_empty_components(self, tmp_path):
+        spec_path = str(tmp_path / "design_spec.json")
+        write_spec_document(spec_path, {"version": "1.0", "components": []})
+        with open(spec_path, encoding="utf-8") as f:
+            assert json.load(f) == {"version": "1.0", "components": []}
+        assert read_spec_header(spec_path) == {"version": "1.0", "component_index": []}
+
+    def test_stale_index_falls_back_to_full_parse(self, tmp_path):
+        spec_path = str(tmp_path / "design_spec.json")
+        write_spec_document(spec_path, _document())
+        # Rewritten without the index (e.g. by an older assembler)
+        newer = _document(2)
+        newer["components"][0]["name"] = "Renamed"
+        with open(spec_path, "w", encoding="utf-8") as f:
+            json.dump(newer, f, ensure_ascii=False, indent=2)
+
+        assert load_spec_index(spec_path) is None
+        assert read_spec_component(spec_path, "1:0")["name"] == "Renamed"
+        assert len(read_spec_header(spec_path)["component_index"]) == 2
+
+    def test_index_path(self):
+        assert spec_index_path("/out/design_spec.json") == "/out/design_spec.index.json"
+        assert spec_index_path("/out/design_spec.json.gz") == "/out/design_spec.index.json"
@@ -75,6 +75,14 @@ class TestBasicMerge:
         assert "role" not in partial
         assert "description" not in partial
 
+    def test_in_place_merges_into_input(self):
+        partial = {"id": "1", "style": {}, "children": [{"id": "2", "style": {}}]}
+        output = {"role": "button", "children_updates": [{"id": "2", "role": "text"}]}
+        result = merge_analyzer_output(partial, output, in_place=True)
+        assert result is partial
+        assert partial["role"] == "button"
+        assert partial["children"][0]["role"] == "text"
+
 
 # ── Content updates ──
 
@@ -589,6 +597,51 @@ class TestIntegration:
 # ── Edge cases ──
 
 
+class TestPathsAndReport:
+    def test_paths_use_semantic_names_and_dedupe_siblings(self):
+        partial = {
+            "id": "root",
+            "name": "Frame 12",
+            "children": [
+                {"id": "a", "name": "Rectangle 1", "children": [{"id": "a1", "name": "Text"}]},
+                {"id": "b", "name": "Rectangle 2"},
+                {"id": "c", "name": "Footer"},
+            ],
+        }
+        output = {
+            "suggested_name": "ProductCard",
+            "children_updates": [
+                {"id": "a", "suggested_name": "Tag"},
+                {"id": "b", "suggested_name": "Tag"},
+                {"id": "a1", "suggested_name": "TagLabel"},
+            ],
+        }
+        result = merge_analyzer_output(partial, output)
+        children = result["children"]
+        assert result["path"] == "ProductCard"
+        assert [c["path"] for c in children] == [
+            "ProductCard/Tag_1", "ProductCard/Tag_2", "ProductCard/Footer",
+        ]
+        assert children[0]["children"][0]["path"] == "ProductCard/Tag_1/TagLabel"
+
+    def test_pruned_ids_reported_separately_from_unmatched(self):
+        partial = {
+            "id": "root",
+            "children": [{"id": "icon", "_pruned_child_ids": ["vec-1", "vec-2"]}],
+        }
+        output = {
+            "children_updates": [
+                {"id": "icon", "role": "icon", "description": "搜索"},
+                {"id": "vec-1", "role": "image"},
+                {"id": "ghost", "role": "text"},
+            ],
+        }
+        report = merge_analyzer_output(partial, output)["_merge_report"]
+        assert report["children_updates_matched"] == 1
+        assert report["children_updates_pruned"] == ["vec-1"]
+        assert report["children_updates_unmatched"] == ["ghost"]
+
+
 class TestEdgeCases:
     def test_empty_partial_spec(self):
         result = merge_analyzer_output({}, {"role": "text", "description": "Test"})
@@ -3,8 +3,11 @@
 import pytest
 
 from workflow.spec.spec_validator import (
+    SpecValidator,
+    ValidationRule,
     collect_merge_reports,
     run_all_validations,
+    validate_component,
     validate_bounds,
     validate_naming,
     validate_render_hints,
@@ -324,3 +327,112 @@ class TestRunAllValidations:
         assert "merge_stats" in result
         assert isinstance(result["quality_warnings"], list)
         assert result["quality_warning_count"] == 0
+
+    def test_single_traversal_matches_per_rule_functions(self):
+        components = [
+            {
+                "id": "1", "name": "Card", "path": "Card", "role": "list-item",
+                "bounds": {"x": 0, "y": 0, "width": 400, "height": 100},
+                "_merge_report": {
+                    "children_updates_total": 2,
+                    "children_updates_matched": 1,
+                    "children_updates_unmatched": ["9:9"],
+                },
+                "children": [{
+                    "id": "2", "name": "Btn", "path": "Card/Btn", "role": "button",
+                    "render_hint": "spacer",
+                    "bounds": {"x": 350, "y": 0, "width": 100, "height": 40},
+                    "children": [{
+                        "id": "3", "name": "Inner", "path": "Card/Btn/Inner",
+                        "role": "button",
+                    }],
+                }],
+            },
+        ]
+        page = {"device": {"width": 393, "height": 852}}
+
+        expected = []
+        for comp in components:
+            validate_role_consistency(comp, None, expected)
+        for comp in components:
+            validate_bounds(comp, {"x": 0, "y": 0, "width": 393, "height": 852}, expected)
+        for comp in components:
+            validate_render_hints(comp, expected)
+        naming = validate_naming(components)
+
+        result = run_all_validations(components, page, node_id="test")
+        assert result["quality_warnings"] == expected
+        assert result["naming"] == naming
+        assert result["merge_stats"]["children_updates_unmatched_count"] == 1
+        assert "_merge_report" not in components[0]
+
+    def test_reports_inferred_layout_nodes(self):
+        components = [{
+            "id": "1", "name": "Row", "path": "Row", "layoutSource": "inferred",
+            "children": [
+                {"id": "2", "name": "A", "path": "Row/A"},
+                {"id": "3", "name": "B", "path": "Row/B", "layoutSource": "inferred"},
+            ],
+        }]
+        result = run_all_validations(components, {})
+        assert result["auto_layout_compliant"] is False
+        assert result["inferred_node_count"] == 1
+        assert result["inferred_nodes"] == [
+            {"id": "1", "name": "Row", "path": "Row", "children_count": 2},
+        ]
+
+    def test_rule_stats(self):
+        components = [{
+            "id": "1", "name": "Page", "role": "page",
+            "children": [{"id": "2", "name": "Item", "role": "list-item"}],
+        }]
+        stats = run_all_validations(components, {})["rule_stats"]
+        assert stats["nodes_visited"] == 2
+        assert stats["rules"]["role_consistency"]["findings"] == 1
+        assert set(stats["rules"]) >= {
+            "role_consistency", "bounds", "render_hints", "auto_layout",
+            "naming", "merge_stats",
+        }
+        assert all(r["elapsed_ms"] >= 0 for r in stats["rules"].values())
+
+
+# ---------------------------------------------------------------------------
+# Rule framework: custom rules and incremental validation
+# ---------------------------------------------------------------------------
+
+
+class TestSpecValidator:
+    def test_custom_rule_sees_every_node_once(self):
+        class CountRule(ValidationRule):
+            name = "count"
+
+            def visit(self, node, parent):
+                self.findings.append((node["id"], parent.get("id")))
+
+        rule = CountRule()
+        validator = SpecValidator(rules=[rule])
+        validator.add_component({
+            "id": "1", "children": [{"id": "2", "children": [{"id": "3"}]}, "junk"],
+        })
+        assert rule.findings == [("1", None), ("2", "1"), ("3", "2")]
+        assert validator.rule_stats()["rules"]["count"]["findings"] == 3
+
+    def test_validate_component_returns_node_local_warnings(self):
+        component = {
+            "id": "1", "name": "Btn", "role": "button",
+            "bounds": {"x": 300, "y": 0, "width": 200, "height": 40},
+            "_merge_report": {"children_updates_total": 1},
+            "children": [{"id": "2", "name": "Inner", "role": "button"}],
+        }
+        warnings = validate_component(component, {"device": {"width": 393, "height": 852}})
+        assert [w["rule"] for w in warnings] == ["role_nested_interactive", "bounds_overflow"]
+        # Page-wide state is left for run_all_validations
+        assert "_merge_report" in component
+
+    def test_add_component_returns_only_new_warnings(self):
+        validator = SpecValidator()
+        first = validator.add_component({"id": "1", "name": "Item", "role": "list-item"})
+        second = validator.add_component({"id": "2", "name": "List", "role": "list"})
+        assert len(first) == 1
+        assert second == []
+        assert validator.quality_warnings() == first
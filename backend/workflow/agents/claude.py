@@ -1,6 +1,7 @@
 """Claude CLI agent integration for LangGraph nodes.
 
 Delegates to the unified claude_cli_wrapper for subprocess management.
+Every CLI subprocess spawned here holds a process-wide CLI governor slot.
 This module preserves the public API used by workflow/nodes/agents.py.
 """
 from __future__ import annotations
@@ -14,6 +15,7 @@ from ..claude_cli_wrapper import (
     ClaudeEvent,
     build_cli_args,
     clean_env,
+    get_cli_governor,
     invoke_stream,
     _parse_assistant_content,
 )
@@ -40,35 +42,36 @@ async def run_claude_agent(
     """Run Claude CLI and return the complete output."""
     cmd = build_cli_args(prompt, output_format="text", no_session_persistence=False)
     cli_env = clean_env()
-    try:
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            cwd=cwd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            env=cli_env,
-        )
-    except FileNotFoundError:
-        return f"[Error] Claude CLI not found at '{CLAUDE_CLI_PATH}'. Set CLAUDE_CLI_PATH env var."
-
-    try:
-        stdout, stderr = await asyncio.wait_for(
-            proc.communicate(),
-            timeout=timeout,
-        )
-
-        output = stdout.decode("utf-8").rstrip()
-
-        if proc.returncode != 0:
-            err_msg = stderr.decode("utf-8").rstrip()
-            return f"[Error] Claude CLI exited with code {proc.returncode}: {err_msg}"
-
-        return output
-
-    except asyncio.TimeoutError:
-        proc.kill()
-        await proc.wait()
-        return f"[Error] Claude CLI timed out after {timeout}s"
+    async with get_cli_governor().slot():
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                cwd=cwd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=cli_env,
+            )
+        except FileNotFoundError:
+            return f"[Error] Claude CLI not found at '{CLAUDE_CLI_PATH}'. Set CLAUDE_CLI_PATH env var."
+
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(),
+                timeout=timeout,
+            )
+
+            output = stdout.decode("utf-8").rstrip()
+
+            if proc.returncode != 0:
+                err_msg = stderr.decode("utf-8").rstrip()
+                return f"[Error] Claude CLI exited with code {proc.returncode}: {err_msg}"
+
+            return output
+
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return f"[Error] Claude CLI timed out after {timeout}s"
 
 
 async def stream_claude_agent(
@@ -76,53 +79,69 @@ async def stream_claude_agent(
     cwd: str = ".",
     timeout: float = 300.0,
 ) -> AsyncGenerator[str, None]:
-    """Stream Claude CLI output line by line."""
+    """Stream Claude CLI output line by line.
+
+    The CLI governor slot is held until the generator finishes. A caller
+    that may stop iterating early must wrap it in
+    ``contextlib.aclosing(stream_claude_agent(...))`` so the subprocess is
+    killed and the slot released at once rather than when the generator
+    is garbage-collected.
+    """
     cmd = build_cli_args(prompt, output_format="text", no_session_persistence=False)
     cli_env = clean_env()
-    try:
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            cwd=cwd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            env=cli_env,
-        )
-    except FileNotFoundError:
-        yield f"[Error] Claude CLI not found at '{CLAUDE_CLI_PATH}'. Set CLAUDE_CLI_PATH env var."
-        return
-
-    deadline = asyncio.get_event_loop().time() + timeout
-
-    try:
-        while True:
+    async with get_cli_governor().slot():
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                cwd=cwd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=cli_env,
+            )
+        except FileNotFoundError:
+            yield f"[Error] Claude CLI not found at '{CLAUDE_CLI_PATH}'. Set CLAUDE_CLI_PATH env var."
+            return
+
+        deadline = asyncio.get_event_loop().time() + timeout
+
+        try:
+            while True:
+                remaining = deadline - asyncio.get_event_loop().time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                try:
+                    line = await asyncio.wait_for(
+                        proc.stdout.readline(),
+                        timeout=remaining,
+                    )
+                except asyncio.TimeoutError:
+                    raise
+                if not line:
+                    break
+                yield line.decode("utf-8").rstrip()
+
             remaining = deadline - asyncio.get_event_loop().time()
-            if remaining <= 0:
+            if remaining > 0:
+                await asyncio.wait_for(proc.wait(), timeout=remaining)
+            else:
                 raise asyncio.TimeoutError()
-            try:
-                line = await asyncio.wait_for(
-                    proc.stdout.readline(),
-                    timeout=remaining,
-                )
-            except asyncio.TimeoutError:
-                raise
-            if not line:
-                break
-            yield line.decode("utf-8").rstrip()
-
-        remaining = deadline - asyncio.get_event_loop().time()
-        if remaining > 0:
-            await asyncio.wait_for(proc.wait(), timeout=remaining)
-        else:
-            raise asyncio.TimeoutError()
-
-        if proc.returncode != 0:
-            stderr = await proc.stderr.read()
-            yield f"[Error] Claude CLI exited with code {proc.returncode}: {stderr.decode()}"
-
-    except asyncio.TimeoutError:
-        proc.kill()
-        await proc.wait()
-        yield f"[Error] Claude CLI timed out after {timeout}s"
+
+            if proc.returncode != 0:
+                stderr = await proc.stderr.read()
+                yield f"[Error] Claude CLI exited with code {proc.returncode}: {stderr.decode()}"
+
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            yield f"[Error] Claude CLI timed out after {timeout}s"
+        finally:
+            # Closed or cancelled mid-stream: don't leave the CLI running
+            if proc.returncode is None:
+                try:
+                    proc.kill()
+                except ProcessLookupError:
+                    pass
+                await proc.wait()
 
 
 async def run_claude_agent_json(
@@ -133,31 +152,32 @@ async def run_claude_agent_json(
     """Run Claude CLI and parse JSON output."""
     cmd = build_cli_args(prompt, output_format="json", no_session_persistence=False)
     cli_env = clean_env()
-    try:
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            cwd=cwd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            env=cli_env,
-        )
-
-        stdout, stderr = await asyncio.wait_for(
-            proc.communicate(),
-            timeout=timeout,
-        )
-
-        if proc.returncode != 0:
-            return {"error": stderr.decode(), "code": proc.returncode}
-
-        return json.loads(stdout.decode())
-
-    except FileNotFoundError:
-        return {"error": f"Claude CLI not found at '{CLAUDE_CLI_PATH}'"}
-    except asyncio.TimeoutError:
-        return {"error": f"Timeout after {timeout}s"}
-    except json.JSONDecodeError as e:
-        return {"error": f"JSON parse error: {e}"}
+    async with get_cli_governor().slot():
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                cwd=cwd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=cli_env,
+            )
+
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(),
+                timeout=timeout,
+            )
+
+            if proc.returncode != 0:
+                return {"error": stderr.decode(), "code": proc.returncode}
+
+            return json.loads(stdout.decode())
+
+        except FileNotFoundError:
+            return {"error": f"Claude CLI not found at '{CLAUDE_CLI_PATH}'"}
+        except asyncio.TimeoutError:
+            return {"error": f"Timeout after {timeout}s"}
+        except json.JSONDecodeError as e:
+            return {"error": f"JSON parse error: {e}"}
 
 
 async def stream_claude_events(
@@ -165,9 +185,14 @@ async def stream_claude_events(
     cwd: str = ".",
     timeout: float = 300.0,
     on_event: Optional[Callable[[ClaudeEvent], None]] = None,
+    pipeline: str = "default",
+    job_id: str = "",
 ) -> str:
     """Run Claude CLI with stream-json and emit structured events.
 
     Delegates to claude_cli_wrapper.invoke_stream().
     """
-    return await invoke_stream(prompt, cwd=cwd, timeout=timeout, on_event=on_event)
+    return await invoke_stream(
+        prompt, cwd=cwd, timeout=timeout, on_event=on_event,
+        pipeline=pipeline, job_id=job_id,
+    )
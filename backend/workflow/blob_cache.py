@@ -0,0 +1,172 @@
+"""SQLite blob store shared by the on-disk response caches.
+
+LLMResponseCache (llm_cache.py) and FigmaResponseCache
+(integrations/figma_cache.py) differ only in how they derive keys and
+encode payloads; both keep their entries in a BlobCache.
+
+Storage: a single SQLite file (WAL mode, safe to share between the API
+server and worker processes) with TTL expiry and LRU eviction once the
+stored bytes exceed max_bytes. With compress, payloads are zlib-compressed
+when that saves space (already-compressed data such as PNGs is stored
+as-is). A file left by an older table layout is reset — it is a cache.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = ("key", "data", "compressed", "size", "created_at", "accessed_at")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    compressed INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at);
+"""
+
+
+class BlobCache:
+    """SQLite-backed blob cache with TTL, size-based LRU eviction and optional compression.
+
+    Methods are synchronous and thread-safe; async callers should run them
+    via asyncio.to_thread.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int,
+        ttl_seconds: float,
+        compress: bool = False,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.compress = compress
+        self.hits = 0
+        self.misses = 0
+        self._name = type(self).__name__
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        columns = tuple(row[1] for row in self._conn.execute("PRAGMA table_info(responses)"))
+        if columns and columns != _COLUMNS:
+            logger.info("%s: resetting %s (old table layout)", self._name, path)
+            self._conn.execute("DROP TABLE responses")
+        self._conn.executescript(_SCHEMA)
+
+    def get_blob(self, key: str) -> Optional[bytes]:
+        """Return the stored bytes for a live entry, else None."""
+        try:
+            return self._get(key)
+        except (sqlite3.Error, zlib.error) as e:
+            logger.warning("%s: lookup failed: %s", self._name, e)
+            return None
+
+    def put_blob(self, key: str, data: bytes) -> None:
+        """Store bytes, then evict least-recently-used entries over budget."""
+        try:
+            self._put(key, data)
+        except sqlite3.Error as e:
+            logger.warning("%s: store failed: %s", self._name, e)
+            with self._lock:
+                self._conn.rollback()
+
+    def _get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, compressed, created_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            data, compressed, created_at = row
+            if self.ttl_seconds > 0 and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key),
+            )
+            self._conn.commit()
+            self.hits += 1
+        return zlib.decompress(data) if compressed else bytes(data)
+
+    def _put(self, key: str, data: bytes) -> None:
+        now = time.time()
+        blob, compressed = data, False
+        if self.compress:
+            packed = zlib.compress(data, 6)
+            if len(packed) < len(data):
+                blob, compressed = packed, True
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, data, compressed, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, blob, int(compressed), len(blob), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"entries": entries, "bytes": total, "hits": self.hits, "misses": self.misses}
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,),
+            )
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        victims = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        logger.info("%s: evicted %d entries (size budget)", self._name, len(victims))
+
+
+def open_blob_cache(cache_cls, directory: str) -> Optional[BlobCache]:
+    """Open cache_cls on directory/responses.sqlite3, or None if the store can't be opened."""
+    try:
+        return cache_cls(os.path.join(directory, "responses.sqlite3"))
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("%s: disabled, cannot open %s: %s", cache_cls.__name__, directory, e)
+        return None
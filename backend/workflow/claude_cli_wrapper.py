@@ -5,7 +5,8 @@ Two calling modes:
 - invoke_stream(): NDJSON streaming with event callbacks, returns result text
 
 Shared: env cleanup, CLI arg construction, timeout, rate limit detection,
-token/result extraction from JSON envelope.
+token/result extraction from JSON envelope, and the process-wide CLI
+governor that caps concurrent `claude` subprocesses across all pipelines.
 
 Previously split across agents/claude.py and nodes/llm_utils.py — unified in M25/T136.
 """
@@ -18,10 +19,20 @@ import logging
 import os
 import random
 import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Sequence
 
 from .config import CLAUDE_CLI_PATH, CLAUDE_SKIP_PERMISSIONS, CLAUDE_MCP_CONFIG
+from .llm_cache import cache_key, file_content_hash, get_llm_cache
+from .settings import (
+    CLAUDE_CLI_AIMD_DECREASE_FACTOR,
+    CLAUDE_CLI_INITIAL_CONCURRENCY,
+    CLAUDE_CLI_MAX_CONCURRENCY,
+    CLAUDE_CLI_MIN_CONCURRENCY,
+    CLAUDE_CLI_THROTTLE_COOLDOWN,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -114,6 +125,185 @@ def resolve_screenshot(screenshot_path: str, base_dir: str, caller: str) -> str:
     return abs_path
 
 
+# ---------------------------------------------------------------------------
+# Process-wide CLI governor
+# ---------------------------------------------------------------------------
+
+# Priority class per pipeline (lower runs first). Frame classification and
+# spec analysis are short, user-facing calls; batch agent runs are long.
+PIPELINE_PRIORITIES: Dict[str, int] = {
+    "classify": 0,
+    "spec": 1,
+    "default": 1,
+    "batch": 2,
+}
+
+
+class CLIGovernor:
+    """Caps concurrent Claude CLI subprocesses for the whole worker process.
+
+    Waiters are queued per priority class; within a class, jobs are served
+    round-robin (one slot grant per job in turn) so a job with many pending
+    calls cannot starve another job of the same class.
+
+    The cap adapts AIMD-style between min_concurrency and max_concurrency:
+    each successful call adds 1/limit (about +1 per limit's worth of
+    successes), and a rate-limit error multiplies it by decrease_factor —
+    at most once per throttle_cooldown, so one burst of 429s from calls
+    already in flight counts as a single throttle event.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = CLAUDE_CLI_MAX_CONCURRENCY,
+        min_concurrency: int = CLAUDE_CLI_MIN_CONCURRENCY,
+        initial_concurrency: int = CLAUDE_CLI_INITIAL_CONCURRENCY,
+        decrease_factor: float = CLAUDE_CLI_AIMD_DECREASE_FACTOR,
+        throttle_cooldown: float = CLAUDE_CLI_THROTTLE_COOLDOWN,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = min(max(1, min_concurrency), self.max_concurrency)
+        self._limit = float(
+            min(max(initial_concurrency, self.min_concurrency), self.max_concurrency)
+        )
+        self.decrease_factor = decrease_factor
+        self.throttle_cooldown = throttle_cooldown
+        self._last_throttle = float("-inf")
+        self._active = 0
+        # priority -> job key -> FIFO of waiter futures
+        self._queues: Dict[int, "OrderedDict[str, Deque[asyncio.Future]]"] = {}
+        self.total_acquired = 0
+        self.total_wait_ms = 0
+        self.throttle_events = 0
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency cap."""
+        return int(self._limit)
+
+    def queued(self) -> int:
+        return sum(len(q) for jobs in self._queues.values() for q in jobs.values())
+
+    async def acquire(self, pipeline: str = "default", job_id: str = "") -> int:
+        """Wait for a slot; returns the time spent queued in ms."""
+        start = time.monotonic()
+        if self._active < self.limit and not self.queued():
+            self._active += 1
+        else:
+            priority = PIPELINE_PRIORITIES.get(pipeline, PIPELINE_PRIORITIES["default"])
+            jobs = self._queues.setdefault(priority, OrderedDict())
+            waiters = jobs.setdefault(job_id or f"{pipeline}:anonymous", deque())
+            waiter = asyncio.get_running_loop().create_future()
+            waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Granted just as we were cancelled: hand the slot on
+                    self.release()
+                else:
+                    self._discard(waiter)
+                raise
+        wait_ms = int((time.monotonic() - start) * 1000)
+        self.total_acquired += 1
+        self.total_wait_ms += wait_ms
+        return wait_ms
+
+    def release(self) -> None:
+        """Free a slot and grant queued waiters up to the current limit."""
+        self._active = max(0, self._active - 1)
+        self._wake()
+
+    def record_success(self) -> None:
+        """Additive increase after a call that was not rate-limited."""
+        if self._limit < self.max_concurrency:
+            self._limit = min(self.max_concurrency, self._limit + 1.0 / self._limit)
+            self._wake()
+
+    def record_rate_limit(self) -> None:
+        """Multiplicative decrease after a rate-limit error."""
+        now = time.monotonic()
+        if now - self._last_throttle < self.throttle_cooldown:
+            return
+        self._last_throttle = now
+        self.throttle_events += 1
+        self._limit = max(float(self.min_concurrency), self._limit * self.decrease_factor)
+        logger.warning(
+            "CLIGovernor: rate limited, concurrency cut to %d (throttle #%d)",
+            self.limit, self.throttle_events,
+        )
+
+    @asynccontextmanager
+    async def slot(self, pipeline: str = "default", job_id: str = "") -> AsyncIterator[int]:
+        """async with governor.slot(...) as wait_ms: — one CLI subprocess."""
+        wait_ms = await self.acquire(pipeline, job_id)
+        try:
+            yield wait_ms
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "concurrency": self.limit,
+            "throttle_events": self.throttle_events,
+            "active": self._active,
+            "queued": self.queued(),
+            "total_acquired": self.total_acquired,
+            "total_wait_ms": self.total_wait_ms,
+        }
+
+    def _wake(self) -> None:
+        while self._active < self.limit:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            self._active += 1
+            waiter.set_result(None)
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        for priority in sorted(self._queues):
+            jobs = self._queues[priority]
+            while jobs:
+                job_key, waiters = next(iter(jobs.items()))
+                waiter = waiters.popleft()
+                # Round-robin: this job goes to the back of its class
+                if waiters:
+                    jobs.move_to_end(job_key)
+                else:
+                    del jobs[job_key]
+                if not waiter.done():
+                    return waiter
+            del self._queues[priority]
+        return None
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        for priority, jobs in list(self._queues.items()):
+            for job_key, waiters in list(jobs.items()):
+                if waiter in waiters:
+                    waiters.remove(waiter)
+                    if not waiters:
+                        del jobs[job_key]
+                    if not jobs:
+                        del self._queues[priority]
+                    return
+
+
+_governor: Optional[CLIGovernor] = None
+
+
+def get_cli_governor() -> CLIGovernor:
+    """Process-wide CLIGovernor (created on first use)."""
+    global _governor
+    if _governor is None:
+        _governor = CLIGovernor()
+    return _governor
+
+
 # ---------------------------------------------------------------------------
 # Structured Event Types (used by streaming mode)
 # ---------------------------------------------------------------------------
@@ -127,7 +317,7 @@ class ClaudeEvent:
     RESULT = "result"
 
     __slots__ = ("type", "content", "tool_name", "tool_input", "timestamp",
-                 "is_error", "usage", "cost_usd", "duration_ms")
+                 "is_error", "usage", "cost_usd", "duration_ms", "queue_wait_ms")
 
     def __init__(
         self,
@@ -140,6 +330,7 @@ class ClaudeEvent:
         usage: Optional[Dict[str, Any]] = None,
         cost_usd: Optional[float] = None,
         duration_ms: Optional[float] = None,
+        queue_wait_ms: Optional[int] = None,
     ):
         self.type = type
         self.content = content
@@ -150,6 +341,7 @@ class ClaudeEvent:
         self.usage = usage
         self.cost_usd = cost_usd
         self.duration_ms = duration_ms
+        self.queue_wait_ms = queue_wait_ms
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to SSE-ready dict."""
@@ -170,6 +362,8 @@ class ClaudeEvent:
             d["cost_usd"] = self.cost_usd
         if self.duration_ms is not None:
             d["duration_ms"] = self.duration_ms
+        if self.queue_wait_ms is not None:
+            d["queue_wait_ms"] = self.queue_wait_ms
         return d
 
 
@@ -222,25 +416,55 @@ async def invoke_oneshot(
     max_retries: int = 2,
     retry_base_delay: float = 10.0,
     screenshot_path: str = "",
+    screenshot_tiles: Sequence[str] = (),
     allowed_tools: Optional[List[str]] = None,
     no_tools: bool = False,
     component_name: str = "unknown",
     caller: str = "ClaudeCLI",
+    pipeline: str = "default",
+    job_id: str = "",
+    cache: bool = True,
 ) -> Dict[str, Any]:
     """Oneshot Claude CLI invocation with retry and exponential backoff.
 
     Builds prompt (including screenshot instructions if provided), invokes
     Claude CLI as a subprocess, parses the JSON envelope, and extracts
-    text + token usage.
+    text + token usage. Each attempt holds a CLI governor slot (released
+    during backoff sleeps); pipeline/job_id pick its priority and fair-share
+    queue.
+
+    Successful responses are stored in the on-disk LLM response cache
+    (workflow/llm_cache.py); an identical later call (same prompt, model,
+    tools and screenshot content) returns the stored text and original
+    token_usage without spawning the CLI. cache=False bypasses it.
 
-    Returns {"text": str, "token_usage": dict|None, "retry_count": int, "duration_ms": int}.
+    screenshot_tiles: several images of one screenshot, top to bottom (a
+    tall frame split by spec/screenshot_prep.py); used instead of
+    screenshot_path when it has more than one entry.
+
+    Returns {"text": str, "token_usage": dict|None, "retry_count": int,
+    "duration_ms": int, "queue_wait_ms": int, "cached": bool}.
     Raises RuntimeError on CLI failure, TimeoutError on timeout (after all retries).
     """
-    # Resolve screenshot absolute path
+    # Resolve screenshot absolute path(s)
+    tiles_abs: List[str] = []
+    if len(screenshot_tiles) > 1:
+        tiles_abs = [p for p in (resolve_screenshot(t, cwd, caller) for t in screenshot_tiles) if p]
+        screenshot_path = "" if tiles_abs else screenshot_path
     screenshot_abs = resolve_screenshot(screenshot_path, cwd, caller)
 
     # Build full prompt with screenshot instruction if applicable
-    if screenshot_abs:
+    if tiles_abs:
+        tile_list = "\n".join(f"{i + 1}. {p}" for i, p in enumerate(tiles_abs))
+        full_prompt = (
+            f"{prompt}\n\n"
+            "First, read the screenshot images below. They are consecutive vertical "
+            "slices of one screenshot, top to bottom, with a small overlap:\n"
+            f"{tile_list}\n"
+            "Use them together as visual reference for your analysis."
+        )
+        tools = allowed_tools or ["Read"]
+    elif screenshot_abs:
         full_prompt = (
             f"{prompt}\n\n"
             f"First, read the screenshot image at: {screenshot_abs}\n"
@@ -263,11 +487,40 @@ async def invoke_oneshot(
     )
 
     cli_env = clean_env()
+    _start_time = time.monotonic()
+
+    # Content-addressed response cache
+    response_cache = get_llm_cache() if cache else None
+    key = ""
+    if response_cache is not None:
+        if tiles_abs:
+            tile_hashes = [await asyncio.to_thread(file_content_hash, p) for p in tiles_abs]
+            screenshot_hash = "tiles:" + ",".join(tile_hashes)
+        else:
+            screenshot_hash = (
+                await asyncio.to_thread(file_content_hash, screenshot_abs) if screenshot_abs else ""
+            )
+        key = cache_key(
+            prompt, model=model, allowed_tools=tools,
+            no_tools=no_tools if not tools else False, screenshot_hash=screenshot_hash,
+        )
+        hit = await asyncio.to_thread(response_cache.get, key)
+        if hit is not None:
+            logger.info("%s: cache hit for %s", caller, component_name)
+            return {
+                "text": hit["text"],
+                "token_usage": hit["token_usage"],
+                "retry_count": 0,
+                "duration_ms": int((time.monotonic() - _start_time) * 1000),
+                "queue_wait_ms": 0,
+                "cached": True,
+            }
 
     last_error: Optional[Exception] = None
     _is_rate_limited = False
     attempts = 1 + max(0, max_retries)
-    _start_time = time.monotonic()
+    governor = get_cli_governor()
+    queue_wait_ms = 0
 
     for attempt in range(attempts):
         if attempt > 0:
@@ -289,20 +542,24 @@ async def invoke_oneshot(
         )
 
         try:
-            proc = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                env=cli_env,
-            )
-
-            try:
-                stdout, stderr = await asyncio.wait_for(
-                    proc.communicate(), timeout=timeout,
+            async with governor.slot(pipeline, job_id) as wait_ms:
+                queue_wait_ms += wait_ms
+                proc = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    env=cli_env,
                 )
-            except asyncio.TimeoutError:
-                proc.kill()
-                await proc.communicate()
+
+                try:
+                    stdout, stderr = await asyncio.wait_for(
+                        proc.communicate(), timeout=timeout,
+                    )
+                except asyncio.TimeoutError:
+                    proc.kill()
+                    await proc.communicate()
+                    stdout = None
+            if stdout is None:
                 last_error = TimeoutError(
                     f"Claude CLI timed out ({timeout}s) for {component_name}"
                 )
@@ -325,22 +582,31 @@ async def invoke_oneshot(
                 if not err_msg and isinstance(cli_output, dict):
                     err_msg = cli_output.get("result", "")
                 _is_rate_limited = is_rate_limit_error(err_msg)
+                if _is_rate_limited:
+                    governor.record_rate_limit()
                 last_error = RuntimeError(
                     f"Claude CLI failed (exit {proc.returncode}) for "
                     f"{component_name}: {err_msg[:500]}"
                 )
                 continue
 
+            governor.record_success()
+
             # Extract token usage and result text
             token_usage = extract_token_usage(cli_output) if isinstance(cli_output, dict) else None
             result_text = extract_result_text(raw_text, cli_output)
 
+            if response_cache is not None:
+                await asyncio.to_thread(response_cache.put, key, result_text, token_usage)
+
             duration_ms = int((time.monotonic() - _start_time) * 1000)
             return {
                 "text": result_text,
                 "token_usage": token_usage,
                 "retry_count": attempt,
                 "duration_ms": duration_ms,
+                "queue_wait_ms": queue_wait_ms,
+                "cached": False,
             }
 
         except (TimeoutError, RuntimeError):
@@ -363,13 +629,40 @@ async def invoke_stream(
     cwd: str = ".",
     timeout: float = 300.0,
     on_event: Optional[Callable[[ClaudeEvent], None]] = None,
+    pipeline: str = "default",
+    job_id: str = "",
 ) -> str:
     """Run Claude CLI with stream-json and emit structured events.
 
     Uses --output-format stream-json --verbose to get NDJSON events.
     Parses assistant/result events and calls on_event for each structured event.
+    The subprocess runs under a CLI governor slot; the time spent queued for
+    it is reported as queue_wait_ms on the RESULT event, and the RESULT
+    outcome feeds the governor's adaptive concurrency.
     Returns the final result text.
     """
+    governor = get_cli_governor()
+    async with governor.slot(pipeline, job_id) as wait_ms:
+        def callback(event: ClaudeEvent) -> None:
+            if event.type == ClaudeEvent.RESULT:
+                event.queue_wait_ms = wait_ms
+                if not event.is_error:
+                    governor.record_success()
+                elif is_rate_limit_error(event.content):
+                    governor.record_rate_limit()
+            if on_event:
+                on_event(event)
+
+        return await _run_stream(prompt, cwd, timeout, callback)
+
+
+async def _run_stream(
+    prompt: str,
+    cwd: str,
+    timeout: float,
+    on_event: Optional[Callable[[ClaudeEvent], None]],
+) -> str:
+    """invoke_stream body; caller holds the governor slot."""
     cmd = build_cli_args(
         prompt,
         output_format="stream-json",
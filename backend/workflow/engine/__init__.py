@@ -1,6 +1,7 @@
 """Workflow Engine: graph building, execution, and expression evaluation."""
 
 from .graph_builder import (
+    CompiledWorkflow,
     EdgeDefinition,
     LoopInfo,
     NodeConfig,
@@ -9,12 +10,20 @@ from .graph_builder import (
     WorkflowDefinition,
     build_graph_from_config,
     detect_loops,
+    get_compiled_workflow,
     validate_workflow,
 )
 from .executor import MaxIterationsExceeded, execute_dynamic_workflow
-from .safe_eval import SafeEvalError, safe_eval, validate_condition_expression
+from .safe_eval import (
+    CompiledExpression,
+    SafeEvalError,
+    compile_expression,
+    safe_eval,
+    validate_condition_expression,
+)
 
 __all__ = [
+    "CompiledWorkflow",
     "EdgeDefinition",
     "LoopInfo",
     "NodeConfig",
@@ -23,10 +32,13 @@ __all__ = [
     "WorkflowDefinition",
     "build_graph_from_config",
     "detect_loops",
+    "get_compiled_workflow",
     "validate_workflow",
     "MaxIterationsExceeded",
     "execute_dynamic_workflow",
+    "CompiledExpression",
     "SafeEvalError",
+    "compile_expression",
     "safe_eval",
     "validate_condition_expression",
 ]
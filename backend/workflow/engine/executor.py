@@ -1,22 +1,20 @@
 """Dynamic Workflow Executor
 
 Executes dynamically-built LangGraph workflows with SSE event notifications.
-Bridges dynamic_graph.build_graph_from_config with the SSE push infrastructure.
+Bridges the compiled graph cache (graph_builder.get_compiled_workflow) with
+the SSE push infrastructure.
 """
 
 from __future__ import annotations
 
-import json
 import logging
 from collections import defaultdict
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
-from .graph_builder import (
-    WorkflowDefinition,
-    build_graph_from_config,
-    detect_loops,
-)
+from .graph_builder import WorkflowDefinition, get_compiled_workflow
+from .state_delta import NodeOutputEncoder, merge_node_output
+from ..settings import NODE_OUTPUT_SCHEMA_VERSION, NODE_OUTPUT_SNAPSHOT_EVERY
 from ..sse import notify_node_status, push_sse_event
 
 logger = logging.getLogger(__name__)
@@ -38,6 +36,7 @@ async def execute_dynamic_workflow(
     workflow_def: WorkflowDefinition,
     initial_state: Dict[str, Any],
     run_id: str = "",
+    event_schema_version: Optional[int] = None,
 ) -> Dict[str, Any]:
     """Execute a dynamic workflow definition with SSE event tracking.
 
@@ -49,6 +48,9 @@ async def execute_dynamic_workflow(
         workflow_def: The validated workflow definition
         initial_state: Initial state dict (user inputs, parameters)
         run_id: Run ID for SSE event tracking
+        event_schema_version: node_output schema (1 = full state per node,
+            2 = deltas + periodic snapshots). Defaults to
+            NODE_OUTPUT_SCHEMA_VERSION.
 
     Returns:
         Final merged state dict with all node outputs
@@ -61,18 +63,29 @@ async def execute_dynamic_workflow(
     # Inject run_id into state for node-level SSE if needed
     state = {**initial_state, "run_id": run_id}
 
-    # Detect if this workflow has loops
-    loops = detect_loops(workflow_def)
+    # Build and compile the graph (cached per definition hash, along with
+    # its loop metadata)
+    try:
+        compiled = get_compiled_workflow(workflow_def)
+    except (ValueError, ImportError) as e:
+        logger.error(f"Failed to build graph: {e}")
+        if run_id:
+            await push_sse_event(run_id, "workflow_error", {
+                "error": str(e),
+                "timestamp": _now(),
+            })
+        return {"error": str(e), "success": False}
+
+    compiled_graph = compiled.graph
+    loops = compiled.loops
     has_loops = len(loops) > 0
-    loop_node_ids = set()
-    for loop in loops:
-        loop_node_ids.update(loop.cycle_path[:-1])
+    loop_node_ids = compiled.loop_node_ids
 
     if has_loops:
         logger.info(
             f"Workflow has {len(loops)} loop(s), "
             f"max_iterations={workflow_def.max_iterations}, "
-            f"loop nodes: {loop_node_ids}"
+            f"loop nodes: {set(loop_node_ids)}"
         )
 
     # Push workflow-level start event
@@ -85,24 +98,17 @@ async def execute_dynamic_workflow(
             "timestamp": _now(),
         })
 
-    # Build and compile the graph
-    try:
-        compiled_graph = build_graph_from_config(workflow_def)
-    except (ValueError, ImportError) as e:
-        logger.error(f"Failed to build graph: {e}")
-        if run_id:
-            await push_sse_event(run_id, "workflow_error", {
-                "error": str(e),
-                "timestamp": _now(),
-            })
-        return {"error": str(e), "success": False}
-
     # Per-node execution counter for loop control
     node_exec_count: Dict[str, int] = defaultdict(int)
 
     # Track which nodes have been notified as running
     notified_running = set()
 
+    output_encoder = NodeOutputEncoder(
+        schema_version=event_schema_version or NODE_OUTPUT_SCHEMA_VERSION,
+        snapshot_every=NODE_OUTPUT_SNAPSHOT_EVERY,
+    )
+
     # Execute with streaming to capture per-node events
     try:
         # Notify all nodes as pending initially
@@ -110,9 +116,8 @@ async def execute_dynamic_workflow(
             if run_id:
                 await notify_node_status(run_id, node_config.id, "pending")
 
-        # Calculate recursion_limit for loops
-        recursion_limit = workflow_def.max_iterations * len(workflow_def.nodes) + len(workflow_def.nodes)
-        config = {"recursion_limit": recursion_limit} if has_loops else {}
+        # recursion_limit for loops (precomputed with the compiled graph)
+        config = compiled.run_config
 
         # Stream execution — LangGraph emits {node_id: output} per step
         async for event in compiled_graph.astream(state, config=config):
@@ -148,19 +153,17 @@ async def execute_dynamic_workflow(
                 # graph_builder's node_func ({**prev_state, node_id: result, ...}).
                 # We merge all keys so top-level state (e.g. component_registry,
                 # current_index) stays current across loop iterations.
-                if isinstance(node_output, dict):
-                    state.update(node_output)
-                else:
-                    state[node_id] = node_output
+                ops = merge_node_output(
+                    state, node_id, node_output,
+                    track_changes=bool(run_id) and output_encoder.tracks_changes,
+                )
 
-                # Notify completed with output
+                # Notify completed with output (full state or delta, per schema)
                 if run_id:
-                    output_str = (
-                        node_output
-                        if isinstance(node_output, str)
-                        else json.dumps(node_output, ensure_ascii=False, default=str)
+                    output_str, extra = output_encoder.encode(node_output, ops, state)
+                    await notify_node_status(
+                        run_id, node_id, "completed", output_str, extra=extra
                     )
-                    await notify_node_status(run_id, node_id, "completed", output_str)
 
                 logger.info(
                     f"Node '{node_id}' completed "
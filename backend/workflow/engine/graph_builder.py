@@ -7,6 +7,7 @@ Key Components:
 - WorkflowDefinition: Declarative workflow configuration
 - EdgeDefinition: Edge connection definition
 - build_graph_from_config: Dynamic graph builder
+- get_compiled_workflow: Process-wide LRU cache of compiled graphs + loop metadata
 - Workflow validation and topological sorting
 
 Design Principles:
@@ -18,10 +19,12 @@ Design Principles:
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
-from collections import defaultdict, deque
+from collections import ChainMap, OrderedDict, defaultdict, deque
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
 
 # Optional langgraph import (only needed for build_graph_from_config)
 try:
@@ -33,7 +36,8 @@ except ImportError:
     StateGraph = None  # Placeholder
 
 from ..nodes.registry import create_node, is_node_type_registered
-from .safe_eval import SafeEvalError, safe_eval, validate_condition_expression
+from ..settings import GRAPH_CACHE_MAX_ENTRIES
+from .safe_eval import SafeEvalError, compile_expression, validate_condition_expression
 
 logger = logging.getLogger(__name__)
 
@@ -712,6 +716,126 @@ def build_graph_from_config(workflow: WorkflowDefinition):
     return graph.compile()
 
 
+# --- Compiled graph cache ---
+
+
+def workflow_definition_hash(workflow: WorkflowDefinition) -> str:
+    """Canonical SHA-256 of everything that affects the compiled graph."""
+    canonical = {
+        "name": workflow.name,
+        "nodes": [
+            {"id": n.id, "type": n.type, "config": n.config} for n in workflow.nodes
+        ],
+        "edges": [
+            {"id": e.id, "source": e.source, "target": e.target, "condition": e.condition}
+            for e in workflow.edges
+        ],
+        "entry_point": workflow.entry_point,
+        "max_iterations": workflow.max_iterations,
+        "merge_skip_keys": (
+            sorted(workflow.merge_skip_keys) if workflow.merge_skip_keys is not None else None
+        ),
+    }
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CompiledWorkflow:
+    """A compiled graph plus the loop metadata needed to run it.
+
+    Attributes:
+        graph: Compiled LangGraph graph (safe to share across runs)
+        loops: Detected loops
+        loop_node_ids: Node IDs that participate in any loop
+        recursion_limit: LangGraph step limit for looping workflows
+        definition_hash: Cache key (see workflow_definition_hash)
+    """
+    graph: Any
+    loops: List[LoopInfo]
+    loop_node_ids: frozenset
+    recursion_limit: int
+    definition_hash: str = ""
+
+    @property
+    def run_config(self) -> Dict[str, Any]:
+        """astream/ainvoke config: recursion_limit only when loops exist."""
+        return {"recursion_limit": self.recursion_limit} if self.loops else {}
+
+
+class CompiledGraphCache:
+    """LRU cache of CompiledWorkflow keyed by workflow definition hash.
+
+    Compiled graphs hold stateless node instances, so one entry can serve
+    any number of concurrent runs in the worker process.
+    """
+
+    def __init__(self, max_entries: int = GRAPH_CACHE_MAX_ENTRIES):
+        self._entries: "OrderedDict[str, CompiledWorkflow]" = OrderedDict()
+        self._max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, workflow: WorkflowDefinition) -> CompiledWorkflow:
+        """Return the compiled workflow, building it on a miss."""
+        key = workflow_definition_hash(workflow)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        graph = build_graph_from_config(workflow)
+        loops = detect_loops(workflow)
+        loop_node_ids = frozenset(
+            nid for loop in loops for nid in loop.cycle_path[:-1]
+        )
+        node_count = len(workflow.nodes)
+        entry = CompiledWorkflow(
+            graph=graph,
+            loops=loops,
+            loop_node_ids=loop_node_ids,
+            recursion_limit=workflow.max_iterations * node_count + node_count,
+            definition_hash=key,
+        )
+        self._entries[key] = entry
+        if len(self._entries) > self._max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            logger.info(f"Compiled graph cache evicted {evicted[:12]}")
+        logger.info(
+            f"Compiled workflow '{workflow.name}' ({key[:12]}), "
+            f"cache size={len(self._entries)}"
+        )
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "max_entries": self._max_entries,
+        }
+
+
+_compiled_graph_cache = CompiledGraphCache()
+
+
+def get_compiled_workflow(workflow: WorkflowDefinition) -> CompiledWorkflow:
+    """Compile (or fetch from the process-wide cache) a workflow definition."""
+    return _compiled_graph_cache.get(workflow)
+
+
+def get_compiled_graph_cache() -> CompiledGraphCache:
+    """The process-wide compiled graph cache (for stats / clearing)."""
+    return _compiled_graph_cache
+
+
 def _add_conditional_edges(
     graph,
     source_id: str,
@@ -754,28 +878,45 @@ def _add_conditional_edges(
         path_map[edge.target] = target
     path_map["__default__"] = default_target
 
+    # Compile each condition once at build time; a condition that fails to
+    # compile is kept so the router logs and skips it (never re-raised: the
+    # error would accumulate a traceback frame per routing decision)
+    compiled_conditions: List[Tuple[EdgeDefinition, Any]] = []
+    for edge in conditional_edges:
+        try:
+            compiled_conditions.append((edge, compile_expression(edge.condition)))
+        except SafeEvalError as e:
+            compiled_conditions.append((edge, e))
+
     # Create routing function
     def make_router(src_id, cond_edges, default):
-        def router(state: Dict[str, Any]) -> str:
+        def router(state: Mapping[str, Any]) -> str:
             """Evaluate conditions and return the target node ID."""
             # Build evaluation context from full state
             # The source node's output is available as state[source_id]
             node_output = state.get(src_id, {})
 
+            # Overlay source-node conveniences on the state without copying it
+            overrides: Dict[str, Any] = {}
+            if isinstance(node_output, Mapping):
+                overrides["result"] = node_output
+                # Also expose condition_result directly for condition nodes
+                if "condition_result" in node_output:
+                    overrides["condition_result"] = node_output["condition_result"]
+                if "branch_taken" in node_output:
+                    overrides["branch_taken"] = node_output["branch_taken"]
+            context = ChainMap(overrides, state)
+
             # Try each conditional edge in order
-            for edge in cond_edges:
+            for edge, condition in cond_edges:
+                if isinstance(condition, SafeEvalError):
+                    logger.error(
+                        f"Condition evaluation failed for edge {edge.id}: {condition}. "
+                        f"Skipping this condition."
+                    )
+                    continue
                 try:
-                    # Build context: merge state with source node output for convenience
-                    context = {**state}
-                    if isinstance(node_output, dict):
-                        context["result"] = node_output
-                        # Also expose condition_result directly for condition nodes
-                        if "condition_result" in node_output:
-                            context["condition_result"] = node_output["condition_result"]
-                        if "branch_taken" in node_output:
-                            context["branch_taken"] = node_output["branch_taken"]
-
-                    result = safe_eval(edge.condition, context)
+                    result = condition(context)
                     if result:
                         logger.info(
                             f"Conditional route: {src_id} -> {edge.target} "
@@ -797,7 +938,7 @@ def _add_conditional_edges(
 
         return router
 
-    routing_func = make_router(source_id, conditional_edges, default_target)
+    routing_func = make_router(source_id, compiled_conditions, default_target)
     graph.add_conditional_edges(source_id, routing_func, path_map)
 
 
@@ -10,6 +10,9 @@ Supported expressions:
 - Literals: "string", 42, 3.14, True, False, None
 - Field access: node_1["field"], result.status (dict dot access)
 - Arithmetic: x + 1, count * 2 (basic only)
+
+Expressions are compiled once (compile_expression) into a closure tree
+built from the whitelisted AST, then evaluated any number of times.
 """
 
 from __future__ import annotations
@@ -17,13 +20,18 @@ from __future__ import annotations
 import ast
 import logging
 import operator
-from typing import Any, Dict
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Callable
 
 logger = logging.getLogger(__name__)
 
 # Maximum expression length to prevent abuse
 MAX_EXPRESSION_LENGTH = 500
 
+# Distinct expressions kept compiled (process-wide)
+COMPILED_CACHE_SIZE = 1024
+
 # Safe binary operators
 _SAFE_COMPARE_OPS = {
     ast.Eq: operator.eq,
@@ -56,18 +64,40 @@ class SafeEvalError(Exception):
     pass
 
 
-def safe_eval(expression: str, context: Dict[str, Any]) -> Any:
-    """Safely evaluate an expression against a context dictionary.
+class CompiledExpression:
+    """A validated expression compiled into a tree of closures.
 
-    Args:
-        expression: The expression string to evaluate
-        context: Dictionary of variable names to values
+    Compile once (compile_expression), evaluate many times against any
+    mapping — no re-parsing and no AST walk per evaluation.
+    """
 
-    Returns:
-        The result of evaluating the expression
+    __slots__ = ("expression", "_fn")
+
+    def __init__(self, expression: str, fn: Callable[[Mapping[str, Any]], Any]):
+        self.expression = expression
+        self._fn = fn
+
+    def __call__(self, context: Mapping[str, Any]) -> Any:
+        try:
+            return self._fn(context)
+        except SafeEvalError:
+            raise
+        except Exception as e:
+            raise SafeEvalError(f"Evaluation error: {e}") from e
+
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.expression!r})"
+
+
+@lru_cache(maxsize=COMPILED_CACHE_SIZE)
+def compile_expression(expression: str) -> CompiledExpression:
+    """Parse and validate an expression once, returning a reusable evaluator.
+
+    Results are cached per expression string, so repeated compiles (e.g.
+    the same condition on every loop iteration) are free.
 
     Raises:
-        SafeEvalError: If expression is invalid or uses unsupported constructs
+        SafeEvalError: If expression is empty, too long, or has invalid syntax
     """
     if not expression or not expression.strip():
         raise SafeEvalError("Expression cannot be empty")
@@ -84,116 +114,165 @@ def safe_eval(expression: str, context: Dict[str, Any]) -> Any:
     except SyntaxError as e:
         raise SafeEvalError(f"Invalid expression syntax: {e}") from e
 
-    try:
-        return _eval_node(tree.body, context)
-    except SafeEvalError:
-        raise
-    except Exception as e:
-        raise SafeEvalError(f"Evaluation error: {e}") from e
+    return CompiledExpression(expression, _compile_node(tree.body))
+
 
+def safe_eval(expression: str, context: Mapping[str, Any]) -> Any:
+    """Safely evaluate an expression against a context dictionary.
 
-def _eval_node(node: ast.AST, context: Dict[str, Any]) -> Any:
-    """Recursively evaluate an AST node."""
+    Args:
+        expression: The expression string to evaluate
+        context: Mapping of variable names to values (read-only)
+
+    Returns:
+        The result of evaluating the expression
+
+    Raises:
+        SafeEvalError: If expression is invalid or uses unsupported constructs
+    """
+    return compile_expression(expression)(context)
+
+
+def _raiser(message: str) -> Callable[[Mapping[str, Any]], Any]:
+    """Unsupported construct: fail when (and only when) it is evaluated."""
+    def fn(context):
+        raise SafeEvalError(message)
+    return fn
+
+
+_NAME_CONSTANTS = {
+    "true": True, "True": True,
+    "false": False, "False": False,
+    "none": None, "None": None,
+}
+
+
+def _compile_node(node: ast.AST) -> Callable[[Mapping[str, Any]], Any]:
+    """Compile a whitelisted AST node into a closure taking the context."""
 
     # Literal values: 42, "hello", True, None
     if isinstance(node, ast.Constant):
-        return node.value
+        value = node.value
+        return lambda context: value
 
     # Variable names: x, status, result
     if isinstance(node, ast.Name):
         name = node.id
         # Python builtins for boolean/none
-        if name == "true" or name == "True":
-            return True
-        if name == "false" or name == "False":
-            return False
-        if name == "none" or name == "None":
-            return None
-        if name in context:
-            return context[name]
-        raise SafeEvalError(f"Unknown variable: '{name}'")
+        if name in _NAME_CONSTANTS:
+            constant = _NAME_CONSTANTS[name]
+            return lambda context: constant
+
+        def lookup(context):
+            if name in context:
+                return context[name]
+            raise SafeEvalError(f"Unknown variable: '{name}'")
+        return lookup
 
     # Comparisons: x > 10, a == b, x in [1,2,3]
     if isinstance(node, ast.Compare):
-        left = _eval_node(node.left, context)
+        left_fn = _compile_node(node.left)
+        steps = []
         for op, comparator in zip(node.ops, node.comparators):
             op_func = _SAFE_COMPARE_OPS.get(type(op))
             if op_func is None:
-                raise SafeEvalError(f"Unsupported comparison: {type(op).__name__}")
-            right = _eval_node(comparator, context)
-            if not op_func(left, right):
-                return False
-            left = right
-        return True
+                return _raiser(f"Unsupported comparison: {type(op).__name__}")
+            steps.append((op_func, _compile_node(comparator)))
+
+        def compare(context):
+            left = left_fn(context)
+            for op_func, right_fn in steps:
+                right = right_fn(context)
+                if not op_func(left, right):
+                    return False
+                left = right
+            return True
+        return compare
 
     # Boolean operators: x and y, a or b
     if isinstance(node, ast.BoolOp):
+        value_fns = [_compile_node(v) for v in node.values]
         if isinstance(node.op, ast.And):
-            return all(_eval_node(v, context) for v in node.values)
+            return lambda context: all(fn(context) for fn in value_fns)
         if isinstance(node.op, ast.Or):
-            return any(_eval_node(v, context) for v in node.values)
-        raise SafeEvalError(f"Unsupported boolean op: {type(node.op).__name__}")
+            return lambda context: any(fn(context) for fn in value_fns)
+        return _raiser(f"Unsupported boolean op: {type(node.op).__name__}")
 
     # Unary operators: not x, -n
     if isinstance(node, ast.UnaryOp):
         op_func = _SAFE_UNARY_OPS.get(type(node.op))
         if op_func is None:
-            raise SafeEvalError(f"Unsupported unary op: {type(node.op).__name__}")
-        return op_func(_eval_node(node.operand, context))
+            return _raiser(f"Unsupported unary op: {type(node.op).__name__}")
+        operand_fn = _compile_node(node.operand)
+        return lambda context: op_func(operand_fn(context))
 
     # Binary operators: x + 1, count * 2
     if isinstance(node, ast.BinOp):
         op_func = _SAFE_BIN_OPS.get(type(node.op))
         if op_func is None:
-            raise SafeEvalError(f"Unsupported binary op: {type(node.op).__name__}")
-        left = _eval_node(node.left, context)
-        right = _eval_node(node.right, context)
-        return op_func(left, right)
+            return _raiser(f"Unsupported binary op: {type(node.op).__name__}")
+        left_fn = _compile_node(node.left)
+        right_fn = _compile_node(node.right)
+        return lambda context: op_func(left_fn(context), right_fn(context))
 
     # Subscript access: data["key"], items[0]
     if isinstance(node, ast.Subscript):
-        value = _eval_node(node.value, context)
-        key = _eval_node(node.slice, context)
-        try:
-            return value[key]
-        except (KeyError, IndexError, TypeError) as e:
-            raise SafeEvalError(f"Subscript access failed: {e}") from e
+        value_fn = _compile_node(node.value)
+        key_fn = _compile_node(node.slice)
+
+        def subscript(context):
+            value = value_fn(context)
+            key = key_fn(context)
+            try:
+                return value[key]
+            except (KeyError, IndexError, TypeError) as e:
+                raise SafeEvalError(f"Subscript access failed: {e}") from e
+        return subscript
 
     # Attribute access: result.status (only on dicts)
     if isinstance(node, ast.Attribute):
-        value = _eval_node(node.value, context)
-        if isinstance(value, dict):
-            if node.attr in value:
-                return value[node.attr]
+        value_fn = _compile_node(node.value)
+        attr = node.attr
+
+        def attribute(context):
+            value = value_fn(context)
+            if isinstance(value, Mapping):
+                if attr in value:
+                    return value[attr]
+                raise SafeEvalError(
+                    f"Key '{attr}' not found in dict"
+                )
             raise SafeEvalError(
-                f"Key '{node.attr}' not found in dict"
+                "Attribute access only supported on dict-like objects"
             )
-        raise SafeEvalError(
-            "Attribute access only supported on dict-like objects"
-        )
+        return attribute
 
     # List literals: [1, 2, 3]
     if isinstance(node, ast.List):
-        return [_eval_node(elt, context) for elt in node.elts]
+        elt_fns = [_compile_node(elt) for elt in node.elts]
+        return lambda context: [fn(context) for fn in elt_fns]
 
     # Tuple literals: (1, 2)
     if isinstance(node, ast.Tuple):
-        return tuple(_eval_node(elt, context) for elt in node.elts)
+        elt_fns = [_compile_node(elt) for elt in node.elts]
+        return lambda context: tuple(fn(context) for fn in elt_fns)
 
     # Dict literals: {"a": 1}
     if isinstance(node, ast.Dict):
-        return {
-            _eval_node(k, context): _eval_node(v, context)
+        pair_fns = [
+            (_compile_node(k), _compile_node(v))
             for k, v in zip(node.keys, node.values)
-        }
+        ]
+        return lambda context: {k_fn(context): v_fn(context) for k_fn, v_fn in pair_fns}
 
     # IfExp: x if condition else y
     if isinstance(node, ast.IfExp):
-        if _eval_node(node.test, context):
-            return _eval_node(node.body, context)
-        return _eval_node(node.orelse, context)
+        test_fn = _compile_node(node.test)
+        body_fn = _compile_node(node.body)
+        orelse_fn = _compile_node(node.orelse)
+        return lambda context: body_fn(context) if test_fn(context) else orelse_fn(context)
 
-    raise SafeEvalError(f"Unsupported expression type: {type(node).__name__}")
+    return _raiser(f"Unsupported expression type: {type(node).__name__}")
 
 
 def validate_condition_expression(expression: str) -> list[str]:
@@ -0,0 +1,101 @@
+"""Delta encoding for node_output SSE events.
+
+Each node in a dynamic graph returns the full merged state
+({**state, node_id: result, ...}), so shipping it verbatim costs
+O(nodes × state size) bytes per run. Schema version 2 ships only the
+top-level keys a node changed, as JSON-patch style operations, plus a
+periodic full snapshot so late or lossy clients can re-sync.
+
+node_output payloads:
+- v1: {"node", "output": <JSON of the node's full output>}
+- v2: {"node", "output": <JSON of patch ops or snapshot>,
+       "schema_version": 2, "kind": "delta" | "snapshot", "seq": n}
+
+Patch ops: {"op": "add" | "replace", "path": "/<key>", "value": ...}
+(paths are RFC 6901 escaped; merging never removes keys).
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+SCHEMA_FULL = 1
+SCHEMA_DELTA = 2
+
+
+def _pointer(key: Any) -> str:
+    """RFC 6901 JSON pointer for a top-level key."""
+    return "/" + str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _changed(old: Any, new: Any) -> bool:
+    if old is new:
+        return False
+    try:
+        return bool(old != new)
+    except Exception:
+        return True
+
+
+def merge_node_output(
+    state: Dict[str, Any],
+    node_id: str,
+    node_output: Any,
+    track_changes: bool = True,
+) -> Optional[List[Dict[str, Any]]]:
+    """Merge a node's output into the tracked state in place.
+
+    Dict outputs are merged key by key; anything else is stored under
+    node_id. Returns the patch ops for the keys that actually changed,
+    or None when track_changes is False.
+    """
+    updates = node_output if isinstance(node_output, dict) else {node_id: node_output}
+
+    ops: Optional[List[Dict[str, Any]]] = [] if track_changes else None
+    if track_changes:
+        for key, value in updates.items():
+            if key not in state:
+                ops.append({"op": "add", "path": _pointer(key), "value": value})
+            elif _changed(state[key], value):
+                ops.append({"op": "replace", "path": _pointer(key), "value": value})
+
+    state.update(updates)
+    return ops
+
+
+class NodeOutputEncoder:
+    """Builds node_output payloads for one run in the requested schema."""
+
+    def __init__(self, schema_version: int = SCHEMA_DELTA, snapshot_every: int = 10):
+        self.schema_version = schema_version
+        self.snapshot_every = max(1, snapshot_every)
+        self._seq = 0
+
+    @property
+    def tracks_changes(self) -> bool:
+        return self.schema_version >= SCHEMA_DELTA
+
+    def encode(
+        self,
+        node_output: Any,
+        ops: Optional[List[Dict[str, Any]]],
+        state: Dict[str, Any],
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Return (output string, extra event fields) for one completion."""
+        if not self.tracks_changes:
+            output = (
+                node_output
+                if isinstance(node_output, str)
+                else json.dumps(node_output, ensure_ascii=False, default=str)
+            )
+            return output, {}
+
+        self._seq += 1
+        snapshot = (self._seq - 1) % self.snapshot_every == 0
+        body = state if snapshot else (ops or [])
+        return json.dumps(body, ensure_ascii=False, default=str), {
+            "schema_version": SCHEMA_DELTA,
+            "kind": "snapshot" if snapshot else "delta",
+            "seq": self._seq,
+        }
@@ -0,0 +1,79 @@
+"""Versioned on-disk cache for Figma REST API responses.
+
+Spec jobs and /design/scan-figma refetch the same node trees, variables and
+render URLs every run, even when the file has not changed. FigmaClient
+probes the file version once (GET /v1/files/:key?depth=1, cheap) and uses
+it as part of the key, so an edited file simply misses — there is no
+invalidation to get wrong.
+
+Key: SHA-256 over (file_key, endpoint, params, file version).
+
+Storage: a compressing BlobCache (workflow/blob_cache.py); multi-megabyte
+node trees shrink ~10x, PNG screenshots are stored as-is.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from ..blob_cache import BlobCache, open_blob_cache
+from ..settings import FIGMA_CACHE_DIR, FIGMA_CACHE_ENABLED, FIGMA_CACHE_MAX_BYTES, FIGMA_CACHE_TTL_SECONDS
+
+
+def response_key(
+    file_key: str,
+    endpoint: str,
+    params: Optional[Dict[str, Any]],
+    version: str,
+) -> str:
+    """Content-addressed key for one versioned Figma response."""
+    material = json.dumps(
+        {
+            "file_key": file_key,
+            "endpoint": endpoint,
+            "params": {k: str(v) for k, v in (params or {}).items()},
+            "version": version,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class FigmaResponseCache(BlobCache):
+    """Versioned Figma responses (raw bytes or JSON) in a compressing BlobCache."""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = FIGMA_CACHE_MAX_BYTES,
+        ttl_seconds: float = FIGMA_CACHE_TTL_SECONDS,
+    ):
+        super().__init__(path, max_bytes=max_bytes, ttl_seconds=ttl_seconds, compress=True)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_blob(key)
+
+    def put(self, key: str, data: bytes) -> None:
+        self.put_blob(key, data)
+
+    def get_json(self, key: str) -> Optional[Any]:
+        data = self.get_blob(key)
+        return json.loads(data) if data is not None else None
+
+    def put_json(self, key: str, value: Any) -> None:
+        self.put_blob(key, json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+_cache: Optional[FigmaResponseCache] = None
+
+
+def get_figma_cache() -> Optional[FigmaResponseCache]:
+    """Process-wide cache, or None when disabled or the store can't be opened."""
+    global _cache
+    if not FIGMA_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = open_blob_cache(FigmaResponseCache, FIGMA_CACHE_DIR)
+    return _cache
@@ -6,6 +6,9 @@ using Personal Access Token (PAT) authentication.
 Environment:
     FIGMA_TOKEN — Figma Personal Access Token (required)
 
+Responses for a given file version are served from an on-disk cache
+(figma_cache.py) after one cheap version probe per client.
+
 Usage:
     client = FigmaClient()
     nodes = await client.get_file_nodes("6kGd851qaAX4TiL44vpIrO", ["16650:538"])
@@ -13,14 +16,16 @@ Usage:
     export = await client.generate_design_export("6kGd851qaAX4TiL44vpIrO", "16650:538")
 """
 
+import asyncio
 import json
 import logging
 import os
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 import httpx
 
+from .figma_cache import FigmaResponseCache, get_figma_cache, response_key
 from .figma_classifiers import (
     associate_specs_to_screens,
     classify_frame_by_rules,
@@ -32,10 +37,32 @@ from .figma_classifiers import (
     variables_to_design_tokens,
 )
 
+from ..settings import (
+    FIGMA_DOWNLOAD_CONCURRENCY,
+    FIGMA_DOWNLOAD_MAX_RETRIES,
+    FIGMA_DOWNLOAD_RETRY_DELAY,
+    FIGMA_HTTP_TIMEOUT,
+)
+
 logger = logging.getLogger("workflow.integrations.figma")
 
 FIGMA_API_BASE = "https://api.figma.com"
 
+# Called as each screenshot lands: {"node_id", "path", "bytes", "completed", "total"}
+DownloadProgressCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+
 
 class FigmaClientError(Exception):
     """Raised when a Figma API call fails."""
@@ -47,12 +74,16 @@ class FigmaClient:
     Args:
         token: Figma PAT. Falls back to FIGMA_TOKEN env var.
         timeout: HTTP request timeout in seconds.
+        use_cache: Serve versioned responses from the on-disk cache.
+        cache: Cache instance to use (defaults to the process-wide one).
     """
 
     def __init__(
         self,
         token: Optional[str] = None,
         timeout: float = 60.0,
+        use_cache: bool = True,
+        cache: Optional[FigmaResponseCache] = None,
     ):
         self._token = token or os.getenv("FIGMA_TOKEN", "")
         if not self._token:
@@ -61,7 +92,12 @@ class FigmaClient:
                 "or pass token= to FigmaClient()."
             )
         self._client: Optional[httpx.AsyncClient] = None
+        self._download_client: Optional[httpx.AsyncClient] = None
         self._timeout = timeout
+        self._cache = (cache or get_figma_cache()) if use_cache else None
+        # file_key -> version, probed once per client (a client lives for one
+        # job / request, so edits made after that are picked up next time)
+        self._versions: Dict[str, Optional[str]] = {}
 
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None or self._client.is_closed:
@@ -73,10 +109,26 @@ class FigmaClient:
             )
         return self._client
 
+    async def _get_download_client(self) -> httpx.AsyncClient:
+        """Pooled client for rendered-image URLs (S3, no Figma auth header)."""
+        if self._download_client is None or self._download_client.is_closed:
+            self._download_client = httpx.AsyncClient(
+                timeout=FIGMA_HTTP_TIMEOUT,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=FIGMA_DOWNLOAD_CONCURRENCY,
+                    max_keepalive_connections=FIGMA_DOWNLOAD_CONCURRENCY,
+                ),
+            )
+        return self._download_client
+
     async def close(self) -> None:
         if self._client and not self._client.is_closed:
             await self._client.aclose()
             self._client = None
+        if self._download_client and not self._download_client.is_closed:
+            await self._download_client.aclose()
+            self._download_client = None
 
     async def _get(self, path: str, params: Optional[Dict] = None) -> Dict[str, Any]:
         """Make a GET request to the Figma API."""
@@ -104,6 +156,40 @@ class FigmaClient:
 
         return resp.json()
 
+    async def _file_version(self, file_key: str) -> Optional[str]:
+        if file_key not in self._versions:
+            self._versions[file_key] = await self.get_file_version(file_key)
+        return self._versions[file_key]
+
+    async def _get_cached(
+        self,
+        file_key: str,
+        path: str,
+        params: Optional[Dict] = None,
+        version: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """GET through the versioned response cache.
+
+        Falls back to a plain _get when caching is off or the file version
+        can't be determined (an unversioned response is never stored).
+        """
+        if self._cache is None:
+            return await self._get(path, params=params)
+        version = version or await self._file_version(file_key)
+        if not version:
+            return await self._get(path, params=params)
+
+        key = response_key(file_key, path, params, version)
+        cached = await asyncio.to_thread(self._cache.get_json, key)
+        if cached is not None:
+            logger.debug(f"_get_cached: hit {path} (version={version})")
+            return cached
+
+        data = await self._get(path, params=params)
+        if not data.get("err") and not data.get("error"):
+            await asyncio.to_thread(self._cache.put_json, key, data)
+        return data
+
     # ------------------------------------------------------------------
     # Core API methods
     # ------------------------------------------------------------------
@@ -135,7 +221,9 @@ class FigmaClient:
         GET /v1/files/:key/nodes?ids=...
         """
         ids_param = ",".join(node_ids)
-        data = await self._get(f"/v1/files/{file_key}/nodes", params={"ids": ids_param})
+        data = await self._get_cached(
+            file_key, f"/v1/files/{file_key}/nodes", params={"ids": ids_param},
+        )
         logger.info(
             f"get_file_nodes: file={file_key}, requested={len(node_ids)}, "
             f"returned={len(data.get('nodes', {}))}"
@@ -155,7 +243,7 @@ class FigmaClient:
         GET /v1/images/:key?ids=...&format=png&scale=2&version=...
         """
         if version is None:
-            version = await self.get_file_version(file_key)
+            version = await self._file_version(file_key)
 
         ids_param = ",".join(node_ids)
         params: Dict[str, str] = {
@@ -166,9 +254,8 @@ class FigmaClient:
         if version:
             params["version"] = version
 
-        data = await self._get(
-            f"/v1/images/{file_key}",
-            params=params,
+        data = await self._get_cached(
+            file_key, f"/v1/images/{file_key}", params=params, version=version,
         )
 
         if data.get("err"):
@@ -186,7 +273,7 @@ class FigmaClient:
         file_key: str,
     ) -> Dict[str, Any]:
         """Fetch published styles from a Figma file."""
-        data = await self._get(f"/v1/files/{file_key}/styles")
+        data = await self._get_cached(file_key, f"/v1/files/{file_key}/styles")
         styles = data.get("meta", {}).get("styles", [])
         logger.info(f"get_file_styles: file={file_key}, styles_count={len(styles)}")
         return data
@@ -196,7 +283,7 @@ class FigmaClient:
         file_key: str,
     ) -> Dict[str, Any]:
         """Fetch local variables from a Figma file."""
-        data = await self._get(f"/v1/files/{file_key}/variables/local")
+        data = await self._get_cached(file_key, f"/v1/files/{file_key}/variables/local")
         logger.info(f"get_file_variables: file={file_key}")
         return data
 
@@ -218,56 +305,205 @@ class FigmaClient:
         fmt: str = "png",
         scale: int = 2,
         version: Optional[str] = None,
+        on_progress: Optional[DownloadProgressCallback] = None,
     ) -> Dict[str, str]:
         """Download node screenshots to disk.
 
-        1. Calls get_node_images() to get render URLs
-        2. Downloads each image to {output_dir}/screenshots/{node_id}.{fmt}
+        1. Restores screenshots already cached for this file version
+        2. Calls get_node_images() to get render URLs for the rest
+        3. Downloads each image to {output_dir}/screenshots/{node_id}.{fmt}
+           (concurrently, see download_images) and caches the bytes
+
+        on_progress is reported for network downloads only.
         """
         screenshots_dir = os.path.join(output_dir, "screenshots")
         os.makedirs(screenshots_dir, exist_ok=True)
 
-        image_urls = await self.get_node_images(
-            file_key, node_ids, fmt=fmt, scale=scale, version=version,
-        )
+        if version is None:
+            version = await self._file_version(file_key)
 
-        client = await self._get_client()
         downloaded: Dict[str, str] = {}
-
-        for node_id, url in image_urls.items():
-            if not url:
-                logger.warning(f"download_screenshots: No image URL for node {node_id}")
-                continue
-
-            safe_id = node_id.replace(":", "_")
-            filename = f"{safe_id}.{fmt}"
-            filepath = os.path.join(screenshots_dir, filename)
-            rel_path = f"screenshots/{filename}"
-
-            try:
-                async with httpx.AsyncClient(timeout=60.0) as dl_client:
-                    img_resp = await dl_client.get(url)
-                if img_resp.status_code == 200:
-                    with open(filepath, "wb") as f:
-                        f.write(img_resp.content)
+        pending = list(node_ids)
+        if self._cache is not None and version:
+            pending = []
+            for node_id in node_ids:
+                rel_path = await self._restore_cached_image(
+                    file_key, node_id, fmt, scale, version, output_dir,
+                )
+                if rel_path:
                     downloaded[node_id] = rel_path
-                    logger.info(
-                        f"download_screenshots: {node_id} → {rel_path} "
-                        f"({len(img_resp.content)} bytes)"
-                    )
                 else:
-                    logger.warning(
-                        f"download_screenshots: Failed to download {node_id}: "
-                        f"HTTP {img_resp.status_code}"
+                    pending.append(node_id)
+            if downloaded:
+                logger.info(
+                    f"download_screenshots: {len(downloaded)} screenshots restored from cache"
+                )
+
+        if pending:
+            image_urls = await self.get_node_images(
+                file_key, pending, fmt=fmt, scale=scale, version=version,
+            )
+            for node_id, url in image_urls.items():
+                if not url:
+                    logger.warning(f"download_screenshots: No image URL for node {node_id}")
+
+            fresh = await self.download_images(
+                image_urls, output_dir, "screenshots", fmt, on_progress=on_progress,
+            )
+            downloaded.update(fresh)
+            if self._cache is not None and version:
+                for node_id, rel_path in fresh.items():
+                    await self._store_cached_image(
+                        file_key, node_id, fmt, scale, version,
+                        os.path.join(output_dir, rel_path),
                     )
-            except Exception as e:
-                logger.warning(f"download_screenshots: Error downloading {node_id}: {e}")
 
         logger.info(
             f"download_screenshots: {len(downloaded)}/{len(node_ids)} screenshots saved"
         )
         return downloaded
 
+    def _image_key(self, file_key: str, node_id: str, fmt: str, scale: int, version: str) -> str:
+        return response_key(
+            file_key, f"render/{node_id}", {"format": fmt, "scale": scale}, version,
+        )
+
+    async def _restore_cached_image(
+        self,
+        file_key: str,
+        node_id: str,
+        fmt: str,
+        scale: int,
+        version: str,
+        output_dir: str,
+    ) -> Optional[str]:
+        data = await asyncio.to_thread(
+            self._cache.get, self._image_key(file_key, node_id, fmt, scale, version),
+        )
+        if data is None:
+            return None
+        rel_path = f"screenshots/{node_id.replace(':', '_')}.{fmt}"
+        try:
+            await asyncio.to_thread(_write_bytes, os.path.join(output_dir, rel_path), data)
+        except OSError as e:
+            logger.warning(f"download_screenshots: cannot restore {node_id} from cache: {e}")
+            return None
+        return rel_path
+
+    async def _store_cached_image(
+        self,
+        file_key: str,
+        node_id: str,
+        fmt: str,
+        scale: int,
+        version: str,
+        filepath: str,
+    ) -> None:
+        try:
+            data = await asyncio.to_thread(_read_bytes, filepath)
+        except OSError:
+            return
+        await asyncio.to_thread(
+            self._cache.put, self._image_key(file_key, node_id, fmt, scale, version), data,
+        )
+
+    async def download_images(
+        self,
+        image_urls: Dict[str, Optional[str]],
+        output_dir: str,
+        subdir: str,
+        fmt: str = "png",
+        on_progress: Optional[DownloadProgressCallback] = None,
+    ) -> Dict[str, str]:
+        """Download rendered images concurrently over the pooled download client.
+
+        At most FIGMA_DOWNLOAD_CONCURRENCY downloads run at once. Each body is
+        streamed to a temp file off the event loop and renamed into place, so
+        a failed download never leaves a partial image. Transport errors,
+        429 and 5xx are retried FIGMA_DOWNLOAD_MAX_RETRIES times with
+        exponential backoff; other failures are logged and skipped.
+
+        Returns {node_id: "<subdir>/<safe_id>.<fmt>"} for saved images.
+        """
+        targets = {nid: url for nid, url in image_urls.items() if url}
+        if not targets:
+            return {}
+        target_dir = os.path.join(output_dir, subdir)
+        os.makedirs(target_dir, exist_ok=True)
+
+        client = await self._get_download_client()
+        sem = asyncio.Semaphore(FIGMA_DOWNLOAD_CONCURRENCY)
+        downloaded: Dict[str, str] = {}
+
+        async def _one(node_id: str, url: str) -> None:
+            filename = f"{node_id.replace(':', '_')}.{fmt}"
+            rel_path = f"{subdir}/{filename}"
+            async with sem:
+                size = await self._download_to_file(
+                    client, url, os.path.join(target_dir, filename), node_id,
+                )
+            if size is None:
+                return
+            downloaded[node_id] = rel_path
+            logger.info(f"download_images: {node_id} → {rel_path} ({size} bytes)")
+            if on_progress is not None:
+                try:
+                    await on_progress({
+                        "node_id": node_id,
+                        "path": rel_path,
+                        "bytes": size,
+                        "completed": len(downloaded),
+                        "total": len(targets),
+                    })
+                except Exception as e:
+                    logger.warning(f"download_images: progress callback failed: {e}")
+
+        await asyncio.gather(*[_one(nid, url) for nid, url in targets.items()])
+        return downloaded
+
+    async def _download_to_file(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        filepath: str,
+        node_id: str,
+    ) -> Optional[int]:
+        """Stream one URL to filepath with retry; returns bytes written or None."""
+        tmp_path = f"{filepath}.part"
+        attempts = 1 + max(0, FIGMA_DOWNLOAD_MAX_RETRIES)
+        for attempt in range(attempts):
+            if attempt > 0:
+                await asyncio.sleep(FIGMA_DOWNLOAD_RETRY_DELAY * (2 ** (attempt - 1)))
+            try:
+                async with client.stream("GET", url) as resp:
+                    if resp.status_code != 200:
+                        retryable = resp.status_code == 429 or resp.status_code >= 500
+                        logger.warning(
+                            f"download_images: Failed to download {node_id}: "
+                            f"HTTP {resp.status_code} (attempt {attempt + 1}/{attempts})"
+                        )
+                        if retryable:
+                            continue
+                        return None
+                    f = await asyncio.to_thread(open, tmp_path, "wb")
+                    size = 0
+                    try:
+                        async for chunk in resp.aiter_bytes(_DOWNLOAD_CHUNK_SIZE):
+                            await asyncio.to_thread(f.write, chunk)
+                            size += len(chunk)
+                    finally:
+                        await asyncio.to_thread(f.close)
+                await asyncio.to_thread(os.replace, tmp_path, filepath)
+                return size
+            except (httpx.HTTPError, OSError) as e:
+                logger.warning(
+                    f"download_images: Error downloading {node_id} "
+                    f"(attempt {attempt + 1}/{attempts}): {e}"
+                )
+        if os.path.exists(tmp_path):
+            await asyncio.to_thread(os.remove, tmp_path)
+        return None
+
     # ------------------------------------------------------------------
     # High-level: generate design_export.json
     # ------------------------------------------------------------------
@@ -382,40 +618,16 @@ class FigmaClient:
                 needs_screenshot_ids.append(ctx["node_id"])
 
         if output_dir and needs_screenshot_ids:
-            screenshots_dir = os.path.join(output_dir, "interaction_screenshots")
-            os.makedirs(screenshots_dir, exist_ok=True)
-
             try:
                 image_urls = await self.get_node_images(
                     file_key, needs_screenshot_ids, fmt="png", scale=1
                 )
-                for node_id, url in image_urls.items():
-                    if not url:
-                        continue
-                    safe_id = node_id.replace(":", "_")
-                    filename = f"{safe_id}.png"
-                    filepath = os.path.join(screenshots_dir, filename)
-                    rel_path = f"interaction_screenshots/{filename}"
-
-                    try:
-                        async with httpx.AsyncClient(timeout=60.0) as dl_client:
-                            img_resp = await dl_client.get(url)
-                        if img_resp.status_code == 200:
-                            with open(filepath, "wb") as f:
-                                f.write(img_resp.content)
-                            for ctx in results:
-                                if ctx["node_id"] == node_id:
-                                    ctx["screenshot_path"] = rel_path
-                                    break
-                            logger.info(
-                                f"extract_interaction_contexts: screenshot {node_id} "
-                                f"→ {rel_path} ({len(img_resp.content)} bytes)"
-                            )
-                    except Exception as e:
-                        logger.warning(
-                            f"extract_interaction_contexts: screenshot download "
-                            f"failed for {node_id}: {e}"
-                        )
+                downloaded = await self.download_images(
+                    image_urls, output_dir, "interaction_screenshots", "png",
+                )
+                for ctx in results:
+                    if ctx["node_id"] in downloaded:
+                        ctx["screenshot_path"] = downloaded[ctx["node_id"]]
             except FigmaClientError as e:
                 logger.warning(f"extract_interaction_contexts: image fetch failed: {e}")
 
@@ -451,8 +663,8 @@ class FigmaClient:
         target_y = bbox.get("y", 0)
 
         try:
-            file_data = await self._get(
-                f"/v1/files/{file_key}", params={"depth": "2"}
+            file_data = await self._get_cached(
+                file_key, f"/v1/files/{file_key}", params={"depth": "2"}
             )
         except FigmaClientError as e:
             logger.warning(f"resolve_to_page: failed to fetch file structure: {e}")
@@ -0,0 +1,93 @@
+"""Content-addressed on-disk cache for oneshot Claude CLI responses.
+
+invoke_oneshot() re-spawns the CLI for byte-identical prompts on job
+retries, re-runs after small Figma tweaks, and JSON-repair passes. This
+cache short-circuits those calls.
+
+Key: SHA-256 over (prompt, model, allowed tools, no_tools, screenshot file
+content hash) — the screenshot's path is deliberately not part of the key,
+so the same image in a different job directory still hits.
+
+Storage: a BlobCache (workflow/blob_cache.py) holding each response as JSON.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+from .blob_cache import BlobCache, open_blob_cache
+from .settings import LLM_CACHE_DIR, LLM_CACHE_ENABLED, LLM_CACHE_MAX_BYTES, LLM_CACHE_TTL_SECONDS
+
+
+def file_content_hash(path: str) -> str:
+    """SHA-256 of a file's bytes ('' if path is empty or unreadable)."""
+    if not path:
+        return ""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    except OSError:
+        return ""
+    return digest.hexdigest()
+
+
+def cache_key(
+    prompt: str,
+    *,
+    model: str = "",
+    allowed_tools: Optional[List[str]] = None,
+    no_tools: bool = False,
+    screenshot_hash: str = "",
+) -> str:
+    """Content-addressed key for one oneshot call."""
+    material = json.dumps(
+        {
+            "prompt": prompt,
+            "model": model,
+            "allowed_tools": sorted(allowed_tools or []),
+            "no_tools": no_tools,
+            "screenshot": screenshot_hash,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache(BlobCache):
+    """Oneshot CLI responses ({"text", "token_usage"}) in a BlobCache."""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+    ):
+        super().__init__(path, max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return {"text", "token_usage"} for a live entry, else None."""
+        data = self.get_blob(key)
+        return json.loads(data) if data is not None else None
+
+    def put(self, key: str, text: str, token_usage: Optional[Dict[str, int]]) -> None:
+        """Store a response, then evict least-recently-used entries over budget."""
+        payload = {"text": text, "token_usage": token_usage}
+        self.put_blob(key, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+
+_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Process-wide cache, or None when disabled or the store can't be opened."""
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = open_blob_cache(LLMResponseCache, LLM_CACHE_DIR)
+    return _cache
@@ -13,6 +13,7 @@ import re
 from typing import Any, Callable, Dict, Optional
 
 from ..agents.claude import run_claude_agent, stream_claude_events, ClaudeEvent
+from ..claude_cli_wrapper import get_cli_governor
 from .registry import BaseNodeImpl, register_node_type
 
 logger = logging.getLogger(__name__)
@@ -233,10 +234,14 @@ def _make_sse_event_callback(inputs: Dict[str, Any], node_id: str):
 
             # Push stats on result events
             if event.type == ClaudeEvent.RESULT and event.usage:
+                governor = get_cli_governor()
                 push_fn(job_id, "ai_thinking_stats", {
                     "tokens_in": event.usage.get("input_tokens", 0),
                     "tokens_out": event.usage.get("output_tokens", 0),
                     "cost": event.cost_usd or 0,
+                    "queue_wait_ms": event.queue_wait_ms or 0,
+                    "cli_concurrency": governor.limit,
+                    "throttle_events": governor.throttle_events,
                 })
         except Exception:
             # Don't let SSE push failures break the workflow
@@ -472,6 +477,7 @@ class LLMAgentNode(BaseNodeImpl):
         try:
             result = await stream_claude_events(
                 full_prompt, cwd=cwd, timeout=timeout, on_event=on_event,
+                pipeline="batch", job_id=inputs.get("job_id", ""),
             )
             success = bool(result) and not result.startswith("[Error]")
             # Detect structured failure indicators in the summary sections
@@ -698,6 +704,7 @@ class VerifyNode(BaseNodeImpl):
         try:
             response = await stream_claude_events(
                 full_prompt, cwd=cwd, timeout=timeout, on_event=on_event,
+                pipeline="batch", job_id=inputs.get("job_id", ""),
             )
 
             if not response or response.startswith("[Error]"):
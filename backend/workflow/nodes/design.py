@@ -13,9 +13,13 @@ import re
 from typing import Any, Dict, List, Optional
 
 from .registry import BaseNodeImpl, register_node_type
+from .spatial_index import SpatialIndex
 
 logger = logging.getLogger(__name__)
 
+# Max pixel gap between two components for them to count as neighbors
+_ADJACENCY_THRESHOLD = 50.0
+
 
 # ---------------------------------------------------------------------------
 # Module helpers
@@ -618,21 +622,24 @@ class DesignAnalyzerNode(BaseNodeImpl):
             logger.info("DesignAnalyzerNode: using pre-computed neighbors")
             return components
 
-        # Compute from bounding box distance
+        # Compute from bounding box distance. Any adjacent box lies within
+        # the threshold margin, so only grid candidates need the exact check.
+        index = SpatialIndex([comp.get("bounds") for comp in components])
         for i, comp_a in enumerate(components):
             neighbors = []
             a_bounds = comp_a.get("bounds", {})
-            for j, comp_b in enumerate(components):
-                if i == j:
-                    continue
-                b_bounds = comp_b.get("bounds", {})
-                if self._are_spatially_adjacent(a_bounds, b_bounds):
-                    neighbors.append(comp_b["name"])
+            if a_bounds:
+                for j in index.query(a_bounds, margin=_ADJACENCY_THRESHOLD):
+                    if j == i:
+                        continue
+                    b_bounds = components[j].get("bounds", {})
+                    if self._are_spatially_adjacent(a_bounds, b_bounds):
+                        neighbors.append(components[j]["name"])
             comp_a["neighbors"] = neighbors
         return components
 
     def _are_spatially_adjacent(
-        self, a: Dict[str, float], b: Dict[str, float], threshold: float = 50.0
+        self, a: Dict[str, float], b: Dict[str, float], threshold: float = _ADJACENCY_THRESHOLD
     ) -> bool:
         """Check if two bounding boxes are within threshold pixels of each other."""
         if not a or not b:
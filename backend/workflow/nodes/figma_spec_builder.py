@@ -11,6 +11,7 @@ from typing import Any, Dict, List, Optional
 import logging
 
 from .figma_utils import (
+    TokenIndex,
     detect_container_layout,
     detect_render_hint,
     figma_color_to_hex,
@@ -100,7 +101,7 @@ def _normalize_bounds(spec: Dict, origin_x: float, origin_y: float) -> Dict:
 def figma_node_to_component_spec(
     node: Dict,
     z_index: int = 0,
-    reverse_map: Optional[Dict[str, str]] = None,
+    token_index: Optional[TokenIndex] = None,
     depth: int = 0,
     parent_path: str = "",
 ) -> Optional[Dict[str, Any]]:
@@ -115,6 +116,9 @@ def figma_node_to_component_spec(
     - description -> ""
     - interaction -> None
 
+    Colors are resolved to ColorValue token references through token_index
+    as each node is built, so the tree never needs a second rewrite.
+
     Pruning: controlled by _should_recurse() and _MAX_COMPONENT_DEPTH.
     When not recursing, children_bounds are still computed from raw Figma
     bbox for accurate layout detection (stack vs absolute).
@@ -172,7 +176,7 @@ def figma_node_to_component_spec(
         # Recurse into children
         for i, child in enumerate(children):
             child_spec = figma_node_to_component_spec(
-                child, z_index=i, reverse_map=reverse_map,
+                child, z_index=i, token_index=token_index,
                 depth=depth + 1, parent_path=current_path,
             )
             if child_spec:
@@ -304,6 +308,8 @@ def figma_node_to_component_spec(
         spec["typography"] = typography
     if content:
         spec["content"] = content
+    if token_index is not None:
+        token_index.apply_to_spec_fields(spec)
     if children_specs:
         spec["children"] = children_specs
     # Attach pruned child IDs for spec_merger to distinguish
@@ -8,10 +8,13 @@ backgrounds, borders, effects, and component naming.
 import math
 import re
 from math import gcd
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import logging
 
+from ..settings import SPEC_TOKEN_COLOR_METRIC, SPEC_TOKEN_COLOR_TOLERANCE
+from .spatial_index import SpatialIndex
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -46,53 +49,175 @@ def build_token_reverse_map(design_tokens: Dict) -> Dict[str, str]:
     return reverse
 
 
-def _fuzzy_token_lookup(hex_color: str, reverse_map: Dict[str, str]) -> Optional[str]:
-    """Look up a hex color in the token map with +/-1 tolerance per channel.
+def _redmean_distance(a: Tuple[int, int, int], b: Tuple[int, int, int]) -> float:
+    """Cheap perceptual RGB distance (weights channels by the mean red level)."""
+    rmean = (a[0] + b[0]) / 2
+    dr, dg, db = a[0] - b[0], a[1] - b[1], a[2] - b[2]
+    return math.sqrt(
+        (2 + rmean / 256) * dr * dr + 4 * dg * dg + (2 + (255 - rmean) / 256) * db * db
+    )
+
+
+class TokenIndex:
+    """Nearest-color lookup from hex values to design token names.
 
     Figma stores colors as floats (0-1). Converting to 0-255 int can cause
-    +/-1 rounding differences (e.g. 0.21*255=53.55 rounds to 54 vs 53).
+    +/-1 rounding differences (e.g. 0.21*255=53.55 rounds to 54 vs 53), so
+    near matches within a tolerance count as the token.
+
+    Token colors are bucketed on a quantized RGB grid whose cell is wider
+    than the search radius, so a lookup only probes the 27 buckets around
+    the color. Results are memoized per hex value, since a page repeats the
+    same handful of colors thousands of times. Exact matches always win;
+    otherwise the closest token within tolerance is returned (ties go to
+    the token listed first).
+
+    metric="channel" bounds every RGB channel difference by tolerance;
+    metric="perceptual" bounds the redmean distance instead.
     """
-    key = hex_color.upper()[:7]
-    # Exact match first
-    token = reverse_map.get(key)
-    if token:
+
+    def __init__(
+        self,
+        reverse_map: Dict[str, str],
+        tolerance: float = SPEC_TOKEN_COLOR_TOLERANCE,
+        metric: str = SPEC_TOKEN_COLOR_METRIC,
+    ):
+        if metric not in ("channel", "perceptual"):
+            raise ValueError(f"unknown color metric: {metric!r}")
+        self.tolerance = tolerance
+        self.metric = metric
+        self._exact: Dict[str, str] = {}
+        self._buckets: Dict[Tuple[int, int, int], List[Tuple[Tuple[int, int, int], int, str]]] = {}
+        self._memo: Dict[str, Optional[str]] = {}
+        # Max per-channel difference a match can have. The redmean weights
+        # are >= 2, so a perceptual distance d bounds each channel by d/sqrt(2).
+        bound = tolerance if metric == "channel" else tolerance / math.sqrt(2)
+        self._radius = max(0, int(bound))
+        self._cell = self._radius + 1
+
+        for position, (hex_val, name) in enumerate(reverse_map.items()):
+            key = hex_val.upper()[:7]
+            self._exact.setdefault(key, name)
+            rgb = _hex_to_rgb(key)
+            if rgb is not None:
+                self._buckets.setdefault(self._bucket(rgb), []).append((rgb, position, name))
+
+    @classmethod
+    def from_design_tokens(cls, design_tokens: Dict, **kwargs: Any) -> "TokenIndex":
+        return cls(build_token_reverse_map(design_tokens), **kwargs)
+
+    def _bucket(self, rgb: Tuple[int, int, int]) -> Tuple[int, int, int]:
+        cell = self._cell
+        return rgb[0] // cell, rgb[1] // cell, rgb[2] // cell
+
+    def _distance(self, a: Tuple[int, int, int], b: Tuple[int, int, int]) -> float:
+        if self.metric == "channel":
+            return max(abs(a[0] - b[0]), abs(a[1] - b[1]), abs(a[2] - b[2]))
+        return _redmean_distance(a, b)
+
+    def lookup(self, hex_color: str) -> Optional[str]:
+        """Token name for a hex color (alpha ignored), or None."""
+        key = hex_color.upper()[:7]
+        if key in self._memo:
+            return self._memo[key]
+        token = self._exact.get(key)
+        if token is None and self._radius > 0:
+            token = self._nearest(key)
+        self._memo[key] = token
         return token
 
-    # Fuzzy match: try +/-1 for each RGB channel
-    if len(key) >= 7:
-        r = int(key[1:3], 16)
-        g = int(key[3:5], 16)
-        b = int(key[5:7], 16)
+    def _nearest(self, key: str) -> Optional[str]:
+        rgb = _hex_to_rgb(key)
+        if rgb is None:
+            return None
+        br, bg, bb = self._bucket(rgb)
+        best: Optional[Tuple[float, int, str]] = None
         for dr in (-1, 0, 1):
             for dg in (-1, 0, 1):
                 for db in (-1, 0, 1):
-                    if dr == 0 and dg == 0 and db == 0:
-                        continue
-                    nr = max(0, min(255, r + dr))
-                    ng = max(0, min(255, g + dg))
-                    nb = max(0, min(255, b + db))
-                    candidate = f"#{nr:02X}{ng:02X}{nb:02X}"
-                    token = reverse_map.get(candidate)
-                    if token:
-                        return token
-    return None
+                    for candidate, position, name in self._buckets.get((br + dr, bg + dg, bb + db), ()):
+                        dist = self._distance(rgb, candidate)
+                        if dist <= self.tolerance and (best is None or (dist, position) < best[:2]):
+                            best = (dist, position, name)
+        return best[2] if best else None
+
+    def color_value(self, value: Any) -> Any:
+        """Hex string -> ColorValue {"value", "token"} when a token matches.
+
+        Non-matching hex strings and non-hex values are returned unchanged.
+        """
+        if isinstance(value, str) and _HEX_COLOR_RE.match(value):
+            token = self.lookup(value)
+            if token:
+                return {"value": value, "token": token}
+        return value
+
+    def apply_to_spec_fields(self, spec: Dict[str, Any]) -> None:
+        """Resolve the color positions of one ComponentSpec node (in-place).
+
+        Covers style background/gradient stops/border/shadows, typography
+        and icon colors. Children are not visited: the spec builder calls
+        this once per node as it creates it.
+        """
+        style = spec.get("style")
+        if isinstance(style, dict):
+            background = style.get("background")
+            if isinstance(background, dict):
+                if "color" in background:
+                    background["color"] = self.color_value(background["color"])
+                gradient = background.get("gradient")
+                if isinstance(gradient, dict):
+                    for stop in gradient.get("stops") or []:
+                        if isinstance(stop, dict) and "color" in stop:
+                            stop["color"] = self.color_value(stop["color"])
+            border = style.get("border")
+            if isinstance(border, dict) and "color" in border:
+                border["color"] = self.color_value(border["color"])
+            for shadow in style.get("shadow") or []:
+                if isinstance(shadow, dict) and "color" in shadow:
+                    shadow["color"] = self.color_value(shadow["color"])
+
+        typography = spec.get("typography")
+        if isinstance(typography, dict) and "color" in typography:
+            typography["color"] = self.color_value(typography["color"])
+
+        content = spec.get("content")
+        if isinstance(content, dict):
+            icon = content.get("icon")
+            if isinstance(icon, dict) and "color" in icon:
+                icon["color"] = self.color_value(icon["color"])
+
+
+def _hex_to_rgb(key: str) -> Optional[Tuple[int, int, int]]:
+    if len(key) < 7:
+        return None
+    try:
+        return int(key[1:3], 16), int(key[3:5], 16), int(key[5:7], 16)
+    except ValueError:
+        return None
 
 
-def apply_token_reverse_map(obj: Any, reverse_map: Dict[str, str]) -> Any:
+def apply_token_reverse_map(obj: Any, reverse_map: Any) -> Any:
     """Recursively traverse JSON tree, convert hex colors to ColorValue format.
 
     - Matching hex -> {"value": "#FF6B35", "token": "brand-primary"}
     - Non-matching hex -> unchanged string "#FF6B35"
+
+    reverse_map may be a hex -> token dict or a prepared TokenIndex. The spec
+    builder resolves tokens per node via TokenIndex.apply_to_spec_fields;
+    this whole-tree rewrite remains for arbitrary JSON.
     """
-    if isinstance(obj, str) and _HEX_COLOR_RE.match(obj):
-        token = _fuzzy_token_lookup(obj, reverse_map)
-        if token:
-            return {"value": obj, "token": token}
-        return obj
+    index = reverse_map if isinstance(reverse_map, TokenIndex) else TokenIndex(reverse_map)
+    return _apply_token_index(obj, index)
+
+
+def _apply_token_index(obj: Any, index: TokenIndex) -> Any:
+    if isinstance(obj, str):
+        return index.color_value(obj)
     elif isinstance(obj, dict):
-        return {k: apply_token_reverse_map(v, reverse_map) for k, v in obj.items()}
+        return {k: _apply_token_index(v, index) for k, v in obj.items()}
     elif isinstance(obj, list):
-        return [apply_token_reverse_map(item, reverse_map) for item in obj]
+        return [_apply_token_index(item, index) for item in obj]
     return obj
 
 
@@ -192,11 +317,12 @@ def detect_container_layout(node: Dict, children_bounds: List[Dict]) -> Dict:
     # No auto-layout: check for stack (overlapping children).
     # Any significant overlap between siblings indicates intentional layering --
     # in normal flex/absolute layouts siblings never overlap.
+    # Only pairs that share area can pass the ratio check, so the spatial
+    # index supplies candidates instead of comparing every pair.
     if len(children_bounds) >= 2:
-        for i in range(len(children_bounds)):
-            for j in range(i + 1, len(children_bounds)):
-                if _bounds_overlap_ratio(children_bounds[i], children_bounds[j]) > 0.3:
-                    return {"type": "stack"}
+        for i, j in SpatialIndex(children_bounds).overlapping_pairs():
+            if _bounds_overlap_ratio(children_bounds[i], children_bounds[j]) > 0.3:
+                return {"type": "stack"}
 
     return {"type": "absolute"}
 
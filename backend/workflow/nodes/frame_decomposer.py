@@ -8,11 +8,7 @@ import logging
 from typing import Any, Dict, List
 
 from .registry import BaseNodeImpl, register_node_type
-from .figma_utils import (
-    apply_token_reverse_map,
-    build_token_reverse_map,
-    detect_container_layout,
-)
+from .figma_utils import TokenIndex, detect_container_layout
 from .figma_spec_builder import (
     _detect_device_type,
     _normalize_bounds,
@@ -98,8 +94,8 @@ class FrameDecomposerNode(BaseNodeImpl):
             self.node_id, page_name, page_node_id,
         )
 
-        # Build token reverse map
-        reverse_map = build_token_reverse_map(design_tokens_raw)
+        # Color -> token index, applied per node while building specs
+        token_index = TokenIndex.from_design_tokens(design_tokens_raw)
 
         # Resolve page document node from various input formats
         page_doc = self._resolve_page_doc(node_tree, page_node_id)
@@ -111,11 +107,9 @@ class FrameDecomposerNode(BaseNodeImpl):
 
         for i, child in enumerate(children):
             spec = figma_node_to_component_spec(
-                child, z_index=i, reverse_map=reverse_map,
+                child, z_index=i, token_index=token_index,
             )
             if spec:
-                # Apply token reverse map to all color values
-                spec = apply_token_reverse_map(spec, reverse_map)
                 # Assign screenshot path if available
                 nid = spec["id"]
                 if nid in screenshot_paths:
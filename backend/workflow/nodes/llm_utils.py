@@ -8,7 +8,7 @@ specific to LLM response processing, not CLI subprocess management.
 import json
 import logging
 import re
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Sequence
 
 from ..claude_cli_wrapper import invoke_oneshot
 
@@ -21,6 +21,7 @@ async def invoke_claude_cli(
     system_prompt: str,
     user_prompt: str,
     screenshot_path: str = "",
+    screenshot_tiles: Sequence[str] = (),
     base_dir: str = ".",
     model: str = "",
     timeout: float = 300.0,
@@ -28,21 +29,27 @@ async def invoke_claude_cli(
     retry_base_delay: float = 10.0,
     component_name: str = "unknown",
     caller: str = "ClaudeCLI",
+    pipeline: str = "default",
+    job_id: str = "",
+    cache: bool = True,
 ) -> Dict[str, Any]:
     """Invoke Claude CLI subprocess and return response text + token usage.
 
     Delegates to claude_cli_wrapper.invoke_oneshot() for subprocess management,
     retry, backoff, rate limit detection, and token extraction.
 
-    Returns {"text": str, "token_usage": {...} | None, "retry_count": int}.
+    Returns {"text": str, "token_usage": {...} | None, "retry_count": int,
+    "queue_wait_ms": int, "cached": bool}. On a cache hit token_usage is the
+    original call's usage (no tokens were spent this time).
     Raises RuntimeError on CLI failure, TimeoutError on timeout (after all retries).
     """
     # Build full prompt: system + user
     full_prompt = f"{system_prompt}\n\n{user_prompt}"
 
     # Determine tool restrictions based on screenshot
-    allowed_tools = ["Read"] if screenshot_path else None
-    no_tools = not screenshot_path
+    has_image = bool(screenshot_path or screenshot_tiles)
+    allowed_tools = ["Read"] if has_image else None
+    no_tools = not has_image
 
     return await invoke_oneshot(
         prompt=full_prompt,
@@ -53,10 +60,14 @@ async def invoke_claude_cli(
         max_retries=max_retries,
         retry_base_delay=retry_base_delay,
         screenshot_path=screenshot_path,
+        screenshot_tiles=screenshot_tiles,
         allowed_tools=allowed_tools,
         no_tools=no_tools,
         component_name=component_name,
         caller=caller,
+        pipeline=pipeline,
+        job_id=job_id,
+        cache=cache,
     )
 
 
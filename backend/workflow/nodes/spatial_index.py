@@ -0,0 +1,201 @@
+"""Uniform-grid spatial index over Figma bounding boxes.
+
+Neighbor computation (DesignAnalyzerNode) and stack detection
+(detect_container_layout) used to compare every box against every other
+one, which is quadratic on dense design-system pages. The index buckets
+boxes into square grid cells so a query only looks at the cells it
+touches.
+
+Bounds are dicts in the ComponentSpec shape ({x, y, width, height}).
+Coordinates are kept in plain parallel lists. Cell size is derived from
+the data: at least the median box size, and large enough that the page
+extent holds about one cell per box. Boxes that would span more than
+_MAX_CELLS_PER_ITEM cells (sections, page-wide containers) go to a coarser
+index with 4x larger cells instead, so a few huge frames neither fill the
+whole grid nor get scanned by every query.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+_MAX_CELLS_PER_ITEM = 16
+
+
+def _extent(bounds: Dict) -> Tuple[float, float, float, float]:
+    x = bounds.get("x", 0)
+    y = bounds.get("y", 0)
+    x2 = x + bounds.get("width", 0)
+    y2 = y + bounds.get("height", 0)
+    return min(x, x2), min(y, y2), max(x, x2), max(y, y2)
+
+
+def _gap(ax1: float, ay1: float, ax2: float, ay2: float,
+         bx1: float, by1: float, bx2: float, by2: float) -> float:
+    """Euclidean distance between two boxes (0 when they touch or overlap)."""
+    dx = max(0.0, bx1 - ax2, ax1 - bx2)
+    dy = max(0.0, by1 - ay2, ay1 - by2)
+    return math.hypot(dx, dy)
+
+
+class SpatialIndex:
+    """Static grid index over a list of bounds; queries return list indices.
+
+    Entries that are None or empty dicts are not indexed, and queries never
+    return them.
+    """
+
+    def __init__(self, bounds_list: Sequence[Optional[Dict]], cell_size: Optional[float] = None):
+        self._x1: List[float] = []
+        self._y1: List[float] = []
+        self._x2: List[float] = []
+        self._y2: List[float] = []
+        self._ids: List[int] = []  # position in bounds_list
+        for idx, bounds in enumerate(bounds_list):
+            if not bounds:
+                continue
+            x1, y1, x2, y2 = _extent(bounds)
+            self._x1.append(x1)
+            self._y1.append(y1)
+            self._x2.append(x2)
+            self._y2.append(y2)
+            self._ids.append(idx)
+
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._oversized: List[int] = []
+        self._coarse: Optional[SpatialIndex] = None
+        n = len(self._ids)
+        if n == 0:
+            self.cell_size = 1.0
+            self._min_x = self._min_y = 0.0
+            self._max_cx = self._max_cy = 0
+            return
+
+        self._min_x = min(self._x1)
+        self._min_y = min(self._y1)
+        width = max(self._x2) - self._min_x
+        height = max(self._y2) - self._min_y
+        if cell_size is None:
+            sizes = sorted(
+                max(self._x2[k] - self._x1[k], self._y2[k] - self._y1[k]) for k in range(n)
+            )
+            cell_size = max(sizes[n // 2], math.sqrt(width * height / n), 1.0)
+        self.cell_size = float(cell_size)
+        self._max_cx = int(width // self.cell_size)
+        self._max_cy = int(height // self.cell_size)
+
+        for k in range(n):
+            cx1, cy1, cx2, cy2 = self._cell_range(self._x1[k], self._y1[k], self._x2[k], self._y2[k])
+            if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > _MAX_CELLS_PER_ITEM:
+                self._oversized.append(k)
+                continue
+            for cx in range(cx1, cx2 + 1):
+                for cy in range(cy1, cy2 + 1):
+                    self._cells.setdefault((cx, cy), []).append(k)
+        if len(self._oversized) > _MAX_CELLS_PER_ITEM:
+            self._coarse = SpatialIndex(
+                [self._bounds(k) for k in self._oversized], cell_size=self.cell_size * 4,
+            )
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _bounds(self, k: int) -> Dict:
+        return {
+            "x": self._x1[k], "y": self._y1[k],
+            "width": self._x2[k] - self._x1[k], "height": self._y2[k] - self._y1[k],
+        }
+
+    def _cell_range(self, x1: float, y1: float, x2: float, y2: float) -> Tuple[int, int, int, int]:
+        size = self.cell_size
+        return (
+            max(0, int((x1 - self._min_x) // size)),
+            max(0, int((y1 - self._min_y) // size)),
+            min(self._max_cx, int((x2 - self._min_x) // size)),
+            min(self._max_cy, int((y2 - self._min_y) // size)),
+        )
+
+    def _candidates(self, cx1: int, cy1: int, cx2: int, cy2: int) -> set:
+        """Positions of boxes that may intersect the given block of cells."""
+        if self._coarse is None:
+            found = set(self._oversized)
+        else:
+            size = self.cell_size
+            block = {
+                "x": self._min_x + cx1 * size, "y": self._min_y + cy1 * size,
+                "width": (cx2 - cx1 + 1) * size, "height": (cy2 - cy1 + 1) * size,
+            }
+            found = {self._oversized[pos] for pos in self._coarse.query(block)}
+        cells = self._cells
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        return found
+
+    def query(self, bounds: Dict, margin: float = 0.0) -> List[int]:
+        """Indices of boxes touching or intersecting bounds grown by margin, ascending."""
+        if not self._ids:
+            return []
+        qx1, qy1, qx2, qy2 = _extent(bounds)
+        qx1 -= margin
+        qy1 -= margin
+        qx2 += margin
+        qy2 += margin
+        x1, y1, x2, y2 = self._x1, self._y1, self._x2, self._y2
+        hits = [
+            k for k in self._candidates(*self._cell_range(qx1, qy1, qx2, qy2))
+            if x1[k] <= qx2 and qx1 <= x2[k] and y1[k] <= qy2 and qy1 <= y2[k]
+        ]
+        return sorted(self._ids[k] for k in hits)
+
+    def nearest(self, bounds: Dict, k: int = 1, exclude: Optional[int] = None) -> List[int]:
+        """The k boxes closest to bounds (edge-to-edge distance), nearest first.
+
+        Ties are broken by index. exclude skips one index, typically the
+        query box itself.
+        """
+        if k <= 0 or not self._ids:
+            return []
+        qx1, qy1, qx2, qy2 = _extent(bounds)
+        cx1, cy1, cx2, cy2 = self._cell_range(qx1, qy1, qx2, qy2)
+        x1, y1, x2, y2 = self._x1, self._y1, self._x2, self._y2
+
+        # Grow a ring of cells around the query. Any box outside ring r is at
+        # least r cells away, so stop once k hits are within that distance.
+        seen: set = set()
+        heap: List[Tuple[float, int]] = []
+        ring = 0
+        while True:
+            block = (cx1 - ring, cy1 - ring, cx2 + ring, cy2 + ring)
+            for c in self._candidates(*block) - seen:
+                seen.add(c)
+                if self._ids[c] == exclude:
+                    continue
+                dist = _gap(qx1, qy1, qx2, qy2, x1[c], y1[c], x2[c], y2[c])
+                heapq.heappush(heap, (dist, self._ids[c]))
+            covers_grid = (
+                block[0] <= 0 and block[1] <= 0
+                and block[2] >= self._max_cx and block[3] >= self._max_cy
+            )
+            if covers_grid:
+                break
+            if len(heap) >= k and heapq.nsmallest(k, heap)[-1][0] <= ring * self.cell_size:
+                break
+            ring += 1
+        return [idx for _, idx in heapq.nsmallest(k, heap)]
+
+    def overlapping_pairs(self) -> Iterator[Tuple[int, int]]:
+        """Yield (i, j), i < j, for every pair of boxes sharing a positive area."""
+        x1, y1, x2, y2 = self._x1, self._y1, self._x2, self._y2
+        for a in range(len(self._ids)):
+            if x2[a] <= x1[a] or y2[a] <= y1[a]:
+                continue
+            for b in self._candidates(*self._cell_range(x1[a], y1[a], x2[a], y2[a])):
+                if b <= a or x2[b] <= x1[b] or y2[b] <= y1[b]:
+                    continue
+                if x1[b] < x2[a] and x1[a] < x2[b] and y1[b] < y2[a] and y1[a] < y2[b]:
+                    yield self._ids[a], self._ids[b]
@@ -10,7 +10,7 @@ Structured fields come from Pass 2 (small JSON, sanitize + retry safety net).
 
 import json
 import logging
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional
 
 from .registry import BaseNodeImpl, register_node_type
 from .llm_utils import invoke_claude_cli as _invoke_claude_cli
@@ -23,7 +23,9 @@ from ..spec.spec_analyzer_prompt import (
     PASS2_SYSTEM_PROMPT,
     PASS2_USER_PROMPT,
 )
+from ..spec.screenshot_prep import prepare_analysis_images
 from ..spec.spec_merger import merge_analyzer_output
+from ..spec.spec_validator import validate_component
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +56,190 @@ def _strip_semantic_fields(spec: Dict) -> Dict:
     return result
 
 
+def _add_token_usage(
+    cli_result: Dict, spent: Dict[str, int], cached: Dict[str, int],
+) -> None:
+    """Add a CLI call's token usage to spent, or to cached for cache hits."""
+    usage = cli_result.get("token_usage")
+    if not usage:
+        return
+    bucket = cached if cli_result.get("cached") else spent
+    bucket["input_tokens"] += usage.get("input_tokens", 0)
+    bucket["output_tokens"] += usage.get("output_tokens", 0)
+
+
+# ---------------------------------------------------------------------------
+# Analysis run: per-component analysis + stats for one SpecAnalyzer pass
+# ---------------------------------------------------------------------------
+
+
+class SpecAnalysisRun:
+    """Shared state for analyzing one page's components.
+
+    Created by SpecAnalyzerNode.start_run(). analyze() may be called for
+    components in any order and as they become ready (the streaming spec
+    pipeline feeds it as screenshots land); result() builds the node output.
+    """
+
+    def __init__(self, node: "SpecAnalyzerNode", claude_bin: str, inputs: Dict[str, Any]):
+        import asyncio
+        from ..claude_cli_wrapper import get_cli_governor
+        from ..settings import SPEC_CLI_CONCURRENCY
+
+        components = inputs.get("components", [])
+        self.node = node
+        self.claude_bin = claude_bin
+        self.page = inputs.get("page", {})
+        self.design_tokens = inputs.get("design_tokens", {})
+        self.run_id = inputs.get("run_id", "")
+        # Whole-page render; components whose own render failed are cropped
+        # from it for Pass 1 (the streaming pipeline sets it once it lands)
+        self.page_screenshot = inputs.get("page_screenshot_path", "")
+        # Called with each successfully analyzed component as soon as it is
+        # ready (the spec activity checkpoints it)
+        self.on_analyzed: Optional[Callable[[Dict], None]] = inputs.get("on_analyzed")
+        self.device = self.page.get("device", {})
+        self.page_layout = self.page.get("layout", {})
+        self.sibling_names = [c.get("name", "?") for c in components]
+        self.total = len(components)
+        self.cwd = node.config.get("cwd", ".")
+        self.model = node.config.get("model", "")
+        # Read max_retries from config (passed through from API)
+        self.max_retries = node.config.get("max_retries", 2)
+
+        self.stats: Dict[str, Any] = {
+            "total": self.total, "succeeded": 0, "failed": 0,
+            "total_retries": 0, "total_queue_wait_ms": 0, "cache_hits": 0,
+        }
+        self.token_totals = {"input_tokens": 0, "output_tokens": 0}
+        self.cached_token_totals = {"input_tokens": 0, "output_tokens": 0}
+        # {component_id: screenshot_prep result} for analysis_stats["screenshots"]
+        self.screenshot_prep: Dict[str, Dict[str, Any]] = {}
+
+        # Semaphore limits this job's parallel CLI calls; the process-wide
+        # CLI governor caps all jobs together and adapts that cap to rate
+        # limits (replaces the old static stagger)
+        self._sem = asyncio.Semaphore(SPEC_CLI_CONCURRENCY)
+        self._governor = get_cli_governor()
+
+    async def analyze(self, idx: int, component: Dict) -> Dict:
+        """Analyze one component; failures return it flagged _analysis_failed."""
+        node_id = self.node.node_id
+        comp_name = component.get("name", f"component_{idx}")
+        comp_id = component.get("id", "")
+        logger.info(
+            "SpecAnalyzerNode [%s]: analyzing %s (%d/%d)",
+            node_id, comp_name, idx + 1, self.total,
+        )
+        async with self._sem:
+            try:
+                result = await self.node._analyze_single_component(
+                    claude_bin=self.claude_bin,
+                    component=component,
+                    page=self.page,
+                    design_tokens=self.design_tokens,
+                    device=self.device,
+                    page_layout=self.page_layout,
+                    sibling_names=self.sibling_names,
+                    cwd=self.cwd,
+                    model=self.model,
+                    max_retries=self.max_retries,
+                    job_id=self.run_id,
+                    page_screenshot=self.page_screenshot,
+                )
+                self.stats["succeeded"] += 1
+                prepared = result.pop("_screenshot_prep", None)
+                if prepared is not None:
+                    self.screenshot_prep[comp_id] = prepared
+
+                # Track retries and duration
+                retry_count = result.pop("_retry_count", 0)
+                self.stats["total_retries"] += retry_count
+                duration_ms = result.pop("_duration_ms", 0)
+                queue_wait_ms = result.pop("_queue_wait_ms", 0)
+                self.stats["total_queue_wait_ms"] += queue_wait_ms
+
+                # Accumulate token usage
+                comp_tokens = result.pop("_token_usage", None)
+                if comp_tokens:
+                    self.token_totals["input_tokens"] += comp_tokens.get("input_tokens", 0)
+                    self.token_totals["output_tokens"] += comp_tokens.get("output_tokens", 0)
+                comp_cached_tokens = result.pop("_cached_token_usage", None)
+                if comp_cached_tokens:
+                    self.cached_token_totals["input_tokens"] += comp_cached_tokens.get("input_tokens", 0)
+                    self.cached_token_totals["output_tokens"] += comp_cached_tokens.get("output_tokens", 0)
+                self.stats["cache_hits"] += result.pop("_cache_hits", 0)
+
+                if self.on_analyzed is not None:
+                    try:
+                        self.on_analyzed(result)
+                    except Exception as e:
+                        logger.warning(
+                            "SpecAnalyzerNode [%s]: on_analyzed failed for %s: %s",
+                            node_id, comp_name, e,
+                        )
+
+                # Push SSE event for this component.
+                # Uses HTTP POST (workflow/sse.py) since this runs in
+                # Temporal Worker process — reverted from T137's direct
+                # EventBus push after T141 Temporal migration.
+                if self.run_id:
+                    from ..sse import push_sse_event
+                    sse_payload: Dict[str, Any] = {
+                        "component_id": comp_id,
+                        "component_name": comp_name,
+                        "suggested_name": result.get("suggested_name"),
+                        "role": result.get("role"),
+                        "description": result.get("description", "")[:200],
+                        "design_analysis": result.get("design_analysis"),
+                        "index": idx,
+                        "total": self.total,
+                        "duration_ms": duration_ms,
+                        "queue_wait_ms": queue_wait_ms,
+                        "cli_concurrency": self._governor.limit,
+                        "throttle_events": self._governor.throttle_events,
+                    }
+                    if comp_tokens:
+                        sse_payload["tokens_used"] = comp_tokens
+                    if comp_cached_tokens:
+                        sse_payload["cached_tokens"] = comp_cached_tokens
+                    if retry_count > 0:
+                        sse_payload["retry_count"] = retry_count
+                    # Node-local quality rules run per component so problems
+                    # show up while the rest of the page is still analyzing.
+                    warnings = validate_component(result, self.page)
+                    if warnings:
+                        sse_payload["quality_warning_count"] = len(warnings)
+                        sse_payload["quality_warnings"] = warnings[:5]
+                    await push_sse_event(self.run_id, "spec_analyzed", sse_payload)
+
+                return result
+            except Exception as e:
+                logger.error(
+                    "SpecAnalyzerNode [%s]: failed to analyze %s: %s",
+                    node_id, comp_name, e,
+                )
+                self.stats["failed"] += 1
+                return {**component, "_analysis_failed": True}
+
+    def result(self, analyzed_components: List[Dict]) -> Dict[str, Any]:
+        if self.screenshot_prep:
+            from ..spec.screenshot_prep import prune_cache, summarize
+            self.stats["screenshots"] = summarize(self.screenshot_prep)
+            prune_cache()
+        logger.info(
+            "SpecAnalyzerNode [%s]: done -- %d/%d succeeded, tokens: %d in / %d out",
+            self.node.node_id, self.stats["succeeded"], self.stats["total"],
+            self.token_totals["input_tokens"], self.token_totals["output_tokens"],
+        )
+        return {
+            "components": analyzed_components,
+            "analysis_stats": self.stats,
+            "token_usage": self.token_totals,
+            "cached_token_usage": self.cached_token_totals,
+        }
+
+
 # ---------------------------------------------------------------------------
 # Node 2: SpecAnalyzerNode
 # ---------------------------------------------------------------------------
@@ -103,127 +289,31 @@ class SpecAnalyzerNode(BaseNodeImpl):
     3. Calls Claude CLI subprocess with vision (Read tool for images)
     4. Parses returned JSON, merges into ComponentSpec
     5. Sends SSE event per completed component
+
+    CLI responses go through the LLM response cache unless config
+    llm_cache is False; cached usage is reported as cached_token_usage,
+    separate from token_usage (tokens actually spent).
     """
 
     async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         components = inputs.get("components", [])
-        page = inputs.get("page", {})
-        design_tokens = inputs.get("design_tokens", {})
-        source = inputs.get("source", {})
-        run_id = inputs.get("run_id", "")
-        cwd = self.config.get("cwd", ".")
-
         model = self.config.get("model", "")
-        max_tokens = self.config.get("max_tokens", 4096)
 
         logger.info(
             "SpecAnalyzerNode [%s]: analyzing %d components with %s",
             self.node_id, len(components), model,
         )
 
-        # Build page context for prompt
-        device = page.get("device", {})
-        page_layout = page.get("layout", {})
-        sibling_names = [c.get("name", "?") for c in components]
-
-        # Verify claude CLI is available
-        import shutil
-        claude_bin = shutil.which("claude")
-        if not claude_bin:
-            logger.error(
-                "SpecAnalyzerNode: 'claude' CLI not found in PATH. "
-                "Install Claude Code: https://code.claude.com"
-            )
+        run = self.start_run(inputs)
+        if run is None:
             return {
                 "components": components,
                 "analysis_stats": {"error": "claude CLI not found in PATH"},
             }
 
-        # Read max_retries from config (passed through from API)
-        max_retries = self.config.get("max_retries", 2)
-
-        stats = {
-            "total": len(components), "succeeded": 0, "failed": 0,
-            "total_retries": 0,
-        }
-        token_totals = {"input_tokens": 0, "output_tokens": 0}
-
-        # Concurrent analysis with semaphore to limit parallel CLI processes
         import asyncio
-        from ..settings import SPEC_CLI_CONCURRENCY, SPEC_COMPONENT_STAGGER_DELAY
-        sem = asyncio.Semaphore(SPEC_CLI_CONCURRENCY)
-
-        async def _analyze_one(idx: int, component: Dict) -> Dict:
-            comp_name = component.get("name", f"component_{idx}")
-            comp_id = component.get("id", "")
-            # Stagger launches to avoid hitting rate limits
-            if idx > 0:
-                await asyncio.sleep(idx * SPEC_COMPONENT_STAGGER_DELAY)
-            logger.info(
-                "SpecAnalyzerNode [%s]: analyzing %s (%d/%d)",
-                self.node_id, comp_name, idx + 1, len(components),
-            )
-            async with sem:
-                try:
-                    result = await self._analyze_single_component(
-                        claude_bin=claude_bin,
-                        component=component,
-                        page=page,
-                        design_tokens=design_tokens,
-                        device=device,
-                        page_layout=page_layout,
-                        sibling_names=sibling_names,
-                        cwd=cwd,
-                        model=model,
-                        max_retries=max_retries,
-                    )
-                    stats["succeeded"] += 1
-
-                    # Track retries and duration
-                    retry_count = result.pop("_retry_count", 0)
-                    stats["total_retries"] += retry_count
-                    duration_ms = result.pop("_duration_ms", 0)
-
-                    # Accumulate token usage
-                    comp_tokens = result.pop("_token_usage", None)
-                    if comp_tokens:
-                        token_totals["input_tokens"] += comp_tokens.get("input_tokens", 0)
-                        token_totals["output_tokens"] += comp_tokens.get("output_tokens", 0)
-
-                    # Push SSE event for this component.
-                    # Uses HTTP POST (workflow/sse.py) since this runs in
-                    # Temporal Worker process — reverted from T137's direct
-                    # EventBus push after T141 Temporal migration.
-                    if run_id:
-                        from ..sse import push_sse_event
-                        sse_payload: Dict[str, Any] = {
-                            "component_id": comp_id,
-                            "component_name": comp_name,
-                            "suggested_name": result.get("suggested_name"),
-                            "role": result.get("role"),
-                            "description": result.get("description", "")[:200],
-                            "design_analysis": result.get("design_analysis"),
-                            "index": idx,
-                            "total": len(components),
-                            "duration_ms": duration_ms,
-                        }
-                        if comp_tokens:
-                            sse_payload["tokens_used"] = comp_tokens
-                        if retry_count > 0:
-                            sse_payload["retry_count"] = retry_count
-                        await push_sse_event(run_id, "spec_analyzed", sse_payload)
-
-                    return result
-                except Exception as e:
-                    logger.error(
-                        "SpecAnalyzerNode [%s]: failed to analyze %s: %s",
-                        self.node_id, comp_name, e,
-                    )
-                    stats["failed"] += 1
-                    return {**component, "_analysis_failed": True}
-
         raw_results = await asyncio.gather(
-            *[_analyze_one(i, c) for i, c in enumerate(components)],
+            *[run.analyze(i, c) for i, c in enumerate(components)],
             return_exceptions=True,
         )
         # Handle exceptions returned by return_exceptions=True
@@ -236,22 +326,31 @@ class SpecAnalyzerNode(BaseNodeImpl):
                     self.node_id, comp.get("name", f"component_{i}"),
                     type(r).__name__, r,
                 )
-                stats["failed"] += 1
+                run.stats["failed"] += 1
                 analyzed_components.append({**comp, "_analysis_failed": True})
             else:
                 analyzed_components.append(r)
 
-        logger.info(
-            "SpecAnalyzerNode [%s]: done -- %d/%d succeeded, tokens: %d in / %d out",
-            self.node_id, stats["succeeded"], stats["total"],
-            token_totals["input_tokens"], token_totals["output_tokens"],
-        )
+        return run.result(analyzed_components)
 
-        return {
-            "components": analyzed_components,
-            "analysis_stats": stats,
-            "token_usage": token_totals,
-        }
+    def start_run(self, inputs: Dict[str, Any]) -> Optional["SpecAnalysisRun"]:
+        """Prepare an analysis run without starting any CLI calls.
+
+        inputs["components"] is the full component list (page context for
+        sibling names and progress totals); callers then analyze components
+        one at a time with run.analyze(). Returns None if the claude CLI
+        is not installed.
+        """
+        # Verify claude CLI is available
+        import shutil
+        claude_bin = shutil.which("claude")
+        if not claude_bin:
+            logger.error(
+                "SpecAnalyzerNode: 'claude' CLI not found in PATH. "
+                "Install Claude Code: https://code.claude.com"
+            )
+            return None
+        return SpecAnalysisRun(self, claude_bin, inputs)
 
     async def _retry_with_error_feedback(
         self,
@@ -260,6 +359,7 @@ class SpecAnalyzerNode(BaseNodeImpl):
         cwd: str,
         model: str,
         component_name: str,
+        job_id: str = "",
     ) -> dict | None:
         """Retry JSON parse by feeding the error back to Claude CLI.
 
@@ -300,6 +400,9 @@ class SpecAnalyzerNode(BaseNodeImpl):
                 max_retries=0,  # no further retries for the correction call
                 component_name=f"{component_name}_json_fix",
                 caller=f"SpecAnalyzerNode [{self.node_id}] retry",
+                pipeline="spec",
+                job_id=job_id,
+                cache=self.config.get("llm_cache", True),
             )
             corrected = _parse_llm_json(
                 correction_result["text"],
@@ -330,12 +433,19 @@ class SpecAnalyzerNode(BaseNodeImpl):
         cwd: str,
         model: str,
         max_retries: int = 2,
+        job_id: str = "",
+        page_screenshot: str = "",
     ) -> Dict:
         """Analyze a single component using two-pass Claude CLI architecture.
 
         Pass 1: Screenshot + structural spec → free-form design analysis text
         Pass 2: Pass 1 text + spec → small JSON (role, name, interaction, etc.)
+
+        Pass 1 reads the preprocessed image(s) from spec/screenshot_prep.py
+        when available (downsized, cropped from page_screenshot, or tiled),
+        else the original render.
         """
+        import asyncio
         import time as _time
         _start_time = _time.monotonic()
 
@@ -349,7 +459,21 @@ class SpecAnalyzerNode(BaseNodeImpl):
 
         # Token usage accumulator for both passes
         total_tokens: Dict[str, int] = {"input_tokens": 0, "output_tokens": 0}
+        # Usage of responses served from the LLM response cache (not spent)
+        cached_tokens: Dict[str, int] = {"input_tokens": 0, "output_tokens": 0}
         total_retries = 0
+        total_queue_wait_ms = 0
+
+        # ---- Screenshot preprocessing (downsize / crop / tile) ----
+        screenshot_path = component.get("screenshot_path", "")
+        screenshot_tiles: List[str] = []
+        prepared = await asyncio.to_thread(
+            prepare_analysis_images, component, cwd, page_screenshot, device.get("width", 0),
+        )
+        if prepared is not None:
+            screenshot_path = prepared["paths"][0]
+            if len(prepared["paths"]) > 1:
+                screenshot_tiles = prepared["paths"]
 
         # ---- Pass 1: Free-form design analysis (with screenshot) ----
         pass1_user = PASS1_USER_PROMPT.format(
@@ -367,20 +491,23 @@ class SpecAnalyzerNode(BaseNodeImpl):
             claude_bin=claude_bin,
             system_prompt=PASS1_SYSTEM_PROMPT,
             user_prompt=pass1_user,
-            screenshot_path=component.get("screenshot_path", ""),
+            screenshot_path=screenshot_path,
+            screenshot_tiles=screenshot_tiles,
             base_dir=cwd,
             model=model,
             timeout=300.0,
             max_retries=max_retries,
             component_name=f"{comp_name}_pass1",
             caller=f"SpecAnalyzerNode [{self.node_id}]",
+            pipeline="spec",
+            job_id=job_id,
+            cache=self.config.get("llm_cache", True),
         )
 
         design_analysis_text = pass1_result["text"]
         total_retries += pass1_result.get("retry_count", 0)
-        if pass1_result["token_usage"]:
-            total_tokens["input_tokens"] += pass1_result["token_usage"].get("input_tokens", 0)
-            total_tokens["output_tokens"] += pass1_result["token_usage"].get("output_tokens", 0)
+        total_queue_wait_ms += pass1_result.get("queue_wait_ms", 0)
+        _add_token_usage(pass1_result, total_tokens, cached_tokens)
 
         logger.info(
             "SpecAnalyzerNode [%s]: Pass 1 complete for %s (%d chars)",
@@ -404,12 +531,14 @@ class SpecAnalyzerNode(BaseNodeImpl):
             max_retries=max_retries,
             component_name=f"{comp_name}_pass2",
             caller=f"SpecAnalyzerNode [{self.node_id}]",
+            pipeline="spec",
+            job_id=job_id,
+            cache=self.config.get("llm_cache", True),
         )
 
         total_retries += pass2_result.get("retry_count", 0)
-        if pass2_result["token_usage"]:
-            total_tokens["input_tokens"] += pass2_result["token_usage"].get("input_tokens", 0)
-            total_tokens["output_tokens"] += pass2_result["token_usage"].get("output_tokens", 0)
+        total_queue_wait_ms += pass2_result.get("queue_wait_ms", 0)
+        _add_token_usage(pass2_result, total_tokens, cached_tokens)
 
         # Parse Pass 2 JSON (with sanitize safety net from T134)
         raw_pass2 = pass2_result["text"]
@@ -430,6 +559,7 @@ class SpecAnalyzerNode(BaseNodeImpl):
                 cwd=cwd,
                 model=model,
                 component_name=f"{comp_name}_pass2",
+                job_id=job_id,
             )
 
         if not analyzer_output:
@@ -449,13 +579,21 @@ class SpecAnalyzerNode(BaseNodeImpl):
         # Inject design_analysis from Pass 1 directly (never serialized as JSON)
         analyzer_output["design_analysis"] = design_analysis_text
 
-        # Merge LLM output into component using spec_merger
+        # Merge LLM output into component using spec_merger. The component is
+        # still shared (queued frame_decomposed event, the streaming pipeline's
+        # component list, the _analysis_failed fallback), so merge into a copy.
         merged = merge_analyzer_output(component, analyzer_output)
 
         # Attach tracking metadata (both passes combined)
         duration_ms = int((_time.monotonic() - _start_time) * 1000)
         if total_tokens["input_tokens"] > 0 or total_tokens["output_tokens"] > 0:
             merged["_token_usage"] = total_tokens
+        if cached_tokens["input_tokens"] > 0 or cached_tokens["output_tokens"] > 0:
+            merged["_cached_token_usage"] = cached_tokens
         merged["_retry_count"] = total_retries
         merged["_duration_ms"] = duration_ms
+        merged["_queue_wait_ms"] = total_queue_wait_ms
+        merged["_cache_hits"] = sum(1 for r in (pass1_result, pass2_result) if r.get("cached"))
+        if prepared is not None:
+            merged["_screenshot_prep"] = prepared
         return merged
@@ -4,7 +4,6 @@ Wraps page metadata, design tokens, source info, orders components
 by z_index, validates auto-layout compliance, and writes output.
 """
 
-import json
 import logging
 import os
 from datetime import datetime, timezone
@@ -53,30 +52,10 @@ class SpecAssemblerNode(BaseNodeImpl):
     1. Wraps page metadata, design_tokens, source info
     2. Orders components by z_index (bottom layer first)
     3. Validates auto-layout compliance
-    4. Writes to {output_dir}/design_spec.json
+    4. Writes to {output_dir}/design_spec.json (.json.gz with gzip) plus
+       design_spec.index.json (byte offsets per component)
     """
 
-    @staticmethod
-    def _collect_inferred_nodes(
-        node: Dict[str, Any], results: List[Dict[str, Any]],
-    ) -> None:
-        """Recursively collect nodes with layoutSource == 'inferred'.
-
-        Only flags nodes with >= 2 children, since single/zero-child
-        containers don't benefit from auto-layout (no gap to compute).
-        """
-        children = node.get("children", [])
-        if node.get("layoutSource") == "inferred" and len(children) >= 2:
-            results.append({
-                "id": node.get("id", ""),
-                "name": node.get("name", ""),
-                "path": node.get("path", ""),
-                "children_count": len(children),
-            })
-        for child in node.get("children", []):
-            if isinstance(child, dict):
-                SpecAssemblerNode._collect_inferred_nodes(child, results)
-
     async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         components = inputs.get("components", [])
         page = inputs.get("page", {})
@@ -127,24 +106,13 @@ class SpecAssemblerNode(BaseNodeImpl):
                 self.node_id, dedup_count,
             )
 
-        # --- Quality validation (merge reports + role/bounds/hint/naming) ---
+        # --- Validation (auto-layout + merge reports + role/bounds/hint/naming) ---
+        # One traversal per component feeds every registered rule.
         from ..spec.spec_validator import run_all_validations
-        quality_report = run_all_validations(
+        validation: Dict[str, Any] = run_all_validations(
             sorted_components, page, node_id=self.node_id,
         )
-
-        # --- Validate auto-layout compliance ---
-        inferred_nodes: List[Dict[str, Any]] = []
-        for comp in sorted_components:
-            self._collect_inferred_nodes(comp, inferred_nodes)
-
-        # Build combined validation report
-        validation: Dict[str, Any] = {
-            "auto_layout_compliant": len(inferred_nodes) == 0,
-            "inferred_node_count": len(inferred_nodes),
-            "inferred_nodes": inferred_nodes,
-            **quality_report,
-        }
+        inferred_nodes: List[Dict[str, Any]] = validation["inferred_nodes"]
         if inferred_nodes:
             validation["message"] = (
                 f"{len(inferred_nodes)} node(s) missing auto-layout. "
@@ -176,18 +144,25 @@ class SpecAssemblerNode(BaseNodeImpl):
             spec_document["token_usage"] = token_usage
 
         # Write to disk if output_dir provided
+        # (streamed component by component, with a sidecar offset index so
+        # the API can serve the header or one component without parsing all)
         spec_path = ""
         if output_dir:
+            from ..settings import SPEC_OUTPUT_GZIP
+            from ..spec.spec_file import write_spec_document
+
+            compress = self.config.get("gzip", SPEC_OUTPUT_GZIP)
             os.makedirs(output_dir, exist_ok=True)
-            spec_path = os.path.join(output_dir, "design_spec.json")
-            with open(spec_path, "w", encoding="utf-8") as f:
-                json.dump(spec_document, f, ensure_ascii=False, indent=2)
+            spec_path = os.path.join(
+                output_dir, "design_spec.json.gz" if compress else "design_spec.json",
+            )
+            write_spec_document(spec_path, spec_document, compress=compress)
             logger.info(
                 "SpecAssemblerNode [%s]: wrote %s (%d components, %d inferred, "
                 "%d quality warnings)",
                 self.node_id, spec_path, len(sorted_components),
                 len(inferred_nodes),
-                quality_report.get("quality_warning_count", 0),
+                validation.get("quality_warning_count", 0),
             )
 
         return {
@@ -12,15 +12,46 @@ from __future__ import annotations
 
 import logging
 import re
+from collections.abc import Mapping
 from typing import Any, Dict, List, Optional
 
-from workflow.engine.safe_eval import safe_eval as _safe_eval
+from workflow.engine.safe_eval import SafeEvalError, compile_expression
 
 from .registry import BaseNodeImpl, register_node_type
 
 logger = logging.getLogger(__name__)
 
 
+class _ExpressionScope(Mapping):
+    """Variable lookup for UpdateStateNode expressions.
+
+    Every name resolves: unknown or None fields evaluate to 0 (with a
+    warning), matching the node's historical behaviour.
+    """
+
+    __slots__ = ("_context", "_expr")
+
+    def __init__(self, context: Mapping[str, Any], expr: str):
+        self._context = context
+        self._expr = expr
+
+    def __getitem__(self, name: str) -> Any:
+        value = self._context.get(name)
+        if value is None:
+            logger.warning(f"UpdateStateNode: Unknown field '{name}' in expression '{self._expr}', using 0")
+            return 0
+        return value
+
+    def __contains__(self, name: object) -> bool:
+        return True
+
+    def __iter__(self):
+        return iter(self._context)
+
+    def __len__(self) -> int:
+        return len(self._context)
+
+
 def _safe_get_nested(obj: Any, path: str) -> Any:
     """Safely get a nested value from an object using dot notation.
 
@@ -34,7 +65,7 @@ def _safe_get_nested(obj: Any, path: str) -> Any:
     parts = path.split(".")
     current = obj
     for part in parts:
-        if isinstance(current, dict):
+        if isinstance(current, Mapping):
             current = current.get(part)
         elif hasattr(current, part):
             current = getattr(current, part)
@@ -45,6 +76,14 @@ def _safe_get_nested(obj: Any, path: str) -> Any:
     return current
 
 
+def _preview(value: Any, limit: int = 200) -> str:
+    """Short log representation — never formats a whole growing collection."""
+    if isinstance(value, (list, tuple, dict)):
+        return f"<{type(value).__name__} len={len(value)}>"
+    text = repr(value)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
 @register_node_type(
     node_type="get_current_item",
     display_name="Get Current Item",
@@ -252,7 +291,7 @@ class UpdateStateNode(BaseNodeImpl):
                 new_value = self._compute_update(update, inputs)
                 result[field] = new_value
                 updated_fields.append(field)
-                logger.info(f"UpdateStateNode {self.node_id}: Updated '{field}' = {new_value}")
+                logger.info(f"UpdateStateNode {self.node_id}: Updated '{field}' = {_preview(new_value)}")
             except Exception as e:
                 logger.error(f"UpdateStateNode {self.node_id}: Failed to update '{field}': {e}")
                 result[f"{field}_error"] = str(e)
@@ -361,7 +400,7 @@ class UpdateStateNode(BaseNodeImpl):
         """Evaluate a simple arithmetic expression.
 
         Supports:
-        - Field references: current_index, retry_count
+        - Field references: current_index, retry_count, config.max_retries
         - Arithmetic: +, -, *
         - Comparison: <, >, ==, !=, <=, >=
 
@@ -372,43 +411,11 @@ class UpdateStateNode(BaseNodeImpl):
         Returns:
             Evaluated result
         """
-        # Replace field references with values
-        tokens = re.split(r"(\s+|\+|\-|\*|<|>|==|!=|<=|>=)", expr)
-        evaluated_tokens = []
-
-        for token in tokens:
-            token = token.strip()
-            if not token:
-                continue
-
-            # Check if it's a number
-            if re.match(r"^-?\d+(\.\d+)?$", token):
-                evaluated_tokens.append(token)
-            # Check if it's an operator
-            elif token in ["+", "-", "*", "<", ">", "==", "!=", "<=", ">="]:
-                evaluated_tokens.append(token)
-            # Check if it's a boolean
-            elif token.lower() in ["true", "false"]:
-                evaluated_tokens.append(token.capitalize())
-            # Otherwise it's a field reference
-            else:
-                value = context.get(token)
-                if value is None:
-                    value = _safe_get_nested(context, token)
-                if value is None:
-                    logger.warning(f"UpdateStateNode: Unknown field '{token}' in expression, using 0")
-                    value = 0
-                evaluated_tokens.append(str(value))
-
-        # Join and evaluate
-        eval_expr = " ".join(evaluated_tokens)
-        logger.debug(f"UpdateStateNode: Evaluating '{eval_expr}' (from '{expr}')")
-
         try:
-            # Use AST-based safe_eval — no arbitrary code execution
-            result = _safe_eval(eval_expr, {})
-            return result
-        except Exception as e:
+            # Compiled once per distinct expression (AST-based, no eval)
+            compiled = compile_expression(expr)
+            return compiled(_ExpressionScope(context, expr))
+        except SafeEvalError as e:
             logger.error(f"UpdateStateNode: Expression evaluation failed: {e}")
             raise ValueError(f"Invalid expression '{expr}': {e}")
 
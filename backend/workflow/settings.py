@@ -10,6 +10,7 @@ in workflow/config.py.
 from __future__ import annotations
 
 import os
+from pathlib import Path
 
 
 def _int(key: str, default: int) -> int:
@@ -28,11 +29,23 @@ def _str(key: str, default: str) -> str:
 # Spec Pipeline (design-to-spec)
 # =====================================================================
 
-# Max parallel Claude CLI subprocesses for component analysis
+# Max parallel Claude CLI calls per spec job (all jobs also share
+# CLAUDE_CLI_MAX_CONCURRENCY)
 SPEC_CLI_CONCURRENCY = _int("SPEC_CLI_CONCURRENCY", 3)
 
-# Stagger delay per component (seconds) to avoid rate limits
-SPEC_COMPONENT_STAGGER_DELAY = _float("SPEC_COMPONENT_STAGGER_DELAY", 2.0)
+# Phase scheduling for execute_spec_pipeline_activity:
+#   sequential — fetch all → decompose all → analyze all (default)
+#   streaming  — each frame is analyzed as soon as its screenshot lands;
+#                stages are connected by queues of SPEC_STREAM_QUEUE_SIZE
+SPEC_PIPELINE_MODE = _str("SPEC_PIPELINE_MODE", "sequential")
+SPEC_STREAM_QUEUE_SIZE = _int("SPEC_STREAM_QUEUE_SIZE", 16)
+
+# Color -> design token matching in FrameDecomposer (figma_utils.TokenIndex):
+#   channel    — every RGB channel within SPEC_TOKEN_COLOR_TOLERANCE (0-255 units);
+#                the default 1 absorbs Figma float -> int rounding
+#   perceptual — weighted "redmean" RGB distance within the tolerance
+SPEC_TOKEN_COLOR_METRIC = _str("SPEC_TOKEN_COLOR_METRIC", "channel")
+SPEC_TOKEN_COLOR_TOLERANCE = _float("SPEC_TOKEN_COLOR_TOLERANCE", 1.0)
 
 # SpecAnalyzer LLM parameters
 SPEC_ANALYZER_MAX_TOKENS = _int("SPEC_ANALYZER_MAX_TOKENS", 4096)
@@ -50,6 +63,42 @@ SPEC_WORKFLOW_PER_COMPONENT_MINUTES = _int("SPEC_WORKFLOW_PER_COMPONENT_MINUTES"
 SPEC_WORKFLOW_OVERHEAD_MINUTES = _int("SPEC_WORKFLOW_OVERHEAD_MINUTES", 5)
 SPEC_WORKFLOW_HEARTBEAT_TIMEOUT_MINUTES = _int("SPEC_WORKFLOW_HEARTBEAT_TIMEOUT_MINUTES", 10)
 
+# Cross-job store of analyzed components (workflow/spec/analysis_store.py),
+# keyed by structural spec + screenshot content: a new job on the same page
+# only re-analyzes components whose Figma subtree changed
+SPEC_ANALYSIS_STORE_ENABLED = _str("SPEC_ANALYSIS_STORE_ENABLED", "true").lower() in ("true", "1", "yes")
+SPEC_ANALYSIS_STORE_DIR = _str(
+    "SPEC_ANALYSIS_STORE_DIR", str(Path(__file__).parent.parent / ".cache" / "spec_analysis"),
+)
+SPEC_ANALYSIS_STORE_MAX_ENTRIES = _int("SPEC_ANALYSIS_STORE_MAX_ENTRIES", 5000)
+
+# Screenshot preprocessing before Pass 1 vision analysis
+# (workflow/spec/screenshot_prep.py; needs Pillow, skipped without it).
+# Long-edge targets by component size class (longest side <= 200 / <= 600 /
+# larger, in design px); frames taller than TILE_ASPECT x their width are
+# split into at most MAX_TILES vertical tiles. FORMAT: jpeg | webp | png
+SPEC_SCREENSHOT_PREP_ENABLED = _str("SPEC_SCREENSHOT_PREP_ENABLED", "true").lower() in ("true", "1", "yes")
+SPEC_SCREENSHOT_MAX_DIM_SMALL = _int("SPEC_SCREENSHOT_MAX_DIM_SMALL", 512)
+SPEC_SCREENSHOT_MAX_DIM_MEDIUM = _int("SPEC_SCREENSHOT_MAX_DIM_MEDIUM", 1024)
+SPEC_SCREENSHOT_MAX_DIM_LARGE = _int("SPEC_SCREENSHOT_MAX_DIM_LARGE", 1568)
+SPEC_SCREENSHOT_TILE_ASPECT = _float("SPEC_SCREENSHOT_TILE_ASPECT", 3.0)
+SPEC_SCREENSHOT_MAX_TILES = _int("SPEC_SCREENSHOT_MAX_TILES", 4)
+SPEC_SCREENSHOT_FORMAT = _str("SPEC_SCREENSHOT_FORMAT", "jpeg").lower()
+SPEC_SCREENSHOT_QUALITY = _int("SPEC_SCREENSHOT_QUALITY", 85)
+SPEC_SCREENSHOT_CACHE_DIR = _str(
+    "SPEC_SCREENSHOT_CACHE_DIR", str(Path(__file__).parent.parent / ".cache" / "spec_screenshots"),
+)
+SPEC_SCREENSHOT_CACHE_MAX_ENTRIES = _int("SPEC_SCREENSHOT_CACHE_MAX_ENTRIES", 5000)
+
+# Per-job checkpoint log (workflow/spec/checkpoint_log.py): every record is
+# flushed to the OS on append; fsync is batched per N records / T seconds
+SPEC_CHECKPOINT_FSYNC_EVERY = _int("SPEC_CHECKPOINT_FSYNC_EVERY", 8)
+SPEC_CHECKPOINT_FSYNC_INTERVAL = _float("SPEC_CHECKPOINT_FSYNC_INTERVAL", 2.0)
+
+# Write design_spec.json.gz instead of design_spec.json (workflow/spec/spec_file.py);
+# the spec_assembler "gzip" config overrides it per run
+SPEC_OUTPUT_GZIP = _str("SPEC_OUTPUT_GZIP", "false").lower() in ("true", "1", "yes")
+
 
 # =====================================================================
 # Batch Pipeline (bug fix)
@@ -64,25 +113,69 @@ BATCH_WORKFLOW_MIN_TIMEOUT_MINUTES = _int("BATCH_WORKFLOW_MIN_TIMEOUT_MINUTES",
 BATCH_WORKFLOW_PER_BUG_MINUTES = _int("BATCH_WORKFLOW_PER_BUG_MINUTES", 15)
 BATCH_WORKFLOW_HEARTBEAT_TIMEOUT_MINUTES = _int("BATCH_WORKFLOW_HEARTBEAT_TIMEOUT_MINUTES", 15)
 
+# Upper bound for config.max_parallel_bugs (concurrent git worktrees per job)
+BATCH_MAX_PARALLEL_BUGS = _int("BATCH_MAX_PARALLEL_BUGS", 8)
+
+# Directory (inside the repo's git common dir) that holds per-job worktrees
+BATCH_WORKTREE_DIRNAME = _str("BATCH_WORKTREE_DIRNAME", "batch-worktrees")
+
 # DB sync retry attempts (with exponential backoff)
 BATCH_DB_SYNC_MAX_ATTEMPTS = _int("BATCH_DB_SYNC_MAX_ATTEMPTS", 4)
 
+# Worker-side DB write-behind (workflow/temporal/db_writer.py): job/bug
+# status, step and component-count updates from the batch and spec
+# activities are coalesced per row and written in one transaction every
+# DB_WRITE_FLUSH_INTERVAL seconds, or once DB_WRITE_MAX_PENDING rows wait.
+# A job whose write fails DB_WRITE_MAX_FAILED_FLUSHES flushes in a row,
+# while other jobs' writes succeed, has its queued updates dropped.
+DB_WRITE_BEHIND_ENABLED = _str("DB_WRITE_BEHIND_ENABLED", "true").lower() in ("true", "1", "yes")
+DB_WRITE_FLUSH_INTERVAL = _float("DB_WRITE_FLUSH_INTERVAL", 1.0)
+DB_WRITE_MAX_PENDING = _int("DB_WRITE_MAX_PENDING", 50)
+DB_WRITE_MAX_RETRIES = _int("DB_WRITE_MAX_RETRIES", 3)
+DB_WRITE_RETRY_DELAY = _float("DB_WRITE_RETRY_DELAY", 0.2)
+DB_WRITE_MAX_FAILED_FLUSHES = _int("DB_WRITE_MAX_FAILED_FLUSHES", 5)
+
 
 # =====================================================================
 # LLM / Claude CLI
 # =====================================================================
 
+# Concurrent claude CLI subprocesses per worker process, across all
+# pipelines and jobs (claude_cli_wrapper.CLIGovernor). The cap adapts
+# (AIMD) between MIN and MAX: +1 per window of successful calls, multiplied
+# by AIMD_DECREASE_FACTOR on a rate-limit error (once per THROTTLE_COOLDOWN)
+CLAUDE_CLI_MAX_CONCURRENCY = _int("CLAUDE_CLI_MAX_CONCURRENCY", 4)
+CLAUDE_CLI_MIN_CONCURRENCY = _int("CLAUDE_CLI_MIN_CONCURRENCY", 1)
+CLAUDE_CLI_INITIAL_CONCURRENCY = _int("CLAUDE_CLI_INITIAL_CONCURRENCY", 2)
+CLAUDE_CLI_AIMD_DECREASE_FACTOR = _float("CLAUDE_CLI_AIMD_DECREASE_FACTOR", 0.5)
+CLAUDE_CLI_THROTTLE_COOLDOWN = _float("CLAUDE_CLI_THROTTLE_COOLDOWN", 10.0)
+
 # Default retry base delay for exponential backoff (seconds)
 LLM_RETRY_BASE_DELAY = _float("LLM_RETRY_BASE_DELAY", 10.0)
 
 # Min delay when rate-limited (overrides base delay)
 LLM_RATE_LIMIT_MIN_DELAY = _float("LLM_RATE_LIMIT_MIN_DELAY", 30.0)
 
+# On-disk cache for oneshot CLI responses (workflow/llm_cache.py), keyed by
+# prompt, model, tools and screenshot content. Per-call override: cache=False
+LLM_CACHE_ENABLED = _str("LLM_CACHE_ENABLED", "true").lower() in ("true", "1", "yes")
+LLM_CACHE_DIR = _str("LLM_CACHE_DIR", str(Path(__file__).parent.parent / ".cache" / "llm"))
+LLM_CACHE_MAX_BYTES = _int("LLM_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+LLM_CACHE_TTL_SECONDS = _float("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600.0)
+
 # Default/max timeout for LLM agent nodes (seconds)
 LLM_AGENT_DEFAULT_TIMEOUT = _float("LLM_AGENT_DEFAULT_TIMEOUT", 300.0)
 LLM_AGENT_MAX_TIMEOUT = _float("LLM_AGENT_MAX_TIMEOUT", 3600.0)
 
 
+# =====================================================================
+# Workflow Engine
+# =====================================================================
+
+# Max compiled graphs kept per worker process (LRU by definition hash)
+GRAPH_CACHE_MAX_ENTRIES = _int("GRAPH_CACHE_MAX_ENTRIES", 32)
+
+
 # =====================================================================
 # HTTP Clients (Worker → FastAPI SSE push, Figma API)
 # =====================================================================
@@ -91,8 +184,36 @@ SSE_HTTP_TIMEOUT = _float("SSE_HTTP_TIMEOUT", 5.0)
 SSE_HTTP_MAX_CONNECTIONS = _int("SSE_HTTP_MAX_CONNECTIONS", 10)
 SSE_HTTP_MAX_KEEPALIVE = _int("SSE_HTTP_MAX_KEEPALIVE", 5)
 
+# Worker-side SSE batching (workflow/sse.py EventShipper)
+SSE_BATCH_ENABLED = _str("SSE_BATCH_ENABLED", "true").lower() in ("true", "1", "yes")
+SSE_BATCH_MAX_EVENTS = _int("SSE_BATCH_MAX_EVENTS", 50)
+SSE_BATCH_FLUSH_INTERVAL = _float("SSE_BATCH_FLUSH_INTERVAL", 0.05)
+SSE_BATCH_MAX_RETRIES = _int("SSE_BATCH_MAX_RETRIES", 3)
+SSE_QUEUE_MAX_EVENTS = _int("SSE_QUEUE_MAX_EVENTS", 10000)
+
+# node_output event schema for dynamic workflows (workflow/engine/executor.py)
+#   1 — full merged state on every node completion (what the UI renders)
+#   2 — JSON-patch delta of changed state keys, plus a full snapshot on the
+#       first completion and every NODE_OUTPUT_SNAPSHOT_EVERY completions.
+#       Clients opt in per run with event_schema_version=2.
+NODE_OUTPUT_SCHEMA_VERSION = _int("NODE_OUTPUT_SCHEMA_VERSION", 1)
+NODE_OUTPUT_SNAPSHOT_EVERY = _int("NODE_OUTPUT_SNAPSHOT_EVERY", 10)
+
 FIGMA_HTTP_TIMEOUT = _float("FIGMA_HTTP_TIMEOUT", 60.0)
 
+# Screenshot downloads from Figma render URLs (one pooled client per FigmaClient)
+FIGMA_DOWNLOAD_CONCURRENCY = _int("FIGMA_DOWNLOAD_CONCURRENCY", 8)
+FIGMA_DOWNLOAD_MAX_RETRIES = _int("FIGMA_DOWNLOAD_MAX_RETRIES", 2)
+FIGMA_DOWNLOAD_RETRY_DELAY = _float("FIGMA_DOWNLOAD_RETRY_DELAY", 0.5)
+
+# On-disk cache for Figma API responses and screenshots
+# (workflow/integrations/figma_cache.py), keyed by file version. Keep the
+# TTL under Figma's 30-day render URL lifetime
+FIGMA_CACHE_ENABLED = _str("FIGMA_CACHE_ENABLED", "true").lower() in ("true", "1", "yes")
+FIGMA_CACHE_DIR = _str("FIGMA_CACHE_DIR", str(Path(__file__).parent.parent / ".cache" / "figma"))
+FIGMA_CACHE_MAX_BYTES = _int("FIGMA_CACHE_MAX_BYTES", 512 * 1024 * 1024)
+FIGMA_CACHE_TTL_SECONDS = _float("FIGMA_CACHE_TTL_SECONDS", 7 * 24 * 3600.0)
+
 
 # =====================================================================
 # Pipeline Policies
@@ -0,0 +1,124 @@
+"""Cross-job store of SpecAnalyzer results, keyed by component content.
+
+Job checkpoints (.spec_checkpoints.log in the job directory) only help a retry
+of the same job. A new job on the same page — e.g. after a designer nudged
+one button — would otherwise re-run two-pass vision analysis for every
+component. This store lets it reuse prior merge_analyzer_output results for
+components whose structure and screenshot are unchanged, so only the
+changed ones go to SpecAnalyzerNode.
+
+Fingerprint: SHA-256 over the structural spec (_strip_semantic_fields), the
+screenshot file's content hash and the model. Bounds, children, text and
+styles are all part of the structural spec, so any edit to the subtree
+produces a new fingerprint.
+
+Storage: one JSON file per fingerprint (atomic rename, safe across worker
+processes); oldest entries by mtime are pruned beyond max_entries.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Optional
+
+from ..llm_cache import file_content_hash
+from ..settings import SPEC_ANALYSIS_STORE_DIR, SPEC_ANALYSIS_STORE_ENABLED, SPEC_ANALYSIS_STORE_MAX_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+
+def component_fingerprint(component: Dict, output_dir: str, model: str = "") -> str:
+    """Stable content hash of a component's structural spec + screenshot."""
+    from ..nodes.spec_analyzer import _strip_semantic_fields
+
+    structural = _strip_semantic_fields(component)
+    screenshot_path = component.get("screenshot_path") or ""
+    screenshot_hash = (
+        file_content_hash(os.path.join(output_dir, screenshot_path)) if screenshot_path else ""
+    )
+    material = json.dumps(
+        {"spec": structural, "screenshot": screenshot_hash, "model": model},
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class SpecAnalysisStore:
+    """Directory of analyzed ComponentSpecs, one JSON file per fingerprint."""
+
+    def __init__(self, root: str, max_entries: int = SPEC_ANALYSIS_STORE_MAX_ENTRIES):
+        self.root = root
+        self.max_entries = max_entries
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, fingerprint: str) -> str:
+        return os.path.join(self.root, f"{fingerprint}.json")
+
+    def get(self, fingerprint: str) -> Optional[Dict]:
+        path = self._path(fingerprint)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            os.utime(path)  # mark as recently used for pruning
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("SpecAnalysisStore: cannot read %s: %s", path, e)
+            return None
+        return data
+
+    def put(self, fingerprint: str, component: Dict) -> None:
+        path = self._path(fingerprint)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(component, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("SpecAnalysisStore: cannot write %s: %s", path, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def prune(self) -> int:
+        """Remove least-recently-used entries beyond max_entries."""
+        try:
+            entries = [
+                e for e in os.scandir(self.root) if e.name.endswith(".json")
+            ]
+        except OSError:
+            return 0
+        excess = len(entries) - self.max_entries
+        if excess <= 0:
+            return 0
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        removed = 0
+        for entry in entries[:excess]:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+        logger.info("SpecAnalysisStore: pruned %d entries", removed)
+        return removed
+
+
+_store: Optional[SpecAnalysisStore] = None
+
+
+def get_spec_analysis_store() -> Optional[SpecAnalysisStore]:
+    """Process-wide store, or None when disabled or the directory is unusable."""
+    global _store
+    if not SPEC_ANALYSIS_STORE_ENABLED:
+        return None
+    if _store is None:
+        try:
+            _store = SpecAnalysisStore(SPEC_ANALYSIS_STORE_DIR)
+        except OSError as e:
+            logger.warning("SpecAnalysisStore: disabled, cannot open %s: %s", SPEC_ANALYSIS_STORE_DIR, e)
+            return None
+    return _store
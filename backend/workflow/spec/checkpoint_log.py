@@ -0,0 +1,256 @@
+"""Per-job append-only log of analyzed components (resume on retry).
+
+Replaces the one-file-per-component .spec_checkpoints/ directory: every
+analyzed component is appended to {output_dir}/.spec_checkpoints.log the
+moment it finishes, so a worker crash mid-analysis only loses the
+components that were still in flight.
+
+Record format, one per line:
+
+    <crc32 of payload, 8 hex>\t<component id>\t<payload JSON>\n
+
+The last record for an id wins. A record that is cut short or fails its
+CRC (torn write on crash) ends the scan; the file is truncated back to the
+last good record before new appends. Startup only parses the winning
+record per id.
+
+Durability: each append is flushed to the OS immediately (survives a
+process crash); fsync is batched — every SPEC_CHECKPOINT_FSYNC_EVERY
+records or SPEC_CHECKPOINT_FSYNC_INTERVAL seconds, on a writer thread so
+append() never blocks the event loop on disk — and done inline on close.
+
+Compaction: load() rewrites the log with only the live records when
+records > 2 * live + 8 (about two-thirds superseded, and never for fewer
+than 8 superseded records) or when legacy .spec_checkpoints/ files were
+imported.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from ..settings import SPEC_CHECKPOINT_FSYNC_EVERY, SPEC_CHECKPOINT_FSYNC_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+_LOG_NAME = ".spec_checkpoints.log"
+_LEGACY_DIR = ".spec_checkpoints"
+
+
+def _encode_record(component_id: str, data: dict) -> bytes:
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    crc = zlib.crc32(payload)
+    # ids are Figma node ids ("1:23"); keep the field delimiters out of them
+    safe_id = component_id.replace("\t", " ").replace("\n", " ")
+    return b"%08x\t%s\t%s\n" % (crc, safe_id.encode("utf-8"), payload)
+
+
+def _scan(raw: bytes) -> Tuple[Dict[str, bytes], int, int]:
+    """(latest payload per id, record count, end offset of the last good record)."""
+    latest: Dict[str, bytes] = {}
+    records = 0
+    pos = 0
+    while pos < len(raw):
+        end = raw.find(b"\n", pos)
+        if end < 0:
+            break  # torn final record
+        parts = raw[pos:end].split(b"\t", 2)
+        if len(parts) != 3:
+            break
+        crc, comp_id, payload = parts
+        try:
+            ok = int(crc, 16) == zlib.crc32(payload)
+        except ValueError:
+            ok = False
+        if not ok:
+            break
+        latest[comp_id.decode("utf-8")] = payload
+        records += 1
+        pos = end + 1
+    return latest, records, pos
+
+
+class CheckpointLog:
+    """Append-only checkpoint log for one spec job's output directory.
+
+    append() is safe to call from the event loop; close() waits for the
+    final fsync, so async callers run it via asyncio.to_thread.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        fsync_every: int = SPEC_CHECKPOINT_FSYNC_EVERY,
+        fsync_interval: float = SPEC_CHECKPOINT_FSYNC_INTERVAL,
+    ):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, _LOG_NAME)
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self._file = None
+        self._fsyncer: Optional[ThreadPoolExecutor] = None
+        self._pending: Optional[Future] = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def __enter__(self) -> "CheckpointLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -- reading --------------------------------------------------------
+
+    def load(self) -> Dict[str, dict]:
+        """All checkpointed components, {component_id: data}.
+
+        Also repairs a torn tail and compacts the log when worthwhile.
+        Never raises: an unreadable log is treated as empty.
+        """
+        raw = b""
+        try:
+            with open(self.path, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Failed to read checkpoint log %s: %s", self.path, e)
+
+        latest, records, good_end = _scan(raw)
+        result: Dict[str, dict] = {}
+        for comp_id, payload in latest.items():
+            try:
+                result[comp_id] = json.loads(payload)
+            except ValueError:
+                continue
+        if good_end < len(raw):
+            logger.warning(
+                "Checkpoint log %s: dropping %d bytes of torn records",
+                self.path, len(raw) - good_end,
+            )
+
+        legacy = self._load_legacy_dir()
+        for comp_id, data in legacy.items():
+            result.setdefault(comp_id, data)
+
+        if legacy or records > 2 * len(result) + 8:
+            if self._rewrite(result) and legacy:
+                self._remove_legacy_dir()
+        elif good_end < len(raw):
+            self._truncate(good_end)
+        return result
+
+    def _load_legacy_dir(self) -> Dict[str, dict]:
+        """Checkpoints written as one JSON file per component (pre-log jobs)."""
+        cp_dir = os.path.join(self.output_dir, _LEGACY_DIR)
+        if not os.path.isdir(cp_dir):
+            return {}
+        result: Dict[str, dict] = {}
+        for filename in sorted(os.listdir(cp_dir)):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(cp_dir, filename), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Skipping legacy checkpoint %s: %s", filename, e)
+                continue
+            if isinstance(data, dict) and data.get("id"):
+                result[data["id"]] = data
+        return result
+
+    def _remove_legacy_dir(self) -> None:
+        shutil.rmtree(os.path.join(self.output_dir, _LEGACY_DIR), ignore_errors=True)
+
+    # -- writing --------------------------------------------------------
+
+    def append(self, component_id: str, data: dict) -> None:
+        """Append one component's result. Failures are logged, not raised."""
+        try:
+            if self._file is None:
+                os.makedirs(self.output_dir, exist_ok=True)
+                self._file = open(self.path, "ab")
+            self._file.write(_encode_record(component_id, data))
+            self._file.flush()
+            self._unsynced += 1
+            if (
+                self._unsynced >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_interval
+            ):
+                self._sync_in_background()
+        except Exception as e:
+            logger.warning("Failed to save checkpoint for %s: %s", component_id, e)
+
+    def _sync_in_background(self) -> None:
+        if self._pending is not None and not self._pending.done():
+            return  # previous batch still syncing; a later append retries
+        if self._fsyncer is None:
+            self._fsyncer = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="checkpoint-fsync",
+            )
+        self._pending = self._fsyncer.submit(self._fsync, self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _fsync(self, fd: int) -> None:
+        try:
+            os.fsync(fd)
+        except OSError as e:
+            logger.warning("Failed to sync checkpoint log %s: %s", self.path, e)
+
+    def sync(self) -> None:
+        """fsync appended records to disk (blocking)."""
+        if self._pending is not None:
+            self._pending.result()
+            self._pending = None
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        try:
+            self.sync()
+        except OSError as e:
+            logger.warning("Failed to sync checkpoint log %s: %s", self.path, e)
+        finally:
+            self._file.close()
+            self._file = None
+            if self._fsyncer is not None:
+                self._fsyncer.shutdown()
+                self._fsyncer = None
+
+    def _truncate(self, size: int) -> None:
+        try:
+            with open(self.path, "r+b") as f:
+                f.truncate(size)
+                os.fsync(f.fileno())
+        except OSError as e:
+            logger.warning("Failed to repair checkpoint log %s: %s", self.path, e)
+
+    def _rewrite(self, entries: Dict[str, dict]) -> bool:
+        """Compact: replace the log with one record per live component."""
+        self.close()
+        tmp_path = f"{self.path}.tmp"
+        records: List[bytes] = [_encode_record(cid, data) for cid, data in entries.items()]
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(b"".join(records))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Failed to compact checkpoint log %s: %s", self.path, e)
+            return False
+        return True
+
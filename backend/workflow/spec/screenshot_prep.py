@@ -0,0 +1,364 @@
+"""Screenshot preprocessing between download and Pass 1 vision analysis.
+
+Figma renders arrive as scale=2 PNGs and used to go to Claude unchanged:
+a 40px icon costs as many image tokens as its 2x render, and a tall
+scrolling frame gets downscaled by the API until its text is unreadable.
+prepare_analysis_images derives the image(s) Pass 1 actually reads:
+
+- downsized so the long edge fits the component's size class
+  (SPEC_SCREENSHOT_MAX_DIM_SMALL / _MEDIUM / _LARGE)
+- cropped out of the page screenshot when the component has no render of
+  its own (failed download)
+- split into vertical tiles when the frame is much taller than wide
+  (height / width > SPEC_SCREENSHOT_TILE_ASPECT, at most _MAX_TILES)
+- re-encoded as SPEC_SCREENSHOT_FORMAT (jpeg by default, on white)
+
+Derived images are cached in SPEC_SCREENSHOT_CACHE_DIR keyed by the
+source file's content hash plus the preprocessing parameters, and copied
+into {output_dir}/screenshots/analysis/. The original screenshot_path is
+left alone (the UI and the cross-job analysis store use it).
+
+Needs Pillow (the "images" extra). Without it preprocessing is skipped
+and Pass 1 reads the original render, as before.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import logging
+import math
+import os
+import shutil
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..llm_cache import file_content_hash
+from ..settings import (
+    SPEC_SCREENSHOT_CACHE_DIR,
+    SPEC_SCREENSHOT_CACHE_MAX_ENTRIES,
+    SPEC_SCREENSHOT_FORMAT,
+    SPEC_SCREENSHOT_MAX_DIM_LARGE,
+    SPEC_SCREENSHOT_MAX_DIM_MEDIUM,
+    SPEC_SCREENSHOT_MAX_DIM_SMALL,
+    SPEC_SCREENSHOT_MAX_TILES,
+    SPEC_SCREENSHOT_PREP_ENABLED,
+    SPEC_SCREENSHOT_QUALITY,
+    SPEC_SCREENSHOT_TILE_ASPECT,
+)
+
+logger = logging.getLogger(__name__)
+
+# Size classes by the component's longest side in design px
+_SMALL_MAX_SIDE = 200
+_MEDIUM_MAX_SIDE = 600
+
+# What the vision API does to large images before counting tokens
+_API_MAX_EDGE = 1568
+_API_MAX_PIXELS = 1_150_000
+_PIXELS_PER_TOKEN = 750
+
+# Vertical overlap between tiles, so text cut by a tile edge appears whole once
+_TILE_OVERLAP = 0.05
+
+_EXTENSIONS = {"jpeg": "jpg", "webp": "webp", "png": "png"}
+
+_pillow_missing_logged = False
+
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    """Approximate vision input tokens for one image (after API downscaling)."""
+    if width <= 0 or height <= 0:
+        return 0
+    scale = min(1.0, _API_MAX_EDGE / max(width, height), math.sqrt(_API_MAX_PIXELS / (width * height)))
+    return math.ceil(width * scale * height * scale / _PIXELS_PER_TOKEN)
+
+
+def size_class_max_dim(bounds: Optional[Dict[str, Any]]) -> int:
+    """Target long edge (px) for a component of these design-px bounds."""
+    bounds = bounds or {}
+    side = max(bounds.get("width", 0) or 0, bounds.get("height", 0) or 0)
+    if 0 < side <= _SMALL_MAX_SIDE:
+        return SPEC_SCREENSHOT_MAX_DIM_SMALL
+    if 0 < side <= _MEDIUM_MAX_SIDE:
+        return SPEC_SCREENSHOT_MAX_DIM_MEDIUM
+    return SPEC_SCREENSHOT_MAX_DIM_LARGE
+
+
+def plan_layout(
+    width: int,
+    height: int,
+    max_dim: int,
+    tile_aspect: float = SPEC_SCREENSHOT_TILE_ASPECT,
+    max_tiles: int = SPEC_SCREENSHOT_MAX_TILES,
+) -> Tuple[float, List[Tuple[int, int]]]:
+    """(scale, [(top, bottom), ...]) for an image of width x height.
+
+    Rows are in scaled pixels. Ordinary images get one row with the long
+    edge fitted to max_dim. Frames taller than tile_aspect x their width
+    are fitted by width and cut into overlapping rows of at most max_dim;
+    if that needs more than max_tiles rows the whole frame is scaled down
+    further so it fits in max_tiles.
+    """
+    if width <= 0 or height <= 0:
+        return 1.0, []
+    if height / width <= tile_aspect or max_tiles <= 1:
+        scale = min(1.0, max_dim / max(width, height))
+        return scale, [(0, max(1, round(height * scale)))]
+
+    scale = min(1.0, max_dim / width)
+    step = max_dim * (1 - _TILE_OVERLAP)
+    tiles_needed = math.ceil((height * scale - max_dim) / step) + 1
+    if tiles_needed > max_tiles:
+        # Fit the whole height into max_tiles overlapping rows
+        scale = (max_dim + (max_tiles - 1) * step) / height
+    scaled_h = max(1, round(height * scale))
+    rows: List[Tuple[int, int]] = []
+    top = 0.0
+    while True:
+        bottom = min(scaled_h, round(top + max_dim))
+        rows.append((round(top), bottom))
+        if bottom >= scaled_h:
+            break
+        top += step
+    return scale, rows
+
+
+def crop_box(
+    bounds: Dict[str, Any], page_width: float, image_size: Tuple[int, int],
+) -> Optional[Tuple[int, int, int, int]]:
+    """Pixel box of page-relative bounds inside the page screenshot, or None."""
+    img_w, img_h = image_size
+    if page_width <= 0 or img_w <= 0:
+        return None
+    scale = img_w / page_width
+    left = max(0, math.floor(bounds.get("x", 0) * scale))
+    top = max(0, math.floor(bounds.get("y", 0) * scale))
+    right = min(img_w, math.ceil((bounds.get("x", 0) + bounds.get("width", 0)) * scale))
+    bottom = min(img_h, math.ceil((bounds.get("y", 0) + bounds.get("height", 0)) * scale))
+    if right - left < 2 or bottom - top < 2:
+        return None
+    return left, top, right, bottom
+
+
+def _load_pillow():
+    global _pillow_missing_logged
+    try:
+        from PIL import Image
+    except ImportError:
+        if not _pillow_missing_logged:
+            logger.warning("Pillow not installed; screenshots go to analysis unprocessed")
+            _pillow_missing_logged = True
+        return None
+    return Image
+
+
+def prepare_analysis_images(
+    component: Dict[str, Any],
+    output_dir: str,
+    page_screenshot: str = "",
+    page_width: float = 0,
+) -> Optional[Dict[str, Any]]:
+    """Derive Pass 1 image(s) for a component.
+
+    Returns None when preprocessing is disabled, Pillow is missing, or there
+    is nothing to read (no render and no page screenshot to crop from).
+    Otherwise returns:
+
+        {"paths": [...],                 # relative to output_dir, top to bottom
+         "cropped": bool, "tiles": int,
+         "source_bytes": int, "derived_bytes": int,
+         "tokens_before": int, "tokens_after": int}
+
+    tokens_before is the estimate for the original render (0 for a crop,
+    since there was no image to send before).
+    """
+    if not SPEC_SCREENSHOT_PREP_ENABLED:
+        return None
+    Image = _load_pillow()
+    if Image is None:
+        return None
+
+    bounds = component.get("bounds") or {}
+    rel_source = component.get("screenshot_path") or ""
+    source = os.path.join(output_dir, rel_source) if rel_source else ""
+    cropped = False
+    if not source or not os.path.isfile(source):
+        source = os.path.join(output_dir, page_screenshot) if page_screenshot else ""
+        if not source or not os.path.isfile(source) or not bounds:
+            return None
+        cropped = True
+
+    fmt = SPEC_SCREENSHOT_FORMAT if SPEC_SCREENSHOT_FORMAT in _EXTENSIONS else "jpeg"
+    max_dim = size_class_max_dim(bounds)
+    params = {
+        "fmt": fmt, "quality": SPEC_SCREENSHOT_QUALITY, "max_dim": max_dim,
+        "tile_aspect": SPEC_SCREENSHOT_TILE_ASPECT, "max_tiles": SPEC_SCREENSHOT_MAX_TILES,
+        "crop": [bounds.get(k, 0) for k in ("x", "y", "width", "height")] + [page_width]
+        if cropped else None,
+    }
+    key = hashlib.sha256(
+        (file_content_hash(source) + json.dumps(params, sort_keys=True)).encode("utf-8"),
+    ).hexdigest()
+
+    try:
+        derived = _cached(key) or _derive(Image, key, source, cropped, bounds, page_width, params)
+    except Exception as e:
+        logger.warning("Screenshot preprocessing failed for %s: %s", component.get("id", "?"), e)
+        return None
+    if derived is None:
+        return None
+
+    ext = _EXTENSIONS[fmt]
+    safe_id = (component.get("id") or "component").replace(":", "_").replace("/", "_")
+    rel_dir = os.path.join("screenshots", "analysis")
+    os.makedirs(os.path.join(output_dir, rel_dir), exist_ok=True)
+    paths: List[str] = []
+    for i in range(derived["tiles"]):
+        rel_path = os.path.join(rel_dir, f"{safe_id}_{i}.{ext}")
+        shutil.copyfile(
+            os.path.join(SPEC_SCREENSHOT_CACHE_DIR, f"{key}_{i}.{ext}"),
+            os.path.join(output_dir, rel_path),
+        )
+        paths.append(rel_path)
+
+    return {
+        "paths": paths,
+        "cropped": cropped,
+        "tiles": derived["tiles"],
+        "source_bytes": 0 if cropped else os.path.getsize(source),
+        "derived_bytes": derived["derived_bytes"],
+        "tokens_before": 0 if cropped else derived["tokens_before"],
+        "tokens_after": derived["tokens_after"],
+    }
+
+
+def _cached(key: str) -> Optional[Dict[str, Any]]:
+    meta_path = os.path.join(SPEC_SCREENSHOT_CACHE_DIR, f"{key}.json")
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        os.utime(meta_path)  # LRU for prune_cache
+        return meta
+    except (OSError, ValueError):
+        return None
+
+
+def prune_cache(max_entries: int = SPEC_SCREENSHOT_CACHE_MAX_ENTRIES) -> int:
+    """Remove least-recently-used derived images beyond max_entries sources."""
+    try:
+        files = list(os.scandir(SPEC_SCREENSHOT_CACHE_DIR))
+    except OSError:
+        return 0
+    metas = [e for e in files if e.name.endswith(".json")]
+    excess = len(metas) - max_entries
+    if excess <= 0:
+        return 0
+    metas.sort(key=lambda e: e.stat().st_mtime)
+    stale = {e.name[:-len(".json")] for e in metas[:excess]}
+    removed = 0
+    # Metadata first: an entry with tiles but no metadata is just a miss
+    for entry in metas[:excess] + [e for e in files if e.name.split("_", 1)[0] in stale]:
+        try:
+            os.remove(entry.path)
+            removed += entry.name.endswith(".json")
+        except OSError:
+            pass
+    logger.info("Screenshot cache: pruned %d entries", removed)
+    return removed
+
+
+def _derive(
+    Image: Any,
+    key: str,
+    source: str,
+    cropped: bool,
+    bounds: Dict[str, Any],
+    page_width: float,
+    params: Dict[str, Any],
+) -> Optional[Dict[str, Any]]:
+    """Render the derived tiles into the cache and write their metadata."""
+    with Image.open(source) as img:
+        img.load()
+        tokens_before = estimate_image_tokens(*img.size)
+        if cropped:
+            box = crop_box(bounds, page_width, img.size)
+            if box is None:
+                return None
+            img = img.crop(box)
+        if img.mode in ("RGBA", "LA", "P") and params["fmt"] != "png":
+            rgba = img.convert("RGBA")
+            img = Image.new("RGB", rgba.size, (255, 255, 255))
+            img.paste(rgba, mask=rgba.getchannel("A"))
+        elif img.mode not in ("RGB", "L", "RGBA"):
+            img = img.convert("RGB")
+
+        scale, rows = plan_layout(
+            img.width, img.height, params["max_dim"],
+            params["tile_aspect"], params["max_tiles"],
+        )
+        if scale < 1.0:
+            img = img.resize(
+                (max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+                Image.LANCZOS,
+            )
+
+        os.makedirs(SPEC_SCREENSHOT_CACHE_DIR, exist_ok=True)
+        ext = _EXTENSIONS[params["fmt"]]
+        derived_bytes = 0
+        tokens_after = 0
+        for i, (top, bottom) in enumerate(rows):
+            tile = img.crop((0, top, img.width, min(bottom, img.height)))
+            buf = io.BytesIO()
+            save_kwargs: Dict[str, Any] = {"optimize": True}
+            if params["fmt"] != "png":
+                save_kwargs["quality"] = params["quality"]
+            tile.save(buf, format=params["fmt"].upper(), **save_kwargs)
+            data = buf.getvalue()
+            tmp_path = os.path.join(SPEC_SCREENSHOT_CACHE_DIR, f"{key}_{i}.{ext}.tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, os.path.join(SPEC_SCREENSHOT_CACHE_DIR, f"{key}_{i}.{ext}"))
+            derived_bytes += len(data)
+            tokens_after += estimate_image_tokens(*tile.size)
+
+    meta = {
+        "tiles": len(rows),
+        "derived_bytes": derived_bytes,
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+    }
+    # Metadata last: its presence means every tile is in place
+    meta_path = os.path.join(SPEC_SCREENSHOT_CACHE_DIR, f"{key}.json")
+    with open(f"{meta_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(f"{meta_path}.tmp", meta_path)
+    return meta
+
+
+def summarize(prepared: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Job-level screenshot stats from {component_id: prepare result}."""
+    source_bytes = sum(p["source_bytes"] for p in prepared.values())
+    derived_bytes = sum(p["derived_bytes"] for p in prepared.values())
+    # Crops had no image before; bytes saved only counts replaced renders
+    replaced_derived = sum(p["derived_bytes"] for p in prepared.values() if not p["cropped"])
+    return {
+        "preprocessed": len(prepared),
+        "cropped": sum(1 for p in prepared.values() if p["cropped"]),
+        "tiled": sum(1 for p in prepared.values() if p["tiles"] > 1),
+        "source_bytes": source_bytes,
+        "derived_bytes": derived_bytes,
+        "bytes_saved": source_bytes - replaced_derived,
+        "image_tokens_before": sum(p["tokens_before"] for p in prepared.values()),
+        "image_tokens_after": sum(p["tokens_after"] for p in prepared.values()),
+        "components": {
+            comp_id: {
+                "tokens_before": p["tokens_before"],
+                "tokens_after": p["tokens_after"],
+                "token_delta": p["tokens_after"] - p["tokens_before"],
+                "tiles": p["tiles"],
+                "cropped": p["cropped"],
+            }
+            for comp_id, p in prepared.items()
+        },
+    }
@@ -0,0 +1,191 @@
+"""design_spec.json on disk: streaming writer, sidecar index and partial reads.
+
+SpecAssemblerNode used to build the whole document as one string
+(json.dump with indent=2), and the spec endpoint parsed the whole file back
+on every request. write_spec_document streams the document instead, one
+top-level component at a time in compact encoding, and records where each
+component lives in a small sidecar index (design_spec.index.json):
+
+    {
+      "format": 1,
+      "file": "design_spec.json",
+      "encoding": "identity" | "gzip",
+      "size": ..., "mtime_ns": ...,       # of the spec file, to detect staleness
+      "head": [offset, length],            # document up to "components":[
+      "tail": [offset, length],            # "]" and the keys after components
+      "components": [{"id", "name", "offset", "length"}, ...]
+    }
+
+With gzip, every segment (head, each component, tail) is its own gzip
+member. Concatenated members are still a valid .gz file, and a single
+component can be decompressed from its byte range alone.
+
+Readers fall back to parsing the whole file when the index is missing or
+does not match the spec file (e.g. specs written before the index existed).
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT = 1
+
+
+def _encode(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def spec_index_path(spec_path: str) -> str:
+    """Sidecar index path: design_spec.json[.gz] -> design_spec.index.json."""
+    base = spec_path[:-3] if spec_path.endswith(".gz") else spec_path
+    if base.endswith(".json"):
+        base = base[:-5]
+    return f"{base}.index.json"
+
+
+def spec_etag(spec_path: str) -> str:
+    """ETag from the file's size and mtime, so no content is read."""
+    st = os.stat(spec_path)
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def write_spec_document(spec_path: str, document: Dict[str, Any], compress: bool = False) -> str:
+    """Stream document to spec_path and write its sidecar index.
+
+    Keys keep their order; the "components" list is written element by
+    element. Both files are written to a temp name and renamed into place.
+    Returns the index path.
+    """
+    tmp_path = f"{spec_path}.tmp"
+    components: List[Dict[str, Any]] = document.get("components") or []
+    entries: List[Dict[str, Any]] = []
+    offset = 0
+
+    with open(tmp_path, "wb") as f:
+        def segment(data: bytes) -> List[int]:
+            nonlocal offset
+            if compress:
+                data = gzip.compress(data, mtime=0)
+            f.write(data)
+            span = [offset, len(data)]
+            offset += len(data)
+            return span
+
+        # key:value pairs before and after the components list
+        keys = list(document)
+        split = keys.index("components") if "components" in document else len(keys)
+        before = [_encode(k) + b":" + _encode(document[k]) for k in keys[:split]]
+        after = [_encode(k) + b":" + _encode(document[k]) for k in keys[split + 1:]]
+        before.append(b'"components":[')
+
+        head = segment(b"{" + b",".join(before))
+        for i, comp in enumerate(components):
+            start, length = segment((b"," if i else b"") + _encode(comp))
+            entries.append({
+                "id": comp.get("id", ""),
+                "name": comp.get("name", ""),
+                "offset": start,
+                "length": length,
+            })
+        tail = segment(b"]" + b"".join(b"," + pair for pair in after) + b"}")
+
+    st = os.stat(tmp_path)
+    os.replace(tmp_path, spec_path)
+
+    index = {
+        "format": INDEX_FORMAT,
+        "file": os.path.basename(spec_path),
+        "encoding": "gzip" if compress else "identity",
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "head": head,
+        "tail": tail,
+        "components": entries,
+    }
+    index_path = spec_index_path(spec_path)
+    with open(f"{index_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(f"{index_path}.tmp", index_path)
+    return index_path
+
+
+def is_gzip_spec(spec_path: str) -> bool:
+    with open(spec_path, "rb") as f:
+        return f.read(2) == b"\x1f\x8b"
+
+
+def load_spec_index(spec_path: str) -> Optional[Dict[str, Any]]:
+    """The sidecar index, or None if missing or out of date with spec_path."""
+    index_path = spec_index_path(spec_path)
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        st = os.stat(spec_path)
+    except (OSError, ValueError):
+        return None
+    if (
+        index.get("format") != INDEX_FORMAT
+        or index.get("size") != st.st_size
+        or index.get("mtime_ns") != st.st_mtime_ns
+    ):
+        logger.warning("Spec index %s is stale, ignoring", index_path)
+        return None
+    return index
+
+
+def _read_span(f, index: Dict[str, Any], span: List[int]) -> bytes:
+    f.seek(span[0])
+    data = f.read(span[1])
+    if index.get("encoding") == "gzip":
+        data = gzip.decompress(data)
+    return data
+
+
+def _load_full(spec_path: str) -> Dict[str, Any]:
+    opener = gzip.open if is_gzip_spec(spec_path) else open
+    with opener(spec_path, "rb") as f:
+        return json.loads(f.read())
+
+
+def read_spec_header(spec_path: str) -> Dict[str, Any]:
+    """The document without its components, plus a component_index listing.
+
+    component_index is [{"id", "name"}] in document order, so a client can
+    fetch components one by one with read_spec_component.
+    """
+    index = load_spec_index(spec_path)
+    if index is None:
+        document = _load_full(spec_path)
+        components = document.pop("components", None) or []
+        listing = [{"id": c.get("id", ""), "name": c.get("name", "")} for c in components]
+    else:
+        with open(spec_path, "rb") as f:
+            raw = _read_span(f, index, index["head"]) + _read_span(f, index, index["tail"])
+        document = json.loads(raw)
+        document.pop("components", None)
+        listing = [{"id": e["id"], "name": e["name"]} for e in index["components"]]
+    document["component_index"] = listing
+    return document
+
+
+def read_spec_component(spec_path: str, component_id: str) -> Optional[Dict[str, Any]]:
+    """One top-level component by id, or None if the spec has no such component."""
+    index = load_spec_index(spec_path)
+    if index is None:
+        for comp in _load_full(spec_path).get("components") or []:
+            if comp.get("id") == component_id:
+                return comp
+        return None
+
+    entry = next((e for e in index["components"] if e["id"] == component_id), None)
+    if entry is None:
+        return None
+    with open(spec_path, "rb") as f:
+        raw = _read_span(f, index, [entry["offset"], entry["length"]])
+    return json.loads(raw.lstrip(b","))
@@ -11,7 +11,7 @@ from __future__ import annotations
 import logging
 from copy import deepcopy
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List
 
 logger = logging.getLogger(__name__)
 
@@ -132,11 +132,7 @@ def _merge_interaction(
         existing["states"] = merged_states
 
 
-def _apply_update_fields(
-    component: Dict[str, Any],
-    update: Dict[str, Any],
-    report: Optional[MergeReport] = None,
-) -> None:
+def _apply_update_fields(component: Dict[str, Any], update: Dict[str, Any]) -> None:
     """Apply semantic fields from an update dict into a component (in-place)."""
     if "role" in update:
         component["role"] = update["role"]
@@ -152,14 +148,6 @@ def _apply_update_fields(
     if "design_analysis" in update:
         component["design_analysis"] = update["design_analysis"]
 
-    # Track empty descriptions
-    if report is not None:
-        desc = component.get("description", "")
-        if not desc or (isinstance(desc, str) and not desc.strip()):
-            comp_id = component.get("id", "unknown")
-            comp_name = component.get("name", "unknown")
-            report.empty_descriptions.append(f"{comp_name}({comp_id})")
-
     # Content updates (image.alt, icon.name)
     content_updates = update.get("content_updates")
     if isinstance(content_updates, dict):
@@ -171,142 +159,71 @@ def _apply_update_fields(
         _merge_interaction(component, interaction)
 
 
-def _merge_into_component(
-    component: Dict[str, Any],
-    update: Dict[str, Any],
-    children_map: Dict[str, Dict[str, Any]],
-    report: Optional[MergeReport] = None,
-) -> None:
-    """Merge analyzer output fields into a single component (in-place).
+def _track_empty_description(component: Dict[str, Any], report: MergeReport) -> None:
+    desc = component.get("description", "")
+    if not desc or (isinstance(desc, str) and not desc.strip()):
+        comp_id = component.get("id", "unknown")
+        comp_name = component.get("name", "unknown")
+        report.empty_descriptions.append(f"{comp_name}({comp_id})")
 
-    Then recurse into ALL children unconditionally, so deep descendants
-    can be matched even when their parent has no update in children_map.
-    """
-    # Apply semantic fields from the update
-    _apply_update_fields(component, update, report)
 
-    # Recurse into ALL children (full-tree walk for deep matching)
-    _walk_children_for_updates(component, children_map, report)
+class _MergeWalk:
+    """One traversal of a component tree after its top-level update.
 
+    For every node it applies the matching children_update, records the IDs
+    seen and the IDs FrameDecomposer pruned (for unmatched detection), and
+    rebuilds `path` from the semantic names. All updates for one set of
+    siblings are applied before their paths are assigned, because same-name
+    siblings are deduplicated with _1, _2 suffixes.
+    """
 
-def _walk_children_for_updates(
-    node: Dict[str, Any],
-    children_map: Dict[str, Dict[str, Any]],
-    report: Optional[MergeReport] = None,
-) -> None:
-    """Walk ALL children recursively, applying updates where IDs match.
+    def __init__(self, children_map: Dict[str, Dict[str, Any]], report: MergeReport):
+        self.children_map = children_map
+        self.report = report
+        self.tree_ids: set = set()
+        self.pruned_ids: set = set()
 
-    This ensures deep descendants (depth 2+) get their semantic fields
-    even when intermediate parent nodes have no update entry.
-    """
-    children = node.get("children")
-    if not isinstance(children, list):
-        return
-    for child in children:
-        if not isinstance(child, dict):
-            continue
-        child_id = child.get("id")
-        if child_id and child_id in children_map:
-            child_update = children_map[child_id]
-            if report is not None:
-                report.children_updates_matched += 1
-            _apply_update_fields(child, child_update, report)
-        # Always recurse deeper — descendants may have updates
-        _walk_children_for_updates(child, children_map, report)
-
-
-def _rebuild_paths(node: Dict[str, Any], parent_path: str = "") -> None:
-    """Rebuild path fields using semantic names (post-AI merge).
-
-    After AI merge, `name` fields contain semantic names (e.g. "BottomActionBar")
-    instead of Figma IDs. This rebuilds `path` using those names.
-    Also deduplicates same-name siblings by adding _1, _2 suffixes.
-    """
-    name = node.get("name", "Component")
-    current_path = f"{parent_path}/{name}" if parent_path else name
-    node["path"] = current_path
+    def visit(self, node: Dict[str, Any], node_path: str) -> None:
+        node["path"] = node_path
+        pruned_here = node.get("_pruned_child_ids")
+        if isinstance(pruned_here, list):
+            self.pruned_ids.update(pruned_here)
+
+        children = node.get("children")
+        if not isinstance(children, list):
+            return
+        children = [c for c in children if isinstance(c, dict)]
 
-    children = node.get("children")
-    if isinstance(children, list):
-        # Deduplicate same-name siblings
+        matched = []
         name_counts: Dict[str, int] = {}
-        name_seen: Dict[str, int] = {}
         for child in children:
+            child_id = child.get("id")
+            update = self.children_map.get(child_id) if child_id else None
+            if child_id:
+                self.tree_ids.add(child_id)
+            if update is not None:
+                self.report.children_updates_matched += 1
+                _apply_update_fields(child, update)
+            matched.append(update is not None)
             cname = child.get("name", "Component")
             name_counts[cname] = name_counts.get(cname, 0) + 1
 
-        for child in children:
+        name_seen: Dict[str, int] = {}
+        for child, was_matched in zip(children, matched, strict=True):
+            if was_matched:
+                _track_empty_description(child, self.report)
             cname = child.get("name", "Component")
             if name_counts[cname] > 1:
                 idx = name_seen.get(cname, 0) + 1
                 name_seen[cname] = idx
-                deduped_name = f"{cname}_{idx}"
-                child_path = f"{current_path}/{deduped_name}"
-            else:
-                child_path = f"{current_path}/{cname}"
-            child["path"] = child_path
-            # Recurse with the correct parent path
-            _rebuild_paths_children(child, child_path)
-
-
-def _rebuild_paths_children(node: Dict[str, Any], node_path: str) -> None:
-    """Recursively rebuild paths for children of a node."""
-    children = node.get("children")
-    if not isinstance(children, list):
-        return
-
-    name_counts: Dict[str, int] = {}
-    name_seen: Dict[str, int] = {}
-    for child in children:
-        cname = child.get("name", "Component")
-        name_counts[cname] = name_counts.get(cname, 0) + 1
-
-    for child in children:
-        cname = child.get("name", "Component")
-        if name_counts[cname] > 1:
-            idx = name_seen.get(cname, 0) + 1
-            name_seen[cname] = idx
-            child_path = f"{node_path}/{cname}_{idx}"
-        else:
-            child_path = f"{node_path}/{cname}"
-        child["path"] = child_path
-        _rebuild_paths_children(child, child_path)
-
-
-def _collect_all_child_ids(node: Dict[str, Any], ids: set) -> None:
-    """Recursively collect all child IDs in the component tree."""
-    children = node.get("children")
-    if isinstance(children, list):
-        for child in children:
-            if isinstance(child, dict):
-                child_id = child.get("id")
-                if child_id:
-                    ids.add(child_id)
-                _collect_all_child_ids(child, ids)
-
-
-def _collect_all_pruned_ids(node: Dict[str, Any]) -> List[str]:
-    """Recursively collect all pruned child IDs from the component tree.
-
-    These are IDs of children that FrameDecomposer skipped due to pruning
-    (depth limit, small icons, vector types, etc.). Stored as _pruned_child_ids
-    on nodes that had children but didn't recurse into them.
-    """
-    pruned: List[str] = []
-    pruned_here = node.get("_pruned_child_ids")
-    if isinstance(pruned_here, list):
-        pruned.extend(pruned_here)
-    children = node.get("children")
-    if isinstance(children, list):
-        for child in children:
-            if isinstance(child, dict):
-                pruned.extend(_collect_all_pruned_ids(child))
-    return pruned
+                cname = f"{cname}_{idx}"
+            self.visit(child, f"{node_path}/{cname}")
 
 
 def merge_analyzer_output(
     partial_spec: Dict[str, Any],
     analyzer_output: Dict[str, Any],
+    in_place: bool = False,
 ) -> Dict[str, Any]:
     """Merge SpecAnalyzer LLM output into a partial ComponentSpec.
 
@@ -319,13 +236,18 @@ def merge_analyzer_output(
         analyzer_output: LLM output from Node 2 (SpecAnalyzer).
                          Contains: role, description, render_hint,
                          content_updates, interaction, children_updates[].
+        in_place: Merge into partial_spec itself instead of a deep copy.
+                  The caller must hold the only reference to partial_spec
+                  (and its children): anything else still pointing at it,
+                  such as a queued event payload or a fallback copy, sees
+                  the merged fields.
 
     Returns:
-        A new ComponentSpec dict with semantic fields merged in.
-        Does not mutate the input.
+        The ComponentSpec dict with semantic fields merged in — a new dict
+        unless in_place is set.
         The dict includes a '_merge_report' key with merge statistics.
     """
-    result = deepcopy(partial_spec)
+    result = partial_spec if in_place else deepcopy(partial_spec)
 
     # Build lookup map from flattened children_updates
     children_updates = analyzer_output.get("children_updates", [])
@@ -334,17 +256,17 @@ def merge_analyzer_output(
     # Create merge report
     report = MergeReport(children_updates_total=len(children_updates))
 
-    # Merge top-level component fields
-    _merge_into_component(result, analyzer_output, children_map, report)
+    # Merge top-level component fields, then children/paths in one walk
+    _apply_update_fields(result, analyzer_output)
+    _track_empty_description(result, report)
+    walk = _MergeWalk(children_map, report)
+    walk.visit(result, result.get("name", "Component"))
 
     # Detect unmatched children_updates (LLM returned IDs not found in tree)
     # Distinguish between "pruned by depth limit" (expected) and truly unmatched
-    all_child_ids: set = set()
-    _collect_all_child_ids(result, all_child_ids)
-    pruned_ids = set(_collect_all_pruned_ids(result))
     for child_id in children_map:
-        if child_id not in all_child_ids:
-            if child_id in pruned_ids:
+        if child_id not in walk.tree_ids:
+            if child_id in walk.pruned_ids:
                 report.children_updates_pruned.append(child_id)
             else:
                 report.children_updates_unmatched.append(child_id)
@@ -381,9 +303,6 @@ def merge_analyzer_output(
             report.empty_descriptions[:5],
         )
 
-    # Rebuild paths using semantic names (post-merge)
-    _rebuild_paths(result)
-
     # Attach report for downstream consumption
     result["_merge_report"] = report.to_dict()
 
@@ -4,15 +4,20 @@ Called by SpecAssemblerNode after merge to detect quality issues:
 - Parent-child role conflicts
 - Bounds overflow
 - render_hint contradictions
+- Auto-layout compliance (inferred layouts)
 - Naming quality (duplicates, empty descriptions)
 - Merge report aggregation
+
+Each check is a ValidationRule registered with @register_rule; SpecValidator
+walks each component once and feeds every node to all rules.
 """
 
 from __future__ import annotations
 
 import logging
+import time
 from collections import Counter
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Type
 
 logger = logging.getLogger(__name__)
 
@@ -42,190 +47,391 @@ _INTERACTIVE_ROLES = {"button", "input"}
 
 
 # ---------------------------------------------------------------------------
-# Validation functions
+# Rule framework: every rule sees each node once, in one shared traversal
 # ---------------------------------------------------------------------------
 
-def validate_role_consistency(
-    node: Dict[str, Any],
-    parent_role: Optional[str],
-    warnings: List[Dict[str, Any]],
-) -> None:
-    """Check parent-child role conflicts recursively."""
-    role = node.get("role", "other")
-    node_ref = {
+def _node_ref(node: Dict[str, Any]) -> Dict[str, Any]:
+    return {
         "id": node.get("id", ""),
         "name": node.get("name", ""),
         "path": node.get("path", ""),
     }
 
-    # Forbidden parent roles
-    forbidden_parents = _ROLE_PARENT_CONFLICTS.get(role)
-    if forbidden_parents and parent_role in forbidden_parents:
-        warnings.append({
-            **node_ref,
-            "rule": "role_parent_conflict",
-            "detail": f"role='{role}' nested inside parent role='{parent_role}'",
-        })
-
-    # Required parent roles
-    required_parents = _ROLE_REQUIRES_PARENT.get(role)
-    if required_parents and parent_role not in required_parents:
-        warnings.append({
-            **node_ref,
-            "rule": "role_missing_parent",
-            "detail": (
-                f"role='{role}' requires parent role in "
-                f"{required_parents}, got '{parent_role}'"
-            ),
-        })
-
-    # Nested same interactive role (e.g., button inside button)
-    if role in _INTERACTIVE_ROLES and role == parent_role:
-        warnings.append({
-            **node_ref,
-            "rule": "role_nested_interactive",
-            "detail": f"role='{role}' nested inside same role='{parent_role}'",
-        })
-
-    for child in node.get("children", []):
-        if isinstance(child, dict):
-            validate_role_consistency(child, role, warnings)
 
+class ValidationRule:
+    """Base class for a spec validation rule.
 
-def validate_bounds(
-    node: Dict[str, Any],
-    parent_bounds: Optional[Dict[str, Any]],
-    warnings: List[Dict[str, Any]],
-) -> None:
-    """Check if child bounds exceed parent bounds (2px tolerance)."""
-    bounds = node.get("bounds")
-    if not isinstance(bounds, dict) or not isinstance(parent_bounds, dict):
-        for child in node.get("children", []):
-            if isinstance(child, dict):
-                validate_bounds(child, bounds, warnings)
-        return
-
-    tolerance = 2
-    px, py = parent_bounds.get("x", 0), parent_bounds.get("y", 0)
-    pw, ph = parent_bounds.get("width", 0), parent_bounds.get("height", 0)
-    cx, cy = bounds.get("x", 0), bounds.get("y", 0)
-    cw, ch = bounds.get("width", 0), bounds.get("height", 0)
-
-    overflow = (
-        cx + tolerance < px
-        or cy + tolerance < py
-        or cx + cw > px + pw + tolerance
-        or cy + ch > py + ph + tolerance
-    )
-
-    if overflow and cw > 0 and ch > 0:
-        layout = node.get("layout", {})
-        if layout.get("overflow") not in ("hidden", "scroll"):
-            warnings.append({
-                "id": node.get("id", ""),
-                "name": node.get("name", ""),
-                "path": node.get("path", ""),
-                "rule": "bounds_overflow",
+    visit() is called for every node of every component with its parent
+    (a synthetic page-level parent for top-level components). Rules keep
+    their own findings; report() summarizes them once all components are in.
+    incremental rules only look at a node and its parent, so they can be run
+    on a single component as soon as it is analyzed.
+    """
+
+    name = ""
+    incremental = True
+
+    def __init__(self) -> None:
+        self.findings: List[Dict[str, Any]] = []
+
+    def visit_component(self, component: Dict[str, Any]) -> None:
+        """Called once per top-level component, before its nodes."""
+
+    def visit(self, node: Dict[str, Any], parent: Dict[str, Any]) -> None:
+        """Called once per node."""
+
+    def report(self) -> Any:
+        return self.findings
+
+
+_RULE_TYPES: List[Type[ValidationRule]] = []
+
+
+def register_rule(cls: Type[ValidationRule]) -> Type[ValidationRule]:
+    """Class decorator: add a rule to every SpecValidator run."""
+    _RULE_TYPES.append(cls)
+    return cls
+
+
+@register_rule
+class RoleConsistencyRule(ValidationRule):
+    """Parent-child role conflicts."""
+
+    name = "role_consistency"
+
+    def visit(self, node: Dict[str, Any], parent: Dict[str, Any]) -> None:
+        role = node.get("role", "other")
+        parent_role = parent.get("role", "other")
+
+        # Forbidden parent roles
+        forbidden_parents = _ROLE_PARENT_CONFLICTS.get(role)
+        if forbidden_parents and parent_role in forbidden_parents:
+            self.findings.append({
+                **_node_ref(node),
+                "rule": "role_parent_conflict",
+                "detail": f"role='{role}' nested inside parent role='{parent_role}'",
+            })
+
+        # Required parent roles
+        required_parents = _ROLE_REQUIRES_PARENT.get(role)
+        if required_parents and parent_role not in required_parents:
+            self.findings.append({
+                **_node_ref(node),
+                "rule": "role_missing_parent",
                 "detail": (
-                    f"bounds ({cx},{cy},{cw}x{ch}) exceeds "
-                    f"parent ({px},{py},{pw}x{ph})"
+                    f"role='{role}' requires parent role in "
+                    f"{required_parents}, got '{parent_role}'"
                 ),
             })
 
-    for child in node.get("children", []):
-        if isinstance(child, dict):
-            validate_bounds(child, bounds, warnings)
+        # Nested same interactive role (e.g., button inside button)
+        if role in _INTERACTIVE_ROLES and role == parent_role:
+            self.findings.append({
+                **_node_ref(node),
+                "rule": "role_nested_interactive",
+                "detail": f"role='{role}' nested inside same role='{parent_role}'",
+            })
 
 
-def validate_render_hints(
-    node: Dict[str, Any],
-    warnings: List[Dict[str, Any]],
-) -> None:
-    """Detect contradictory role + render_hint combinations."""
-    role = node.get("role", "other")
-    hint = node.get("render_hint")
-    if hint:
-        forbidden = _HINT_ROLE_CONFLICTS.get(role, set())
-        if hint in forbidden:
-            warnings.append({
-                "id": node.get("id", ""),
-                "name": node.get("name", ""),
-                "path": node.get("path", ""),
+@register_rule
+class BoundsRule(ValidationRule):
+    """Child bounds exceeding parent bounds (2px tolerance)."""
+
+    name = "bounds"
+
+    def visit(self, node: Dict[str, Any], parent: Dict[str, Any]) -> None:
+        bounds = node.get("bounds")
+        parent_bounds = parent.get("bounds")
+        if not isinstance(bounds, dict) or not isinstance(parent_bounds, dict):
+            return
+
+        tolerance = 2
+        px, py = parent_bounds.get("x", 0), parent_bounds.get("y", 0)
+        pw, ph = parent_bounds.get("width", 0), parent_bounds.get("height", 0)
+        cx, cy = bounds.get("x", 0), bounds.get("y", 0)
+        cw, ch = bounds.get("width", 0), bounds.get("height", 0)
+
+        overflow = (
+            cx + tolerance < px
+            or cy + tolerance < py
+            or cx + cw > px + pw + tolerance
+            or cy + ch > py + ph + tolerance
+        )
+
+        if overflow and cw > 0 and ch > 0:
+            layout = node.get("layout", {})
+            if layout.get("overflow") not in ("hidden", "scroll"):
+                self.findings.append({
+                    **_node_ref(node),
+                    "rule": "bounds_overflow",
+                    "detail": (
+                        f"bounds ({cx},{cy},{cw}x{ch}) exceeds "
+                        f"parent ({px},{py},{pw}x{ph})"
+                    ),
+                })
+
+
+@register_rule
+class RenderHintRule(ValidationRule):
+    """Contradictory role + render_hint combinations."""
+
+    name = "render_hints"
+
+    def visit(self, node: Dict[str, Any], parent: Dict[str, Any]) -> None:
+        role = node.get("role", "other")
+        hint = node.get("render_hint")
+        if hint and hint in _HINT_ROLE_CONFLICTS.get(role, set()):
+            self.findings.append({
+                **_node_ref(node),
                 "rule": "hint_role_conflict",
                 "detail": f"role='{role}' with render_hint='{hint}' is contradictory",
             })
-    for child in node.get("children", []):
-        if isinstance(child, dict):
-            validate_render_hints(child, warnings)
 
 
-def validate_naming(
-    components: List[Dict[str, Any]],
-) -> Dict[str, Any]:
-    """Check naming quality: duplicates and empty descriptions."""
-    all_names: List[str] = []
-    empty_desc_nodes: List[Dict[str, Any]] = []
+@register_rule
+class InferredLayoutRule(ValidationRule):
+    """Nodes with layoutSource == 'inferred' (no Figma auto-layout).
+
+    Only flags nodes with >= 2 children, since single/zero-child
+    containers don't benefit from auto-layout (no gap to compute).
+    """
+
+    name = "auto_layout"
+
+    def visit(self, node: Dict[str, Any], parent: Dict[str, Any]) -> None:
+        children = node.get("children") or []
+        if node.get("layoutSource") == "inferred" and len(children) >= 2:
+            self.findings.append({**_node_ref(node), "children_count": len(children)})
+
+
+@register_rule
+class NamingRule(ValidationRule):
+    """Naming quality: duplicates and empty descriptions (page-wide)."""
+
+    name = "naming"
+    incremental = False
 
-    def _collect(node: Dict[str, Any]) -> None:
+    def __init__(self) -> None:
+        super().__init__()
+        self.all_names: List[str] = []
+
+    def visit(self, node: Dict[str, Any], parent: Dict[str, Any]) -> None:
         name = node.get("name", "")
         if name:
-            all_names.append(name)
+            self.all_names.append(name)
         desc = node.get("description", "")
         if not desc or (isinstance(desc, str) and not desc.strip()):
             role = node.get("role", "other")
             # Only warn for semantic roles (skip decorative/divider/other)
             if role not in ("decorative", "divider", "other"):
-                empty_desc_nodes.append({
-                    "id": node.get("id", ""),
-                    "name": node.get("name", ""),
-                    "path": node.get("path", ""),
-                    "role": role,
-                })
-        for child in node.get("children", []):
+                self.findings.append({**_node_ref(node), "role": role})
+
+    def report(self) -> Dict[str, Any]:
+        name_counts = Counter(self.all_names)
+        duplicates = {n: c for n, c in name_counts.items() if c > 1}
+        duplicate_rate = len(duplicates) / max(len(name_counts), 1)
+        return {
+            "total_names": len(self.all_names),
+            "unique_names": len(name_counts),
+            "duplicate_names": duplicates,
+            "duplicate_rate": round(duplicate_rate, 2),
+            "empty_description_count": len(self.findings),
+            "empty_description_nodes": self.findings[:10],
+        }
+
+
+@register_rule
+class MergeReportRule(ValidationRule):
+    """Aggregate _merge_report from all components (removes internal key)."""
+
+    name = "merge_stats"
+    incremental = False
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.total_updates = 0
+        self.total_matched = 0
+
+    def visit_component(self, component: Dict[str, Any]) -> None:
+        report = component.pop("_merge_report", None)
+        if isinstance(report, dict):
+            self.total_updates += report.get("children_updates_total", 0)
+            self.total_matched += report.get("children_updates_matched", 0)
+            self.findings.extend(report.get("children_updates_unmatched", []))
+
+    def report(self) -> Dict[str, Any]:
+        loss_rate = (
+            len(self.findings) / self.total_updates if self.total_updates > 0 else 0.0
+        )
+        return {
+            "children_updates_total": self.total_updates,
+            "children_updates_matched": self.total_matched,
+            "children_updates_unmatched_count": len(self.findings),
+            "children_updates_loss_rate": round(loss_rate, 2),
+        }
+
+
+# Rules whose findings are reported as quality_warnings, in report order
+_WARNING_RULES = ("role_consistency", "bounds", "render_hints")
+
+
+def _page_parent(page: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Synthetic parent of top-level components: no role, page-sized bounds."""
+    parent: Dict[str, Any] = {"role": None}
+    page_device = (page or {}).get("device")
+    if page_device:
+        parent["bounds"] = {
+            "x": 0, "y": 0,
+            "width": page_device.get("width", 9999),
+            "height": page_device.get("height", 99999),
+        }
+    return parent
+
+
+class SpecValidator:
+    """Runs a set of rules over components in a single traversal each.
+
+    Components can be added one at a time (add_component) as they are
+    analyzed; report() then summarizes everything added so far. Per-rule
+    time, findings and the number of nodes visited are kept for the
+    validation report.
+    """
+
+    def __init__(
+        self,
+        page: Optional[Dict[str, Any]] = None,
+        rules: Optional[Sequence[ValidationRule]] = None,
+    ):
+        self.rules = list(rules) if rules is not None else [rule_type() for rule_type in _RULE_TYPES]
+        self._by_name = {rule.name: rule for rule in self.rules}
+        self._parent = _page_parent(page)
+        self._elapsed = [0.0] * len(self.rules)
+        self.nodes_visited = 0
+
+    def add_component(
+        self,
+        component: Dict[str, Any],
+        parent: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Validate one top-level component; returns its quality warnings.
+
+        parent overrides the page-level parent the component is checked against.
+        """
+        before = {name: len(self._by_name[name].findings) for name in _WARNING_RULES if name in self._by_name}
+        clock = time.perf_counter
+        for i, rule in enumerate(self.rules):
+            start = clock()
+            rule.visit_component(component)
+            self._elapsed[i] += clock() - start
+        self._walk(component, self._parent if parent is None else parent)
+        return [
+            warning
+            for name, count in before.items()
+            for warning in self._by_name[name].findings[count:]
+        ]
+
+    def _walk(self, node: Dict[str, Any], parent: Dict[str, Any]) -> None:
+        self.nodes_visited += 1
+        clock = time.perf_counter
+        elapsed = self._elapsed
+        for i, rule in enumerate(self.rules):
+            start = clock()
+            rule.visit(node, parent)
+            elapsed[i] += clock() - start
+        for child in node.get("children") or []:
             if isinstance(child, dict):
-                _collect(child)
+                self._walk(child, node)
+
+    def rule(self, name: str) -> Optional[ValidationRule]:
+        return self._by_name.get(name)
+
+    def quality_warnings(self) -> List[Dict[str, Any]]:
+        return [
+            warning
+            for name in _WARNING_RULES if name in self._by_name
+            for warning in self._by_name[name].findings
+        ]
+
+    def rule_stats(self) -> Dict[str, Any]:
+        return {
+            "nodes_visited": self.nodes_visited,
+            "rules": {
+                rule.name: {
+                    "elapsed_ms": round(self._elapsed[i] * 1000, 2),
+                    "findings": len(rule.findings),
+                }
+                for i, rule in enumerate(self.rules)
+            },
+        }
+
+
+def validate_component(
+    component: Dict[str, Any], page: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Quality warnings for one component, using only incremental rules.
+
+    Used by SpecAnalyzer to flag problems as each component completes;
+    page-wide rules (naming, merge stats) run in run_all_validations.
+    Does not modify the component.
+    """
+    rules = [rule_type() for rule_type in _RULE_TYPES if rule_type.incremental]
+    return SpecValidator(page, rules).add_component(component)
 
-    for comp in components:
-        _collect(comp)
 
-    name_counts = Counter(all_names)
-    duplicates = {n: c for n, c in name_counts.items() if c > 1}
-    duplicate_rate = len(duplicates) / max(len(name_counts), 1)
+# ---------------------------------------------------------------------------
+# Single-rule entry points (kept for callers validating one aspect)
+# ---------------------------------------------------------------------------
+
+def _run_rule(
+    rule: ValidationRule, nodes: List[Dict[str, Any]], parent: Dict[str, Any],
+) -> ValidationRule:
+    validator = SpecValidator(rules=[rule])
+    for node in nodes:
+        validator.add_component(node, parent)
+    return rule
 
-    return {
-        "total_names": len(all_names),
-        "unique_names": len(name_counts),
-        "duplicate_names": duplicates,
-        "duplicate_rate": round(duplicate_rate, 2),
-        "empty_description_count": len(empty_desc_nodes),
-        "empty_description_nodes": empty_desc_nodes[:10],
-    }
+
+def validate_role_consistency(
+    node: Dict[str, Any],
+    parent_role: Optional[str],
+    warnings: List[Dict[str, Any]],
+) -> None:
+    """Check parent-child role conflicts recursively."""
+    warnings.extend(_run_rule(RoleConsistencyRule(), [node], {"role": parent_role}).findings)
+
+
+def validate_bounds(
+    node: Dict[str, Any],
+    parent_bounds: Optional[Dict[str, Any]],
+    warnings: List[Dict[str, Any]],
+) -> None:
+    """Check if child bounds exceed parent bounds (2px tolerance)."""
+    warnings.extend(_run_rule(BoundsRule(), [node], {"bounds": parent_bounds}).findings)
+
+
+def validate_render_hints(
+    node: Dict[str, Any],
+    warnings: List[Dict[str, Any]],
+) -> None:
+    """Detect contradictory role + render_hint combinations."""
+    warnings.extend(_run_rule(RenderHintRule(), [node], {}).findings)
+
+
+def validate_naming(
+    components: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Check naming quality: duplicates and empty descriptions."""
+    return _run_rule(NamingRule(), components, {}).report()
 
 
 def collect_merge_reports(
     components: List[Dict[str, Any]],
 ) -> Dict[str, Any]:
     """Aggregate _merge_report from all components (removes internal key)."""
-    total_updates = 0
-    total_matched = 0
-    all_unmatched: List[str] = []
-
+    rule = MergeReportRule()
     for comp in components:
-        report = comp.pop("_merge_report", None)
-        if isinstance(report, dict):
-            total_updates += report.get("children_updates_total", 0)
-            total_matched += report.get("children_updates_matched", 0)
-            all_unmatched.extend(report.get("children_updates_unmatched", []))
-
-    loss_rate = (
-        len(all_unmatched) / total_updates if total_updates > 0 else 0.0
-    )
-    return {
-        "children_updates_total": total_updates,
-        "children_updates_matched": total_matched,
-        "children_updates_unmatched_count": len(all_unmatched),
-        "children_updates_loss_rate": round(loss_rate, 2),
-    }
+        rule.visit_component(comp)
+    return rule.report()
 
 
 # ---------------------------------------------------------------------------
@@ -239,10 +445,14 @@ def run_all_validations(
 ) -> Dict[str, Any]:
     """Run all quality validation rules on assembled components.
 
-    Returns a validation report dict to embed in spec_document.validation.
+    One traversal per component feeds every registered rule. Returns a
+    validation report dict to embed in spec_document.validation.
     """
-    # Collect merge reports first (pops _merge_report from components)
-    merge_stats = collect_merge_reports(components)
+    validator = SpecValidator(page)
+    for comp in components:
+        validator.add_component(comp)
+
+    merge_stats = validator.rule("merge_stats").report()
     if merge_stats["children_updates_unmatched_count"] > 0:
         logger.warning(
             "SpecValidator [%s]: %d/%d children_updates unmatched "
@@ -254,26 +464,9 @@ def run_all_validations(
         )
 
     # Quality warnings
-    quality_warnings: List[Dict[str, Any]] = []
-
-    for comp in components:
-        validate_role_consistency(comp, None, quality_warnings)
-
-    for comp in components:
-        page_device = page.get("device")
-        parent_bounds = None
-        if page_device:
-            parent_bounds = {
-                "x": 0, "y": 0,
-                "width": page_device.get("width", 9999),
-                "height": page_device.get("height", 99999),
-            }
-        validate_bounds(comp, parent_bounds, quality_warnings)
-
-    for comp in components:
-        validate_render_hints(comp, quality_warnings)
-
-    naming_report = validate_naming(components)
+    quality_warnings = validator.quality_warnings()
+    naming_report = validator.rule("naming").report()
+    inferred_nodes = validator.rule("auto_layout").report()
 
     # Log summary
     if quality_warnings:
@@ -300,8 +493,12 @@ def run_all_validations(
         )
 
     return {
+        "auto_layout_compliant": len(inferred_nodes) == 0,
+        "inferred_node_count": len(inferred_nodes),
+        "inferred_nodes": inferred_nodes,
         "quality_warnings": quality_warnings,
         "quality_warning_count": len(quality_warnings),
         "naming": naming_report,
         "merge_stats": merge_stats,
+        "rule_stats": validator.rule_stats(),
     }
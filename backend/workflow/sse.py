@@ -2,20 +2,46 @@
 
 Provides push_sse_event and notify_node_status for real-time
 frontend updates during workflow execution.
+
+Events are not POSTed one by one: push_sse_event hands them to the
+process-wide EventShipper, which queues them in memory and ships them
+in batches to /api/internal/events:batch from a background task, so
+callers in the graph loop never wait on HTTP. Each event is serialized
+when it is queued, so later changes to the caller's data dict do not
+leak into what ships. orjson is used when installed, with a stdlib json
+fallback.
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
+from collections import deque
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, TypedDict
+from typing import Any, Deque, Dict, List, Optional, Tuple, TypedDict
 
 import os
 
 import httpx
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
 from .logging_config import get_worker_logger
-from .settings import SSE_HTTP_MAX_CONNECTIONS, SSE_HTTP_MAX_KEEPALIVE, SSE_HTTP_TIMEOUT
+from .settings import (
+    SSE_BATCH_ENABLED,
+    SSE_BATCH_FLUSH_INTERVAL,
+    SSE_BATCH_MAX_EVENTS,
+    SSE_BATCH_MAX_RETRIES,
+    SSE_HTTP_MAX_CONNECTIONS,
+    SSE_HTTP_MAX_KEEPALIVE,
+    SSE_HTTP_TIMEOUT,
+    SSE_QUEUE_MAX_EVENTS,
+)
 
 # API base URL for pushing SSE events (Worker → FastAPI)
 # Use 127.0.0.1 instead of localhost to avoid IPv6 timeout issues
@@ -49,9 +75,230 @@ class WorkflowState(TypedDict, total=False):
     run_id: str
 
 
+# Events that close a client stream — shipped without waiting for the timer
+_URGENT_EVENTS = frozenset({"job_done", "workflow_complete", "workflow_error"})
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# A queued event: (run_id, event_type, JSON-encoded data)
+_QueuedEvent = Tuple[str, str, bytes]
+
+
+def _dumps(data: Any) -> bytes:
+    """Encode a payload as compact UTF-8 JSON (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        data, ensure_ascii=False, separators=(",", ":"), default=str
+    ).encode("utf-8")
+
+
+def _event_body(event_type: str, data: bytes, run_id: Optional[str] = None) -> bytes:
+    """Build an event object around already-encoded data."""
+    head = b'{"run_id":' + _dumps(run_id) + b"," if run_id is not None else b"{"
+    return head + b'"event_type":' + _dumps(event_type) + b',"data":' + data + b"}"
+
+
+class EventShipper:
+    """Batches SSE events from the worker to the API server.
+
+    Events are appended to an in-memory FIFO and a single background task
+    drains it, POSTing up to max_batch events per request to
+    /api/internal/events:batch. A batch is sent when it is full, when an
+    urgent (stream-closing) event arrives, or after flush_interval seconds.
+    Because one task sends batches strictly in order, per-job ordering is
+    preserved end to end.
+
+    A failed batch is retried with backoff and then dropped; when the
+    queue is full new events are dropped. Both are counted in stats so a
+    lagging API server is visible. If the API server predates the batch
+    endpoint (404), the shipper falls back to one POST per event.
+
+    enqueue serializes data immediately: the snapshot taken then is what
+    ships, whatever the caller does with the dict afterwards.
+    """
+
+    def __init__(
+        self,
+        max_batch: int = SSE_BATCH_MAX_EVENTS,
+        flush_interval: float = SSE_BATCH_FLUSH_INTERVAL,
+        max_queue: int = SSE_QUEUE_MAX_EVENTS,
+        max_retries: int = SSE_BATCH_MAX_RETRIES,
+    ):
+        self._max_batch = max(1, max_batch)
+        self._flush_interval = flush_interval
+        self._max_queue = max_queue
+        self._max_retries = max_retries
+        self._pending: Deque[_QueuedEvent] = deque()
+        self._inflight = 0
+        self._batch_supported = True
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._has_events: Optional[asyncio.Event] = None
+        self._flush_now: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._stats: Dict[str, int] = {
+            "queued": 0,
+            "flushed": 0,
+            "dropped": 0,
+            "batches": 0,
+            "failed_batches": 0,
+        }
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Counters plus the current backlog (pending + in-flight events)."""
+        return {**self._stats, "pending": len(self._pending) + self._inflight}
+
+    def enqueue(self, run_id: str, event_type: str, data: dict) -> bool:
+        """Queue an event for shipping. Never blocks; returns False if dropped."""
+        if len(self._pending) >= self._max_queue:
+            self._stats["dropped"] += 1
+            logger.warning(
+                f"SSE queue full ({self._max_queue}), dropping {event_type} "
+                f"for {run_id} (dropped={self._stats['dropped']})"
+            )
+            return False
+
+        try:
+            encoded = _dumps(data)
+        except (TypeError, ValueError) as e:
+            self._stats["dropped"] += 1
+            logger.error(f"Cannot serialize {event_type} for {run_id}, dropping it: {e}")
+            return False
+
+        self._ensure_running()
+        self._pending.append((run_id, event_type, encoded))
+        self._stats["queued"] += 1
+        self._idle.clear()
+        self._has_events.set()
+        if len(self._pending) >= self._max_batch or event_type in _URGENT_EVENTS:
+            self._flush_now.set()
+        return True
+
+    async def flush(self, timeout: Optional[float] = None) -> bool:
+        """Ship everything queued so far. Returns False on timeout."""
+        if self._task is None or self._loop is not asyncio.get_running_loop():
+            return not self._pending
+        self._flush_now.set()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _ensure_running(self) -> None:
+        """Start the drain task on the running loop (restarting if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._has_events = asyncio.Event()
+        self._flush_now = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._inflight = 0
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_events.wait()
+            if len(self._pending) < self._max_batch and not self._flush_now.is_set():
+                try:
+                    await asyncio.wait_for(self._flush_now.wait(), timeout=self._flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._flush_now.clear()
+
+            while self._pending:
+                batch = [
+                    self._pending.popleft()
+                    for _ in range(min(self._max_batch, len(self._pending)))
+                ]
+                self._inflight = len(batch)
+                try:
+                    await self._send(batch)
+                finally:
+                    self._inflight = 0
+
+            self._has_events.clear()
+            self._idle.set()
+
+    async def _send(self, batch: List[_QueuedEvent]) -> None:
+        """POST one batch, retrying with backoff; counts drops on final failure."""
+        body = b'{"events":[' + b",".join(
+            _event_body(event_type, data, run_id) for run_id, event_type, data in batch
+        ) + b"]}"
+        for attempt in range(self._max_retries + 1):
+            try:
+                client = await _get_http_client()
+                if self._batch_supported:
+                    resp = await client.post(
+                        f"{API_BASE_URL}/api/internal/events:batch",
+                        content=body,
+                        headers=_JSON_HEADERS,
+                    )
+                    if resp.status_code == 404:
+                        logger.warning("Batch event endpoint not found, falling back to per-event POST")
+                        self._batch_supported = False
+                    else:
+                        resp.raise_for_status()
+                if not self._batch_supported:
+                    for run_id, event_type, data in batch:
+                        await _post_event(client, run_id, event_type, data)
+                self._stats["flushed"] += len(batch)
+                self._stats["batches"] += 1
+                logger.info(f"Shipped {len(batch)} SSE event(s) (backlog={len(self._pending)})")
+                return
+            except Exception as e:
+                self._stats["failed_batches"] += 1
+                logger.error(
+                    f"Failed to ship {len(batch)} SSE event(s) "
+                    f"(attempt {attempt + 1}/{self._max_retries + 1}): {e}"
+                )
+                if attempt < self._max_retries:
+                    await asyncio.sleep(0.2 * (2 ** attempt))
+
+        self._stats["dropped"] += len(batch)
+        logger.warning(f"Dropped {len(batch)} SSE event(s) after retries (dropped={self._stats['dropped']})")
+
+
+async def _post_event(client: httpx.AsyncClient, run_id: str, event_type: str, data: bytes) -> None:
+    """POST a single event (data already JSON-encoded) to the per-run endpoint."""
+    url = f"{API_BASE_URL}/api/internal/events/{run_id}"
+    resp = await client.post(url, content=_event_body(event_type, data), headers=_JSON_HEADERS)
+    resp.raise_for_status()
+
+
+_shipper: Optional[EventShipper] = None
+
+
+def get_event_shipper() -> EventShipper:
+    """Get the process-wide EventShipper singleton."""
+    global _shipper
+    if _shipper is None:
+        _shipper = EventShipper()
+    return _shipper
+
+
+def get_event_shipper_stats() -> Dict[str, int]:
+    """Counters for queued/flushed/dropped events (worker-side observability)."""
+    return get_event_shipper().stats
+
+
+async def flush_sse_events(timeout: float = SSE_HTTP_TIMEOUT) -> bool:
+    """Wait until all queued events have been shipped (or timeout)."""
+    if not SSE_BATCH_ENABLED:
+        return True
+    return await get_event_shipper().flush(timeout=timeout)
+
+
 async def push_sse_event(run_id: str, event_type: str, data: dict) -> None:
     """Push SSE event to the API server.
 
+    Queues the event on the EventShipper and returns immediately; set
+    SSE_BATCH_ENABLED=false to POST each event inline instead.
+
     Args:
         run_id: The workflow run ID
         event_type: Event type (node_update, node_output, etc.)
@@ -61,20 +308,25 @@ async def push_sse_event(run_id: str, event_type: str, data: dict) -> None:
         logger.warning(f"No run_id, skipping event: {event_type}")
         return
 
-    url = f"{API_BASE_URL}/api/internal/events/{run_id}"
-    payload = {"event_type": event_type, "data": data}
-    logger.info(f"Pushing event: {event_type} to {url}")
+    if SSE_BATCH_ENABLED:
+        get_event_shipper().enqueue(run_id, event_type, data)
+        return
 
     try:
         client = await _get_http_client()
-        resp = await client.post(url, json=payload)
-        logger.info(f"Response: {resp.status_code}")
+        await _post_event(client, run_id, event_type, _dumps(data))
     except Exception as e:
         # Log error but don't fail workflow
         logger.error(f"Failed to push event: {e}")
 
 
-async def notify_node_status(run_id: str, node: str, status: str, output: Any = None) -> None:
+async def notify_node_status(
+    run_id: str,
+    node: str,
+    status: str,
+    output: Any = None,
+    extra: Optional[Dict[str, Any]] = None,
+) -> None:
     """Notify frontend about node status change.
 
     Args:
@@ -82,6 +334,8 @@ async def notify_node_status(run_id: str, node: str, status: str, output: Any =
         node: Node name
         status: Status (running, completed, error)
         output: Optional output data for completed status
+        extra: Optional extra fields for the node_output event
+            (e.g. schema_version / kind / seq for delta-encoded output)
     """
     timestamp = datetime.now(timezone.utc).isoformat()
 
@@ -105,5 +359,6 @@ async def notify_node_status(run_id: str, node: str, status: str, output: Any =
         await push_sse_event(run_id, "node_output", {
             "node": node,
             "output": output if isinstance(output, str) else json.dumps(output, ensure_ascii=False),
-            "timestamp": timestamp
+            "timestamp": timestamp,
+            **(extra or {}),
         })
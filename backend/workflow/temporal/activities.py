@@ -18,12 +18,14 @@ async def execute_dynamic_graph_activity(params: dict) -> dict:
             - workflow_definition: Serialized WorkflowDefinition dict
             - initial_state: Initial state dict
             - run_id: Run ID for SSE tracking
+            - event_schema_version: Optional node_output schema (1 or 2)
 
     Returns:
         Final state dict from workflow execution
     """
     from ..engine.graph_builder import WorkflowDefinition, NodeConfig, EdgeDefinition
     from ..engine.executor import execute_dynamic_workflow
+    from ..sse import flush_sse_events
 
     # Ensure node types are registered
     import workflow.nodes.base  # noqa: F401
@@ -55,8 +57,11 @@ async def execute_dynamic_graph_activity(params: dict) -> dict:
         max_iterations=wf_dict.get("max_iterations", 10),
     )
 
-    return await execute_dynamic_workflow(
+    result = await execute_dynamic_workflow(
         workflow_def=workflow_def,
         initial_state=initial_state,
         run_id=run_id,
+        event_schema_version=params.get("event_schema_version"),
     )
+    await flush_sse_events()
+    return result
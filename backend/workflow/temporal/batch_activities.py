@@ -12,6 +12,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import os
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
@@ -20,6 +21,7 @@ from temporalio import activity
 # Re-export from sub-modules for backward compatibility
 from .sse_events import (  # noqa: F401
     NODE_TO_STEP,
+    _flush_events,
     _push_event,
     _setup_sync_event_pusher,
     _periodic_heartbeat,
@@ -32,6 +34,13 @@ from .git_operations import (  # noqa: F401
     _git_commit_bug_fix,
     _git_revert_changes,
     _git_change_summary,
+    _git_head,
+    _git_worktree_root,
+    _git_worktree_add,
+    _git_worktree_remove,
+    _git_checkout_bug_branch,
+    _git_cherry_pick_branch,
+    _git_delete_branch,
     _prescan_closed_bugs,
     _preflight_check,
     _JIRA_RESOLVED_CATEGORIES,
@@ -48,7 +57,12 @@ from .state_sync import (  # noqa: F401
     _sync_final_results,
 )
 
-from ..settings import BATCH_HEARTBEAT_INTERVAL, BATCH_DB_SYNC_MAX_ATTEMPTS, FAILURE_POLICY  # noqa: F401
+from ..settings import (  # noqa: F401
+    BATCH_DB_SYNC_MAX_ATTEMPTS,
+    BATCH_HEARTBEAT_INTERVAL,
+    BATCH_MAX_PARALLEL_BUGS,
+    FAILURE_POLICY,
+)
 
 logger = logging.getLogger("workflow.temporal.batch_activities")
 
@@ -200,9 +214,17 @@ async def execute_batch_bugfix_activity(params: dict) -> dict:
         _periodic_heartbeat(job_id, interval_seconds=60)
     )
 
-    # Mark first active bug as in_progress
+    # Parallel mode: one git worktree per slot (requires a git repo)
+    max_parallel = min(
+        int(config.get("max_parallel_bugs", 1) or 1),
+        BATCH_MAX_PARALLEL_BUGS,
+        len(active_urls),
+    )
+    parallel = max_parallel > 1 and await _git_is_repo(cwd)
+
+    # Mark first active bug as in_progress (parallel slots mark their own)
     now = datetime.now(timezone.utc)
-    if active_urls:
+    if active_urls and not parallel:
         first_db_index = _db_index(0, bug_index_offset, index_map)
         await _update_bug_status_db(job_id, first_db_index, "in_progress", started_at=now)
         await _push_event(job_id, "bug_started", {
@@ -212,9 +234,15 @@ async def execute_batch_bugfix_activity(params: dict) -> dict:
         })
 
     try:
-        final_state = await _execute_workflow(
-            job_id, active_urls, cwd, config, bug_index_offset, index_map,
-        )
+        if parallel:
+            final_state = await _execute_workflow_parallel(
+                job_id, active_urls, cwd, config, bug_index_offset, index_map,
+                max_parallel,
+            )
+        else:
+            final_state = await _execute_workflow(
+                job_id, active_urls, cwd, config, bug_index_offset, index_map,
+            )
 
         # Final sync
         pre_skipped = len(closed_indices) if closed_indices else 0
@@ -260,6 +288,7 @@ async def execute_batch_bugfix_activity(params: dict) -> dict:
             await heartbeat_task
         except asyncio.CancelledError:
             pass
+        await _flush_events()
 
 
 # --- Workflow Execution ---
@@ -282,8 +311,7 @@ async def _execute_workflow(
         WorkflowDefinition,
         NodeConfig,
         EdgeDefinition,
-        build_graph_from_config,
-        detect_loops,
+        get_compiled_workflow,
     )
     from workflow.templates import load_template, template_to_workflow_definition
 
@@ -316,20 +344,15 @@ async def _execute_workflow(
         "run_id": job_id,
     }
 
-    # Build and compile graph
-    compiled_graph = build_graph_from_config(workflow_def)
-    loops = detect_loops(workflow_def)
-
-    recursion_limit = (
-        workflow_def.max_iterations * len(workflow_def.nodes)
-        + len(workflow_def.nodes)
-    )
-    graph_config = {"recursion_limit": recursion_limit} if loops else {}
+    # Build and compile graph — the template never changes, so after the
+    # first run this is a cache hit for the lifetime of the worker
+    compiled = get_compiled_workflow(workflow_def)
+    compiled_graph = compiled.graph
+    graph_config = compiled.run_config
 
     # Tracking state
     state = {**initial_state}
     last_synced_index = -1
-    bug_steps: Dict[int, List[Dict[str, Any]]] = {}
     node_start_times: Dict[str, datetime] = {}
 
     # Git isolation: check if cwd is a git repo
@@ -437,7 +460,7 @@ async def _execute_workflow(
                 if attempt is not None:
                     step_record["attempt"] = attempt
 
-                bug_steps.setdefault(bug_index, []).append(step_record)
+                await _persist_bug_steps(job_id, db_bug_index, [step_record])
 
                 await _push_event(job_id, "bug_step_completed", {
                     "bug_index": db_bug_index,
@@ -487,19 +510,13 @@ async def _execute_workflow(
                         f"{last_synced_index + 1}/{len(jira_urls)}"
                     )
 
-                    steps = bug_steps.get(last_synced_index)
-                    if steps:
-                        await _persist_bug_steps(
-                            job_id, _db_index(last_synced_index, bug_index_offset, index_map), steps,
-                        )
-                        # Memory cleanup: remove persisted bug data
-                        bug_steps.pop(last_synced_index, None)
-                        stale_keys = [
-                            k for k in node_start_times
-                            if k.startswith(f"{last_synced_index}:")
-                        ]
-                        for k in stale_keys:
-                            node_start_times.pop(k, None)
+                    # Memory cleanup: drop the synced bug's step start times
+                    stale_keys = [
+                        k for k in node_start_times
+                        if k.startswith(f"{last_synced_index}:")
+                    ]
+                    for k in stale_keys:
+                        node_start_times.pop(k, None)
 
                     # --- failure_policy "stop": abort on first failure ---
                     fp = config.get("failure_policy", "skip")
@@ -583,3 +600,198 @@ async def _execute_workflow(
 
     state["success"] = True
     return state
+
+
+# --- Parallel Execution (git worktrees) ---
+
+
+async def _execute_workflow_parallel(
+    job_id: str,
+    jira_urls: List[str],
+    cwd: str,
+    config: Dict[str, Any],
+    bug_index_offset: int = 0,
+    index_map: Optional[List[int]] = None,
+    max_parallel: int = 2,
+) -> Dict[str, Any]:
+    """Fix up to max_parallel bugs concurrently, each in its own git worktree.
+
+    Every slot owns one worktree under the repo's git dir and runs the
+    regular single-bug workflow (_execute_workflow with a one-element
+    bug list) inside it, so step events, DB sync and per-bug commits work
+    exactly as in sequential mode. Each fix is committed on its own
+    branch and cherry-picked back onto cwd serially under a lock.
+
+    Returns a state dict whose "results" are ordered by bug index. With
+    failure_policy=stop no new bugs are started after the first failure;
+    bugs already in flight still finish.
+    """
+    worktree_root = await _git_worktree_root(cwd, job_id)
+    if worktree_root is None:
+        raise RuntimeError(f"无法定位 {cwd} 的 git 目录，不能创建 worktree")
+
+    logger.info(
+        f"Job {job_id}: Executing {len(jira_urls)} bugs in parallel "
+        f"({max_parallel} worktrees under {worktree_root})"
+    )
+
+    pending: asyncio.Queue = asyncio.Queue()
+    for i in range(len(jira_urls)):
+        pending.put_nowait(i)
+
+    results_by_index: Dict[int, Dict[str, Any]] = {}
+    merge_lock = asyncio.Lock()
+    stop = asyncio.Event()
+    fail_fast = config.get("failure_policy", "skip") == "stop"
+    slots_started = 0
+
+    async def run_slot(slot: int) -> None:
+        nonlocal slots_started
+        worktree = os.path.join(worktree_root, f"slot-{slot}")
+        if not await _git_worktree_add(cwd, worktree, job_id):
+            return
+        slots_started += 1
+        try:
+            while not stop.is_set():
+                try:
+                    i = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                result = await _run_bug_in_worktree(
+                    job_id, jira_urls[i], slot, worktree, cwd, config,
+                    _db_index(i, bug_index_offset, index_map), merge_lock,
+                )
+                results_by_index[i] = result
+                if fail_fast and result.get("status") == "failed":
+                    stop.set()
+        finally:
+            await _git_worktree_remove(cwd, worktree, job_id)
+
+    tasks = [asyncio.create_task(run_slot(s)) for s in range(max_parallel)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    if slots_started == 0:
+        raise RuntimeError(f"无法在 {worktree_root} 创建 git worktree")
+
+    if stop.is_set():
+        await _push_event(job_id, "workflow_error", {
+            "message": "failure_policy=stop: 有 Bug 修复失败，终止剩余 Bug 处理",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        })
+
+    # Bugs are dequeued in index order, so the processed set is a prefix
+    results: List[Dict[str, Any]] = []
+    while len(results) in results_by_index:
+        results.append(results_by_index[len(results)])
+
+    return {
+        "bugs": jira_urls,
+        "bugs_count": len(jira_urls),
+        "job_id": job_id,
+        "cwd": cwd,
+        "current_index": len(results),
+        "results": results,
+        "config": config,
+        "run_id": job_id,
+        "success": True,
+    }
+
+
+async def _run_bug_in_worktree(
+    job_id: str,
+    jira_url: str,
+    slot: int,
+    worktree: str,
+    cwd: str,
+    config: Dict[str, Any],
+    db_bug_index: int,
+    merge_lock: asyncio.Lock,
+) -> Dict[str, Any]:
+    """Fix one bug inside a slot's worktree and merge the fix back into cwd.
+
+    Returns the bug's result dict ({"url", "status", ...}). A fix whose
+    commits cannot be cherry-picked cleanly is reported as failed and its
+    branch is kept for manual resolution.
+    """
+    jira_key = _extract_jira_key(jira_url)
+    branch = f"batch/{job_id}/{jira_key}"
+
+    async with merge_lock:
+        base_sha = await _git_head(cwd)
+    if base_sha is None or not await _git_checkout_bug_branch(
+        worktree, branch, base_sha, job_id,
+    ):
+        result = {"url": jira_url, "status": "failed", "error": f"无法为 {jira_key} 准备 git worktree 分支"}
+        await _sync_incremental_results(job_id, [jira_url], [result], 0, 0, [db_bug_index])
+        return result
+
+    now = datetime.now(timezone.utc)
+    await _update_bug_status_db(job_id, db_bug_index, "in_progress", started_at=now)
+    await _push_event(job_id, "bug_started", {
+        "bug_index": db_bug_index,
+        "url": jira_url,
+        "slot": slot,
+        "timestamp": now.isoformat(),
+    })
+
+    state = await _execute_workflow(
+        job_id, [jira_url], worktree, config, 0, [db_bug_index],
+    )
+    results = state.get("results") or []
+    if results:
+        result = results[0]
+    else:
+        result = {"url": jira_url, "status": "failed", "error": "工作流未产生结果"}
+        await _sync_incremental_results(job_id, [jira_url], [result], 0, 0, [db_bug_index])
+
+    # Release the branch so it can be deleted (or kept) independently of the slot
+    await _git_run(worktree, "checkout", "--detach")
+
+    if result.get("status") != "completed":
+        await _git_delete_branch(cwd, branch)
+        return result
+
+    async with merge_lock:
+        merged, detail = await _git_cherry_pick_branch(cwd, base_sha, branch, job_id)
+
+    now_iso = datetime.now(timezone.utc).isoformat()
+    if merged:
+        await _git_delete_branch(cwd, branch)
+        await _push_event(job_id, "bug_step_completed", {
+            "bug_index": db_bug_index,
+            "step": "git_merge",
+            "label": "合并修复",
+            "node_label": "合并修复",
+            "status": "completed",
+            "output_preview": f"{branch} → 主工作区 ({detail})",
+            "timestamp": now_iso,
+        })
+        return result
+
+    error = f"合并冲突：{jira_key} 的修复保留在分支 {branch}，需手动合并"
+    await _push_event(job_id, "bug_step_completed", {
+        "bug_index": db_bug_index,
+        "step": "git_merge",
+        "label": "合并修复",
+        "node_label": "合并修复",
+        "status": "failed",
+        "output_preview": detail[:500],
+        "error": error,
+        "timestamp": now_iso,
+    })
+    await _update_bug_status_db(
+        job_id, db_bug_index, "failed",
+        error=error, completed_at=datetime.now(timezone.utc),
+    )
+    await _push_event(job_id, "bug_failed", {
+        "bug_index": db_bug_index,
+        "url": jira_url,
+        "error": error,
+        "timestamp": now_iso,
+    })
+    return {**result, "status": "failed", "error": error}
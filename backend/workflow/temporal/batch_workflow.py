@@ -24,7 +24,8 @@ class BatchBugFixWorkflow:
     """Temporal workflow that executes batch bug fix via Claude CLI.
 
     Delegates to a single long-running activity that iterates through
-    bugs sequentially (fix -> verify -> retry loop).
+    bugs sequentially (fix -> verify -> retry loop), or runs up to
+    config.max_parallel_bugs of them concurrently in git worktrees.
     """
 
     def __init__(self) -> None:
@@ -0,0 +1,341 @@
+"""Write-behind queue for worker-side DB updates.
+
+The batch and spec activities used to open a session and commit for
+every single row change (bug status, job status, step records, component
+counters), often several times per graph step, and on SQLite each of
+those commits competes with API reads for the single writer lock.
+
+DBWriteQueue keeps those changes in memory instead, one entry per row:
+a newer update of the same job or bug is merged into the pending entry
+(later values win) and step records are appended. A background task
+writes everything pending every flush_interval seconds, or as soon as
+max_pending rows are waiting, in one transaction per job. Activities flush
+explicitly at phase boundaries (a bug's result is in) and before
+terminal transitions, so a job_done SSE event never gets ahead of the
+database.
+
+A job whose write fails is retried with backoff; if it still fails its
+entries go back into the queue, under any newer updates, for the next
+flush, while the other jobs' writes go through. Entries of a job that
+failed max_failed_flushes flushes in a row while other jobs were written
+are dropped (e.g. steps of a batch job deleted mid-run), so they do not
+retry forever. stats reports queue depth and flush latency; the
+activities' periodic heartbeats carry it to Temporal.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..settings import (
+    DB_WRITE_BEHIND_ENABLED,
+    DB_WRITE_FLUSH_INTERVAL,
+    DB_WRITE_MAX_FAILED_FLUSHES,
+    DB_WRITE_MAX_PENDING,
+    DB_WRITE_MAX_RETRIES,
+    DB_WRITE_RETRY_DELAY,
+)
+
+logger = logging.getLogger("workflow.temporal.db_writer")
+
+# Job statuses whose write must not wait for the next flush
+TERMINAL_JOB_STATUSES = frozenset({"completed", "failed", "cancelled"})
+
+# Entry kinds: one pending entry per (kind, job_id, bug_index)
+_BUG = "bug"
+_BATCH_JOB = "batch_job"
+_STEPS = "steps"
+_DESIGN_JOB = "design_job"
+
+_Key = Tuple[str, str, int]
+
+
+def _merge(pending: Dict[_Key, Any], key: _Key, value: Any) -> bool:
+    """Fold value into pending[key]. Returns True if an entry was merged."""
+    current = pending.get(key)
+    if current is None:
+        pending[key] = list(value) if key[0] == _STEPS else dict(value)
+        return False
+    if key[0] == _STEPS:
+        current.extend(value)
+    elif key[0] == _DESIGN_JOB:
+        current.update(value)
+    else:
+        # Repository semantics: status is always set, the rest only if not None
+        current.update({k: v for k, v in value.items() if v is not None})
+    return True
+
+
+async def _write_batch(batch: Dict[_Key, Any]) -> None:
+    """Apply a batch of entries (one job's) in one transaction (raises on failure)."""
+    from app.database import get_session_ctx
+    from app.repositories.batch_job import BatchJobRepository
+
+    steps_by_job: Dict[str, Dict[int, List[Dict[str, Any]]]] = {}
+    async with get_session_ctx() as session:
+        batch_repo = BatchJobRepository(session)
+        design_repo = None
+        for (kind, job_id, bug_index), value in batch.items():
+            if kind == _STEPS:
+                steps_by_job.setdefault(job_id, {})[bug_index] = value
+            elif kind == _BUG:
+                await batch_repo.update_bug_status(
+                    job_id=job_id, bug_index=bug_index, **value,
+                )
+            elif kind == _BATCH_JOB:
+                await batch_repo.update_status(
+                    job_id, value["status"], error=value["error"],
+                )
+            else:
+                if design_repo is None:
+                    from app.repositories.design_job import DesignJobRepository
+                    design_repo = DesignJobRepository(session)
+                await design_repo.update(job_id, **value)
+        for job_id, steps in steps_by_job.items():
+            await batch_repo.append_bug_steps(job_id=job_id, steps=steps)
+
+
+class DBWriteQueue:
+    """Coalescing write-behind queue for job / bug row updates."""
+
+    def __init__(
+        self,
+        flush_interval: float = DB_WRITE_FLUSH_INTERVAL,
+        max_pending: int = DB_WRITE_MAX_PENDING,
+        max_retries: int = DB_WRITE_MAX_RETRIES,
+        retry_delay: float = DB_WRITE_RETRY_DELAY,
+        max_failed_flushes: int = DB_WRITE_MAX_FAILED_FLUSHES,
+    ):
+        self._flush_interval = flush_interval
+        self._max_pending = max(1, max_pending)
+        self._max_retries = max_retries
+        self._retry_delay = retry_delay
+        self._max_failed_flushes = max(1, max_failed_flushes)
+        self._pending: Dict[_Key, Any] = {}
+        # Consecutive failed flushes per job, counted while others succeed
+        self._job_failures: Dict[str, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._has_updates: Optional[asyncio.Event] = None
+        self._flush_now: Optional[asyncio.Event] = None
+        self._stats: Dict[str, float] = {
+            "queued": 0,
+            "coalesced": 0,
+            "flushed": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+            "dropped": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Counters, flush latency and the current depth (rows pending)."""
+        flushes = self._stats["flushes"]
+        return {
+            **self._stats,
+            "pending": len(self._pending),
+            "avg_flush_ms": round(self._stats["total_flush_ms"] / flushes, 1) if flushes else 0.0,
+        }
+
+    # -- enqueue --------------------------------------------------------
+
+    def update_bug(
+        self,
+        job_id: str,
+        bug_index: int,
+        status: str,
+        error: Optional[str] = None,
+        started_at: Optional[Any] = None,
+        completed_at: Optional[Any] = None,
+    ) -> None:
+        """Queue BatchJobRepository.update_bug_status for one bug."""
+        self._enqueue((_BUG, job_id, bug_index), {
+            "status": status,
+            "error": error,
+            "started_at": started_at,
+            "completed_at": completed_at,
+        })
+
+    def update_batch_job(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        """Queue BatchJobRepository.update_status."""
+        self._enqueue((_BATCH_JOB, job_id, -1), {"status": status, "error": error})
+
+    def append_steps(self, job_id: str, bug_index: int, steps: List[Dict[str, Any]]) -> None:
+        """Queue step records to append to a bug's bug_steps rows."""
+        if steps:
+            self._enqueue((_STEPS, job_id, bug_index), steps)
+
+    def update_design_job(self, job_id: str, **fields: Any) -> None:
+        """Queue DesignJobRepository.update (fields are set as given)."""
+        self._enqueue((_DESIGN_JOB, job_id, -1), fields)
+
+    def _enqueue(self, key: _Key, value: Any) -> None:
+        self._ensure_running()
+        self._stats["queued"] += 1
+        if _merge(self._pending, key, value):
+            self._stats["coalesced"] += 1
+        self._has_updates.set()
+        if len(self._pending) >= self._max_pending:
+            self._flush_now.set()
+
+    # -- flush ----------------------------------------------------------
+
+    async def flush(self, job_id: Optional[str] = None) -> bool:
+        """Write everything queued so far now.
+
+        Returns False if a write (of job_id's entries, when given) still
+        failed after retries; those entries then stay queued.
+        """
+        # With nothing queued, still wait out a background flush in flight
+        if not self._pending and (self._lock is None or not self._lock.locked()):
+            return True
+        self._ensure_running()
+        async with self._lock:
+            failed = await self._flush_locked()
+        return job_id not in failed if job_id is not None else not failed
+
+    def stop(self) -> None:
+        """Cancel the background task; pending entries stay queued."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _ensure_running(self) -> None:
+        """Start the flush task on the running loop (restarting if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._lock = asyncio.Lock()
+        self._has_updates = asyncio.Event()
+        self._flush_now = asyncio.Event()
+        if self._pending:
+            self._has_updates.set()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_updates.wait()
+            if len(self._pending) < self._max_pending and not self._flush_now.is_set():
+                try:
+                    await asyncio.wait_for(self._flush_now.wait(), timeout=self._flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._flush_now.clear()
+
+            async with self._lock:
+                failed = await self._flush_locked()
+            if not self._pending:
+                self._has_updates.clear()
+            elif failed:
+                # Database is down or a job keeps failing: back off
+                await asyncio.sleep(self._flush_interval)
+
+    async def _flush_locked(self) -> Dict[str, Dict[_Key, Any]]:
+        """Write all pending entries, one transaction per job.
+
+        Returns the entries of the jobs whose write still failed.
+        """
+        if not self._pending:
+            return {}
+        batch, self._pending = self._pending, {}
+        by_job: Dict[str, Dict[_Key, Any]] = {}
+        for key, value in batch.items():
+            by_job.setdefault(key[1], {})[key] = value
+
+        start = time.monotonic()
+        failed = dict(by_job)
+        for attempt in range(self._max_retries + 1):
+            if attempt:
+                await asyncio.sleep(self._retry_delay * (2 ** (attempt - 1)))
+            for job_id, entries in list(failed.items()):
+                try:
+                    await _write_batch(entries)
+                except Exception as e:
+                    self._stats["failed_flushes"] += 1
+                    logger.error(
+                        f"DB write-behind: failed to write {len(entries)} row update(s) "
+                        f"of {job_id} (attempt {attempt + 1}/{self._max_retries + 1}): {e}"
+                    )
+                else:
+                    del failed[job_id]
+                    self._job_failures.pop(job_id, None)
+            if not failed:
+                break
+
+        written = sum(len(entries) for job_id, entries in by_job.items() if job_id not in failed)
+        if written:
+            elapsed_ms = (time.monotonic() - start) * 1000
+            self._stats["flushed"] += written
+            self._stats["flushes"] += 1
+            self._stats["last_flush_ms"] = round(elapsed_ms, 1)
+            self._stats["max_flush_ms"] = max(self._stats["max_flush_ms"], round(elapsed_ms, 1))
+            self._stats["total_flush_ms"] += elapsed_ms
+            logger.info(
+                f"DB write-behind: wrote {written} row update(s) in {elapsed_ms:.0f}ms "
+                f"(backlog={len(self._pending)})"
+            )
+        if failed:
+            self._requeue(failed, charge=written > 0)
+        return failed
+
+    def _requeue(self, failed: Dict[str, Dict[_Key, Any]], charge: bool) -> None:
+        """Put failed jobs' entries back in front of anything queued meanwhile.
+
+        With charge (other jobs were written, so the database is up) each
+        job's failure count goes up; a job at max_failed_flushes has its
+        entries dropped instead.
+        """
+        restored: Dict[_Key, Any] = {}
+        for job_id, entries in failed.items():
+            if charge:
+                failures = self._job_failures.get(job_id, 0) + 1
+                if failures >= self._max_failed_flushes:
+                    self._job_failures.pop(job_id, None)
+                    self._stats["dropped"] += len(entries)
+                    logger.error(
+                        f"DB write-behind: dropping {len(entries)} row update(s) of {job_id} "
+                        f"after {failures} failed flushes: {sorted(entries)}"
+                    )
+                    continue
+                self._job_failures[job_id] = failures
+            restored.update(entries)
+        newer, self._pending = self._pending, restored
+        for key, value in newer.items():
+            _merge(self._pending, key, value)
+
+
+_queue: Optional[DBWriteQueue] = None
+
+
+def get_db_write_queue() -> DBWriteQueue:
+    """Get the process-wide DBWriteQueue singleton."""
+    global _queue
+    if _queue is None:
+        _queue = DBWriteQueue()
+    return _queue
+
+
+def get_db_write_stats() -> Dict[str, float]:
+    """Queue depth, write counters and flush latency (worker-side observability)."""
+    return get_db_write_queue().stats
+
+
+async def flush_db_writes(urgent: bool = True, job_id: Optional[str] = None) -> bool:
+    """Write queued updates now and return whether that succeeded.
+
+    With job_id, only a failure to write that job's entries counts. With
+    urgent=False (a routine write) this only flushes when
+    DB_WRITE_BEHIND_ENABLED is off, i.e. writes go straight through;
+    otherwise the background task picks the update up.
+    """
+    if not urgent and DB_WRITE_BEHIND_ENABLED:
+        return True
+    return await get_db_write_queue().flush(job_id)
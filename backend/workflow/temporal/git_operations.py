@@ -1,7 +1,8 @@
 """Git isolation and Jira status helpers for batch bug fix activities.
 
 Provides git commit/revert operations for per-bug isolation,
-Jira pre-scan for smart skip, and pre-flight environment checks.
+worktree management for the parallel batch mode, Jira pre-scan
+for smart skip, and pre-flight environment checks.
 """
 
 from __future__ import annotations
@@ -10,8 +11,10 @@ import asyncio
 import logging
 import os
 import re
+import shutil
 from typing import Any, Dict, List, Optional
 
+from ..settings import BATCH_WORKTREE_DIRNAME as _WORKTREE_DIRNAME
 from ..settings import GIT_COMMAND_TIMEOUT as _GIT_TIMEOUT
 
 logger = logging.getLogger("workflow.temporal.git_operations")
@@ -175,6 +178,104 @@ async def _git_change_summary(cwd: str, job_id: str) -> Optional[Dict[str, Any]]
     }
 
 
+# --- Worktree Helpers (parallel batch mode) ---
+
+
+async def _git_head(cwd: str) -> Optional[str]:
+    """Return the commit SHA of HEAD, or None if it cannot be resolved."""
+    code, output = await _git_run(cwd, "rev-parse", "HEAD")
+    return output.strip() if code == 0 and output.strip() else None
+
+
+async def _git_worktree_root(cwd: str, job_id: str) -> Optional[str]:
+    """Directory holding this job's worktrees.
+
+    Lives inside the repository's common git dir so slot checkouts never
+    show up as untracked files in the user's working tree.
+    """
+    code, output = await _git_run(
+        cwd, "rev-parse", "--path-format=absolute", "--git-common-dir",
+    )
+    if code != 0 or not output.strip():
+        return None
+    return os.path.join(output.strip(), _WORKTREE_DIRNAME, job_id)
+
+
+async def _git_worktree_add(cwd: str, path: str, job_id: str) -> bool:
+    """Create a detached worktree at path, checked out at the current HEAD.
+
+    A worktree left at path by an earlier attempt (Temporal retry after a
+    heartbeat timeout or worker crash) is discarded first.
+    """
+    if os.path.exists(path):
+        logger.warning(f"Job {job_id}: Removing stale worktree {path}")
+        await _git_run(cwd, "worktree", "remove", "--force", path)
+        if os.path.exists(path):
+            await asyncio.to_thread(shutil.rmtree, path, ignore_errors=True)
+    # Drops registrations whose directory is gone
+    await _git_run(cwd, "worktree", "prune")
+    code, output = await _git_run(cwd, "worktree", "add", "--detach", path, "HEAD")
+    if code != 0:
+        logger.error(f"Job {job_id}: git worktree add failed for {path}: {output}")
+        return False
+    logger.info(f"Job {job_id}: Created worktree {path}")
+    return True
+
+
+async def _git_worktree_remove(cwd: str, path: str, job_id: str) -> bool:
+    """Remove a worktree (discarding any leftover changes) and prune metadata."""
+    code, output = await _git_run(cwd, "worktree", "remove", "--force", path)
+    if code != 0:
+        logger.warning(f"Job {job_id}: git worktree remove failed for {path}: {output}")
+    await _git_run(cwd, "worktree", "prune")
+    return code == 0
+
+
+async def _git_checkout_bug_branch(
+    worktree: str, branch: str, base_sha: str, job_id: str,
+) -> bool:
+    """Point the worktree at a fresh per-bug branch starting from base_sha."""
+    # Drop anything left behind by the previous bug in this slot
+    await _git_run(worktree, "reset", "--hard")
+    await _git_run(worktree, "clean", "-fd")
+    code, output = await _git_run(worktree, "checkout", "-B", branch, base_sha)
+    if code != 0:
+        logger.error(f"Job {job_id}: git checkout -B {branch} failed: {output}")
+        return False
+    return True
+
+
+async def _git_cherry_pick_branch(
+    cwd: str, base_sha: str, branch: str, job_id: str,
+) -> tuple[bool, str]:
+    """Cherry-pick the commits of base_sha..branch onto the current HEAD of cwd.
+
+    Returns (ok, message). On conflict the cherry-pick is aborted so the
+    main working tree is left exactly as it was, and the bug branch is
+    kept for manual resolution.
+    """
+    code, output = await _git_run(cwd, "rev-list", "--reverse", f"{base_sha}..{branch}")
+    if code != 0:
+        return False, output
+    commits = [c for c in output.split("\n") if c.strip()]
+    if not commits:
+        return True, "no commits"
+
+    code, output = await _git_run(cwd, "cherry-pick", *commits)
+    if code != 0:
+        await _git_run(cwd, "cherry-pick", "--abort")
+        logger.error(f"Job {job_id}: cherry-pick of {branch} failed: {output}")
+        return False, output
+    logger.info(f"Job {job_id}: Cherry-picked {len(commits)} commit(s) from {branch}")
+    return True, f"{len(commits)} commit(s)"
+
+
+async def _git_delete_branch(cwd: str, branch: str) -> bool:
+    """Force-delete a local branch. Best-effort."""
+    code, _ = await _git_run(cwd, "branch", "-D", branch)
+    return code == 0
+
+
 # --- Jira Status Helpers ---
 
 
@@ -14,29 +14,32 @@ runs in a separate Temporal Worker process.
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
-import os
+import time
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from temporalio import activity
 
 from ..settings import (
     SPEC_ANALYZER_MAX_RETRIES,
     SPEC_ANALYZER_MAX_TOKENS,
+    SPEC_CLI_CONCURRENCY,
     SPEC_HEARTBEAT_INTERVAL,
+    SPEC_PIPELINE_MODE,
+    SPEC_STREAM_QUEUE_SIZE,
 )
 
 logger = logging.getLogger(__name__)
 
 
 # SSE push helper — shared with batch_activities via sse_events module
-from .sse_events import _push_event  # noqa: F401
+from .sse_events import _flush_events, _push_event  # noqa: F401
 
 
 # ---------------------------------------------------------------------------
-# DB helpers (same pattern as batch_activities.py)
+# DB helpers — updates go through the worker's write-behind queue
+# (db_writer.py), as in state_sync.py
 # ---------------------------------------------------------------------------
 
 async def _update_job_status(
@@ -46,23 +49,23 @@ async def _update_job_status(
     completed_at: Optional[datetime] = None,
     **extra: Any,
 ) -> bool:
-    """Update design job status in DB."""
-    try:
-        from app.database import get_session_ctx
-        from app.repositories.design_job import DesignJobRepository
-        async with get_session_ctx() as session:
-            repo = DesignJobRepository(session)
-            kwargs: Dict[str, Any] = {"status": status}
-            if error is not None:
-                kwargs["error"] = error
-            if completed_at is not None:
-                kwargs["completed_at"] = completed_at
-            kwargs.update(extra)
-            await repo.update(job_id, **kwargs)
+    """Queue a design job status update.
+
+    Terminal statuses are written before returning, ahead of job_done.
+    """
+    from .db_writer import TERMINAL_JOB_STATUSES, flush_db_writes, get_db_write_queue
+
+    kwargs: Dict[str, Any] = {"status": status}
+    if error is not None:
+        kwargs["error"] = error
+    if completed_at is not None:
+        kwargs["completed_at"] = completed_at
+    kwargs.update(extra)
+    get_db_write_queue().update_design_job(job_id, **kwargs)
+    if await flush_db_writes(urgent=status in TERMINAL_JOB_STATUSES, job_id=job_id):
         return True
-    except Exception as e:
-        logger.error("DB update failed for %s: %s", job_id, e)
-        return False
+    logger.error("DB update failed for %s", job_id)
+    return False
 
 
 async def _update_component_counts(
@@ -71,62 +74,697 @@ async def _update_component_counts(
     completed: Optional[int] = None,
     failed: Optional[int] = None,
 ) -> bool:
-    """Update component progress counters."""
-    try:
-        from app.database import get_session_ctx
-        from app.repositories.design_job import DesignJobRepository
-        async with get_session_ctx() as session:
-            repo = DesignJobRepository(session)
-            await repo.update_component_counts(
-                job_id, total=total, completed=completed, failed=failed,
-            )
+    """Queue component progress counter updates."""
+    from .db_writer import flush_db_writes, get_db_write_queue
+
+    counts = {
+        "components_total": total,
+        "components_completed": completed,
+        "components_failed": failed,
+    }
+    get_db_write_queue().update_design_job(
+        job_id, **{field: value for field, value in counts.items() if value is not None},
+    )
+    if await flush_db_writes(urgent=False, job_id=job_id):
         return True
-    except Exception as e:
-        logger.error("DB component count update failed for %s: %s", job_id, e)
-        return False
+    logger.error("DB component count update failed for %s", job_id)
+    return False
+
+
+# ---------------------------------------------------------------------------
+# Checkpoint helpers (component-level resume on retry; the per-job log is
+# workflow/spec/checkpoint_log.py)
+# ---------------------------------------------------------------------------
+
+def _has_analysis(data: dict) -> bool:
+    """True if data carries real analysis (role != decomposer placeholder)."""
+    return bool(data.get("role")) and data.get("role") != "other"
+
+
+def _resume_component(
+    comp: dict,
+    checkpoints: Dict[str, dict],
+    checkpoint_log: Any,
+    analysis_store: Any,
+    output_dir: str,
+    model: str,
+) -> Tuple[Optional[dict], str, str]:
+    """Find a prior analysis for one component.
+
+    Returns (data, source, fingerprint): source is "checkpoint" (this job,
+    on retry), "store" (an earlier job with unchanged structure and
+    screenshot) or "" (needs analysis). fingerprint is "" when the
+    cross-job store is disabled.
+    """
+    comp_id = comp.get("id", "")
+    cp_data = checkpoints.get(comp_id) if comp_id else None
+    # Verify checkpoint has real analysis data (role != placeholder)
+    if cp_data and _has_analysis(cp_data):
+        return cp_data, "checkpoint", ""
+    if analysis_store is None or not comp_id:
+        return None, "", ""
+
+    from workflow.spec.analysis_store import component_fingerprint
+    fingerprint = component_fingerprint(comp, output_dir, model or "")
+    stored = analysis_store.get(fingerprint)
+    if stored is not None:
+        checkpoint_log.append(comp_id, stored)
+        return stored, "store", fingerprint
+    return None, "", fingerprint
+
+
+def _record_analyzed(
+    comp: dict, checkpoint_log: Any, analysis_store: Any, fingerprint: str,
+) -> None:
+    """Checkpoint a newly analyzed component and share it with later jobs."""
+    comp_id = comp.get("id", "")
+    if comp_id and not comp.get("_analysis_failed"):
+        checkpoint_log.append(comp_id, comp)
+        if analysis_store is not None and fingerprint and _has_analysis(comp):
+            analysis_store.put(fingerprint, comp)
+
+
+def _add_usage(total: Dict[str, int], usage: Optional[Dict[str, int]]) -> None:
+    for key in ("input_tokens", "output_tokens"):
+        total[key] = total.get(key, 0) + (usage or {}).get(key, 0)
+
+
+def _elapsed_ms(start: float) -> int:
+    return int((time.monotonic() - start) * 1000)
+
+
+async def _push_resume_event(
+    job_id: str, checkpointed: int, reused: int, reanalyzed: int, total: int,
+) -> None:
+    logger.info(
+        "Job %s: Checkpoint resume — %d/%d from checkpoints, %d reused "
+        "from earlier jobs, %d to re-analyze",
+        job_id, checkpointed, total, reused, reanalyzed,
+    )
+    await _push_event(job_id, "checkpoint_resume", {
+        "pre_completed": checkpointed + reused,
+        "checkpointed": checkpointed,
+        "reused": reused,
+        "reanalyzed": reanalyzed,
+        "pending": reanalyzed,
+        "total": total,
+    })
 
 
 # ---------------------------------------------------------------------------
-# Checkpoint helpers (component-level resume on retry)
+# Phases 1-3: Figma fetch → FrameDecomposer → SpecAnalyzer
+#
+# Both modes return the same dict: figma_last_modified, components_total,
+# page, design_tokens, source, page_screenshot_path, analyzed_components,
+# analysis_stats, token_usage (spent this run), pre_token_usage (from
+# checkpoints), pre_completed, reused, stage_timings.
 # ---------------------------------------------------------------------------
 
-def _checkpoint_dir(output_dir: str) -> str:
-    """Return the checkpoint directory path for this job."""
-    return os.path.join(output_dir, ".spec_checkpoints")
+async def _fetch_page_tree(
+    client: Any, file_key: str, node_id: str, timings: Dict[str, int],
+) -> Tuple[Dict[str, Any], List[dict], List[str]]:
+    """Phase 1a: fetch the page's raw node tree.
+
+    Returns (nodes response, top-level children, screenshot node ids —
+    the page first, then its children).
+    """
+    start = time.monotonic()
+    nodes_resp = await client.get_file_nodes(file_key, [node_id])
+    page_doc = nodes_resp.get("nodes", {}).get(node_id, {}).get("document", {})
+    timings["fetch_nodes_ms"] = _elapsed_ms(start)
+
+    children = page_doc.get("children", [])
+    child_node_ids = [c.get("id") for c in children if c.get("id")]
+    return nodes_resp, children, [node_id] + child_node_ids
+
+
+async def _download_screenshots(
+    client: Any,
+    job_id: str,
+    file_key: str,
+    screenshot_ids: List[str],
+    output_dir: str,
+    on_landed: Optional[Callable[[str, str], Awaitable[None]]] = None,
+) -> Dict[str, str]:
+    """Download screenshots, warning (SSE) about the ones that failed.
+
+    on_landed(node_id, path) is awaited as each screenshot is saved.
+    Returns {node_id: relative path} for the downloaded ones.
+    """
+    from workflow.integrations.figma_client import FigmaClientError
 
+    async def _on_screenshot(progress: Dict[str, Any]) -> None:
+        await _push_event(job_id, "screenshot_downloaded", progress)
+        if on_landed is not None:
+            await on_landed(progress["node_id"], progress["path"])
 
-def _save_checkpoint(output_dir: str, component_id: str, data: dict) -> None:
-    """Save a completed component's analysis result as a checkpoint file."""
-    cp_dir = _checkpoint_dir(output_dir)
-    os.makedirs(cp_dir, exist_ok=True)
-    safe_id = component_id.replace(":", "_").replace("/", "_")
-    path = os.path.join(cp_dir, f"{safe_id}.json")
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False)
-    except Exception as e:
-        logger.warning("Failed to save checkpoint for %s: %s", component_id, e)
+        paths = await client.download_screenshots(
+            file_key, screenshot_ids, output_dir, on_progress=_on_screenshot,
+        )
+    except FigmaClientError as e:
+        logger.warning("Job %s: Screenshot download failed: %s", job_id, e)
+        await _push_event(job_id, "warning", {
+            "source": "figma_screenshots",
+            "message": f"截图下载失败: {e}",
+        })
+        return {}
+
+    # Warn about partially failed screenshots
+    failed_ids = [nid for nid in screenshot_ids if nid not in paths]
+    if failed_ids:
+        await _push_event(job_id, "warning", {
+            "source": "figma_screenshots",
+            "message": f"{len(failed_ids)} 个组件截图下载失败",
+            "failed_node_ids": failed_ids,
+        })
+    return paths
 
 
-def _load_checkpoints(output_dir: str) -> Dict[str, dict]:
-    """Load all component checkpoints from disk. Returns {component_id: data}."""
-    cp_dir = _checkpoint_dir(output_dir)
-    if not os.path.isdir(cp_dir):
+async def _fetch_design_tokens(
+    client: Any, job_id: str, file_key: str, timings: Dict[str, int],
+) -> Dict[str, Any]:
+    """Fetch design tokens; a failure is warned about (SSE) and yields {}."""
+    from workflow.integrations.figma_client import FigmaClientError
+
+    start = time.monotonic()
+    try:
+        return await client.get_design_tokens(file_key)
+    except FigmaClientError as e:
+        logger.warning("Job %s: Design tokens fetch failed: %s", job_id, e)
+        await _push_event(job_id, "warning", {
+            "source": "figma_tokens",
+            "message": f"设计变量获取失败: {e}",
+        })
         return {}
-    result: Dict[str, dict] = {}
+    finally:
+        timings["fetch_tokens_ms"] = _elapsed_ms(start)
+
+
+async def _push_fetch_complete(
+    job_id: str, children: List[dict], screenshot_paths: Dict[str, str],
+) -> None:
+    await _push_event(job_id, "figma_fetch_complete", {
+        "components_count": len(children),
+        "screenshots_count": len(screenshot_paths),
+    })
+
+
+def _initial_phases(
+    nodes_resp: Dict[str, Any],
+    decomposer_result: Dict[str, Any],
+    page_screenshot_path: str,
+    timings: Dict[str, int],
+) -> Dict[str, Any]:
+    """The phases dict after decomposition, before any analysis."""
+    components = decomposer_result.get("components", [])
+    return {
+        "figma_last_modified": nodes_resp.get("lastModified", ""),
+        "components_total": len(components),
+        "page": decomposer_result.get("page", {}),
+        "design_tokens": decomposer_result.get("design_tokens", {}),
+        "source": decomposer_result.get("source", {}),
+        # Page render, for cropping components whose own render failed
+        "page_screenshot_path": page_screenshot_path,
+        "analyzed_components": [],
+        "analysis_stats": {},
+        "token_usage": {},
+        "pre_token_usage": {},
+        "pre_completed": 0,
+        "reused": 0,
+        "stage_timings": timings,
+    }
+
+
+async def _decompose(
+    job_id: str,
+    file_key: str,
+    node_id: str,
+    nodes_resp: Dict[str, Any],
+    design_tokens_raw: Dict[str, Any],
+    screenshot_paths: Dict[str, str],
+    timings: Dict[str, int],
+) -> Tuple[List[dict], Dict[str, Any]]:
+    """Phase 2: run FrameDecomposerNode and announce its components.
+
+    Returns (components, initial phases dict).
+    """
+    from workflow.nodes.spec_nodes import FrameDecomposerNode
+
+    page_doc = nodes_resp.get("nodes", {}).get(node_id, {}).get("document", {})
+    decompose_start = time.monotonic()
+    decomposer = FrameDecomposerNode(
+        node_id="frame_decomposer_0",
+        node_type="frame_decomposer",
+        config={},
+    )
+    decomposer_result = await decomposer.execute({
+        "figma_node_tree": nodes_resp,
+        "design_tokens": design_tokens_raw,
+        "page_name": page_doc.get("name", ""),
+        "page_node_id": node_id,
+        "file_key": file_key,
+        "file_name": nodes_resp.get("name", ""),
+        "screenshot_paths": screenshot_paths,
+    })
+    timings["decompose_ms"] = _elapsed_ms(decompose_start)
+
+    phases = _initial_phases(
+        nodes_resp, decomposer_result, screenshot_paths.get(node_id, ""), timings,
+    )
+    components = decomposer_result.get("components", [])
+    components_total = phases["components_total"]
+
+    await _update_component_counts(job_id, total=components_total)
+    await _push_event(job_id, "frame_decomposed", {
+        "components_count": components_total,
+        "page": phases["page"],
+        "components": components,
+    })
+    activity.heartbeat("phase:decompose_done")
+
+    logger.info(
+        "Job %s: FrameDecomposer complete — %d components",
+        job_id, components_total,
+    )
+    return components, phases
+
+
+async def _run_sequential_phases(
+    client: Any,
+    job_id: str,
+    file_key: str,
+    node_id: str,
+    output_dir: str,
+    model: str,
+) -> Dict[str, Any]:
+    """Each phase completes for every component before the next starts."""
+    timings: Dict[str, int] = {}
+    try:
+        # 1a. Fetch raw node tree
+        nodes_resp, children, screenshot_ids = await _fetch_page_tree(
+            client, file_key, node_id, timings,
+        )
+
+        # 1b. Download screenshots
+        screenshots_start = time.monotonic()
+        screenshot_paths = await _download_screenshots(
+            client, job_id, file_key, screenshot_ids, output_dir,
+        )
+        timings["screenshots_ms"] = _elapsed_ms(screenshots_start)
+
+        # 1c. Fetch design tokens
+        design_tokens_raw = await _fetch_design_tokens(client, job_id, file_key, timings)
+    finally:
+        await client.close()
+
+    await _push_fetch_complete(job_id, children, screenshot_paths)
+    activity.heartbeat("phase:figma_fetch_done")
+
+    logger.info(
+        "Job %s: Figma fetch complete — %d children, %d screenshots",
+        job_id, len(children), len(screenshot_paths),
+    )
+
+    # ============================================================
+    # Phase 2: FrameDecomposerNode
+    # ============================================================
+    components, phases = await _decompose(
+        job_id, file_key, node_id, nodes_resp, design_tokens_raw, screenshot_paths, timings,
+    )
+    if not components:
+        return phases
+
+    # ============================================================
+    # Phase 3: SpecAnalyzerNode (LLM vision — slowest phase)
+    # ============================================================
+    from workflow.spec.checkpoint_log import CheckpointLog
+
+    checkpoint_log = CheckpointLog(output_dir)
     try:
-        for filename in os.listdir(cp_dir):
-            if not filename.endswith(".json"):
-                continue
-            path = os.path.join(cp_dir, filename)
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            comp_id = data.get("id", "")
-            if comp_id:
-                result[comp_id] = data
-    except Exception as e:
-        logger.warning("Failed to load checkpoints from %s: %s", cp_dir, e)
-    return result
+        return await _analyze_sequential(
+            phases, components, job_id, output_dir, model, checkpoint_log,
+        )
+    finally:
+        await asyncio.to_thread(checkpoint_log.close)
+
+
+async def _analyze_sequential(
+    phases: Dict[str, Any],
+    components: List[dict],
+    job_id: str,
+    output_dir: str,
+    model: str,
+    checkpoint_log: Any,
+) -> Dict[str, Any]:
+    """Sequential Phase 3: resume what we can, then analyze the rest together."""
+    from workflow.nodes.spec_nodes import SpecAnalyzerNode
+    from workflow.spec.analysis_store import get_spec_analysis_store
+
+    components_total = len(components)
+    timings = phases["stage_timings"]
+
+    # -- Checkpoint resume: skip already-analyzed components --
+    # (this job's checkpoints first, then the cross-job analysis store
+    # for components whose structure + screenshot are unchanged)
+    checkpoints = checkpoint_log.load()
+    analysis_store = get_spec_analysis_store()
+    fingerprints: Dict[str, str] = {}
+    checkpointed: List[dict] = []
+    reused_components: List[dict] = []
+    pending_components: List[dict] = []
+    pre_token_usage: Dict[str, int] = {}
+
+    for comp in components:
+        prior, source, fingerprint = _resume_component(
+            comp, checkpoints, checkpoint_log, analysis_store, output_dir, model,
+        )
+        if fingerprint:
+            fingerprints[comp.get("id", "")] = fingerprint
+        if source == "checkpoint":
+            checkpointed.append(prior)
+            _add_usage(pre_token_usage, prior.get("_token_usage"))
+        elif source == "store":
+            reused_components.append(prior)
+        else:
+            pending_components.append(comp)
+
+    pre_completed = checkpointed + reused_components
+    if pre_completed:
+        await _push_resume_event(
+            job_id, len(checkpointed), len(reused_components),
+            len(pending_components), components_total,
+        )
+
+    # Run analyzer only for pending components
+    analyze_start = time.monotonic()
+    analysis_stats: Dict[str, Any] = {}
+    new_token_usage: Dict[str, int] = {}
+    newly_analyzed: List[dict] = []
+
+    if pending_components:
+        recorded: set = set()
+
+        def _on_analyzed(comp: dict) -> None:
+            # Checkpoint each component as it finishes, not after the gather,
+            # so a crash mid-phase only loses the calls still in flight
+            comp_id = comp.get("id", "")
+            _record_analyzed(comp, checkpoint_log, analysis_store, fingerprints.get(comp_id, ""))
+            recorded.add(comp_id)
+
+        analyzer = SpecAnalyzerNode(
+            node_id="spec_analyzer_0",
+            node_type="spec_analyzer",
+            config={
+                "cwd": output_dir,
+                "model": model or "",
+                "max_tokens": SPEC_ANALYZER_MAX_TOKENS,
+                "max_retries": SPEC_ANALYZER_MAX_RETRIES,
+            },
+        )
+        analyzer_result = await analyzer.execute({
+            "components": pending_components,
+            "page": phases["page"],
+            "design_tokens": phases["design_tokens"],
+            "source": phases["source"],
+            "run_id": job_id,
+            "page_screenshot_path": phases["page_screenshot_path"],
+            "on_analyzed": _on_analyzed,
+        })
+
+        newly_analyzed = analyzer_result.get("components", pending_components)
+        analysis_stats = analyzer_result.get("analysis_stats", {})
+        new_token_usage = analyzer_result.get("token_usage", {})
+
+        # Anything the analyzer returned without reporting it through the hook
+        for comp in newly_analyzed:
+            if comp.get("id", "") not in recorded:
+                _record_analyzed(
+                    comp, checkpoint_log, analysis_store, fingerprints.get(comp.get("id", ""), ""),
+                )
+        if analysis_store is not None:
+            analysis_store.prune()
+    timings["analyze_ms"] = _elapsed_ms(analyze_start)
+
+    phases.update({
+        # Merge pre-completed (checkpoint + store) + newly analyzed
+        "analyzed_components": pre_completed + newly_analyzed,
+        "analysis_stats": analysis_stats,
+        "token_usage": new_token_usage,
+        "pre_token_usage": pre_token_usage,
+        "pre_completed": len(pre_completed),
+        "reused": len(reused_components),
+    })
+    return phases
+
+
+async def _run_streaming_phases(
+    client: Any,
+    job_id: str,
+    file_key: str,
+    node_id: str,
+    output_dir: str,
+    model: str,
+) -> Dict[str, Any]:
+    """Overlap screenshot download with analysis, frame by frame.
+
+    Stages, connected by bounded queues (SPEC_STREAM_QUEUE_SIZE):
+
+      download ──landed──▶ dispatch ──pending──▶ analyzers ──results──▶ collect
+
+    The node tree is fetched first; design tokens and all screenshots
+    start downloading together. Decomposition runs once tokens arrive (it
+    is CPU-only and needs every frame for page layout and sibling names,
+    so it is not split per frame). Each frame is then resumed from a
+    checkpoint / the cross-job store or analyzed as soon as its screenshot
+    lands, instead of after the slowest download. The collector appends
+    results to the checkpoint log as they complete; SpecAssembler runs on
+    the full set afterwards (ordering, dedup and validation need every
+    component).
+    """
+    from workflow.nodes.spec_nodes import SpecAnalyzerNode
+    from workflow.spec.analysis_store import get_spec_analysis_store
+    from workflow.spec.checkpoint_log import CheckpointLog
+
+    timings: Dict[str, int] = {}
+    phase_start = time.monotonic()
+    checkpoint_log = CheckpointLog(output_dir)
+    # (node_id, relative screenshot path) per landed screenshot; None = done
+    landed: "asyncio.Queue[Optional[Tuple[str, str]]]" = asyncio.Queue(
+        maxsize=SPEC_STREAM_QUEUE_SIZE,
+    )
+    download_task: Optional[asyncio.Task] = None
+    tokens_task: Optional[asyncio.Task] = None
+    workers: List[asyncio.Task] = []
+    collector: Optional[asyncio.Task] = None
+
+    try:
+        # 1a. Fetch raw node tree
+        nodes_resp, children, screenshot_ids = await _fetch_page_tree(
+            client, file_key, node_id, timings,
+        )
+
+        # 1b/1c. Screenshots + design tokens, concurrently
+        async def _on_landed(comp_id: str, path: str) -> None:
+            await landed.put((comp_id, path))
+
+        async def _download() -> Dict[str, str]:
+            start = time.monotonic()
+            paths: Dict[str, str] = {}
+            try:
+                paths = await _download_screenshots(
+                    client, job_id, file_key, screenshot_ids, output_dir,
+                    on_landed=_on_landed,
+                )
+            finally:
+                timings["screenshots_ms"] = _elapsed_ms(start)
+                await landed.put(None)
+            await _push_fetch_complete(job_id, children, paths)
+            return paths
+
+        download_task = asyncio.create_task(_download())
+        tokens_task = asyncio.create_task(
+            _fetch_design_tokens(client, job_id, file_key, timings)
+        )
+        design_tokens_raw = await tokens_task
+
+        # ============================================================
+        # Phase 2: FrameDecomposerNode (screenshots attached as they land)
+        # ============================================================
+        components, phases = await _decompose(
+            job_id, file_key, node_id, nodes_resp, design_tokens_raw, {}, timings,
+        )
+        if not components:
+            return phases
+        components_total = phases["components_total"]
+        page_meta = phases["page"]
+        schema_tokens = phases["design_tokens"]
+        source_meta = phases["source"]
+
+        # ============================================================
+        # Phase 3: SpecAnalyzerNode, fed per frame
+        # ============================================================
+        analyzer = SpecAnalyzerNode(
+            node_id="spec_analyzer_0",
+            node_type="spec_analyzer",
+            config={
+                "cwd": output_dir,
+                "model": model or "",
+                "max_tokens": SPEC_ANALYZER_MAX_TOKENS,
+                "max_retries": SPEC_ANALYZER_MAX_RETRIES,
+            },
+        )
+        run = analyzer.start_run({
+            "components": components,
+            "page": page_meta,
+            "design_tokens": schema_tokens,
+            "source": source_meta,
+            "run_id": job_id,
+        })
+
+        checkpoints = checkpoint_log.load()
+        analysis_store = get_spec_analysis_store()
+        index_by_id = {c.get("id", ""): i for i, c in enumerate(components)}
+        dispatched: set = set()
+        pending: "asyncio.Queue[Optional[Tuple[int, dict, str]]]" = asyncio.Queue(
+            maxsize=SPEC_STREAM_QUEUE_SIZE,
+        )
+        results: "asyncio.Queue[Optional[Tuple[int, dict, str, str]]]" = asyncio.Queue(
+            maxsize=SPEC_STREAM_QUEUE_SIZE,
+        )
+        checkpointed: List[dict] = []
+        reused_components: List[dict] = []
+        newly_analyzed: List[Tuple[int, dict]] = []
+        pre_token_usage: Dict[str, int] = {}
+        analyze_window: Dict[str, float] = {}
+
+        async def _analyzer_worker() -> None:
+            while True:
+                item = await pending.get()
+                if item is None:
+                    return
+                idx, comp, fingerprint = item
+                analyze_window.setdefault("start", time.monotonic())
+                result = await run.analyze(idx, comp)  # failures come back flagged
+                await results.put((idx, result, "analyzed", fingerprint))
+
+        async def _collect() -> None:
+            while True:
+                item = await results.get()
+                if item is None:
+                    return
+                idx, comp, source, fingerprint = item
+                if source == "checkpoint":
+                    checkpointed.append(comp)
+                    _add_usage(pre_token_usage, comp.get("_token_usage"))
+                elif source == "store":
+                    reused_components.append(comp)
+                else:
+                    if "first_analyzed_ms" not in timings:
+                        timings["first_analyzed_ms"] = _elapsed_ms(phase_start)
+                    newly_analyzed.append((idx, comp))
+                # Keep draining even if bookkeeping fails, or upstream
+                # stages would block on a full queue
+                try:
+                    if source == "analyzed":
+                        _record_analyzed(comp, checkpoint_log, analysis_store, fingerprint)
+                    done = len(checkpointed) + len(reused_components) + len(newly_analyzed)
+                    activity.heartbeat(f"phase:analyze:{done}/{components_total}")
+                except Exception as e:
+                    logger.warning("Job %s: result bookkeeping failed: %s", job_id, e)
+
+        async def _dispatch(comp_id: str, screenshot_path: Optional[str]) -> None:
+            if comp_id == node_id and screenshot_path and run is not None:
+                # Frames analyzed from here on can be cropped from the page
+                # render if their own render failed
+                run.page_screenshot = screenshot_path
+            if comp_id in dispatched or comp_id not in index_by_id:
+                return  # page screenshot, or already handled
+            dispatched.add(comp_id)
+            idx = index_by_id[comp_id]
+            comp = components[idx]
+            if screenshot_path:
+                comp["screenshot_path"] = screenshot_path
+            prior, source, fingerprint = _resume_component(
+                comp, checkpoints, checkpoint_log, analysis_store, output_dir, model,
+            )
+            if prior is not None:
+                await results.put((idx, prior, source, fingerprint))
+            elif run is None:
+                await results.put((idx, comp, "analyzed", fingerprint))
+            else:
+                await pending.put((idx, comp, fingerprint))
+
+        if run is not None:
+            workers = [
+                asyncio.create_task(_analyzer_worker())
+                for _ in range(max(1, SPEC_CLI_CONCURRENCY))
+            ]
+        collector = asyncio.create_task(_collect())
+
+        while True:
+            item = await landed.get()
+            if item is None:
+                break
+            await _dispatch(*item)
+        # Screenshots restored from the Figma cache never go through
+        # on_progress; frames whose screenshot failed get None
+        screenshot_paths = await download_task
+        phases["page_screenshot_path"] = screenshot_paths.get(node_id, "")
+        await _dispatch(node_id, screenshot_paths.get(node_id))
+        for comp in components:
+            comp_id = comp.get("id", "")
+            await _dispatch(comp_id, screenshot_paths.get(comp_id))
+
+        for _ in workers:
+            await pending.put(None)
+        await asyncio.gather(*workers)
+        await results.put(None)
+        await collector
+        if "start" in analyze_window:
+            timings["analyze_ms"] = _elapsed_ms(analyze_window["start"])
+    finally:
+        for task in (download_task, tokens_task, collector, *workers):
+            if task is not None and not task.done():
+                task.cancel()
+        await asyncio.to_thread(checkpoint_log.close)
+        await client.close()
+
+    logger.info(
+        "Job %s: Streaming phases complete — %d screenshots, %d analyzed, "
+        "first result after %s ms",
+        job_id, len(screenshot_paths), len(newly_analyzed),
+        timings.get("first_analyzed_ms", "-"),
+    )
+    if checkpointed or reused_components:
+        await _push_resume_event(
+            job_id, len(checkpointed), len(reused_components),
+            len(newly_analyzed), components_total,
+        )
+    if analysis_store is not None:
+        analysis_store.prune()
+
+    # Keep decomposition order for the newly analyzed components
+    analyzed_in_order = [comp for _, comp in sorted(newly_analyzed, key=lambda r: r[0])]
+    if run is None:
+        analysis_stats: Dict[str, Any] = {"error": "claude CLI not found in PATH"}
+        new_token_usage: Dict[str, int] = {}
+    else:
+        run_result = run.result(analyzed_in_order)
+        analysis_stats = run_result["analysis_stats"]
+        analysis_stats["total"] = len(newly_analyzed)  # this run's share only
+        new_token_usage = run_result["token_usage"]
+
+    pre_completed = checkpointed + reused_components
+    phases.update({
+        "analyzed_components": pre_completed + analyzed_in_order,
+        "analysis_stats": analysis_stats,
+        "token_usage": new_token_usage,
+        "pre_token_usage": pre_token_usage,
+        "pre_completed": len(pre_completed),
+        "reused": len(reused_components),
+    })
+    return phases
 
 
 # ---------------------------------------------------------------------------
@@ -134,11 +772,13 @@ def _load_checkpoints(output_dir: str) -> Dict[str, dict]:
 # ---------------------------------------------------------------------------
 
 async def _periodic_heartbeat(job_id: str, interval_seconds: float = 60.0) -> None:
-    """Send periodic heartbeat to Temporal."""
+    """Send periodic heartbeat to Temporal, with the worker's DB write stats."""
+    from .db_writer import get_db_write_stats
+
     while True:
         await asyncio.sleep(interval_seconds)
         try:
-            activity.heartbeat(f"keepalive:{job_id}")
+            activity.heartbeat(f"keepalive:{job_id}", get_db_write_stats())
         except Exception:
             break  # Activity cancelled or completed
 
@@ -164,6 +804,8 @@ async def execute_spec_pipeline_activity(params: dict) -> dict:
             - node_id: Figma page node ID
             - output_dir: Job output directory
             - model: Claude model override (optional)
+            - pipeline_mode: "sequential" | "streaming" (default
+              SPEC_PIPELINE_MODE, see _run_streaming_phases)
 
     Returns:
         Dict with success status, spec_path, and stats.
@@ -182,6 +824,8 @@ async def execute_spec_pipeline_activity(params: dict) -> dict:
     figma_last_modified = ""
     token_usage: Dict[str, int] = {}
 
+    pipeline_start = time.monotonic()
+
     # Start periodic heartbeat
     heartbeat_task = asyncio.create_task(
         _periodic_heartbeat(job_id, interval_seconds=SPEC_HEARTBEAT_INTERVAL)
@@ -222,109 +866,22 @@ async def execute_spec_pipeline_activity(params: dict) -> dict:
             })
             return {"success": False, "job_id": job_id, "error": error_msg}
 
-        try:
-            # 1a. Fetch raw node tree
-            nodes_resp = await client.get_file_nodes(file_key, [node_id])
-            file_name = nodes_resp.get("name", "")
-            figma_last_modified = nodes_resp.get("lastModified", "")
-            nodes_data = nodes_resp.get("nodes", {})
-            page_data = nodes_data.get(node_id, {})
-            page_doc = page_data.get("document", {})
-            page_name = page_doc.get("name", "")
-
-            # 1b. Collect top-level children IDs for screenshots
-            children = page_doc.get("children", [])
-            child_node_ids = [c.get("id") for c in children if c.get("id")]
-            all_screenshot_ids = [node_id] + child_node_ids
-
-            # 1c. Download screenshots
-            screenshot_paths: Dict[str, str] = {}
-            if all_screenshot_ids:
-                try:
-                    screenshot_paths = await client.download_screenshots(
-                        file_key, all_screenshot_ids, output_dir,
-                    )
-                    # Warn about partially failed screenshots
-                    failed_ids = [
-                        nid for nid in all_screenshot_ids
-                        if nid not in screenshot_paths
-                    ]
-                    if failed_ids:
-                        await _push_event(job_id, "warning", {
-                            "source": "figma_screenshots",
-                            "message": f"{len(failed_ids)} 个组件截图下载失败",
-                            "failed_node_ids": failed_ids,
-                        })
-                except FigmaClientError as e:
-                    logger.warning("Job %s: Screenshot download failed: %s", job_id, e)
-                    await _push_event(job_id, "warning", {
-                        "source": "figma_screenshots",
-                        "message": f"截图下载失败: {e}",
-                    })
-
-            # 1d. Fetch design tokens
-            design_tokens_raw: Dict[str, Any] = {}
-            try:
-                design_tokens_raw = await client.get_design_tokens(file_key)
-            except FigmaClientError as e:
-                logger.warning("Job %s: Design tokens fetch failed: %s", job_id, e)
-                await _push_event(job_id, "warning", {
-                    "source": "figma_tokens",
-                    "message": f"设计变量获取失败: {e}",
-                })
-        finally:
-            await client.close()
-
-        await _push_event(job_id, "figma_fetch_complete", {
-            "components_count": len(children),
-            "screenshots_count": len(screenshot_paths),
-        })
-        activity.heartbeat("phase:figma_fetch_done")
-
-        logger.info(
-            "Job %s: Figma fetch complete — %d children, %d screenshots",
-            job_id, len(children), len(screenshot_paths),
-        )
-
-        # ============================================================
-        # Phase 2: FrameDecomposerNode
-        # ============================================================
-        from workflow.nodes.spec_nodes import FrameDecomposerNode
-
-        decomposer = FrameDecomposerNode(
-            node_id="frame_decomposer_0",
-            node_type="frame_decomposer",
-            config={},
-        )
-        decomposer_result = await decomposer.execute({
-            "figma_node_tree": nodes_resp,
-            "design_tokens": design_tokens_raw,
-            "page_name": page_name,
-            "page_node_id": node_id,
-            "file_key": file_key,
-            "file_name": file_name,
-            "screenshot_paths": screenshot_paths,
-        })
-
-        components = decomposer_result.get("components", [])
-        page_meta = decomposer_result.get("page", {})
-        schema_tokens = decomposer_result.get("design_tokens", {})
-        source_meta = decomposer_result.get("source", {})
-        components_total = len(components)
-
-        await _update_component_counts(job_id, total=components_total)
-
-        await _push_event(job_id, "frame_decomposed", {
-            "components_count": components_total,
-            "page": page_meta,
-            "components": components,
-        })
-        activity.heartbeat("phase:decompose_done")
+        pipeline_mode = params.get("pipeline_mode") or SPEC_PIPELINE_MODE
+        if pipeline_mode == "streaming":
+            phases = await _run_streaming_phases(
+                client, job_id, file_key, node_id, output_dir, model,
+            )
+        else:
+            phases = await _run_sequential_phases(
+                client, job_id, file_key, node_id, output_dir, model,
+            )
 
-        logger.info(
-            "Job %s: FrameDecomposer complete — %d components",
-            job_id, components_total,
-        )
+        figma_last_modified = phases["figma_last_modified"]
+        components_total = phases["components_total"]
+        page_meta = phases["page"]
+        schema_tokens = phases["design_tokens"]
+        source_meta = phases["source"]
+        stage_timings: Dict[str, int] = phases["stage_timings"]
 
         # Fail fast if no components were found (T139)
         if components_total == 0:
@@ -355,88 +912,17 @@ async def execute_spec_pipeline_activity(params: dict) -> dict:
                 "error": error_msg,
             }
 
-        # ============================================================
-        # Phase 3: SpecAnalyzerNode (LLM vision — slowest phase)
-        # ============================================================
-        from workflow.nodes.spec_nodes import SpecAnalyzerNode
-
-        # -- Checkpoint resume: skip already-analyzed components --
-        checkpoints = _load_checkpoints(output_dir)
-        pre_completed: List[dict] = []
-        pending_components: List[dict] = []
-        pre_token_usage: Dict[str, int] = {}
-
-        for comp in components:
-            comp_id = comp.get("id", "")
-            if comp_id in checkpoints:
-                cp_data = checkpoints[comp_id]
-                # Verify checkpoint has real analysis data (role != placeholder)
-                if cp_data.get("role") and cp_data.get("role") != "other":
-                    pre_completed.append(cp_data)
-                    cp_tokens = cp_data.get("_token_usage", {})
-                    pre_token_usage["input_tokens"] = (
-                        pre_token_usage.get("input_tokens", 0)
-                        + cp_tokens.get("input_tokens", 0)
-                    )
-                    pre_token_usage["output_tokens"] = (
-                        pre_token_usage.get("output_tokens", 0)
-                        + cp_tokens.get("output_tokens", 0)
-                    )
-                    continue
-            pending_components.append(comp)
-
-        if pre_completed:
-            logger.info(
-                "Job %s: Checkpoint resume — %d/%d from cache, %d pending",
-                job_id, len(pre_completed), components_total, len(pending_components),
-            )
-            await _push_event(job_id, "checkpoint_resume", {
-                "pre_completed": len(pre_completed),
-                "pending": len(pending_components),
-                "total": components_total,
-            })
-
-        # Run analyzer only for pending components
-        analysis_stats: Dict[str, Any] = {}
-        new_token_usage: Dict[str, int] = {}
-        newly_analyzed: List[dict] = []
-
-        if pending_components:
-            analyzer = SpecAnalyzerNode(
-                node_id="spec_analyzer_0",
-                node_type="spec_analyzer",
-                config={
-                    "cwd": output_dir,
-                    "model": model or "",
-                    "max_tokens": SPEC_ANALYZER_MAX_TOKENS,
-                    "max_retries": SPEC_ANALYZER_MAX_RETRIES,
-                },
-            )
-            analyzer_result = await analyzer.execute({
-                "components": pending_components,
-                "page": page_meta,
-                "design_tokens": schema_tokens,
-                "source": source_meta,
-                "run_id": job_id,
-            })
-
-            newly_analyzed = analyzer_result.get("components", pending_components)
-            analysis_stats = analyzer_result.get("analysis_stats", {})
-            new_token_usage = analyzer_result.get("token_usage", {})
-
-            # Save checkpoints for newly succeeded components
-            for comp in newly_analyzed:
-                comp_id = comp.get("id", "")
-                if comp_id and not comp.get("_analysis_failed"):
-                    _save_checkpoint(output_dir, comp_id, comp)
-
-        # Merge pre-completed (checkpoint) + newly analyzed
-        analyzed_components = pre_completed + newly_analyzed
+        analyzed_components = phases["analyzed_components"]
+        analysis_stats: Dict[str, Any] = phases["analysis_stats"]
+        new_token_usage: Dict[str, int] = phases["token_usage"]
+        pre_token_usage: Dict[str, int] = phases["pre_token_usage"]
+        pre_completed_count = phases["pre_completed"]
+        reused_count = phases["reused"]
 
         # Aggregate counts
         new_completed = analysis_stats.get("succeeded", 0)
         new_failed = analysis_stats.get("failed", 0)
-        components_completed = len(pre_completed) + new_completed
+        components_completed = pre_completed_count + new_completed
         components_failed = new_failed
 
         # Merge token usage
@@ -476,7 +962,7 @@ async def execute_spec_pipeline_activity(params: dict) -> dict:
             logger.info(
                 "Job %s: SpecAnalyzer complete — %d/%d succeeded (pre=%d, new=%d)",
                 job_id, components_completed, components_total,
-                len(pre_completed), new_completed,
+                pre_completed_count, new_completed,
             )
 
         activity.heartbeat(f"phase:analyze_done:{components_completed}/{components_total}")
@@ -491,6 +977,7 @@ async def execute_spec_pipeline_activity(params: dict) -> dict:
             node_type="spec_assembler",
             config={"output_dir": output_dir},
         )
+        assemble_start = time.monotonic()
         assembler_result = await assembler.execute({
             "components": analyzed_components,
             "page": page_meta,
@@ -503,6 +990,8 @@ async def execute_spec_pipeline_activity(params: dict) -> dict:
 
         spec_path = assembler_result.get("spec_path", "")
         validation = assembler_result.get("validation", {})
+        stage_timings["assemble_ms"] = _elapsed_ms(assemble_start)
+        stage_timings["total_ms"] = _elapsed_ms(pipeline_start)
 
         await _push_event(job_id, "spec_complete", {
             "spec_path": spec_path,
@@ -511,6 +1000,8 @@ async def execute_spec_pipeline_activity(params: dict) -> dict:
             "components_failed": components_failed,
             "validation": validation,
             "token_usage": token_usage,
+            "pipeline_mode": pipeline_mode,
+            "stage_timings": stage_timings,
         })
 
         final_status = "completed"
@@ -525,6 +1016,8 @@ async def execute_spec_pipeline_activity(params: dict) -> dict:
                 "spec_path": spec_path,
                 "analysis_stats": analysis_stats,
                 "components_count": components_total,
+                "components_reused": reused_count,
+                "stage_timings": stage_timings,
                 "validation": validation,
                 "token_usage": token_usage,
             },
@@ -603,3 +1096,4 @@ async def execute_spec_pipeline_activity(params: dict) -> dict:
                 "components_failed": components_failed,
                 "error": final_error,
             })
+        await _flush_events()
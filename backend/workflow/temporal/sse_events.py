@@ -36,9 +36,9 @@ NODE_TO_STEP: Dict[str, Optional[tuple]] = {
 async def _push_event(job_id: str, event_type: str, data: Dict[str, Any]) -> None:
     """Push an SSE event to the API server via HTTP POST.
 
-    Uses the existing push_sse_event from workflow/sse.py which POSTs to
-    /api/internal/events/{run_id}. Non-blocking: logs errors but never
-    fails the workflow.
+    Uses the existing push_sse_event from workflow/sse.py, which queues the
+    event for batched delivery to the API server. Non-blocking: logs errors
+    but never fails the workflow.
     """
     from ..sse import push_sse_event
 
@@ -48,6 +48,21 @@ async def _push_event(job_id: str, event_type: str, data: Dict[str, Any]) -> Non
         logger.error(f"Job {job_id}: Failed to push SSE event {event_type}: {e}")
 
 
+async def _flush_events() -> None:
+    """Wait for queued SSE events to be shipped before the activity returns.
+
+    Events are batched by workflow/sse.py's EventShipper; this is called at
+    activity boundaries so the final events are delivered promptly.
+    """
+    from ..sse import flush_sse_events
+
+    try:
+        if not await flush_sse_events():
+            logger.warning("Timed out flushing queued SSE events")
+    except Exception as e:
+        logger.error(f"Failed to flush SSE events: {e}")
+
+
 def _setup_sync_event_pusher() -> None:
     """Configure agents.py to push events via HTTP POST (fire-and-forget).
 
@@ -71,11 +86,15 @@ async def _periodic_heartbeat(job_id: str, interval_seconds: int = 60) -> None:
 
     This prevents heartbeat timeout during long-running Claude CLI calls.
     Runs as a background task and is cancelled when the activity completes.
+    The worker's DB write-behind stats (queue depth, flush latency) ride
+    along as a second heartbeat detail, visible in the Temporal UI.
     """
+    from .db_writer import get_db_write_stats
+
     while True:
         await asyncio.sleep(interval_seconds)
         try:
-            activity.heartbeat(f"alive:job:{job_id}")
+            activity.heartbeat(f"alive:job:{job_id}", get_db_write_stats())
         except Exception:
             # Activity may have been cancelled; stop heartbeating
             return
@@ -1,7 +1,9 @@
 """Database synchronization helpers for batch bug fix activities.
 
 Handles all DB reads/writes for job status, bug status, step persistence,
-and incremental/final result synchronization.
+and incremental/final result synchronization. Row updates go through the
+worker's write-behind queue (db_writer.py); terminal job statuses and the
+final sync are written before returning.
 """
 
 from __future__ import annotations
@@ -13,6 +15,7 @@ from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
 from ..settings import BATCH_DB_SYNC_MAX_ATTEMPTS
+from .db_writer import TERMINAL_JOB_STATUSES, flush_db_writes, get_db_write_queue
 
 logger = logging.getLogger("workflow.temporal.state_sync")
 
@@ -37,37 +40,39 @@ async def _update_job_status(
     status: str,
     error: Optional[str] = None,
 ) -> bool:
-    """Update job status in database. Returns True on success."""
-    from .sse_events import _push_event
+    """Queue a job status update. Returns True on success.
 
-    try:
-        from app.database import get_session_ctx
-        from app.repositories.batch_job import BatchJobRepository
+    Terminal statuses (completed / failed / cancelled) are written, with
+    everything queued before them, before this returns, so callers can
+    push job_done right after.
+    """
+    from .sse_events import _push_event
 
-        async with get_session_ctx() as session:
-            repo = BatchJobRepository(session)
-            await repo.update_status(job_id, status, error=error)
+    get_db_write_queue().update_batch_job(job_id, status, error=error)
+    if await flush_db_writes(urgent=status in TERMINAL_JOB_STATUSES, job_id=job_id):
         logger.info(f"Job {job_id}: DB status -> {status}")
         return True
-    except Exception as e:
-        logger.error(f"Job {job_id}: Failed to update status in DB: {e}")
-        await _push_event(job_id, "db_sync_warning", {
-            "message": f"数据库状态更新失败: {status}",
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        })
-        return False
+    logger.error(f"Job {job_id}: Failed to update status in DB")
+    await _push_event(job_id, "db_sync_warning", {
+        "message": f"数据库状态更新失败: {status}",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    })
+    return False
 
 
 async def _reset_stale_bugs(job_id: str, total_bugs: int) -> None:
     """Reset stale in_progress bugs back to pending on retry attempts.
 
     When a heartbeat timeout kills an attempt, bugs may be left in
-    'in_progress' state. This resets them so the retry starts clean.
+    'in_progress' state with some of their steps written. This resets
+    them and drops those steps so the retry starts clean.
     """
     try:
         from app.database import get_session_ctx
         from app.repositories.batch_job import BatchJobRepository
 
+        # Updates still queued from the killed attempt land first
+        await flush_db_writes(job_id=job_id)
         async with get_session_ctx() as session:
             repo = BatchJobRepository(session)
             db_job = await repo.get(job_id)
@@ -79,6 +84,8 @@ async def _reset_stale_bugs(job_id: str, total_bugs: int) -> None:
                             bug_index=bug.bug_index,
                             status="pending",
                         )
+                        # The bug reruns from the start: drop the partial steps
+                        await repo.clear_bug_steps(job_id, bug.bug_index)
                         logger.info(
                             f"Job {job_id}: Reset bug {bug.bug_index} "
                             f"from in_progress to pending"
@@ -95,27 +102,19 @@ async def _update_bug_status_db(
     started_at: Optional[datetime] = None,
     completed_at: Optional[datetime] = None,
 ) -> bool:
-    """Update a single bug's status in database. Returns True on success."""
-    try:
-        from app.database import get_session_ctx
-        from app.repositories.batch_job import BatchJobRepository
+    """Queue a single bug's status update.
 
-        async with get_session_ctx() as session:
-            repo = BatchJobRepository(session)
-            await repo.update_bug_status(
-                job_id=job_id,
-                bug_index=bug_index,
-                status=status,
-                error=error,
-                started_at=started_at,
-                completed_at=completed_at,
-            )
+    Returns False only if write-behind is off and the write failed; queued
+    writes are checked when the caller flushes.
+    """
+    get_db_write_queue().update_bug(
+        job_id, bug_index, status,
+        error=error, started_at=started_at, completed_at=completed_at,
+    )
+    if await flush_db_writes(urgent=False, job_id=job_id):
         return True
-    except Exception as e:
-        logger.error(
-            f"Job {job_id}: Failed to update bug {bug_index} status: {e}"
-        )
-        return False
+    logger.error(f"Job {job_id}: Failed to update bug {bug_index} status")
+    return False
 
 
 async def _persist_bug_steps(
@@ -123,27 +122,15 @@ async def _persist_bug_steps(
     bug_index: int,
     steps: List[Dict[str, Any]],
 ) -> bool:
-    """Persist step records for a completed bug to the database. Returns True on success."""
-    try:
-        from app.database import get_session_ctx
-        from app.repositories.batch_job import BatchJobRepository
+    """Queue step records of one bug for appending.
 
-        async with get_session_ctx() as session:
-            repo = BatchJobRepository(session)
-            await repo.update_bug_steps(
-                job_id=job_id,
-                bug_index=bug_index,
-                steps=steps,
-            )
-        logger.info(
-            f"Job {job_id}: Persisted {len(steps)} steps for bug {bug_index}"
-        )
+    Returns False only if write-behind is off and the write failed.
+    """
+    get_db_write_queue().append_steps(job_id, bug_index, steps)
+    if await flush_db_writes(urgent=False, job_id=job_id):
         return True
-    except Exception as e:
-        logger.error(
-            f"Job {job_id}: Failed to persist steps for bug {bug_index}: {e}"
-        )
-        return False
+    logger.error(f"Job {job_id}: Failed to persist steps for bug {bug_index}")
+    return False
 
 
 async def _sync_incremental_results(
@@ -164,6 +151,7 @@ async def _sync_incremental_results(
 
     now = datetime.now(timezone.utc)
     now_iso = now.isoformat()
+    synced: List[int] = []
 
     for i in range(start_index, len(results)):
         if i >= len(jira_urls):
@@ -200,18 +188,13 @@ async def _sync_incremental_results(
                 "timestamp": now_iso,
             })
 
-        # Update bug in DB
-        db_ok = await _update_bug_status_db(
+        # Update bug in DB (written by the flush below)
+        await _update_bug_status_db(
             job_id, db_i, result_status,
             error=error_msg,
             completed_at=now,
         )
-        if not db_ok:
-            await _push_event(job_id, "db_sync_warning", {
-                "bug_index": db_i,
-                "message": f"Bug {db_i} 状态同步失败，刷新页面后状态可能不准确",
-                "timestamp": now_iso,
-            })
+        synced.append(db_i)
 
     # Mark next pending bug as in_progress
     next_index = len(results)
@@ -227,6 +210,20 @@ async def _sync_incremental_results(
             "timestamp": now_iso,
         })
 
+    # Phase boundary: write the results (and the bugs' steps) now
+    if not await flush_db_writes(job_id=job_id):
+        for db_i in synced:
+            await _push_event(job_id, "db_sync_warning", {
+                "bug_index": db_i,
+                "message": f"Bug {db_i} 状态同步失败，刷新页面后状态可能不准确",
+                "timestamp": now_iso,
+            })
+        if not synced:
+            await _push_event(job_id, "db_sync_warning", {
+                "message": "数据库同步失败，刷新页面后状态可能不准确",
+                "timestamp": now_iso,
+            })
+
 
 async def _sync_final_results(
     job_id: str,
@@ -254,6 +251,10 @@ async def _sync_final_results(
     overall = "completed" if failed == 0 and skipped == 0 else "failed"
     db_sync_ok = False
 
+    # Queued incremental updates must not land on top of the final ones
+    if not await flush_db_writes(job_id=job_id):
+        logger.error(f"Job {job_id}: Queued DB updates not written before final sync")
+
     for attempt in range(BATCH_DB_SYNC_MAX_ATTEMPTS):
         try:
             from app.database import get_session_ctx
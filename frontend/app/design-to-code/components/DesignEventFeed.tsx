@@ -42,6 +42,7 @@ const EVENT_CONFIG: Record<string, { tagBg: string; tagColor: string; label: str
   job_done: { tagBg: "rgba(6,182,212,0.15)", tagColor: "#22d3ee", label: "任务结束" },
   figma_fetch_start: { tagBg: "rgba(139,92,246,0.12)", tagColor: "#a78bfa", label: "Figma 获取" },
   figma_fetch_complete: { tagBg: "rgba(34,197,94,0.12)", tagColor: "#4ade80", label: "Figma 完成" },
+  screenshot_downloaded: { tagBg: "rgba(139,92,246,0.12)", tagColor: "#a78bfa", label: "截图下载" },
   frame_decomposed: { tagBg: "rgba(6,182,212,0.15)", tagColor: "#22d3ee", label: "结构分解" },
   spec_analyzed: { tagBg: "rgba(139,92,246,0.15)", tagColor: "#a78bfa", label: "语义分析" },
   spec_complete: { tagBg: "rgba(34,197,94,0.15)", tagColor: "#4ade80", label: "规格完成" },
@@ -68,6 +69,7 @@ const EVENT_CATEGORY_MAP: Record<string, FilterCategory> = {
   job_done: "node",
   figma_fetch_start: "spec",
   figma_fetch_complete: "spec",
+  screenshot_downloaded: "spec",
   frame_decomposed: "spec",
   spec_analyzed: "spec",
   spec_complete: "spec",
@@ -748,6 +750,11 @@ function describeEvent(event: PipelineEvent): string {
       return "正在从 Figma 获取设计数据...";
     case "figma_fetch_complete":
       return "Figma 设计数据获取完成";
+    case "screenshot_downloaded": {
+      const completed = event.data?.completed as number;
+      const total = event.data?.total as number;
+      return `截图 ${completed ?? "?"}/${total ?? "?"} 已下载`;
+    }
     case "frame_decomposed": {
       const count = event.data?.components_count as number;
       const pageName = (event.data?.page as Record<string, unknown>)?.name as string;
@@ -762,7 +769,9 @@ function describeEvent(event: PipelineEvent): string {
       const total = event.data?.total as number;
       const progress = idx != null && total ? `(${idx + 1}/${total}) ` : "";
       const roleBadge = role ? `[${role}] ` : "";
-      return `${progress}${roleBadge}${compName || "组件"} 语义分析完成`;
+      const warningCount = event.data?.quality_warning_count as number;
+      const warnings = warningCount ? `，${warningCount} 条质量警告` : "";
+      return `${progress}${roleBadge}${compName || "组件"} 语义分析完成${warnings}`;
     }
     case "ai_thinking":
       return (event.data?.content as string)?.slice(0, 80) || "AI 正在分析...";
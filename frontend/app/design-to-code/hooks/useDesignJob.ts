@@ -215,6 +215,10 @@ export function useDesignJob() {
         pushEvent("figma_fetch_complete", data);
       },
 
+      screenshot_downloaded: (data) => {
+        pushEvent("screenshot_downloaded", data);
+      },
+
       ai_thinking: (data) => {
         pushEvent("ai_thinking", data);
       },
@@ -40,6 +40,8 @@ export interface V2PagedWorkflowsResponse {
 
 export interface V2RunRequest {
   initial_state: Record<string, unknown>;
+  /** node_output schema: 1 = full state per node, 2 = deltas + snapshots */
+  event_schema_version?: 1 | 2;
 }
 
 export interface V2RunResponse {
@@ -257,6 +259,7 @@ export interface BatchBugFixRequest {
     validation_level?: "minimal" | "standard" | "thorough";
     failure_policy?: "stop" | "skip" | "retry";
     max_retries?: number;
+    max_parallel_bugs?: number;
   };
   dry_run?: boolean;
 }
@@ -275,6 +278,7 @@ export interface DryRunResponse {
     validation_level: string;
     failure_policy: string;
     max_retries: number;
+    max_parallel_bugs: number;
   };
   bugs: DryRunBugPreview[];
   expected_steps_per_bug: string[];
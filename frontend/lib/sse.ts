@@ -8,8 +8,12 @@ export interface NodeUpdateEvent {
 
 export interface NodeOutputEvent {
   node: string;
+  /** v1: JSON of the node's full state; v2: JSON of patch ops or a snapshot */
   output: string;
   timestamp?: string;
+  schema_version?: 1 | 2;
+  kind?: "delta" | "snapshot";
+  seq?: number;
 }
 
 export interface LoopIterationEvent {
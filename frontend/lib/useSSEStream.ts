@@ -24,6 +24,13 @@ function getBackoffMs(
   return Math.min(baseMs * Math.pow(2, retryCount), maxMs);
 }
 
+/** Append `last_event_id` so the server replays only missed events */
+function withLastEventId(url: string, lastEventId: string | null): string {
+  if (!lastEventId) return url;
+  const sep = url.includes("?") ? "&" : "?";
+  return `${url}${sep}last_event_id=${encodeURIComponent(lastEventId)}`;
+}
+
 // ---------------------------------------------------------------------------
 // Types
 // ---------------------------------------------------------------------------
@@ -125,6 +132,7 @@ export function useSSEStream(options: UseSSEStreamOptions): UseSSEStreamReturn {
   const retryCountRef = useRef(0);
   const errorFiredRef = useRef(false);
   const closedIntentionallyRef = useRef(false);
+  const lastEventIdRef = useRef<string | null>(null);
   const heartbeatTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null);
 
   useEffect(() => {
@@ -142,6 +150,7 @@ export function useSSEStream(options: UseSSEStreamOptions): UseSSEStreamReturn {
     retryCountRef.current = 0;
     errorFiredRef.current = false;
     closedIntentionallyRef.current = false;
+    lastEventIdRef.current = null;
 
     // -- Heartbeat helpers --
     const clearHeartbeat = () => {
@@ -164,7 +173,9 @@ export function useSSEStream(options: UseSSEStreamOptions): UseSSEStreamReturn {
     const connect = () => {
       if (destroyed) return;
 
-      const es = new EventSource(url);
+      // We recreate EventSource ourselves, so the browser never resends
+      // Last-Event-ID — pass it explicitly to resume without a full reload.
+      const es = new EventSource(withLastEventId(url, lastEventIdRef.current));
       eventSource = es;
 
       es.onopen = () => {
@@ -191,9 +202,16 @@ export function useSSEStream(options: UseSSEStreamOptions): UseSSEStreamReturn {
         if (!seen[k]) { seen[k] = true; eventTypes.push(k); }
       }
 
+      // Server could not replay from our last id — refresh via poll
+      es.addEventListener("resync", () => {
+        lastEventIdRef.current = null;
+        pollFnRef.current?.().catch(() => {});
+      });
+
       for (const eventType of eventTypes) {
         es.addEventListener(eventType, (e: MessageEvent) => {
           resetHeartbeat();
+          if (e.lastEventId) lastEventIdRef.current = e.lastEventId;
           const data = safeParse(e.data) as Record<string, unknown> | null;
           if (!data) return;
 